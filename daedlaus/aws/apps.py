@@ -3,4 +3,8 @@ from django.apps import AppConfig
 class AWSConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'aws'
-    verbose_name = 'AWS Configuration'
\ No newline at end of file
+    verbose_name = 'AWS Configuration'
+
+    def ready(self):
+        # Import signals to register them
+        import aws.signals  # noqa
@@ -0,0 +1,157 @@
+import hashlib
+import logging
+import os
+import threading
+from django.conf import settings
+
+from .utils import get_aws_session, BOTO3_AVAILABLE
+
+if BOTO3_AVAILABLE:
+    from botocore.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+def get_client_config():
+    """
+    Return the botocore Config applied to every pooled client.
+
+    Clients are shared by all threads of a process (transfer workers, ZIP
+    export prefetch, request threads), so the connection pool is sized
+    for that rather than botocore's default of 10.
+    """
+    return Config(
+        max_pool_connections=getattr(settings, 'AWS_MAX_POOL_CONNECTIONS', 50),
+        retries={
+            'max_attempts': getattr(settings, 'AWS_MAX_RETRY_ATTEMPTS', 5),
+            'mode': 'standard',
+        },
+        tcp_keepalive=True,
+    )
+
+
+class ClientRegistry:
+    """
+    Process-wide cache of boto3 clients, one per configuration and service.
+
+    Entries are keyed by the configuration's model, primary key,
+    ``updated_at`` and a fingerprint of its credentials, so an edited
+    configuration never reuses a client built from its old credentials.
+    boto3 clients are thread-safe once created; sessions are not, so
+    creation happens under the registry lock.
+    """
+
+    def __init__(self):
+        self._clients = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(config, service_name, region_name=None):
+        fingerprint = hashlib.sha256(
+            f"{config.aws_access_key_id}:{config.aws_secret_access_key}".encode()
+        ).hexdigest()[:16]
+        version = (config.updated_at.isoformat() if config.updated_at else '', fingerprint)
+        return (config._meta.label, config.pk, version, service_name, region_name or config.region)
+
+    def get_client(self, config, service_name, region_name=None):
+        """
+        Return a shared client for an AWS configuration.
+
+        Configurations that have not been saved yet (e.g. while being
+        validated in a form) get a fresh, uncached client.
+
+        Args:
+            config: S3Configuration or BedrockConfiguration instance
+            service_name: boto3 service name, e.g. 's3' or 'bedrock-runtime'
+            region_name: Region override (defaults to the configuration's region)
+
+        Returns:
+            botocore client
+        """
+        if config.pk is None:
+            return self._create(config, service_name, region_name)
+
+        key = self.make_key(config, service_name, region_name)
+        client = self._clients.get(key)
+        if client is not None:
+            self.hits += 1
+            return client
+
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                self.misses += 1
+                client = self._create(config, service_name, region_name)
+                # Drop clients built from older versions of this configuration
+                for stale in [k for k in self._clients if k[:2] == key[:2] and k[2] != key[2]]:
+                    del self._clients[stale]
+                self._clients[key] = client
+            else:
+                self.hits += 1
+        return client
+
+    def _create(self, config, service_name, region_name=None):
+        session = get_aws_session(config)
+        return session.client(
+            service_name=service_name,
+            region_name=region_name or config.region,
+            config=get_client_config(),
+        )
+
+    def invalidate(self, config=None):
+        """
+        Forget the clients of one configuration, or of all configurations.
+
+        Returns:
+            int: Number of clients dropped
+        """
+        with self._lock:
+            if config is None:
+                keys = list(self._clients)
+            else:
+                keys = [k for k in self._clients if k[:2] == (config._meta.label, config.pk)]
+            for key in keys:
+                del self._clients[key]
+        if keys:
+            logger.info(f"Dropped {len(keys)} cached AWS client(s)")
+        return len(keys)
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self._clients),
+        }
+
+
+_registry = ClientRegistry()
+
+
+def _reset_after_fork():
+    # Connection pools must not be shared with the parent process
+    global _registry
+    _registry = ClientRegistry()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_client_registry():
+    """Return the process-wide client registry."""
+    return _registry
+
+
+def get_client(config, service_name, region_name=None):
+    """
+    Shortcut for ``get_client_registry().get_client(...)``.
+
+    Raises:
+        ImportError: If boto3 is not installed
+    """
+    if not BOTO3_AVAILABLE:
+        raise ImportError("boto3 is not installed. Please install boto3 to use AWS functionality.")
+    return _registry.get_client(config, service_name, region_name)
+
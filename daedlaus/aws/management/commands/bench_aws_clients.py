@@ -0,0 +1,89 @@
+import threading
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from aws.clients import ClientRegistry
+from aws.models import S3Configuration
+from aws.utils import get_aws_session, BOTO3_AVAILABLE
+
+
+class Command(BaseCommand):
+    help = 'Measure the cost of building a boto3 client against fetching one from the client registry'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations', type=int, default=50,
+            help='Clients acquired per measurement (default: 50)'
+        )
+        parser.add_argument(
+            '--threads', type=int, default=8,
+            help='Threads acquiring clients concurrently in the threaded measurement (default: 8)'
+        )
+        parser.add_argument(
+            '--service', default='s3',
+            help="boto3 service name (default: 's3')"
+        )
+        parser.add_argument(
+            '--config-id', type=int,
+            help='S3Configuration to use (default: an unsaved dummy configuration; no requests are sent)'
+        )
+
+    def handle(self, *args, **options):
+        if not BOTO3_AVAILABLE:
+            raise CommandError("boto3 is not installed")
+
+        if options['config_id']:
+            try:
+                config = S3Configuration.objects.get(pk=options['config_id'])
+            except S3Configuration.DoesNotExist:
+                raise CommandError(f"S3Configuration {options['config_id']} does not exist")
+        else:
+            # Never saved: the pk only gives the registry something to key on
+            config = S3Configuration(
+                pk=0, name='bench', aws_access_key_id='AKIABENCHMARK', aws_secret_access_key='bench',
+                bucket_name='bench', updated_at=timezone.now()
+            )
+
+        iterations = options['iterations']
+        service = options['service']
+
+        def fresh():
+            get_aws_session(config).client(service, region_name=config.region)
+
+        registry = ClientRegistry()
+        registry.get_client(config, service)
+
+        def pooled():
+            registry.get_client(config, service)
+
+        self.stdout.write(f"Acquiring '{service}' clients, {iterations} per measurement")
+        fresh_time = self.measure('new session + client', fresh, iterations, 1)
+        pooled_time = self.measure('registry lookup', pooled, iterations, 1)
+        self.measure(f"new session + client, {options['threads']} threads", fresh, iterations, options['threads'])
+        self.measure(f"registry lookup, {options['threads']} threads", pooled, iterations, options['threads'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Registry lookups are {fresh_time / max(pooled_time, 1e-9):,.0f}x faster than building a client"
+        ))
+
+    def measure(self, label, acquire, iterations, threads):
+        """Run ``acquire`` ``iterations`` times on each of ``threads`` threads."""
+        def run():
+            for _ in range(iterations):
+                acquire()
+
+        workers = [threading.Thread(target=run) for _ in range(threads)]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - start
+
+        per_client = elapsed / (iterations * threads)
+        self.stdout.write(
+            f"  {label:<40} {per_client * 1000:10.3f} ms/client  "
+            f"{iterations * threads / elapsed:12,.0f} clients/s"
+        )
+        return per_client
@@ -5,15 +5,10 @@ from django.conf import settings
 import logging
 import re
 
-logger = logging.getLogger(__name__)
+from .clients import get_client
+from .utils import BOTO3_AVAILABLE
 
-# Try to import boto3, but handle gracefully if not available
-try:
-    import boto3
-    BOTO3_AVAILABLE = True
-except ImportError:
-    BOTO3_AVAILABLE = False
-    logger.warning("boto3 is not installed or not available. AWS functionality will be limited.")
+logger = logging.getLogger(__name__)
 
 AWS_REGIONS = [
     ('us-east-1', 'US East (N. Virginia)'),
@@ -98,12 +93,7 @@ class BaseAWSConfiguration(models.Model):
             
         try:
             # Basic validation using STS - works for any valid AWS credentials
-            session = boto3.Session(
-                aws_access_key_id=self.aws_access_key_id,
-                aws_secret_access_key=self.aws_secret_access_key,
-                region_name=self.region
-            )
-            sts = session.client('sts')
+            sts = get_client(self, 'sts')
             sts.get_caller_identity()
             return True, "Credentials validated successfully"
         except Exception as e:
@@ -188,12 +178,7 @@ class S3Configuration(BaseAWSConfiguration):
                 return success, message
             
             # S3-specific validation
-            session = boto3.Session(
-                aws_access_key_id=self.aws_access_key_id,
-                aws_secret_access_key=self.aws_secret_access_key,
-                region_name=self.region
-            )
-            s3_client = session.client('s3')
+            s3_client = get_client(self, 's3')
             
             # Check if bucket exists
             try:
@@ -267,12 +252,6 @@ class BedrockConfiguration(BaseAWSConfiguration):
                 return success, message
             
             # Bedrock-specific validation
-            session = boto3.Session(
-                aws_access_key_id=self.aws_access_key_id,
-                aws_secret_access_key=self.aws_secret_access_key,
-                region_name=self.region
-            )
-            
             # Check if the region supports Bedrock
             bedrock_regions = [
                 'us-east-1', 'us-east-2', 'us-west-2', 'ap-northeast-1', 
@@ -282,10 +261,7 @@ class BedrockConfiguration(BaseAWSConfiguration):
                 return False, f"AWS Bedrock is not available in the {self.region} region. Please use one of: {', '.join(bedrock_regions)}"
             
             # Check if the model exists and is accessible
-            bedrock_client = session.client(
-                service_name='bedrock-runtime',
-                region_name=self.region
-            )
+            bedrock_client = get_client(self, 'bedrock-runtime')
             
             # Try listing models to verify API access
             try:
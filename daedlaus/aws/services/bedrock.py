@@ -1,7 +1,8 @@
 import json
 import logging
 
-from ..utils import get_aws_session, get_active_bedrock_config, BOTO3_AVAILABLE
+from ..clients import get_client
+from ..utils import get_active_bedrock_config, BOTO3_AVAILABLE
 
 # Try to import boto3 dependencies, but handle gracefully if not available
 if BOTO3_AVAILABLE:
@@ -28,7 +29,6 @@ class BedrockService:
         """
         if not BOTO3_AVAILABLE:
             logger.error("boto3 is not installed. Bedrock functionality will not work.")
-            self.session = None
             self.client = None
             self.model_id = None
             self.config = None
@@ -41,19 +41,13 @@ class BedrockService:
             
         if self.config:
             try:
-                self.session = get_aws_session(self.config)
-                self.client = self.session.client(
-                    service_name='bedrock-runtime',
-                    region_name=self.config.region
-                )
+                self.client = get_client(self.config, 'bedrock-runtime')
                 self.model_id = self.config.default_model_id
             except Exception as e:
                 logger.error(f"Error initializing Bedrock service: {str(e)}")
-                self.session = None
                 self.client = None
                 self.model_id = None
         else:
-            self.session = None
             self.client = None
             self.model_id = None
             logger.warning("No Bedrock configuration provided or available")
@@ -142,15 +136,12 @@ class BedrockService:
         Returns:
             list: List of available model IDs or empty list on error
         """
-        if not self.session:
+        if not self.client:
             return []
         
         try:
             # Create a bedrock client (not bedrock-runtime)
-            bedrock_client = self.session.client(
-                service_name='bedrock', 
-                region_name=self.config.region
-            )
+            bedrock_client = get_client(self.config, 'bedrock')
             
             # List foundation models
             response = bedrock_client.list_foundation_models()
@@ -1,6 +1,7 @@
 import logging
 from django.conf import settings
 
+from ..clients import get_client
 from ..utils import get_aws_session, get_active_s3_config, BOTO3_AVAILABLE
 
 # Try to import boto3 dependencies, but handle gracefully if not available
@@ -14,6 +15,67 @@ else:
 
 logger = logging.getLogger(__name__)
 
+# Most keys S3 accepts in one DeleteObjects request
+DELETE_BATCH_SIZE = 1000
+
+
+def iter_bucket_objects(client, bucket_name, prefix='', page_size=1000):
+    """
+    Yield every object under a prefix, following continuation tokens.
+    
+    Keys arrive in ascending UTF-8 byte order, one page in memory at a time.
+    
+    Args:
+        client: boto3 S3 client
+        bucket_name: Bucket to list
+        prefix: Key prefix to filter objects
+        page_size: Keys requested per ListObjectsV2 call (at most 1000)
+        
+    Yields:
+        dict: Object metadata (Key, Size, LastModified, ETag, StorageClass)
+    """
+    params = {'Bucket': bucket_name, 'Prefix': prefix, 'MaxKeys': page_size}
+    while True:
+        response = client.list_objects_v2(**params)
+        yield from response.get('Contents', [])
+        if not response.get('IsTruncated'):
+            return
+        params['ContinuationToken'] = response['NextContinuationToken']
+
+
+def delete_bucket_objects(client, bucket_name, keys):
+    """
+    Delete many objects with one DeleteObjects request per 1000 keys.
+    
+    Args:
+        client: boto3 S3 client
+        bucket_name: Bucket holding the objects
+        keys: Iterable of object keys
+        
+    Returns:
+        tuple: (number of keys deleted, list of (key, error message))
+    """
+    keys = list(dict.fromkeys(key for key in keys if key))
+    deleted = 0
+    errors = []
+    for start in range(0, len(keys), DELETE_BATCH_SIZE):
+        batch = keys[start:start + DELETE_BATCH_SIZE]
+        try:
+            response = client.delete_objects(
+                Bucket=bucket_name,
+                Delete={'Objects': [{'Key': key} for key in batch], 'Quiet': True}
+            )
+        except ClientError as e:
+            logger.error(f"Error deleting {len(batch)} objects from S3: {str(e)}")
+            errors.extend((key, str(e)) for key in batch)
+            continue
+        # Quiet mode only reports the keys that failed
+        failed = [(error['Key'], error.get('Message', error.get('Code', ''))) for error in response.get('Errors', [])]
+        errors.extend(failed)
+        deleted += len(batch) - len(failed)
+    return deleted, errors
+
+
 class S3Service:
     """
     Service class for AWS S3 operations.
@@ -26,11 +88,10 @@ class S3Service:
         Args:
             config: S3Configuration instance (optional)
         """
+        self._resource = None
         if not BOTO3_AVAILABLE:
             logger.error("boto3 is not installed. S3 functionality will not work.")
-            self.session = None
             self.client = None
-            self.resource = None
             self.bucket_name = None
             self.config = None
             return
@@ -44,22 +105,24 @@ class S3Service:
             
         if self.config:
             try:
-                self.session = get_aws_session(self.config)
-                self.client = self.session.client('s3')
-                self.resource = self.session.resource('s3')
+                # Shared, thread-safe client from the process-wide registry
+                self.client = get_client(self.config, 's3')
                 self.bucket_name = self.config.bucket_name
             except Exception as e:
                 logger.error(f"Error initializing S3 service: {str(e)}")
-                self.session = None
                 self.client = None
-                self.resource = None
                 self.bucket_name = None
         else:
-            self.session = None
             self.client = None
-            self.resource = None
             self.bucket_name = None
             logger.warning("No S3 configuration provided or available")
+
+    @property
+    def resource(self):
+        """boto3 S3 resource, created on first use (resources are not shared between threads)."""
+        if self._resource is None and self.client is not None:
+            self._resource = get_aws_session(self.config).resource('s3')
+        return self._resource
     
     def upload_file(self, file_path, object_name=None, acl='private', extra_args=None):
         """
@@ -130,7 +193,7 @@ class S3Service:
         
         Args:
             prefix: Key prefix to filter objects
-            max_keys: Maximum number of keys to return
+            max_keys: Maximum number of keys to return (None for all)
             
         Returns:
             list: List of object metadata dictionaries
@@ -139,19 +202,31 @@ class S3Service:
             return []
         
         try:
-            response = self.client.list_objects_v2(
-                Bucket=self.bucket_name,
-                Prefix=prefix,
-                MaxKeys=max_keys
-            )
-            
-            if 'Contents' in response:
-                return response['Contents']
-            return []
+            objects = []
+            for obj in self.iter_objects(prefix):
+                if max_keys is not None and len(objects) >= max_keys:
+                    break
+                objects.append(obj)
+            return objects
         except ClientError as e:
             logger.error(f"Error listing objects in S3: {str(e)}")
             return []
     
+    def iter_objects(self, prefix='', page_size=1000):
+        """
+        Stream every object with the given prefix, one listing page at a time.
+        
+        Args:
+            prefix: Key prefix to filter objects
+            page_size: Keys fetched per request
+            
+        Yields:
+            dict: Object metadata
+        """
+        if not self.client:
+            return
+        yield from iter_bucket_objects(self.client, self.bucket_name, prefix, page_size)
+    
     def delete_object(self, object_name):
         """
         Delete an object from the S3 bucket.
@@ -175,6 +250,20 @@ class S3Service:
             logger.error(f"Error deleting object from S3: {str(e)}")
             return False
     
+    def delete_objects(self, object_names):
+        """
+        Delete many objects from the S3 bucket, 1000 per request.
+        
+        Args:
+            object_names: Iterable of object keys
+            
+        Returns:
+            tuple: (number deleted, list of (key, error message))
+        """
+        if not self.client:
+            return 0, []
+        return delete_bucket_objects(self.client, self.bucket_name, object_names)
+    
     def get_object_url(self, object_name, expiration=3600):
         """
         Generate a presigned URL for an object.
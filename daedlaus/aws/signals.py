@@ -0,0 +1,19 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .clients import get_client_registry
+from .models import BedrockConfiguration, S3Configuration
+
+
+@receiver(post_save, sender=S3Configuration)
+@receiver(post_save, sender=BedrockConfiguration)
+@receiver(post_delete, sender=S3Configuration)
+@receiver(post_delete, sender=BedrockConfiguration)
+def invalidate_aws_clients(sender, instance, **kwargs):
+    """
+    Drop pooled clients built from a configuration when it changes.
+
+    Other processes pick up the new ``updated_at`` the next time they read
+    the configuration, which gives them a new registry key.
+    """
+    get_client_registry().invalidate(instance)
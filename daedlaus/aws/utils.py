@@ -90,11 +90,8 @@ def get_bedrock_client():
         return None
     
     try:
-        session = get_aws_session(config)
-        return session.client(
-            service_name='bedrock-runtime',
-            region_name=config.region
-        )
+        from .clients import get_client
+        return get_client(config, 'bedrock-runtime')
     except Exception as e:
         logger.error(f"Error creating Bedrock client: {str(e)}")
         return None
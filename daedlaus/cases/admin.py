@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.utils.translation import gettext_lazy as _
-from .models import CaseCategory, Case, Matter, CaseFolder, CaseDocument
+from .models import CaseCategory, Case, Matter, CaseFolder, CaseDocument, CaseStats
 
 @admin.register(CaseCategory)
 class CaseCategoryAdmin(admin.ModelAdmin):
@@ -101,12 +101,38 @@ class MatterAdmin(admin.ModelAdmin):
 
 @admin.register(CaseFolder)
 class CaseFolderAdmin(admin.ModelAdmin):
-    list_display = ('name', 'case', 'matter', 'parent', 'created_at')
+    list_display = ('name', 'case', 'matter', 'name_path', 'depth', 'created_at')
     list_filter = ('created_at',)
-    search_fields = ('name', 'case__title')
-    readonly_fields = ('created_by', 'created_at')
+    search_fields = ('name', 'name_path', 'case__title')
+    readonly_fields = ('name_path', 'depth', 'path', 'created_by', 'created_at')
+    list_select_related = ('case', 'matter')
     
     def save_model(self, request, obj, form, change):
         if not change:  # New object
             obj.created_by = request.user
-        super().save_model(request, obj, form, change)
\ No newline at end of file
+        super().save_model(request, obj, form, change)
+
+@admin.register(CaseStats)
+class CaseStatsAdmin(admin.ModelAdmin):
+    list_display = (
+        'case', 'document_count', 'folder_count', 'matter_count', 'docket_entry_count',
+        'last_activity_at', 'updated_at'
+    )
+    search_fields = ('case__title', 'case__case_number')
+    readonly_fields = (
+        'case', 'document_count', 'root_document_count', 'folder_count', 'matter_count',
+        'docket_entry_count', 'folder_document_counts', 'matter_document_counts',
+        'last_activity_at', 'updated_at'
+    )
+    list_select_related = ('case',)
+    actions = ['recompute']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def recompute(self, request, queryset):
+        """Recompute the selected statistics from the case's current contents"""
+        from .stats import rebuild_case_stats
+        count = rebuild_case_stats(Case.objects.filter(stats__in=queryset))
+        self.message_user(request, _('Recomputed statistics for %(count)d case(s).') % {'count': count})
+    recompute.short_description = _('Recompute selected statistics')
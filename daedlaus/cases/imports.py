@@ -0,0 +1,776 @@
+import csv
+import json
+import logging
+import time
+from itertools import islice
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, models, transaction
+from django.utils import timezone
+
+from clients.models import Client, ClientCategory
+from .models import Case, CaseCategory, CaseFolder, Matter
+from .stats import rebuild_case_stats
+from .visibility import get_visibility_resolver
+
+logger = logging.getLogger(__name__)
+
+# Record types that can be imported, in the order onboarding loads them
+IMPORT_TYPES = ('client', 'case', 'matter', 'folder')
+
+# Permissions needed to import each record type
+IMPORT_PERMISSIONS = {
+    'client': ('clients.add_client', 'clients.change_client'),
+    'case': ('cases.add_case', 'cases.change_case'),
+    'matter': ('cases.add_matter', 'cases.change_matter'),
+    'folder': ('cases.add_casefolder', 'cases.change_casefolder'),
+}
+
+TRUE_VALUES = {'1', 't', 'true', 'y', 'yes'}
+FALSE_VALUES = {'0', 'f', 'false', 'n', 'no'}
+
+
+class RowError(ValueError):
+    """A row that cannot be imported"""
+
+
+def get_import_chunk_size():
+    """Rows validated and written together (CASE_IMPORT_CHUNK_SIZE)"""
+    return getattr(settings, 'CASE_IMPORT_CHUNK_SIZE', 1000)
+
+
+def detect_format(filename):
+    """'jsonl' for .jsonl/.ndjson files, otherwise 'csv'"""
+    return 'jsonl' if filename.lower().endswith(('.jsonl', '.ndjson')) else 'csv'
+
+
+def read_rows(stream, file_format='csv'):
+    """
+    Parse rows from a text stream one at a time, without reading it whole.
+
+    Column names are stripped and lowercased. A line that cannot be parsed
+    yields an error instead of a row, so one bad line does not end the import.
+
+    Args:
+        stream: Text file object
+        file_format: 'csv' (with a header row) or 'jsonl' (one object per line)
+
+    Yields:
+        tuple: (line number, row dict or None, error message or None)
+    """
+    if file_format == 'jsonl':
+        for line_number, line in enumerate(stream, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                yield line_number, None, f"Invalid JSON: {str(e)}"
+                continue
+            if not isinstance(row, dict):
+                yield line_number, None, "Expected a JSON object"
+                continue
+            yield line_number, {str(key).strip().lower(): value for key, value in row.items()}, None
+    elif file_format == 'csv':
+        reader = csv.DictReader(stream)
+        try:
+            for row in reader:
+                yield reader.line_num, {
+                    key.strip().lower(): value for key, value in row.items() if key is not None
+                }, None
+        except csv.Error as e:
+            yield reader.line_num, None, f"Invalid CSV: {str(e)}"
+    else:
+        raise ValueError(f"Unsupported import format: {file_format}")
+
+
+def _text(value):
+    if value is None:
+        return ''
+    return str(value).strip()
+
+
+def _list(value):
+    """Values given as a JSON list or a ';' or ',' separated string"""
+    if isinstance(value, (list, tuple)):
+        return [_text(item) for item in value if _text(item)]
+    text = _text(value).replace(',', ';')
+    return [part.strip() for part in text.split(';') if part.strip()]
+
+
+class ImportReport:
+    """Counts, errors and throughput of one import"""
+
+    def __init__(self, record_type, dry_run=False, max_errors=100):
+        self.record_type = record_type
+        self.dry_run = dry_run
+        self.max_errors = max_errors
+        self.rows = 0
+        self.created = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.failed = 0
+        self.errors = []
+        self.ignored_columns = set()
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    def fail(self, line_number, message):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append((line_number, message))
+
+    def finish(self):
+        self.elapsed = time.perf_counter() - self.started
+
+    @property
+    def rows_per_second(self):
+        elapsed = self.elapsed or (time.perf_counter() - self.started)
+        return self.rows / elapsed if elapsed else 0.0
+
+    def as_dict(self):
+        return {
+            'record_type': self.record_type,
+            'dry_run': self.dry_run,
+            'rows': self.rows,
+            'created': self.created,
+            'updated': self.updated,
+            'unchanged': self.unchanged,
+            'failed': self.failed,
+            'errors': [{'line': line, 'message': message} for line, message in self.errors],
+            'ignored_columns': sorted(self.ignored_columns),
+            'seconds': round(self.elapsed, 3),
+            'rows_per_second': round(self.rows_per_second, 1),
+        }
+
+
+class Importer:
+    """
+    Validates rows and writes them in chunks for one model.
+
+    Rows are matched to existing records through in-memory lookup maps
+    loaded once at the start, so resolving a key or foreign key never
+    queries the database. Rows of a chunk are staged by ``clean()`` and
+    written by ``write()`` with one bulk insert and one bulk update per set
+    of columns; only the columns a row provides are updated. Lookup map
+    changes from a chunk wait in ``_pending`` until its savepoint commits.
+    """
+    model = None
+    # Model fields a row may set directly
+    fields = ()
+    # Columns read by clean() beyond ``fields``
+    extra_columns = ()
+
+    def __init__(self, user, create_categories=False):
+        self.user = user
+        self.create_categories = create_categories
+        self.case_ids = set()
+        self.attorney_ids = set()
+        self._staged = {}
+        self._pending = []
+        self._exclude = {
+            field.name for field in self.model._meta.concrete_fields
+            if field.is_relation or field.primary_key or not field.editable
+        }
+
+    @property
+    def columns(self):
+        return set(self.fields) | set(self.extra_columns)
+
+    def values(self, row):
+        """
+        Convert the row's columns to model values.
+
+        Returns:
+            tuple: (dict of values by attribute name, list of the field names given)
+        """
+        values = {}
+        errors = []
+        for name in self.fields:
+            if name not in row:
+                continue
+            field = self.model._meta.get_field(name)
+            raw = row[name]
+            try:
+                if isinstance(field, models.BooleanField):
+                    text = _text(raw).lower()
+                    if isinstance(raw, bool):
+                        value = raw
+                    elif text in TRUE_VALUES:
+                        value = True
+                    elif text in FALSE_VALUES or text == '':
+                        value = False
+                    else:
+                        raise ValidationError(f"'{raw}' is not true or false")
+                elif isinstance(field, (models.CharField, models.TextField)):
+                    value = _text(raw)
+                elif raw is None or _text(raw) == '':
+                    value = None
+                else:
+                    value = field.to_python(_text(raw))
+            except ValidationError as e:
+                errors.append(f"{name}: {' '.join(e.messages)}")
+                continue
+            values[field.attname] = value
+        if errors:
+            raise RowError('; '.join(errors))
+        return values, list(values)
+
+    def validate(self, instance, fields=None):
+        """Run field validation, limited to ``fields`` when updating"""
+        exclude = set(self._exclude)
+        if fields is not None:
+            exclude |= {field.name for field in self.model._meta.concrete_fields} - set(fields)
+        try:
+            instance.full_clean(exclude=exclude, validate_unique=False, validate_constraints=False)
+        except ValidationError as e:
+            raise RowError('; '.join(
+                f"{field}: {' '.join(messages)}" for field, messages in e.message_dict.items()
+            ))
+
+    def stage(self, key, existing_id, values, fields):
+        """
+        Queue a row for creation or (with ``existing_id``) an update of the
+        given fields. Rows repeating a key already staged in the chunk are
+        merged into it, the later values winning.
+
+        Returns:
+            The staged model instance
+        """
+        if key is not None and key in self._staged:
+            instance, staged_fields = self._staged[key]
+            previous = {attname: getattr(instance, attname) for attname in values}
+            for attname, value in values.items():
+                setattr(instance, attname, value)
+            merged_fields = None if staged_fields is None else staged_fields | set(fields)
+            try:
+                self.validate(instance, merged_fields)
+            except RowError:
+                # Leave the earlier row as it was staged
+                for attname, value in previous.items():
+                    setattr(instance, attname, value)
+                raise
+            if staged_fields is not None:
+                staged_fields.update(fields)
+            return instance
+
+        if existing_id:
+            instance = self.model(pk=existing_id, **values)
+            staged_fields = set(fields)
+        else:
+            instance = self.model(created_by=self.user, **values)
+            staged_fields = None
+        self.validate(instance, staged_fields)
+        self._staged[key if key is not None else object()] = (instance, staged_fields)
+        return instance
+
+    def clean(self, row):
+        """Validate one row, resolve its references and stage it (raises RowError)"""
+        raise NotImplementedError
+
+    def write(self):
+        """
+        Write the staged rows. Rows matching a record whose given columns
+        already hold the same values are skipped, so re-running an import
+        writes only what changed.
+
+        Returns:
+            tuple: (records created, records updated, rows unchanged)
+        """
+        creates = [instance for instance, fields in self._staged.values() if fields is None]
+        updates = {}
+        for instance, fields in self._staged.values():
+            if fields is not None:
+                updates.setdefault(frozenset(fields), []).append(instance)
+
+        self.model.objects.bulk_create(creates)
+        now = timezone.now()
+        field_names = {field.name for field in self.model._meta.concrete_fields}
+        changed = []
+        unchanged = 0
+        for fields, staged in updates.items():
+            fields = set(fields)
+            attnames = [self.model._meta.get_field(name).attname for name in sorted(fields)]
+            current = {
+                row[0]: row[1:] for row in self.model.objects.filter(
+                    pk__in=[instance.pk for instance in staged]
+                ).values_list('pk', *attnames)
+            }
+            instances = [
+                instance for instance in staged
+                if current.get(instance.pk) != tuple(getattr(instance, attname) for attname in attnames)
+            ]
+            unchanged += len(staged) - len(instances)
+            if not instances:
+                continue
+            # bulk_update() skips auto_now, so set the tracking columns here
+            for name, value in (('updated_at', now), ('updated_by', self.user)):
+                if name in field_names:
+                    fields.add(name)
+                    for instance in instances:
+                        setattr(instance, name, value)
+            self.model.objects.bulk_update(instances, sorted(fields))
+            changed.extend(instances)
+        self.after_write(creates, changed)
+        return len(creates), len(changed), unchanged
+
+    def after_write(self, created, updated):
+        """Queue lookup map changes and related writes for the chunk just written"""
+
+    def commit(self):
+        """The chunk's savepoint committed: keep its lookup map changes"""
+        for apply in self._pending:
+            apply()
+        self._pending = []
+        self._staged = {}
+
+    def rollback(self):
+        """The chunk's savepoint rolled back: drop its lookup map changes"""
+        self._pending = []
+        self._staged = {}
+
+    def resolve_category(self, model, categories, name):
+        """ID of the category with this name, created if allowed"""
+        category_id = categories.get(name.lower())
+        if category_id is None:
+            if not self.create_categories:
+                raise RowError(f"category: '{name}' does not exist")
+            category_id = model.objects.create(name=name).pk
+            categories[name.lower()] = category_id
+        return category_id
+
+
+def load_client_lookup():
+    """
+    Clients by tax ID and by lowercased email, as ``{key: (id, name)}`` maps;
+    the first client wins where several share a key
+    """
+    by_tax_id, by_email = {}, {}
+    for pk, name, email, tax_id in Client.objects.values_list('pk', 'name', 'email', 'tax_id').order_by('pk').iterator():
+        if tax_id:
+            by_tax_id.setdefault(tax_id.strip(), (pk, name))
+        if email:
+            by_email.setdefault(email.strip().lower(), (pk, name))
+    return by_tax_id, by_email
+
+
+def load_case_lookup():
+    """
+    Cases by case number, as ``{case number: id}``, with the set of case
+    numbers shared by several cases (which rows cannot refer to)
+    """
+    by_number, ambiguous = {}, set()
+    for number, pk in Case.objects.exclude(case_number='').values_list('case_number', 'pk').iterator():
+        number = number.strip()
+        if number in by_number:
+            ambiguous.add(number)
+        by_number[number] = pk
+    return by_number, ambiguous
+
+
+class ClientImporter(Importer):
+    """Clients, matched to existing ones by tax ID, then by email"""
+    model = Client
+    fields = (
+        'name', 'client_type', 'email', 'phone', 'address_line1', 'address_line2', 'city', 'state',
+        'postal_code', 'country', 'date_of_birth', 'tax_id', 'industry', 'is_active', 'intake_date',
+        'referral_source', 'notes', 'is_confidential', 'data_classification',
+    )
+    extra_columns = ('category',)
+
+    def __init__(self, user, create_categories=False):
+        super().__init__(user, create_categories)
+        self.by_tax_id, self.by_email = load_client_lookup()
+        self.categories = {name.lower(): pk for pk, name in ClientCategory.objects.values_list('pk', 'name')}
+
+    def clean(self, row):
+        values, fields = self.values(row)
+        category = _text(row.get('category'))
+        if category:
+            values['category_id'] = self.resolve_category(ClientCategory, self.categories, category)
+            fields.append('category')
+
+        tax_id, email = values.get('tax_id', ''), values.get('email', '').lower()
+        if tax_id:
+            key = ('tax_id', tax_id)
+            existing = self.by_tax_id.get(tax_id) or (self.by_email.get(email) if email else None)
+        elif email:
+            key = ('email', email)
+            existing = self.by_email.get(email)
+        else:
+            key, existing = None, None
+        if existing is None and not values.get('name'):
+            raise RowError("name: This field is required for new clients")
+        self.stage(key, existing[0] if existing else None, values, fields)
+
+    def after_write(self, created, updated):
+        def remember():
+            for client in created + updated:
+                entry = (client.pk, client.name)
+                if client.tax_id:
+                    self.by_tax_id.setdefault(client.tax_id.strip(), entry)
+                if client.email:
+                    self.by_email.setdefault(client.email.strip().lower(), entry)
+        self._pending.append(remember)
+
+
+class CaseImporter(Importer):
+    """
+    Cases, matched to existing ones by case number. The client is found by
+    ``client_tax_id`` or ``client_email``; ``attorneys`` lists usernames or
+    emails to assign, separated by semicolons.
+    """
+    model = Case
+    fields = (
+        'title', 'case_number', 'status', 'description', 'filed_date', 'client_name', 'client_email',
+        'client_phone', 'is_portal_enabled', 'portal_title', 'portal_description',
+    )
+    extra_columns = ('category', 'client_tax_id', 'attorneys')
+
+    def __init__(self, user, create_categories=False):
+        super().__init__(user, create_categories)
+        self.clients_by_tax_id, self.clients_by_email = load_client_lookup()
+        self.by_number, self.ambiguous = load_case_lookup()
+        self.categories = {name.lower(): pk for pk, name in CaseCategory.objects.values_list('pk', 'name')}
+        from django.contrib.auth import get_user_model
+        self.users = {}
+        for pk, username, email in get_user_model().objects.values_list('pk', 'username', 'email'):
+            self.users.setdefault(username.lower(), pk)
+            if email:
+                self.users.setdefault(email.lower(), pk)
+        self._assignments = []
+
+    def clean(self, row):
+        values, fields = self.values(row)
+        category = _text(row.get('category'))
+        if category:
+            values['category_id'] = self.resolve_category(CaseCategory, self.categories, category)
+            fields.append('category')
+
+        # Client reference: tax ID first, then email
+        tax_id, email = _text(row.get('client_tax_id')), _text(row.get('client_email')).lower()
+        client = None
+        if tax_id:
+            client = self.clients_by_tax_id.get(tax_id)
+            if client is None:
+                raise RowError(f"client_tax_id: No client has tax ID '{tax_id}'")
+        elif email:
+            client = self.clients_by_email.get(email)
+            if client is None:
+                raise RowError(f"client_email: No client has email '{email}'")
+        if client is not None:
+            values['client_id'] = client[0]
+            fields.append('client')
+            if not values.get('client_name'):
+                values['client_name'] = client[1]
+                fields.append('client_name')
+
+        attorney_ids = []
+        for name in _list(row.get('attorneys')):
+            user_id = self.users.get(name.lower())
+            if user_id is None:
+                raise RowError(f"attorneys: No user '{name}'")
+            attorney_ids.append(user_id)
+
+        number = values.get('case_number', '')
+        if number in self.ambiguous:
+            raise RowError(f"case_number: Several cases are numbered '{number}'")
+        existing = self.by_number.get(number) if number else None
+        if existing is None:
+            if not values.get('title'):
+                raise RowError("title: This field is required for new cases")
+            if not values.get('client_name'):
+                raise RowError("client_name: Give client_name, client_tax_id or client_email for new cases")
+            # Case.save() defaults the portal title, which bulk_create() skips
+            if not values.get('portal_title'):
+                values['portal_title'] = values['title']
+        case = self.stage(('case_number', number) if number else None, existing, values, fields)
+        if attorney_ids:
+            self._assignments.append((case, attorney_ids))
+
+    def after_write(self, created, updated):
+        through = Case.assigned_attorneys.through
+        through.objects.bulk_create(
+            [
+                through(case_id=case.pk, user_id=user_id)
+                for case, user_ids in self._assignments
+                for user_id in user_ids
+            ],
+            ignore_conflicts=True,
+        )
+        assignments, self._assignments = self._assignments, []
+
+        def remember():
+            for case in created:
+                if case.case_number:
+                    self.by_number[case.case_number.strip()] = case.pk
+            self.case_ids.update(case.pk for case in created + updated)
+            self.attorney_ids.update(user_id for _, user_ids in assignments for user_id in user_ids)
+        self._pending.append(remember)
+
+    def rollback(self):
+        super().rollback()
+        self._assignments = []
+
+
+class MatterImporter(Importer):
+    """Matters, matched to existing ones by case number and name"""
+    model = Matter
+    fields = ('name', 'description', 'is_active')
+    extra_columns = ('case_number',)
+
+    def __init__(self, user, create_categories=False):
+        super().__init__(user, create_categories)
+        self.cases, self.ambiguous = load_case_lookup()
+        self.matters = {
+            (case_id, name): pk for case_id, name, pk in Matter.objects.values_list('case_id', 'name', 'pk').iterator()
+        }
+
+    def clean(self, row):
+        values, fields = self.values(row)
+        values['case_id'] = resolve_case(self.cases, self.ambiguous, row)
+        if not values.get('name'):
+            raise RowError("name: This field is required")
+        key = (values['case_id'], values['name'])
+        self.stage(key, self.matters.get(key), values, [name for name in fields if name != 'name'])
+
+    def after_write(self, created, updated):
+        def remember():
+            for matter in created:
+                self.matters[(matter.case_id, matter.name)] = matter.pk
+            self.case_ids.update(matter.case_id for matter in created + updated)
+        self._pending.append(remember)
+
+
+def resolve_case(cases, ambiguous, row):
+    """ID of the case a row's ``case_number`` refers to"""
+    number = _text(row.get('case_number'))
+    if not number:
+        raise RowError("case_number: This field is required")
+    if number in ambiguous:
+        raise RowError(f"case_number: Several cases are numbered '{number}'")
+    case_id = cases.get(number)
+    if case_id is None:
+        raise RowError(f"case_number: No case is numbered '{number}'")
+    return case_id
+
+
+class FolderImporter(Importer):
+    """
+    Case folders given by a slash-separated ``path`` of names, creating any
+    missing folders above them. The optional ``matter`` names a matter of
+    the same case to file the last folder under.
+
+    Folders are bulk inserted one depth at a time, with their materialized
+    paths (see CaseFolder) computed from the parents written before them.
+    """
+    model = CaseFolder
+    extra_columns = ('case_number', 'path', 'matter')
+
+    def __init__(self, user, create_categories=False):
+        super().__init__(user, create_categories)
+        self.cases, self.ambiguous = load_case_lookup()
+        self.matters = {
+            (case_id, name): pk for case_id, name, pk in Matter.objects.values_list('case_id', 'name', 'pk').iterator()
+        }
+        self.folders = {
+            (case_id, name_path): (pk, path, matter_id)
+            for case_id, name_path, pk, path, matter_id in CaseFolder.objects.values_list(
+                'case_id', 'name_path', 'pk', 'path', 'matter_id'
+            ).iterator()
+        }
+        self._new = {}
+        self._matter_changes = {}
+        self._unchanged = 0
+
+    def clean(self, row):
+        case_id = resolve_case(self.cases, self.ambiguous, row)
+        parts = [part.strip() for part in _text(row.get('path')).split('/') if part.strip()]
+        if not parts:
+            raise RowError("path: This field is required")
+        max_length = CaseFolder._meta.get_field('name').max_length
+        if any(len(part) > max_length for part in parts):
+            raise RowError(f"path: Folder names are limited to {max_length} characters")
+        matter_id = None
+        matter = _text(row.get('matter'))
+        if matter:
+            matter_id = self.matters.get((case_id, matter))
+            if matter_id is None:
+                raise RowError(f"matter: Case has no matter '{matter}'")
+
+        for depth in range(len(parts)):
+            key = (case_id, '/'.join(parts[:depth + 1]))
+            leaf = depth == len(parts) - 1
+            if key in self.folders:
+                if leaf and matter_id and self.folders[key][2] != matter_id:
+                    self._matter_changes[self.folders[key][0]] = matter_id
+                elif leaf:
+                    self._unchanged += 1
+            elif key in self._new:
+                if leaf and matter_id:
+                    self._new[key]['matter_id'] = matter_id
+            else:
+                self._new[key] = {
+                    'name': parts[depth],
+                    'depth': depth,
+                    'parent': (case_id, '/'.join(parts[:depth])) if depth else None,
+                    'matter_id': matter_id if leaf else None,
+                }
+
+    def write(self):
+        written = {}
+        created = 0
+        for depth in sorted({spec['depth'] for spec in self._new.values()}):
+            level = []
+            for (case_id, name_path), spec in self._new.items():
+                if spec['depth'] != depth:
+                    continue
+                parent = written.get(spec['parent']) or self.folders.get(spec['parent'])
+                level.append(CaseFolder(
+                    case_id=case_id,
+                    parent_id=parent[0] if parent else None,
+                    name=spec['name'],
+                    path=f"{parent[1]}{parent[0]}/" if parent else '/',
+                    depth=depth,
+                    name_path=name_path,
+                    matter_id=spec['matter_id'],
+                    created_by=self.user,
+                ))
+            CaseFolder.objects.bulk_create(level)
+            if any(folder.pk is None for folder in level):
+                # Databases that cannot return inserted IDs
+                ids = dict(
+                    ((case_id, name_path), pk) for case_id, name_path, pk in CaseFolder.objects.filter(
+                        case_id__in={folder.case_id for folder in level},
+                        name_path__in={folder.name_path for folder in level},
+                    ).values_list('case_id', 'name_path', 'pk')
+                )
+                for folder in level:
+                    folder.pk = ids[(folder.case_id, folder.name_path)]
+            for folder in level:
+                written[(folder.case_id, folder.name_path)] = (folder.pk, folder.path, folder.matter_id)
+            created += len(level)
+
+        for folder_id, matter_id in self._matter_changes.items():
+            CaseFolder.objects.filter(pk=folder_id).update(matter_id=matter_id)
+        changes = dict(self._matter_changes)
+
+        def remember():
+            self.folders.update(written)
+            for key, (pk, path, matter_id) in list(self.folders.items()):
+                if pk in changes:
+                    self.folders[key] = (pk, path, changes[pk])
+            self.case_ids.update(case_id for case_id, _ in written)
+        self._pending.append(remember)
+        return created, len(changes), self._unchanged
+
+    def commit(self):
+        super().commit()
+        self._new = {}
+        self._matter_changes = {}
+        self._unchanged = 0
+
+    def rollback(self):
+        super().rollback()
+        self._new = {}
+        self._matter_changes = {}
+        self._unchanged = 0
+
+
+IMPORTERS = {
+    'client': ClientImporter,
+    'case': CaseImporter,
+    'matter': MatterImporter,
+    'folder': FolderImporter,
+}
+
+
+def run_import(stream, record_type, user, file_format='csv', chunk_size=None, dry_run=False,
+               create_categories=False, progress=None):
+    """
+    Import clients, cases, matters or case folders from a CSV or JSONL stream.
+
+    Rows are parsed as they are read and handled a chunk at a time: each
+    chunk is validated, then written in its own savepoint, so a database
+    error loses only that chunk. The whole import runs in one transaction,
+    which a dry run rolls back after writing everything, so it reports the
+    same errors a real import would. Statistics of the cases touched are
+    recomputed at the end, since bulk writes send no signals.
+
+    Args:
+        stream: Text file object
+        record_type: One of IMPORT_TYPES
+        user: User recorded as creating the records
+        file_format: 'csv' or 'jsonl'
+        chunk_size: Rows per chunk (default: CASE_IMPORT_CHUNK_SIZE)
+        dry_run: Validate and write, then roll everything back
+        create_categories: Create categories named by rows that do not exist
+        progress: Optional callable given the report after each chunk
+
+    Returns:
+        ImportReport: Counts, errors and throughput
+    """
+    if record_type not in IMPORTERS:
+        raise ValueError(f"Unknown record type: {record_type}")
+    chunk_size = max(chunk_size or get_import_chunk_size(), 1)
+    report = ImportReport(record_type, dry_run=dry_run)
+    rows = read_rows(stream, file_format)
+
+    with transaction.atomic():
+        importer = IMPORTERS[record_type](user, create_categories=create_categories)
+        columns = importer.columns
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            valid = []
+            for line_number, row, error in chunk:
+                report.rows += 1
+                if error:
+                    report.fail(line_number, error)
+                    continue
+                report.ignored_columns.update(set(row) - columns)
+                try:
+                    importer.clean(row)
+                    valid.append(line_number)
+                except RowError as e:
+                    report.fail(line_number, str(e))
+
+            if valid:
+                try:
+                    with transaction.atomic():
+                        created, updated, unchanged = importer.write()
+                except DatabaseError as e:
+                    importer.rollback()
+                    logger.warning(f"Import chunk ending at line {valid[-1]} failed: {str(e)}")
+                    for line_number in valid:
+                        report.fail(line_number, f"Chunk not written: {str(e)}")
+                else:
+                    importer.commit()
+                    report.created += created
+                    report.updated += updated
+                    report.unchanged += unchanged
+            if progress is not None:
+                progress(report)
+
+        if importer.case_ids:
+            rebuild_case_stats(Case.objects.filter(pk__in=importer.case_ids))
+        if dry_run:
+            transaction.set_rollback(True)
+        elif importer.attorney_ids:
+            attorney_ids = set(importer.attorney_ids)
+
+            def invalidate():
+                resolver = get_visibility_resolver()
+                for user_id in attorney_ids:
+                    resolver.invalidate(user_id)
+
+            transaction.on_commit(invalidate)
+
+    report.finish()
+    logger.info(
+        f"{'Dry run of ' if dry_run else ''}{record_type} import: {report.rows} rows, {report.created} created, "
+        f"{report.updated} updated, {report.unchanged} unchanged, {report.failed} failed, {report.rows_per_second:.0f} rows/s"
+    )
+    return report
@@ -0,0 +1,167 @@
+import random
+import time
+import uuid
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+
+from cases.models import Case, CaseDocument, CaseFolder
+from documents.models import Document
+
+
+def legacy_full_path(folder):
+    """Folder path built by following ``parent`` one query per level, as before materialized paths"""
+    if not folder.parent_id:
+        return folder.name
+    return f"{legacy_full_path(folder.parent)}/{folder.name}"
+
+
+class Command(BaseCommand):
+    help = (
+        'Build a large case folder tree in a rolled-back transaction and compare walking parent '
+        'links with the materialized path for trees, breadcrumbs, subtree counts and moves'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--folders', type=int, default=5000,
+            help='Folders in the case (default: 5000)'
+        )
+        parser.add_argument(
+            '--depth', type=int, default=10,
+            help='Levels of folders (default: 10)'
+        )
+        parser.add_argument(
+            '--documents', type=int, default=2000,
+            help='Documents filed across the folders (default: 2000)'
+        )
+        parser.add_argument(
+            '--seed', type=int, default=1,
+            help='Random seed for the tree shape (default: 1)'
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.run(options)
+            # Leave nothing behind
+            transaction.set_rollback(True)
+
+    def run(self, options):
+        rng = random.Random(options['seed'])
+        user = get_user_model().objects.create_user(f"bench-{uuid.uuid4().hex[:12]}")
+        case = Case.objects.create(title='Folder benchmark', client_name='Benchmark', created_by=user)
+
+        start = time.perf_counter()
+        levels = self.build_tree(case, user, options['folders'], options['depth'], rng)
+        self.stdout.write(
+            f"Created {sum(len(level) for level in levels)} folders over {len(levels)} levels "
+            f"in {time.perf_counter() - start:.1f}s"
+        )
+
+        all_folders = [folder for level in levels for folder in level]
+        documents = Document.objects.bulk_create([
+            Document(title=f"Document {i}", created_by=user) for i in range(options['documents'])
+        ])
+        CaseDocument.objects.bulk_create([
+            CaseDocument(document=document, case=case, folder=rng.choice(all_folders), added_by=user)
+            for document in documents
+        ])
+
+        deepest = levels[-1][0]
+        # The top-level folder with the largest subtree
+        subtree_sizes = {}
+        for folder in CaseFolder.tree(case).values():
+            for ancestor_id in folder.ancestor_ids:
+                subtree_sizes[ancestor_id] = subtree_sizes.get(ancestor_id, 0) + 1
+        top = max(levels[0], key=lambda folder: subtree_sizes[folder.pk])
+        other = next(folder for folder in levels[0] if folder.pk != top.pk)
+
+        def legacy_tree():
+            return [legacy_full_path(folder) for folder in CaseFolder.objects.filter(case=case)]
+
+        def legacy_counts():
+            # Document counts per folder, then each folder's subtree found by walking parents
+            direct = {}
+            for folder_id in CaseDocument.objects.filter(case=case).values_list('folder_id', flat=True):
+                direct[folder_id] = direct.get(folder_id, 0) + 1
+            totals = {}
+            for folder in CaseFolder.objects.filter(case=case):
+                node = folder
+                while node is not None:
+                    totals[node.pk] = totals.get(node.pk, 0) + direct.get(folder.pk, 0)
+                    node = node.parent
+            return totals
+
+        def legacy_breadcrumbs():
+            crumbs = []
+            node = CaseFolder.objects.get(pk=deepest.pk)
+            while node is not None:
+                crumbs.append(node.name)
+                node = node.parent
+            return crumbs[::-1]
+
+        def subtree_documents():
+            return CaseDocument.objects.filter(
+                Q(folder=top) | Q(folder__path__startswith=top.subtree_path)
+            ).count()
+
+        self.stdout.write(f"  {'':<44} {'time':>13} {'queries':>9}")
+        self.measure('tree with paths (parent walk)', legacy_tree)
+        self.measure('tree with paths (materialized)', lambda: CaseFolder.sorted_tree(case))
+        self.measure('subtree document counts (parent walk)', legacy_counts)
+        self.measure('subtree document counts (materialized)', lambda: CaseFolder.tree(case, document_counts=True))
+        self.measure(f'breadcrumbs, depth {deepest.depth} (parent walk)', legacy_breadcrumbs)
+        self.measure(f'breadcrumbs, depth {deepest.depth} (materialized)', lambda: list(deepest.get_ancestors()))
+        self.measure('documents in a top-level subtree (prefix)', subtree_documents)
+
+        # Move the largest top-level subtree under another top-level folder, then rename it
+        subtree_size = top.get_descendants().count()
+        top.parent = other
+        self.measure(f'move a subtree of {subtree_size} folders', top.save)
+        top.name = f"{top.name} (renamed)"
+        self.measure(f'rename a subtree of {subtree_size} folders', top.save)
+
+        mismatched = sum(
+            1 for folder in CaseFolder.objects.filter(case=case).select_related('parent')
+            if folder.full_path != legacy_full_path(folder)
+        )
+        if mismatched:
+            self.stderr.write(f"{mismatched} folder(s) have a stale materialized path")
+        else:
+            self.stdout.write(self.style.SUCCESS("Materialized paths match the parent links after the move"))
+
+    def build_tree(self, case, user, total, depth, rng):
+        """
+        Create ``total`` folders over ``depth`` levels, each level half as
+        large again as the one above and each folder below a random folder
+        of the level above
+        """
+        depth = max(min(depth, total), 1)
+        weights = [1.5 ** level for level in range(depth)]
+        per_level = [max(int(total * weight / sum(weights)), 1) for weight in weights]
+        per_level[-1] += total - sum(per_level)
+        levels = []
+        for level, count in enumerate(per_level):
+            folders = []
+            for i in range(count):
+                parent = rng.choice(levels[-1]) if levels else None
+                folder = CaseFolder(case=case, parent=parent, name=f"L{level} folder {i}", created_by=user)
+                folder.save()
+                folders.append(folder)
+            levels.append(folders)
+        return levels
+
+    def measure(self, label, func):
+        queries = 0
+
+        def count(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count):
+            start = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - start
+        self.stdout.write(f"  {label:<44} {elapsed * 1000:10.1f} ms {queries:9,}")
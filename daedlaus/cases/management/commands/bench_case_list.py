@@ -0,0 +1,149 @@
+import random
+import time
+import uuid
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from cases.models import Case, CaseCategory
+from cases.pagination import encode_cursor, keyset_page
+from cases.views import CASES_PER_PAGE
+from clients.models import Client
+
+
+class Command(BaseCommand):
+    help = (
+        'Fill a rolled-back transaction with cases and measure the queries and time taken by '
+        'case list pages at different depths and with each filter'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--cases', type=int, default=500000,
+            help='Cases to create (default: 500000)'
+        )
+        parser.add_argument(
+            '--clients', type=int, default=5000,
+            help='Clients the cases are spread over (default: 5000)'
+        )
+        parser.add_argument(
+            '--attorneys', type=int, default=50,
+            help='Attorneys assigned to the cases (default: 50)'
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=5,
+            help='Times each page is fetched; the median is reported (default: 5)'
+        )
+        parser.add_argument(
+            '--seed', type=int, default=1,
+            help='Random seed for the generated cases (default: 1)'
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.run(options)
+            # Leave nothing behind
+            transaction.set_rollback(True)
+
+    def run(self, options):
+        rng = random.Random(options['seed'])
+        start = time.perf_counter()
+        attorneys, clients, categories = self.populate(options, rng)
+        self.stdout.write(f"Created {options['cases']:,} cases in {time.perf_counter() - start:.1f}s")
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE cases_case')
+
+        # Cursors pointing into the middle and the end of the list
+        ordered = Case.objects.order_by('-updated_at', '-pk').values_list('updated_at', 'pk')
+        middle = encode_cursor(*ordered[options['cases'] // 2])
+        last = encode_cursor(*ordered[max(options['cases'] - CASES_PER_PAGE // 2, 0)])
+
+        cases = Case.objects.for_list()
+        scenarios = [
+            ('first page', cases, {}),
+            ('middle page', cases, {'after': middle}),
+            ('last page', cases, {'after': last}),
+            ('previous page from the middle', cases, {'before': middle}),
+            ('status = active', cases.filter(status='active'), {}),
+            ('status = active, middle', cases.filter(status='active'), {'after': middle}),
+            ('client', cases.filter(client=clients[0]), {}),
+            ('category', cases.filter(category=categories[0]), {}),
+            ('attorney', cases.assigned_to(attorneys[0].pk), {}),
+            ('attorney, middle', cases.assigned_to(attorneys[0].pk), {'after': middle}),
+        ]
+
+        self.stdout.write(f"  {'':<32} {'median':>11} {'queries':>8} {'rows':>6}")
+        for label, queryset, cursors in scenarios:
+            self.measure(label, queryset, cursors, options['repeat'])
+
+    def populate(self, options, rng):
+        User = get_user_model()
+        tag = uuid.uuid4().hex[:8]
+        owner = User.objects.create_user(f"bench-{tag}")
+        attorneys = User.objects.bulk_create([
+            User(username=f"bench-{tag}-{i}", last_name=f"Attorney {i}") for i in range(options['attorneys'])
+        ])
+        categories = CaseCategory.objects.bulk_create([
+            CaseCategory(name=f"Practice area {i}") for i in range(20)
+        ])
+        clients = Client.objects.bulk_create([
+            Client(name=f"Client {i}", created_by=owner) for i in range(options['clients'])
+        ])
+
+        # updated_at is normally set on save; spread it over five years instead
+        updated_at = Case._meta.get_field('updated_at')
+        updated_at.auto_now = False
+        now = timezone.now()
+        statuses = [value for value, _ in Case.STATUS_CHOICES]
+        through = Case.assigned_attorneys.through
+        try:
+            for offset in range(0, options['cases'], 10000):
+                cases = Case.objects.bulk_create([
+                    Case(
+                        title=f"Case {i}",
+                        case_number=f"{i:07d}",
+                        status=rng.choice(statuses),
+                        category=rng.choice(categories),
+                        client=rng.choice(clients),
+                        client_name='Benchmark',
+                        created_by=owner,
+                        updated_at=now - timedelta(seconds=rng.randrange(5 * 365 * 86400)),
+                    )
+                    for i in range(offset, min(offset + 10000, options['cases']))
+                ])
+                through.objects.bulk_create([
+                    through(case_id=case.pk, user_id=attorney.pk)
+                    for case in cases
+                    for attorney in rng.sample(attorneys, rng.randint(1, min(3, len(attorneys))))
+                ])
+        finally:
+            updated_at.auto_now = True
+        return attorneys, clients, categories
+
+    def measure(self, label, queryset, cursors, repeat):
+        timings = []
+        for _ in range(repeat):
+            queries = 0
+
+            def count(execute, sql, params, many, context):
+                nonlocal queries
+                queries += 1
+                return execute(sql, params, many, context)
+
+            with connection.execute_wrapper(count):
+                start = time.perf_counter()
+                page = keyset_page(queryset.all(), CASES_PER_PAGE, **cursors)
+                # Everything a list row shows
+                rows = [
+                    (case.category.name, case.client.name,
+                     [attorney.get_full_name() for attorney in case.assigned_attorneys.all()])
+                    for case in page
+                ]
+                timings.append(time.perf_counter() - start)
+        timings.sort()
+        self.stdout.write(
+            f"  {label:<32} {timings[len(timings) // 2] * 1000:8.1f} ms {queries:8} {len(rows):6}"
+        )
@@ -0,0 +1,102 @@
+import statistics
+import time
+import uuid
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from cases.models import Case
+from cases.pagination import keyset_page
+from cases.views import CASES_PER_PAGE
+from cases.visibility import get_visibility_resolver
+
+
+class Command(BaseCommand):
+    help = (
+        'Assign an attorney to many cases in a rolled-back transaction and measure case visibility '
+        'checks with a cold cache, a warm cache and within one request, and the visible case list'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--cases', type=int, default=20000,
+            help='Cases to create (default: 20000)'
+        )
+        parser.add_argument(
+            '--assigned', type=int, default=5000,
+            help='Cases the attorney is assigned to (default: 5000)'
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=200,
+            help='Checks timed per scenario; the median is reported (default: 200)'
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.run(options)
+            # Leave nothing behind
+            transaction.set_rollback(True)
+
+    def run(self, options):
+        User = get_user_model()
+        tag = uuid.uuid4().hex[:8]
+        owner = User.objects.create_user(f"bench-{tag}")
+        attorney = User.objects.create_user(f"bench-{tag}-attorney")
+        case_ids = []
+        for offset in range(0, options['cases'], 10000):
+            cases = Case.objects.bulk_create([
+                Case(title=f"Case {i}", client_name='Benchmark', created_by=owner)
+                for i in range(offset, min(offset + 10000, options['cases']))
+            ])
+            case_ids.extend(case.pk for case in cases)
+        through = Case.assigned_attorneys.through
+        assigned = case_ids[::max(len(case_ids) // max(options['assigned'], 1), 1)][:options['assigned']]
+        through.objects.bulk_create([through(case_id=pk, user_id=attorney.pk) for pk in assigned])
+        self.stdout.write(f"Created {len(case_ids):,} cases, {len(assigned):,} assigned to the attorney")
+
+        resolver = get_visibility_resolver()
+        hidden = next(pk for pk in case_ids if pk not in set(assigned))
+        probes = [assigned[len(assigned) // 2], hidden]
+
+        def fresh_user():
+            # A new user object per check, as in separate requests
+            return User.objects.get(pk=attorney.pk)
+
+        def cold(user):
+            resolver.invalidate(user.pk)
+            return resolver.can_view(user, probes[0])
+
+        def warm(user):
+            return resolver.can_view(user, probes[1])
+
+        memo_user = fresh_user()
+        resolver.can_view(memo_user, probes[0])
+
+        self.stdout.write(f"  {'':<36} {'median':>11} {'queries':>8}")
+        self.measure('check, cold cache', cold, fresh_user, options['repeat'])
+        self.measure('check, warm cache', warm, fresh_user, options['repeat'])
+        self.measure('check, same request', warm, lambda: memo_user, options['repeat'])
+        self.measure(
+            'visible case list, first page',
+            lambda user: list(keyset_page(Case.objects.visible_to(user), CASES_PER_PAGE)),
+            lambda: memo_user, max(options['repeat'] // 20, 3),
+        )
+
+    def measure(self, label, func, make_user, repeat):
+        timings = []
+        for _ in range(repeat):
+            user = make_user()
+            # has_perm() reads the user's permissions once per user object
+            user.has_perm('cases.view_all_cases')
+            queries = 0
+
+            def count(execute, sql, params, many, context):
+                nonlocal queries
+                queries += 1
+                return execute(sql, params, many, context)
+
+            with connection.execute_wrapper(count):
+                start = time.perf_counter()
+                func(user)
+                timings.append(time.perf_counter() - start)
+        self.stdout.write(f"  {label:<36} {statistics.median(timings) * 1000:8.3f} ms {queries:8}")
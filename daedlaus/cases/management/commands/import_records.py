@@ -0,0 +1,94 @@
+import sys
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from cases.imports import IMPORT_TYPES, detect_format, get_import_chunk_size, run_import
+
+
+class Command(BaseCommand):
+    help = (
+        'Import clients, cases, matters or case folders from a CSV or JSONL file, streaming it in '
+        'chunks; existing records matched by their keys are updated. Load clients, then cases, '
+        'then matters, then folders.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'record_type', choices=IMPORT_TYPES,
+            help='Kind of records in the file'
+        )
+        parser.add_argument(
+            'path',
+            help="CSV or JSONL file to import, or '-' for standard input"
+        )
+        parser.add_argument(
+            '--user', required=True,
+            help='Username recorded as creating the records'
+        )
+        parser.add_argument(
+            '--format', choices=('csv', 'jsonl'), default=None,
+            help='File format (default: from the file extension, otherwise csv)'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=None,
+            help=f'Rows validated and written per savepoint (default: {get_import_chunk_size()})'
+        )
+        parser.add_argument(
+            '--create-categories', action='store_true',
+            help='Create client and case categories that do not exist yet'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Validate and write everything, then roll it back'
+        )
+        parser.add_argument(
+            '--show', type=int, default=20,
+            help='Row errors listed at the end (default: 20)'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(username=options['user'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"User '{options['user']}' does not exist")
+
+        path = options['path']
+        file_format = options['format'] or ('csv' if path == '-' else detect_format(path))
+        stream = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8-sig')
+        try:
+            report = run_import(
+                stream,
+                options['record_type'],
+                user,
+                file_format=file_format,
+                chunk_size=options['chunk_size'],
+                dry_run=options['dry_run'],
+                create_categories=options['create_categories'],
+                progress=self.progress if options['verbosity'] > 1 else None,
+            )
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        prefix = "Dry run: " if report.dry_run else ""
+        self.stdout.write(
+            f"{prefix}{report.rows:,} rows in {report.elapsed:.1f}s ({report.rows_per_second:,.0f} rows/s): "
+            f"{report.created:,} created, {report.updated:,} updated, {report.unchanged:,} unchanged, "
+            f"{report.failed:,} failed"
+        )
+        if report.ignored_columns:
+            self.stdout.write(self.style.WARNING(f"Ignored columns: {', '.join(sorted(report.ignored_columns))}"))
+        for line_number, message in report.errors[:options['show']]:
+            self.stderr.write(f"  line {line_number}: {message}")
+        if report.failed > min(len(report.errors), options['show']):
+            self.stderr.write(f"  ... and {report.failed - min(len(report.errors), options['show'])} more")
+        if report.failed:
+            self.stdout.write(self.style.WARNING(f"{report.failed:,} row(s) were not imported"))
+        else:
+            self.stdout.write(self.style.SUCCESS("All rows imported" if not report.dry_run else "All rows valid"))
+
+    def progress(self, report):
+        self.stdout.write(
+            f"  {report.rows:,} rows, {report.created:,} created, {report.updated:,} updated, "
+            f"{report.failed:,} failed ({report.rows_per_second:,.0f} rows/s)"
+        )
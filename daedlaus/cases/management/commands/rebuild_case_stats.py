@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+
+from cases.models import Case
+from cases.stats import REBUILD_BATCH_SIZE, rebuild_case_stats, stale_case_stats
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute the dashboard statistics of every case (or the given cases) from their documents, '
+        'folders, matters and docket entries, repairing any drift in the incrementally kept counts'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'case_ids', nargs='*', type=int,
+            help='IDs of the cases to recompute (default: every case)'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=REBUILD_BATCH_SIZE,
+            help=f'Cases recomputed per statement (default: {REBUILD_BATCH_SIZE})'
+        )
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Only report the cases whose stored statistics are out of date'
+        )
+
+    def handle(self, *args, **options):
+        cases = Case.objects.all()
+        if options['case_ids']:
+            cases = cases.filter(pk__in=options['case_ids'])
+
+        if options['check']:
+            stale = stale_case_stats(cases)
+            if not stale:
+                self.stdout.write(self.style.SUCCESS("All case statistics are up to date"))
+                return
+            self.stdout.write(self.style.WARNING(f"{len(stale)} case(s) have out-of-date statistics:"))
+            for case_id in stale[:100]:
+                self.stdout.write(f"  case {case_id}")
+            return
+
+        count = rebuild_case_stats(cases, batch_size=max(options['batch_size'], 1))
+        self.stdout.write(self.style.SUCCESS(f"Recomputed statistics for {count} case(s)"))
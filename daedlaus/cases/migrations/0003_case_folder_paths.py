@@ -0,0 +1,68 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:40
+
+from django.db import migrations, models
+
+
+def fill_folder_paths(apps, schema_editor):
+    CaseFolder = apps.get_model("cases", "CaseFolder")
+    folders = {
+        folder.pk: folder
+        for folder in CaseFolder.objects.only("pk", "name", "parent_id")
+    }
+
+    def resolve(folder, seen=()):
+        if hasattr(folder, "_resolved"):
+            return
+        parent = folders.get(folder.parent_id)
+        if parent is None or parent.pk in seen:
+            folder.path, folder.depth, folder.name_path = "/", 0, folder.name
+        else:
+            resolve(parent, seen + (folder.pk,))
+            folder.path = f"{parent.path}{parent.pk}/"
+            folder.depth = parent.depth + 1
+            folder.name_path = f"{parent.name_path}/{folder.name}"
+        folder._resolved = True
+
+    for folder in folders.values():
+        resolve(folder)
+    CaseFolder.objects.bulk_update(
+        folders.values(), ["path", "depth", "name_path"], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cases", "0002_case_client"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="casefolder",
+            name="depth",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, help_text="Number of folders above this one"
+            ),
+        ),
+        migrations.AddField(
+            model_name="casefolder",
+            name="name_path",
+            field=models.TextField(
+                blank=True,
+                editable=False,
+                help_text="Folder names from the case root, separated by slashes",
+            ),
+        ),
+        migrations.AddField(
+            model_name="casefolder",
+            name="path",
+            field=models.CharField(
+                db_index=True,
+                default="/",
+                editable=False,
+                help_text="IDs of the folders above this one, e.g. /4/17/",
+                max_length=1024,
+            ),
+        ),
+        migrations.RunPython(fill_folder_paths, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:44
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cases", "0003_case_folder_paths"),
+        ("clients", "0002_migrate_case_clients"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="case",
+            index=models.Index(fields=["-updated_at", "-id"], name="case_recent_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="case",
+            index=models.Index(
+                fields=["status", "-updated_at", "-id"], name="case_status_recent_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="case",
+            index=models.Index(
+                fields=["client", "-updated_at", "-id"], name="case_client_recent_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="case",
+            index=models.Index(
+                fields=["category", "-updated_at", "-id"],
+                name="case_category_recent_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cases", "0004_case_list_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CaseStats",
+            fields=[
+                (
+                    "case",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="stats",
+                        serialize=False,
+                        to="cases.case",
+                    ),
+                ),
+                ("document_count", models.PositiveIntegerField(default=0)),
+                (
+                    "root_document_count",
+                    models.PositiveIntegerField(
+                        default=0, help_text="Documents not filed in a folder"
+                    ),
+                ),
+                ("folder_count", models.PositiveIntegerField(default=0)),
+                ("matter_count", models.PositiveIntegerField(default=0)),
+                ("docket_entry_count", models.PositiveIntegerField(default=0)),
+                (
+                    "folder_document_counts",
+                    models.JSONField(
+                        blank=True,
+                        default=dict,
+                        help_text="Documents filed directly in each folder, keyed by folder ID",
+                    ),
+                ),
+                (
+                    "matter_document_counts",
+                    models.JSONField(
+                        blank=True,
+                        default=dict,
+                        help_text="Documents assigned to each matter, keyed by matter ID",
+                    ),
+                ),
+                (
+                    "last_activity_at",
+                    models.DateTimeField(
+                        blank=True,
+                        help_text="Latest change to the case or its documents, folders, matters or docket",
+                        null=True,
+                    ),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Case Statistics",
+                "verbose_name_plural": "Case Statistics",
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:54
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cases", "0005_case_stats"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="case",
+            options={
+                "ordering": ["-updated_at"],
+                "permissions": [
+                    ("view_portal_case", "Can view case in portal"),
+                    ("share_case", "Can share case with external counsel"),
+                    ("view_all_cases", "Can view cases without being assigned to them"),
+                ],
+                "verbose_name": "Case",
+                "verbose_name_plural": "Cases",
+            },
+        ),
+    ]
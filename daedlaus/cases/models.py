@@ -1,4 +1,6 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, Exists, F, OuterRef, Prefetch, Value
+from django.db.models.functions import Concat, Substr
 from django.conf import settings
 from django.urls import reverse
 import uuid
@@ -28,6 +30,32 @@ class CaseCategory(models.Model):
     def __str__(self):
         return self.name
 
+class CaseQuerySet(models.QuerySet):
+    """
+    Queryset helpers for listing cases
+    """
+    
+    def for_list(self):
+        """Fetch everything a case list row shows: category, client and attorneys"""
+        from django.contrib.auth import get_user_model
+        attorneys = get_user_model().objects.only('id', 'username', 'first_name', 'last_name')
+        return self.select_related('category', 'client').prefetch_related(
+            Prefetch('assigned_attorneys', queryset=attorneys)
+        )
+    
+    def assigned_to(self, user_id):
+        """Cases the user is assigned to as an attorney"""
+        through = Case.assigned_attorneys.through
+        return self.filter(
+            Exists(through.objects.filter(case_id=OuterRef('pk'), user_id=user_id))
+        )
+    
+    def visible_to(self, user):
+        """Cases the user may see: those they are assigned to, or all with cases.view_all_cases"""
+        from .visibility import get_visibility_resolver
+        return get_visibility_resolver().filter_queryset(self, user)
+
+
 class Case(models.Model):
     """Main case model for legal matters"""
     STATUS_CHOICES = (
@@ -114,13 +142,24 @@ class Case(models.Model):
         help_text="Custom description for portal display"
     )
     
+    objects = CaseQuerySet.as_manager()
+    
     class Meta:
         verbose_name = "Case"
         verbose_name_plural = "Cases"
         ordering = ['-updated_at']
+        # Case lists are paged newest first by (updated_at, id), optionally
+        # filtered by one of these columns
+        indexes = [
+            models.Index(fields=['-updated_at', '-id'], name='case_recent_idx'),
+            models.Index(fields=['status', '-updated_at', '-id'], name='case_status_recent_idx'),
+            models.Index(fields=['client', '-updated_at', '-id'], name='case_client_recent_idx'),
+            models.Index(fields=['category', '-updated_at', '-id'], name='case_category_recent_idx'),
+        ]
         permissions = [
             ("view_portal_case", "Can view case in portal"),
             ("share_case", "Can share case with external counsel"),
+            ("view_all_cases", "Can view cases without being assigned to them"),
         ]
     
     def __str__(self):
@@ -129,6 +168,11 @@ class Case(models.Model):
     def get_absolute_url(self):
         return reverse('cases:case_detail', args=[self.uuid])
     
+    def is_visible_to(self, user):
+        """Check whether a user may see this case (see cases.visibility)"""
+        from .visibility import get_visibility_resolver
+        return get_visibility_resolver().can_view(user, self)
+    
     def save(self, *args, **kwargs):
         # Set portal title to case title if not provided
         if not self.portal_title and self.title:
@@ -170,6 +214,13 @@ class Matter(models.Model):
 class CaseFolder(models.Model):
     """
     Hierarchical folder structure for organizing documents within cases
+    
+    Each folder stores its ancestry as a materialized path of folder IDs
+    (``/4/17/`` for a folder whose parent is 17 and grandparent 4), its
+    depth and its slash-separated name path, so a whole tree, a subtree or
+    a folder's breadcrumbs load without walking ``parent`` one query per
+    level. The columns are rewritten for the folder and its descendants
+    whenever a folder is created, moved or renamed through ``save()``.
     """
     name = models.CharField(max_length=255)
     case = models.ForeignKey(
@@ -191,6 +242,23 @@ class CaseFolder(models.Model):
         blank=True,
         related_name='subfolders'
     )
+    path = models.CharField(
+        max_length=1024,
+        default='/',
+        db_index=True,
+        editable=False,
+        help_text="IDs of the folders above this one, e.g. /4/17/"
+    )
+    depth = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Number of folders above this one"
+    )
+    name_path = models.TextField(
+        blank=True,
+        editable=False,
+        help_text="Folder names from the case root, separated by slashes"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     created_by = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -205,16 +273,114 @@ class CaseFolder(models.Model):
         ordering = ['name']
     
     def __str__(self):
-        if self.parent:
-            return f"{self.parent}/{self.name}"
-        return self.name
+        return self.full_path
     
     @property
     def full_path(self):
         """Return the full path of this folder"""
-        if not self.parent:
-            return self.name
-        return f"{self.parent.full_path}/{self.name}"
+        return self.name_path or self.name
+    
+    @property
+    def subtree_path(self):
+        """Path prefix shared by every folder below this one"""
+        return f"{self.path}{self.pk}/"
+    
+    @property
+    def ancestor_path_ids(self):
+        """IDs of the folders above this one, from the root down"""
+        return [int(part) for part in self.path.strip('/').split('/') if part]
+    
+    def get_descendants(self):
+        """Folders below this one, in one indexed prefix query"""
+        return CaseFolder.objects.filter(case_id=self.case_id, path__startswith=self.subtree_path)
+    
+    def get_ancestors(self):
+        """Folders above this one (the breadcrumbs), from the root down"""
+        return CaseFolder.objects.filter(pk__in=self.ancestor_path_ids).order_by('depth')
+    
+    def save(self, *args, **kwargs):
+        """Keep the materialized path of this folder and its descendants up to date"""
+        with transaction.atomic():
+            if self.parent_id:
+                parent = CaseFolder.objects.values('path', 'depth', 'name_path').get(pk=self.parent_id)
+                path = f"{parent['path']}{self.parent_id}/"
+                if self.pk and f"/{self.pk}/" in path:
+                    raise ValueError(f"Folder {self.pk} cannot be moved below itself")
+                depth = parent['depth'] + 1
+                name_path = f"{parent['name_path']}/{self.name}"
+            else:
+                path, depth, name_path = '/', 0, self.name
+            
+            old = None
+            if self.pk and not self._state.adding:
+                # Locks the row so concurrent moves of the same folder queue here
+                old = CaseFolder.objects.select_for_update().filter(pk=self.pk).values(
+                    'path', 'depth', 'name_path'
+                ).first()
+            
+            self.path, self.depth, self.name_path = path, depth, name_path
+            update_fields = kwargs.get('update_fields')
+            moved = update_fields is None or bool({'name', 'parent', 'parent_id'} & set(update_fields))
+            if update_fields is not None and moved:
+                kwargs['update_fields'] = set(update_fields) | {'path', 'depth', 'name_path'}
+            super().save(*args, **kwargs)
+            
+            if moved and old and (old['path'], old['name_path']) != (path, name_path):
+                old_prefix = f"{old['path']}{self.pk}/"
+                # Rewrite the moved or renamed prefix of every descendant in one statement
+                CaseFolder.objects.filter(path__startswith=old_prefix).update(
+                    path=Concat(Value(self.subtree_path), Substr('path', len(old_prefix) + 1)),
+                    depth=F('depth') + (depth - old['depth']),
+                    name_path=Concat(Value(f"{name_path}/"), Substr('name_path', len(old['name_path']) + 2)),
+                )
+    
+    @classmethod
+    def tree(cls, case, document_counts=False):
+        """
+        Load every folder of a case in one query, keyed by ID, each with
+        ``path_parts`` (folder names from the root) and ``ancestor_ids``
+        (its own ID and those of the folders above it)
+        
+        With ``document_counts``, one more grouped query sets
+        ``document_count`` (documents directly in the folder) and
+        ``subtree_document_count`` (documents in the folder or below it).
+        Passing the case's ``CaseStats.folder_document_counts`` instead of
+        True sets the same attributes without the query.
+        """
+        folders = {folder.pk: folder for folder in cls.objects.filter(case=case).order_by('depth')}
+        for folder in folders.values():
+            # Parents come first, so their parts are already known
+            parent = folders.get(folder.parent_id)
+            if parent is not None:
+                folder.path_parts = parent.path_parts + [folder.name]
+                folder.ancestor_ids = parent.ancestor_ids | {folder.pk}
+            else:
+                folder.path_parts = [folder.name]
+                folder.ancestor_ids = {folder.pk}
+        
+        direct = None
+        if isinstance(document_counts, dict):
+            direct = {int(folder_id): total for folder_id, total in document_counts.items()}
+        elif document_counts:
+            direct = dict(
+                CaseDocument.objects.filter(case=case, folder__isnull=False)
+                .values_list('folder').annotate(total=Count('pk')).order_by()
+            )
+        if direct is not None:
+            for folder in folders.values():
+                folder.document_count = direct.get(folder.pk, 0)
+                folder.subtree_document_count = 0
+            for folder_id, total in direct.items():
+                folder = folders.get(folder_id)
+                for ancestor_id in (folder.ancestor_ids if folder is not None else ()):
+                    folders[ancestor_id].subtree_document_count += total
+        return folders
+    
+    @classmethod
+    def sorted_tree(cls, case, document_counts=False):
+        """Every folder of a case in display order (depth-first, by name)"""
+        folders = cls.tree(case, document_counts=document_counts)
+        return sorted(folders.values(), key=lambda folder: [part.casefold() for part in folder.path_parts])
 
 class CaseDocument(models.Model):
     """
@@ -257,4 +423,70 @@ class CaseDocument(models.Model):
         unique_together = [['document', 'case']]
     
     def __str__(self):
-        return f"{self.document} in {self.case}"
\ No newline at end of file
+        return f"{self.document} in {self.case}"
+
+class CaseStats(models.Model):
+    """
+    Dashboard counts for a case, kept in one row so a dashboard reads them
+    without counting documents folder by folder
+    
+    The row is updated in the same transaction as each change to the case's
+    documents, folders, matters and docket entries (see ``cases.signals``)
+    and can be recomputed for any or every case with
+    ``manage.py rebuild_case_stats``.
+    """
+    case = models.OneToOneField(
+        Case,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats'
+    )
+    document_count = models.PositiveIntegerField(default=0)
+    root_document_count = models.PositiveIntegerField(
+        default=0,
+        help_text="Documents not filed in a folder"
+    )
+    folder_count = models.PositiveIntegerField(default=0)
+    matter_count = models.PositiveIntegerField(default=0)
+    docket_entry_count = models.PositiveIntegerField(default=0)
+    folder_document_counts = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Documents filed directly in each folder, keyed by folder ID"
+    )
+    matter_document_counts = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Documents assigned to each matter, keyed by matter ID"
+    )
+    last_activity_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Latest change to the case or its documents, folders, matters or docket"
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = "Case Statistics"
+        verbose_name_plural = "Case Statistics"
+    
+    def __str__(self):
+        return f"Statistics for {self.case}"
+    
+    def folder_document_count(self, folder_id):
+        """Documents filed directly in a folder"""
+        return self.folder_document_counts.get(str(folder_id), 0)
+    
+    def matter_document_count(self, matter_id):
+        """Documents assigned to a matter"""
+        return self.matter_document_counts.get(str(matter_id), 0)
+    
+    @classmethod
+    def for_case(cls, case):
+        """The case's statistics, computed first if the case has none yet"""
+        stats = cls.objects.filter(case=case).first()
+        if stats is None:
+            from .stats import rebuild_case_stats
+            rebuild_case_stats(Case.objects.filter(pk=case.pk))
+            stats = cls.objects.get(case=case)
+        return stats
@@ -0,0 +1,104 @@
+from django.core import signing
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+CURSOR_SALT = 'cases.pagination.cursor'
+
+
+def encode_cursor(value, pk):
+    """Opaque cursor pointing at the row with this sort value and primary key"""
+    return signing.dumps([value.isoformat(), pk], salt=CURSOR_SALT)
+
+
+def decode_cursor(cursor):
+    """
+    Read a cursor made by encode_cursor.
+
+    Returns:
+        tuple: (datetime, primary key), or None if the cursor is missing or invalid
+    """
+    if not cursor:
+        return None
+    try:
+        value, pk = signing.loads(cursor, salt=CURSOR_SALT)
+        value = parse_datetime(value)
+    except (signing.BadSignature, TypeError, ValueError):
+        return None
+    if value is None or not isinstance(pk, int):
+        return None
+    return value, pk
+
+
+class KeysetPage:
+    """
+    One page of rows ordered newest first by a timestamp and then by primary key.
+
+    Unlike offset pages, every page costs the same to fetch however deep it
+    is, and rows added or updated while paging never shift the rows that
+    follow. There is no total count, which would need a full scan.
+    """
+
+    def __init__(self, object_list, has_next, has_previous, field):
+        self.object_list = object_list
+        self.has_next = has_next
+        self.has_previous = has_previous
+        self.field = field
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    @property
+    def next_cursor(self):
+        if not self.has_next or not self.object_list:
+            return None
+        last = self.object_list[-1]
+        return encode_cursor(getattr(last, self.field), last.pk)
+
+    @property
+    def previous_cursor(self):
+        if not self.has_previous or not self.object_list:
+            return None
+        first = self.object_list[0]
+        return encode_cursor(getattr(first, self.field), first.pk)
+
+
+def keyset_page(queryset, per_page, after=None, before=None, field='updated_at'):
+    """
+    Fetch one page of a queryset ordered by ``(-field, -pk)`` with one query.
+
+    Args:
+        queryset: QuerySet to paginate (its ordering is replaced)
+        per_page: Rows per page
+        after: Cursor of the last row of the previous page (next page)
+        before: Cursor of the first row of the following page (previous page)
+        field: Timestamp the rows are ordered by, newest first
+
+    Returns:
+        KeysetPage: The rows, with cursors for the pages either side
+    """
+    after, before = decode_cursor(after), decode_cursor(before)
+
+    if before is not None:
+        value, pk = before
+        # Walk backwards from the cursor, then put the rows back in display order
+        rows = list(
+            queryset.filter(**{f'{field}__gte': value})
+            .filter(Q(**{f'{field}__gt': value}) | Q(pk__gt=pk))
+            .order_by(field, 'pk')[:per_page + 1]
+        )
+        has_previous = len(rows) > per_page
+        return KeysetPage(rows[:per_page][::-1], True, has_previous, field)
+
+    if after is not None:
+        value, pk = after
+        # The redundant range lets the database start the index scan at the
+        # cursor instead of filtering every newer row
+        queryset = (
+            queryset.filter(**{f'{field}__lte': value})
+            .filter(Q(**{f'{field}__lt': value}) | Q(pk__lt=pk))
+        )
+    rows = list(queryset.order_by(f'-{field}', '-pk')[:per_page + 1])
+    return KeysetPage(rows[:per_page], len(rows) > per_page, after is not None, field)
@@ -0,0 +1,201 @@
+import logging
+from django.db import transaction
+from django.db.models.signals import m2m_changed, pre_save, post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from docket.models import Docket, DocketEntry
+from .models import Case, CaseDocument, CaseFolder, CaseStats, Matter
+from .stats import apply_stats_change, rebuild_case_stats, record_activity
+from .visibility import get_visibility_resolver
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_save, sender=Case)
+def handle_case_stats(sender, instance, created, **kwargs):
+    """
+    Signal handler to give a new case an empty statistics row, or move an
+    existing case's last activity forward
+    """
+    if created:
+        CaseStats.objects.get_or_create(case=instance, defaults={'last_activity_at': instance.updated_at})
+    else:
+        record_activity(instance.pk, instance.updated_at)
+
+
+@receiver(pre_save, sender=CaseDocument)
+def handle_case_document_move(sender, instance, **kwargs):
+    """
+    Signal handler to remember where a document was filed before it is
+    saved, so moving it takes it out of the old folder and matter counts
+    """
+    if instance.pk:
+        instance._previous_filing = (
+            CaseDocument.objects.filter(pk=instance.pk).values_list('case_id', 'folder_id', 'matter_id').first()
+        )
+
+
+@receiver(post_save, sender=CaseDocument)
+def handle_case_document_save(sender, instance, created, **kwargs):
+    """
+    Signal handler to count a document added to a case or moved between
+    folders, matters or cases
+    """
+    now = timezone.now()
+    if created:
+        apply_stats_change(
+            instance.case_id, documents=1,
+            folder_deltas={instance.folder_id: 1}, matter_deltas={instance.matter_id: 1},
+            activity_at=now,
+        )
+        return
+
+    previous = getattr(instance, '_previous_filing', None)
+    if previous is None or previous == (instance.case_id, instance.folder_id, instance.matter_id):
+        record_activity(instance.case_id, now)
+        return
+
+    case_id, folder_id, matter_id = previous
+    if case_id == instance.case_id:
+        apply_stats_change(
+            case_id,
+            folder_deltas={folder_id: -1, instance.folder_id: 1} if folder_id != instance.folder_id else None,
+            matter_deltas={matter_id: -1, instance.matter_id: 1} if matter_id != instance.matter_id else None,
+            activity_at=now,
+        )
+        return
+
+    # Moved to another case; lock the two rows in a fixed order
+    changes = {
+        case_id: {'documents': -1, 'folder_deltas': {folder_id: -1}, 'matter_deltas': {matter_id: -1}},
+        instance.case_id: {
+            'documents': 1, 'folder_deltas': {instance.folder_id: 1}, 'matter_deltas': {instance.matter_id: 1},
+        },
+    }
+    for changed_case_id in sorted(changes):
+        apply_stats_change(changed_case_id, activity_at=now, **changes[changed_case_id])
+
+
+@receiver(post_delete, sender=CaseDocument)
+def handle_case_document_delete(sender, instance, **kwargs):
+    """Signal handler to stop counting a document removed from a case"""
+    apply_stats_change(
+        instance.case_id, documents=-1,
+        folder_deltas={instance.folder_id: -1}, matter_deltas={instance.matter_id: -1},
+        activity_at=timezone.now(), rebuild_missing=False,
+    )
+
+
+@receiver(post_save, sender=CaseFolder)
+def handle_case_folder_save(sender, instance, created, **kwargs):
+    """Signal handler to count a new folder"""
+    if created:
+        apply_stats_change(instance.case_id, folders=1, activity_at=instance.created_at)
+    else:
+        record_activity(instance.case_id, timezone.now())
+
+
+@receiver(post_delete, sender=CaseFolder)
+def handle_case_folder_delete(sender, instance, **kwargs):
+    """
+    Signal handler to stop counting a deleted folder; its documents are
+    moved to the case root
+    """
+    apply_stats_change(
+        instance.case_id, folders=-1, removed_folders=[instance.pk],
+        activity_at=timezone.now(), rebuild_missing=False,
+    )
+
+
+@receiver(post_save, sender=Matter)
+def handle_matter_save(sender, instance, created, **kwargs):
+    """Signal handler to count a new matter"""
+    if created:
+        apply_stats_change(instance.case_id, matters=1, activity_at=instance.updated_at)
+    else:
+        record_activity(instance.case_id, instance.updated_at)
+
+
+@receiver(post_delete, sender=Matter)
+def handle_matter_delete(sender, instance, **kwargs):
+    """
+    Signal handler to stop counting a deleted matter; its documents stay
+    in the case without a matter
+    """
+    apply_stats_change(
+        instance.case_id, matters=-1, removed_matters=[instance.pk],
+        activity_at=timezone.now(), rebuild_missing=False,
+    )
+
+
+@receiver(pre_save, sender=Docket)
+def handle_docket_relink(sender, instance, **kwargs):
+    """Signal handler to remember which case a docket belonged to before it is saved"""
+    if instance.pk:
+        instance._previous_case_id = (
+            Docket.objects.filter(pk=instance.pk).values_list('case_id', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Docket)
+def handle_docket_save(sender, instance, created, **kwargs):
+    """
+    Signal handler to recount docket entries when a docket is linked to a
+    different case, which moves all of its entries at once
+    """
+    previous_case_id = getattr(instance, '_previous_case_id', None)
+    if not created and previous_case_id != instance.case_id:
+        case_ids = {previous_case_id, instance.case_id} - {None}
+        rebuild_case_stats(Case.objects.filter(pk__in=case_ids))
+
+
+def _docket_case_id(entry):
+    """ID of the case an entry's docket is linked to, if any"""
+    return Docket.objects.filter(pk=entry.docket_id).values_list('case_id', flat=True).first()
+
+
+@receiver(post_save, sender=DocketEntry)
+def handle_docket_entry_save(sender, instance, created, **kwargs):
+    """Signal handler to count a new docket entry against the docket's case"""
+    case_id = _docket_case_id(instance)
+    if created:
+        apply_stats_change(case_id, docket_entries=1, activity_at=instance.updated_at)
+    elif case_id:
+        record_activity(case_id, instance.updated_at)
+
+
+@receiver(post_delete, sender=DocketEntry)
+def handle_docket_entry_delete(sender, instance, **kwargs):
+    """Signal handler to stop counting a deleted docket entry"""
+    apply_stats_change(
+        _docket_case_id(instance), docket_entries=-1,
+        activity_at=timezone.now(), rebuild_missing=False,
+    )
+
+
+@receiver(m2m_changed, sender=Case.assigned_attorneys.through)
+def handle_case_assignment_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Signal handler to drop the cached case IDs of attorneys assigned to or
+    removed from a case once the change commits
+    """
+    if action == 'pre_clear' and not reverse:
+        # Clearing a case's attorneys does not say who they were
+        instance._previous_attorney_ids = set(instance.assigned_attorneys.values_list('pk', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    
+    if reverse:
+        user_ids = {instance.pk}
+    elif action == 'post_clear':
+        user_ids = getattr(instance, '_previous_attorney_ids', set())
+    else:
+        user_ids = set(pk_set or ())
+    
+    def invalidate():
+        resolver = get_visibility_resolver()
+        for user_id in user_ids:
+            resolver.invalidate(user_id)
+    
+    transaction.on_commit(invalidate)
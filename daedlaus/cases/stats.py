@@ -0,0 +1,209 @@
+import logging
+from collections import defaultdict
+from django.db import transaction
+from django.db.models import Count, IntegerField, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest, Now
+
+from docket.models import DocketEntry
+from .models import Case, CaseDocument, CaseFolder, CaseStats, Matter
+
+logger = logging.getLogger(__name__)
+
+# Cases recomputed per statement by rebuild_case_stats
+REBUILD_BATCH_SIZE = 1000
+
+
+def _adjust(counts, key, delta):
+    """Add ``delta`` to a JSON count keyed by ID, dropping counts that reach zero"""
+    key = str(key)
+    total = counts.get(key, 0) + delta
+    if total > 0:
+        counts[key] = total
+    else:
+        counts.pop(key, None)
+
+
+def apply_stats_change(case_id, documents=0, folders=0, matters=0, docket_entries=0,
+                       folder_deltas=None, matter_deltas=None, removed_folders=(),
+                       removed_matters=(), activity_at=None, rebuild_missing=True):
+    """
+    Apply one change to a case's statistics row.
+
+    The row is locked for the read-modify-write, so concurrent changes to the
+    same case queue behind each other and commit or roll back with the change
+    that caused them.
+
+    Args:
+        case_id: ID of the case that changed
+        documents, folders, matters, docket_entries: Amounts to add to each count
+        folder_deltas: Mapping of folder ID (None for the case root) to the
+            change in documents filed directly in it
+        matter_deltas: Mapping of matter ID to the change in its documents
+        removed_folders: IDs of deleted folders, whose documents fall back to
+            the case root
+        removed_matters: IDs of deleted matters, whose documents lose their matter
+        activity_at: Time of the change, if it counts as activity
+        rebuild_missing: Compute the whole row if the case has none yet;
+            deletions pass False, since the case itself may be going
+    """
+    if not case_id:
+        return
+    with transaction.atomic():
+        stats = CaseStats.objects.select_for_update().filter(case_id=case_id).first()
+        if stats is None:
+            # The database already includes this change
+            if rebuild_missing:
+                rebuild_case_stats(Case.objects.filter(pk=case_id))
+            return
+
+        stats.document_count = max(stats.document_count + documents, 0)
+        stats.folder_count = max(stats.folder_count + folders, 0)
+        stats.matter_count = max(stats.matter_count + matters, 0)
+        stats.docket_entry_count = max(stats.docket_entry_count + docket_entries, 0)
+        for folder_id, delta in (folder_deltas or {}).items():
+            if folder_id is None:
+                stats.root_document_count = max(stats.root_document_count + delta, 0)
+            else:
+                _adjust(stats.folder_document_counts, folder_id, delta)
+        for folder_id in removed_folders:
+            stats.root_document_count += stats.folder_document_counts.pop(str(folder_id), 0)
+        for matter_id, delta in (matter_deltas or {}).items():
+            if matter_id is not None:
+                _adjust(stats.matter_document_counts, matter_id, delta)
+        for matter_id in removed_matters:
+            stats.matter_document_counts.pop(str(matter_id), None)
+        if activity_at and (stats.last_activity_at is None or activity_at > stats.last_activity_at):
+            stats.last_activity_at = activity_at
+        stats.save()
+
+
+def record_activity(case_id, activity_at):
+    """Move a case's last activity forward without touching its counts"""
+    CaseStats.objects.filter(case_id=case_id).exclude(last_activity_at__gte=activity_at).update(
+        last_activity_at=activity_at
+    )
+
+
+def _per_case(queryset, case_field='case_id'):
+    """Correlated subquery counting the rows of ``queryset`` belonging to each case"""
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{case_field: OuterRef('case_id')}).order_by()
+            .values(case_field).annotate(total=Count('pk')).values('total'),
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
+def _latest(queryset, field, fallback, case_field='case_id'):
+    """Correlated subquery for the latest ``field`` of each case's rows, or ``fallback``"""
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{case_field: OuterRef('case_id')}).order_by()
+            .values(case_field).annotate(latest=Max(field)).values('latest')
+        ),
+        fallback,
+    )
+
+
+def rebuild_case_stats(cases=None, batch_size=REBUILD_BATCH_SIZE):
+    """
+    Recompute the statistics of cases from scratch.
+
+    Each batch of cases takes one UPDATE of correlated subqueries for the
+    counts and last activity, two grouped queries for the per-folder and
+    per-matter document counts and one bulk update storing them for the
+    cases that have documents, however many documents, folders and entries
+    the cases have.
+
+    Args:
+        cases: QuerySet of cases to recompute (default: every case)
+        batch_size: Cases recomputed per statement
+
+    Returns:
+        int: Number of cases recomputed
+    """
+    cases = Case.objects.all() if cases is None else cases
+    case_ids = list(cases.order_by('pk').values_list('pk', flat=True))
+
+    for offset in range(0, len(case_ids), batch_size):
+        batch = case_ids[offset:offset + batch_size]
+        with transaction.atomic():
+            CaseStats.objects.bulk_create([CaseStats(case_id=pk) for pk in batch], ignore_conflicts=True)
+
+            updated_at = Subquery(Case.objects.filter(pk=OuterRef('case_id')).values('updated_at'))
+            CaseStats.objects.filter(case_id__in=batch).update(
+                document_count=_per_case(CaseDocument.objects.all()),
+                root_document_count=_per_case(CaseDocument.objects.filter(folder__isnull=True)),
+                folder_count=_per_case(CaseFolder.objects.all()),
+                matter_count=_per_case(Matter.objects.all()),
+                docket_entry_count=_per_case(DocketEntry.objects.all(), 'docket__case_id'),
+                # Each part falls back to the case's own update time, as
+                # some databases return NULL from GREATEST if any part is NULL
+                last_activity_at=Greatest(
+                    updated_at,
+                    _latest(CaseDocument.objects.all(), 'added_at', updated_at),
+                    _latest(CaseFolder.objects.all(), 'created_at', updated_at),
+                    _latest(Matter.objects.all(), 'updated_at', updated_at),
+                    _latest(DocketEntry.objects.all(), 'updated_at', updated_at, 'docket__case_id'),
+                ),
+                # Breakdowns are cleared here and filled in below for the
+                # cases that have any
+                folder_document_counts={},
+                matter_document_counts={},
+                updated_at=Now(),
+            )
+
+            folder_counts = defaultdict(dict)
+            for case_id, folder_id, total in (
+                CaseDocument.objects.filter(case_id__in=batch, folder__isnull=False)
+                .values_list('case_id', 'folder_id').annotate(total=Count('pk')).order_by()
+            ):
+                folder_counts[case_id][str(folder_id)] = total
+            matter_counts = defaultdict(dict)
+            for case_id, matter_id, total in (
+                CaseDocument.objects.filter(case_id__in=batch, matter__isnull=False)
+                .values_list('case_id', 'matter_id').annotate(total=Count('pk')).order_by()
+            ):
+                matter_counts[case_id][str(matter_id)] = total
+            CaseStats.objects.bulk_update(
+                [
+                    CaseStats(
+                        case_id=pk,
+                        folder_document_counts=folder_counts.get(pk, {}),
+                        matter_document_counts=matter_counts.get(pk, {}),
+                    )
+                    for pk in folder_counts.keys() | matter_counts.keys()
+                ],
+                ['folder_document_counts', 'matter_document_counts'],
+            )
+
+    logger.info(f"Rebuilt statistics for {len(case_ids)} case(s)")
+    return len(case_ids)
+
+
+def stale_case_stats(cases=None):
+    """
+    Compare stored statistics with freshly computed ones without changing them.
+
+    Returns:
+        list: IDs of cases whose stored counts differ or which have no statistics
+    """
+    cases = Case.objects.all() if cases is None else cases
+    fields = [
+        'document_count', 'root_document_count', 'folder_count', 'matter_count',
+        'docket_entry_count', 'folder_document_counts', 'matter_document_counts',
+    ]
+    stored = {
+        row['case_id']: row
+        for row in CaseStats.objects.filter(case__in=cases).values('case_id', *fields)
+    }
+    with transaction.atomic():
+        rebuild_case_stats(cases)
+        fresh = {
+            row['case_id']: row
+            for row in CaseStats.objects.filter(case__in=cases).values('case_id', *fields)
+        }
+        transaction.set_rollback(True)
+    return sorted(case_id for case_id, row in fresh.items() if stored.get(case_id) != row)
@@ -1,3 +1,316 @@
+import io
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
 
-# Create your tests here.
+from clients.models import Client
+from documents.models import Document
+from .models import Case, CaseDocument, CaseFolder, CaseStats, Matter
+from .imports import run_import
+from .stats import stale_case_stats
+from .visibility import get_visibility_resolver
+
+
+class CaseTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        User = get_user_model()
+        self.creator = User.objects.create_user(username='creator', password='x')
+        self.attorney = User.objects.create_user(username='attorney', password='x')
+        self.client_record = Client.objects.create(name='Acme Corp', created_by=self.creator)
+
+    def create_case(self, title='Acme v. Roe', client=None, attorneys=()):
+        client = client or self.client_record
+        case = Case.objects.create(title=title, client=client, client_name=client.name, created_by=self.creator)
+        if attorneys:
+            with self.captureOnCommitCallbacks(execute=True):
+                case.assigned_attorneys.add(*attorneys)
+        return case
+
+    def fresh(self, user):
+        # A new instance, so nothing is memoized from an earlier check
+        return get_user_model().objects.get(pk=user.pk)
+
+
+class CaseVisibilityTests(CaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.assigned = self.create_case('Assigned', attorneys=[self.attorney])
+        self.other_client = Client.objects.create(name='Roe LLC', created_by=self.creator)
+        self.unassigned = self.create_case('Unassigned', client=self.other_client)
+
+    def test_unassigned_attorney_gets_404(self):
+        self.client.force_login(self.attorney)
+        for url in (
+            reverse('cases:case_detail', args=[self.unassigned.uuid]),
+            reverse('cases:case_export', args=[self.unassigned.uuid]),
+            reverse('docket:case_docket', args=[self.unassigned.uuid]),
+        ):
+            self.assertEqual(self.client.get(url).status_code, 404, url)
+
+    def test_attorney_sees_only_assigned_cases(self):
+        attorney = self.fresh(self.attorney)
+        self.assertEqual(list(Case.objects.visible_to(attorney)), [self.assigned])
+        self.assertTrue(self.assigned.is_visible_to(attorney))
+        self.assertFalse(self.unassigned.is_visible_to(attorney))
+
+    def test_view_all_cases_holder_sees_every_case(self):
+        self.attorney.user_permissions.add(
+            Permission.objects.get(content_type__app_label='cases', codename='view_all_cases')
+        )
+        attorney = self.fresh(self.attorney)
+
+        self.assertEqual(set(Case.objects.visible_to(attorney)), {self.assigned, self.unassigned})
+        self.assertTrue(self.unassigned.is_visible_to(attorney))
+        self.assertEqual(
+            set(get_visibility_resolver().filter_clients(Client.objects.all(), attorney)),
+            {self.client_record, self.other_client}
+        )
+
+    def test_client_list_shows_clients_with_visible_cases(self):
+        self.assertEqual(
+            list(get_visibility_resolver().filter_clients(Client.objects.all(), self.fresh(self.attorney))),
+            [self.client_record]
+        )
+
+    def test_assignment_changes_drop_cached_case_ids(self):
+        self.assertFalse(self.unassigned.is_visible_to(self.fresh(self.attorney)))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.unassigned.assigned_attorneys.add(self.attorney)
+        self.assertTrue(self.unassigned.is_visible_to(self.fresh(self.attorney)))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.unassigned.assigned_attorneys.clear()
+        self.assertFalse(self.unassigned.is_visible_to(self.fresh(self.attorney)))
+
+
+class CaseFolderTests(CaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.case = self.create_case()
+        self.pleadings = self.folder('Pleadings')
+        self.motions = self.folder('Motions', self.pleadings)
+        self.drafts = self.folder('Drafts', self.motions)
+        self.discovery = self.folder('Discovery')
+        self.depositions = self.folder('depositions', self.discovery)
+
+    def folder(self, name, parent=None):
+        return CaseFolder.objects.create(name=name, case=self.case, parent=parent, created_by=self.creator)
+
+    def assertFolder(self, folder, path_ids, name_path):
+        folder.refresh_from_db()
+        self.assertEqual(folder.path, ''.join(f'/{pk}' for pk in path_ids) + '/')
+        self.assertEqual(folder.depth, len(path_ids))
+        self.assertEqual(folder.name_path, name_path)
+
+    def test_moving_a_subtree_rewrites_descendant_paths(self):
+        self.motions.parent = self.discovery
+        self.motions.save()
+
+        self.assertFolder(self.motions, [self.discovery.pk], 'Discovery/Motions')
+        self.assertFolder(self.drafts, [self.discovery.pk, self.motions.pk], 'Discovery/Motions/Drafts')
+        self.assertEqual(set(self.discovery.get_descendants()), {self.depositions, self.motions, self.drafts})
+        self.assertFalse(self.pleadings.get_descendants().exists())
+
+    def test_moving_a_subtree_to_the_root(self):
+        self.motions.parent = None
+        self.motions.save()
+
+        self.assertFolder(self.motions, [], 'Motions')
+        self.assertFolder(self.drafts, [self.motions.pk], 'Motions/Drafts')
+
+    def test_renaming_rewrites_descendant_name_paths(self):
+        self.pleadings.name = 'Filings'
+        self.pleadings.save(update_fields=['name'])
+
+        self.assertFolder(self.motions, [self.pleadings.pk], 'Filings/Motions')
+        self.assertFolder(self.drafts, [self.pleadings.pk, self.motions.pk], 'Filings/Motions/Drafts')
+
+    def test_move_below_own_descendant_is_rejected(self):
+        for target in (self.drafts, self.pleadings):
+            self.pleadings.parent = target
+            with self.assertRaises(ValueError):
+                self.pleadings.save()
+
+        self.assertFolder(self.pleadings, [], 'Pleadings')
+        self.assertFolder(self.drafts, [self.pleadings.pk, self.motions.pk], 'Pleadings/Motions/Drafts')
+
+    def test_sorted_tree_is_depth_first_by_name(self):
+        folders = CaseFolder.sorted_tree(self.case)
+
+        self.assertEqual(
+            [folder.full_path for folder in folders],
+            ['Discovery', 'Discovery/depositions', 'Pleadings', 'Pleadings/Motions', 'Pleadings/Motions/Drafts']
+        )
+        self.assertEqual(folders[-1].path_parts, ['Pleadings', 'Motions', 'Drafts'])
+
+    def test_sorted_tree_rolls_document_counts_up(self):
+        counts = {str(self.drafts.pk): 2, str(self.pleadings.pk): 1}
+        folders = {folder.pk: folder for folder in CaseFolder.sorted_tree(self.case, document_counts=counts)}
+
+        self.assertEqual(folders[self.pleadings.pk].document_count, 1)
+        self.assertEqual(folders[self.pleadings.pk].subtree_document_count, 3)
+        self.assertEqual(folders[self.motions.pk].subtree_document_count, 2)
+        self.assertEqual(folders[self.discovery.pk].subtree_document_count, 0)
+
+
+class CaseStatsTests(CaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.case = self.create_case()
+        self.folder = CaseFolder.objects.create(name='Pleadings', case=self.case, created_by=self.creator)
+        self.matter = Matter.objects.create(name='Appeal', case=self.case, created_by=self.creator)
+        self.document = Document.objects.create(title='Complaint', created_by=self.creator)
+
+    def file_document(self, document=None, case=None, folder=None, matter=None):
+        return CaseDocument.objects.create(
+            document=document or self.document, case=case or self.case,
+            folder=folder, matter=matter, added_by=self.creator
+        )
+
+    def assertStats(self, case, **expected):
+        stats = CaseStats.objects.get(case=case)
+        self.assertEqual({field: getattr(stats, field) for field in expected}, expected)
+        # The incremental counts agree with a full recount
+        self.assertEqual(stale_case_stats(Case.objects.filter(pk=case.pk)), [])
+
+    def test_filing_a_document_counts_it(self):
+        self.file_document(folder=self.folder, matter=self.matter)
+        self.file_document(Document.objects.create(title='Answer', created_by=self.creator))
+
+        self.assertStats(
+            self.case, document_count=2, root_document_count=1, folder_count=1, matter_count=1,
+            folder_document_counts={str(self.folder.pk): 1}, matter_document_counts={str(self.matter.pk): 1},
+        )
+
+    def test_removing_a_document_from_the_case_uncounts_it(self):
+        # There is no soft delete; the document itself stays when its filing is removed
+        self.file_document(folder=self.folder, matter=self.matter).delete()
+
+        self.assertTrue(Document.objects.filter(pk=self.document.pk).exists())
+        self.assertStats(
+            self.case, document_count=0, root_document_count=0,
+            folder_document_counts={}, matter_document_counts={},
+        )
+
+    def test_deleting_a_document_uncounts_it(self):
+        self.file_document(folder=self.folder)
+        self.document.delete()
+
+        self.assertStats(self.case, document_count=0, folder_document_counts={})
+
+    def test_moving_a_document_to_another_case(self):
+        other = self.create_case('Roe v. Acme')
+        filing = self.file_document(folder=self.folder, matter=self.matter)
+
+        filing.case, filing.folder, filing.matter = other, None, None
+        filing.save()
+
+        self.assertStats(self.case, document_count=0, folder_document_counts={}, matter_document_counts={})
+        self.assertStats(other, document_count=1, root_document_count=1)
+
+    def test_for_case_rebuilds_a_missing_row(self):
+        self.file_document(folder=self.folder, matter=self.matter)
+        CaseStats.objects.filter(case=self.case).delete()
+
+        stats = CaseStats.for_case(self.case)
+
+        self.assertEqual(stats.document_count, 1)
+        self.assertEqual(stats.folder_count, 1)
+        self.assertEqual(stats.folder_document_count(self.folder.pk), 1)
+        self.assertEqual(stats.matter_document_count(self.matter.pk), 1)
+        self.assertIsNotNone(stats.last_activity_at)
+
+
+class ImportTests(CaseTestCase):
+    clients_csv = (
+        "name,tax_id,email\n"
+        "Initech,12-3456789,legal@initech.example\n"
+        "Jane Roe,,jane@roe.example\n"
+    )
+    cases_csv = (
+        "title,case_number,client_tax_id,client_email,attorneys\n"
+        "Initech v. Lumbergh,2026-CV-001,12-3456789,,attorney\n"
+        "In re Roe,2026-PR-002,,jane@roe.example,\n"
+    )
+    matters_jsonl = (
+        '{"case_number": "2026-CV-001", "name": "Appeal"}\n'
+        '{"case_number": "2026-PR-002", "name": "Estate"}\n'
+    )
+    folders_csv = (
+        "case_number,path,matter\n"
+        "2026-CV-001,Pleadings/Motions,Appeal\n"
+        "2026-CV-001,Discovery,\n"
+    )
+
+    def run_import(self, record_type, text, file_format='csv'):
+        with self.captureOnCommitCallbacks(execute=True):
+            return run_import(io.StringIO(text), record_type, self.creator, file_format=file_format)
+
+    def import_all(self):
+        return [
+            self.run_import('client', self.clients_csv),
+            self.run_import('case', self.cases_csv),
+            self.run_import('matter', self.matters_jsonl, 'jsonl'),
+            self.run_import('folder', self.folders_csv),
+        ]
+
+    def test_imports_clients_cases_matters_and_folders(self):
+        reports = self.import_all()
+
+        self.assertEqual([(r.created, r.failed) for r in reports], [(2, 0), (2, 0), (2, 0), (3, 0)])
+        case = Case.objects.get(case_number='2026-CV-001')
+        self.assertEqual(case.client.name, 'Initech')
+        self.assertEqual(case.client_name, 'Initech')
+        self.assertEqual(list(case.assigned_attorneys.all()), [self.attorney])
+        self.assertTrue(case.is_visible_to(self.fresh(self.attorney)))
+        self.assertEqual(Case.objects.get(case_number='2026-PR-002').client.name, 'Jane Roe')
+
+        pleadings = CaseFolder.objects.get(case=case, name='Pleadings')
+        motions = CaseFolder.objects.get(case=case, name='Motions')
+        self.assertEqual(motions.parent, pleadings)
+        self.assertEqual(motions.path, f"/{pleadings.pk}/")
+        self.assertEqual(motions.name_path, 'Pleadings/Motions')
+        self.assertEqual(motions.matter.name, 'Appeal')
+        self.assertIsNone(pleadings.matter)
+
+        stats = CaseStats.objects.get(case=case)
+        self.assertEqual((stats.folder_count, stats.matter_count), (3, 1))
+
+    def test_bad_references_are_reported_per_row(self):
+        self.run_import('client', self.clients_csv)
+        report = self.run_import('case', (
+            "title,case_number,client_tax_id,attorneys\n"
+            "Initech v. Lumbergh,2026-CV-001,12-3456789,\n"
+            "Orphan v. Nobody,2026-CV-002,99-9999999,\n"
+            "Initech v. Bolton,2026-CV-003,12-3456789,nobody\n"
+        ))
+
+        self.assertEqual((report.rows, report.created, report.failed), (3, 1, 2))
+        self.assertEqual([line for line, _ in report.errors], [3, 4])
+        self.assertIn('client_tax_id', report.errors[0][1])
+        self.assertIn('attorneys', report.errors[1][1])
+        imported = Case.objects.filter(case_number__startswith='2026-CV').values_list('case_number', flat=True)
+        self.assertEqual(list(imported), ['2026-CV-001'])
+
+        report = self.run_import('folder', (
+            "case_number,path,matter\n"
+            "2026-CV-009,Pleadings,\n"
+            "2026-CV-001,Pleadings,Missing\n"
+        ))
+        self.assertEqual((report.created, report.failed), (0, 2))
+        self.assertIn('case_number', report.errors[0][1])
+        self.assertIn('matter', report.errors[1][1])
+
+    def test_reimporting_the_same_files_changes_nothing(self):
+        self.import_all()
+        counts = [model.objects.count() for model in (Client, Case, Matter, CaseFolder)]
+
+        reports = self.import_all()
+
+        self.assertEqual([(r.created, r.updated, r.failed) for r in reports], [(0, 0, 0)] * 4)
+        self.assertEqual([r.unchanged for r in reports], [2, 2, 2, 2])
+        self.assertEqual([model.objects.count() for model in (Client, Case, Matter, CaseFolder)], counts)
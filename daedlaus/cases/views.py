@@ -1,55 +1,163 @@
+import io
+from urllib.parse import urlencode
 from django.shortcuts import render, get_object_or_404, redirect
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
 from django.contrib.auth.decorators import login_required, permission_required
-from django.http import Http404
+from django.http import Http404, JsonResponse
 from django.contrib import messages
+from django.db.models import Q
 from django.utils.translation import gettext as _
 
-from .models import Case, CaseCategory, Matter, CaseFolder, CaseDocument
+from .models import Case, CaseCategory, Matter, CaseFolder, CaseDocument, CaseStats
+from .imports import IMPORT_PERMISSIONS, IMPORT_TYPES, detect_format, run_import
+from .pagination import keyset_page
+from clients.models import Client
 from documents.models import Document
+from documents.services.s3_service import get_document_service
+from documents.services.zip_export import clean_path_part, export_entries, zip_response
+
+# Cases shown per page of the case list
+CASES_PER_PAGE = 25
+
+
+def case_archive_items(case, prefix=(), folder=None):
+    """
+    List a case's documents for export, each under its folder's path.
+    
+    Args:
+        case: Case to export
+        prefix: Directory parts placed above the case's folders
+        folder: Only include documents in this CaseFolder or below it
+    
+    Returns:
+        list: (directory parts, Document ID)
+    """
+    folders = CaseFolder.tree(case)
+    documents = case.documents.all()
+    if folder is not None:
+        # The folder and its subtree, found by path prefix
+        documents = documents.filter(Q(folder=folder) | Q(folder__path__startswith=folder.subtree_path))
+    items = []
+    for folder_id, document_id in documents.values_list('folder_id', 'document_id'):
+        parent = folders.get(folder_id)
+        items.append((tuple(prefix) + tuple(parent.path_parts if parent else ()), document_id))
+    return items
+
+def get_visible_case_or_404(request, uuid):
+    """
+    The case with this UUID, if the user may see it; cases hidden from the
+    user are reported as missing rather than forbidden
+    """
+    case = get_object_or_404(Case, uuid=uuid)
+    if not case.is_visible_to(request.user):
+        raise Http404("No case matches the given query.")
+    return case
 
 @login_required
 def case_list(request):
-    """List all cases the user has access to"""
+    """
+    List cases newest first, a page at a time.
+    
+    Pages are keyset-paginated on (updated_at, id) and every relation a row
+    shows is fetched up front, so each page takes the same few queries
+    however many cases there are.
+    """
+    cases = Case.objects.for_list().visible_to(request.user)
+    title = "All Cases"
+    
     # Filter by category if requested
     category_id = request.GET.get('category')
     if category_id:
         try:
             category = CaseCategory.objects.get(id=category_id)
-            cases = Case.objects.filter(category=category)
+            cases = cases.filter(category=category)
             title = f"Cases in {category.name}"
-        except CaseCategory.DoesNotExist:
-            cases = Case.objects.all()
-            title = "All Cases"
+        except (CaseCategory.DoesNotExist, ValueError):
+            category_id = None
+    
+    # Filter by status, assigned attorney and client
+    status = request.GET.get('status')
+    if status in dict(Case.STATUS_CHOICES):
+        cases = cases.filter(status=status)
+    else:
+        status = None
+    
+    attorney_id = request.GET.get('attorney')
+    if attorney_id and attorney_id.isdigit():
+        cases = cases.assigned_to(int(attorney_id))
     else:
-        cases = Case.objects.all()
-        title = "All Cases"
+        attorney_id = None
+    
+    client = None
+    client_id = request.GET.get('client')
+    if client_id:
+        try:
+            client = Client.objects.only('id', 'uuid', 'name').get(uuid=client_id)
+            cases = cases.filter(client=client)
+        except (Client.DoesNotExist, ValidationError):
+            client_id = None
+    
+    page = keyset_page(
+        cases,
+        per_page=CASES_PER_PAGE,
+        after=request.GET.get('after'),
+        before=request.GET.get('before')
+    )
     
-    # Get all categories for filter dropdown
+    # Get all categories and attorneys for the filter dropdowns
     categories = CaseCategory.objects.all().order_by('name')
+    attorneys = get_user_model().objects.filter(is_active=True).only(
+        'id', 'username', 'first_name', 'last_name'
+    ).order_by('last_name', 'first_name', 'username')
+    
+    # Links to the pages either side keep the current filters
+    filters = {
+        name: value for name, value in (
+            ('category', category_id), ('status', status), ('attorney', attorney_id), ('client', client_id)
+        ) if value
+    }
+    next_url = f"?{urlencode({**filters, 'after': page.next_cursor})}" if page.next_cursor else None
+    previous_url = f"?{urlencode({**filters, 'before': page.previous_cursor})}" if page.previous_cursor else None
     
     return render(request, 'cases/case_list.html', {
-        'cases': cases,
+        'cases': page,
+        'page': page,
+        'next_url': next_url,
+        'previous_url': previous_url,
         'title': title,
         'categories': categories,
-        'selected_category': category_id
+        'attorneys': attorneys,
+        'status_choices': Case.STATUS_CHOICES,
+        'selected_category': category_id,
+        'selected_status': status,
+        'selected_attorney': attorney_id,
+        'selected_client': client,
     })
 
 @login_required
 def case_detail(request, uuid):
     """Display case details"""
-    case = get_object_or_404(Case, uuid=uuid)
+    case = get_visible_case_or_404(request, uuid)
     
-    # Get matters
-    matters = case.matters.all()
+    # Counts come from the case's statistics row rather than per-folder queries
+    stats = CaseStats.for_case(case)
     
-    # Get root folders
-    root_folders = case.folders.filter(parent=None)
+    # Get matters, with their document counts
+    matters = list(case.matters.all())
+    for matter in matters:
+        matter.document_count = stats.matter_document_count(matter.pk)
+    
+    # Get root folders, with the documents filed anywhere below each
+    folders = CaseFolder.sorted_tree(case, document_counts=stats.folder_document_counts)
+    root_folders = [folder for folder in folders if folder.depth == 0]
     
     # Get documents directly in case root
     root_documents = case.documents.filter(folder=None)
     
     return render(request, 'cases/case_detail.html', {
         'case': case,
+        'stats': stats,
         'matters': matters,
         'root_folders': root_folders,
         'root_documents': root_documents,
@@ -71,9 +179,10 @@ def case_edit(request, uuid):
 
 @login_required
 def folder_list(request, uuid):
-    """List folders for a case"""
-    case = get_object_or_404(Case, uuid=uuid)
-    folders = case.folders.all()
+    """List folders for a case as a tree, depth-first by name"""
+    case = get_visible_case_or_404(request, uuid)
+    stats = CaseStats.for_case(case)
+    folders = CaseFolder.sorted_tree(case, document_counts=stats.folder_document_counts)
     
     return render(request, 'cases/folder_list.html', {
         'case': case,
@@ -90,7 +199,7 @@ def folder_create(request, uuid):
 @login_required
 def case_documents(request, uuid):
     """List documents for a case"""
-    case = get_object_or_404(Case, uuid=uuid)
+    case = get_visible_case_or_404(request, uuid)
     
     # Get all associated documents
     case_docs = case.documents.all()
@@ -105,4 +214,73 @@ def case_documents(request, uuid):
 def add_document(request, uuid):
     """Add an existing document to a case"""
     # Implementation will follow in next phase
-    pass
\ No newline at end of file
+    pass
+
+@login_required
+def case_export(request, uuid, folder_id=None):
+    """Download a case's documents, or one folder subtree's, as a ZIP archive"""
+    case = get_visible_case_or_404(request, uuid)
+    name = case.case_number or case.title
+    
+    folder = None
+    if folder_id is not None:
+        folder = get_object_or_404(CaseFolder, case=case, pk=folder_id)
+        name = f"{name} - {folder.name}"
+    
+    entries = export_entries(case_archive_items(case, folder=folder), request.user)
+    return zip_response(entries, f"{clean_path_part(name)}.zip", get_document_service())
+
+@login_required
+def import_records(request):
+    """
+    API endpoint importing clients, cases, matters or case folders from an
+    uploaded CSV or JSONL file (see manage.py import_records).
+    
+    POST fields: ``file``, ``type`` (client, case, matter or folder) and
+    optionally ``format``, ``chunk_size``, ``dry_run`` and
+    ``create_categories``. Responds with the import report.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'message': 'Method not allowed'}, status=405)
+    
+    record_type = request.POST.get('type')
+    if record_type not in IMPORT_TYPES:
+        return JsonResponse({
+            'success': False,
+            'message': f"type must be one of: {', '.join(IMPORT_TYPES)}"
+        }, status=400)
+    if not request.user.has_perms(IMPORT_PERMISSIONS[record_type]):
+        return JsonResponse({'success': False, 'message': 'Permission denied'}, status=403)
+    
+    upload = request.FILES.get('file')
+    if upload is None:
+        return JsonResponse({'success': False, 'message': 'No file uploaded'}, status=400)
+    file_format = request.POST.get('format') or detect_format(upload.name)
+    if file_format not in ('csv', 'jsonl'):
+        return JsonResponse({'success': False, 'message': 'format must be csv or jsonl'}, status=400)
+    try:
+        chunk_size = int(request.POST['chunk_size']) if request.POST.get('chunk_size') else None
+    except ValueError:
+        return JsonResponse({'success': False, 'message': 'chunk_size must be a number'}, status=400)
+    
+    def flag(name):
+        return request.POST.get(name, '').lower() in ('1', 'true', 'yes', 'on')
+    
+    # Read the upload as text a line at a time rather than all at once
+    stream = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+    try:
+        report = run_import(
+            stream,
+            record_type,
+            request.user,
+            file_format=file_format,
+            chunk_size=chunk_size,
+            dry_run=flag('dry_run'),
+            create_categories=flag('create_categories'),
+        )
+    except UnicodeDecodeError:
+        return JsonResponse({'success': False, 'message': 'File is not UTF-8 text'}, status=400)
+    finally:
+        stream.detach()
+    
+    return JsonResponse({'success': not report.failed, **report.as_dict()})
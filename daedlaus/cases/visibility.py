@@ -0,0 +1,153 @@
+import logging
+import threading
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Model permission that shows every case, assigned or not
+FULL_ACCESS_PERMISSION = 'cases.view_all_cases'
+
+
+class CaseVisibilityResolver:
+    """
+    Resolves which cases a user may see.
+
+    Users holding the ``cases.view_all_cases`` permission see every case;
+    everyone else sees the cases they are assigned to as an attorney. The
+    IDs of a user's assigned cases are read in one query and cached under
+    the configured cache alias, and assignment changes drop the affected
+    users' entries once they commit. The IDs are also memoized on the user
+    object, so checking any number of cases in one request is a set lookup.
+    """
+
+    def __init__(self, timeout=None, cache_alias=None):
+        self.timeout = timeout if timeout is not None else getattr(
+            settings, 'CASE_VISIBILITY_CACHE_TIMEOUT', 300
+        )
+        self.cache_alias = cache_alias or getattr(settings, 'CASE_VISIBILITY_CACHE_ALIAS', 'default')
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def cache(self):
+        from django.core.cache import caches
+        return caches[self.cache_alias]
+
+    @staticmethod
+    def make_key(user_id):
+        return f"cases:visible:{user_id}"
+
+    def assigned_case_ids(self, user):
+        """
+        Return the IDs of the cases a user is assigned to.
+
+        Args:
+            user: User to resolve
+
+        Returns:
+            frozenset: Case IDs (empty for anonymous users)
+        """
+        if user is None or not getattr(user, 'is_authenticated', False):
+            return frozenset()
+
+        memo = getattr(user, '_assigned_case_ids', None)
+        if memo is not None:
+            return memo
+
+        key = self.make_key(user.pk)
+        case_ids = self.cache.get(key) if self.timeout else None
+        if case_ids is not None:
+            with self._lock:
+                self.hits += 1
+        else:
+            case_ids = self._load(user.pk)
+            with self._lock:
+                self.misses += 1
+            if self.timeout:
+                self.cache.set(key, case_ids, self.timeout)
+
+        user._assigned_case_ids = case_ids
+        return case_ids
+
+    @staticmethod
+    def _load(user_id):
+        from .models import Case
+        through = Case.assigned_attorneys.through
+        return frozenset(through.objects.filter(user_id=user_id).values_list('case_id', flat=True))
+
+    def has_full_access(self, user):
+        """Whether a model permission lets the user see every case."""
+        return user is not None and user.has_perm(FULL_ACCESS_PERMISSION)
+
+    def can_view(self, user, case):
+        """
+        Check whether a user may see a case.
+
+        Args:
+            user: User requesting the case
+            case: Case instance or ID
+
+        Returns:
+            bool: True if the user is assigned to the case or a model
+                permission covers every case
+        """
+        case_id = getattr(case, 'pk', case)
+        if case_id in self.assigned_case_ids(user):
+            return True
+        return self.has_full_access(user)
+
+    def filter_queryset(self, queryset, user):
+        """
+        Restrict a Case queryset to what the user may see.
+
+        The restriction is an EXISTS subquery on the assignment table rather
+        than a list of IDs, so it stays one indexed lookup per case however
+        many cases the user is assigned to.
+        """
+        if user is None or not getattr(user, 'is_authenticated', False):
+            return queryset.none()
+        if self.has_full_access(user):
+            return queryset
+        return queryset.assigned_to(user.pk)
+
+    def filter_clients(self, queryset, user):
+        """
+        Restrict a Client queryset to clients with a case the user may see
+        (every client with full access).
+        """
+        if user is None or not getattr(user, 'is_authenticated', False):
+            return queryset.none()
+        if self.has_full_access(user):
+            return queryset
+        from django.db.models import Exists, OuterRef
+        from .models import Case
+        through = Case.assigned_attorneys.through
+        return queryset.filter(
+            Exists(through.objects.filter(user_id=user.pk, case__client_id=OuterRef('pk')))
+        )
+
+    def invalidate(self, user_id):
+        """Forget the cached case IDs of one user."""
+        self.cache.delete(self.make_key(user_id))
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+_resolver = None
+_resolver_lock = threading.Lock()
+
+
+def get_visibility_resolver():
+    """Return the process-wide case visibility resolver, creating it on first use."""
+    global _resolver
+    if _resolver is None:
+        with _resolver_lock:
+            if _resolver is None:
+                _resolver = CaseVisibilityResolver()
+    return _resolver
@@ -12,5 +12,6 @@ urlpatterns = [
     path('<uuid:uuid>/contacts/<int:contact_id>/edit/', views.edit_contact, name='edit_contact'),
     path('<uuid:uuid>/documents/', views.client_documents, name='client_documents'),
     path('<uuid:uuid>/add-document/', views.add_document, name='add_document'),
+    path('<uuid:uuid>/export/', views.client_export, name='client_export'),
     path('<uuid:uuid>/cases/', views.client_cases, name='client_cases'),
 ]
\ No newline at end of file
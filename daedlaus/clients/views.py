@@ -5,6 +5,10 @@ from django.contrib import messages
 from django.utils.translation import gettext as _
 
 from .models import Client, ClientCategory, ClientContact, ClientDocument
+from cases.views import case_archive_items
+from cases.visibility import get_visibility_resolver
+from documents.services.s3_service import get_document_service
+from documents.services.zip_export import clean_path_part, export_entries, zip_response
 
 @login_required
 def client_list(request):
@@ -13,8 +17,8 @@ def client_list(request):
     category_id = request.GET.get('category')
     client_type = request.GET.get('type')
     
-    # Start with all clients
-    clients = Client.objects.all()
+    # Start with the clients that have a case the user may see
+    clients = get_visibility_resolver().filter_clients(Client.objects.all(), request.user)
     
     # Apply filters
     if category_id:
@@ -59,7 +63,7 @@ def client_detail(request, uuid):
         contacts = client.contacts.all().order_by('-is_primary', 'name')
     
     # Get associated cases
-    cases = client.cases.all().order_by('-created_at')
+    cases = client.cases.visible_to(request.user).order_by('-created_at')
     
     # Get client documents
     documents = client.documents.all().order_by('-added_at')
@@ -121,7 +125,7 @@ def client_cases(request, uuid):
         return redirect('clients:client_list')
     
     # Get all associated cases
-    cases = client.cases.all().order_by('-created_at')
+    cases = client.cases.visible_to(request.user).order_by('-created_at')
     
     return render(request, 'clients/client_cases.html', {
         'client': client,
@@ -140,4 +144,27 @@ def add_contact(request, uuid):
 def edit_contact(request, uuid, contact_id):
     """Edit a contact for an organization client"""
     # Implementation will follow in next phase
-    pass
\ No newline at end of file
+    pass
+
+@login_required
+def client_export(request, uuid):
+    """
+    Download a client's documents and those of all its cases as a ZIP archive
+    """
+    client = get_object_or_404(Client, uuid=uuid)
+    
+    # Check for confidential access
+    if client.is_confidential and not request.user.has_perm('clients.view_confidential_client'):
+        messages.error(request, _("You don't have permission to view this confidential client."))
+        return redirect('clients:client_list')
+    
+    items = [
+        ((_("Client documents"),), document_id)
+        for document_id in client.documents.values_list('document_id', flat=True)
+    ]
+    for case in client.cases.visible_to(request.user):
+        label = f"{case.case_number} {case.title}" if case.case_number else case.title
+        items.extend(case_archive_items(case, prefix=(label,)))
+    
+    entries = export_entries(items, request.user)
+    return zip_response(entries, f"{clean_path_part(client.name)}.zip", get_document_service())
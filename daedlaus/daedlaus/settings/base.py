@@ -115,6 +115,107 @@ STATICFILES_DIRS = [
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Document storage
+# Uploads are streamed to storage in chunks of this size (bytes)
+DOCUMENT_UPLOAD_CHUNK_SIZE = int(os.environ.get('DOCUMENT_UPLOAD_CHUNK_SIZE', 64 * 1024))
+# Largest accepted upload (bytes); S3 presigned POSTs cap out at 5 GB
+DOCUMENT_MAX_UPLOAD_SIZE = int(os.environ.get('DOCUMENT_MAX_UPLOAD_SIZE', 5 * 1024 ** 3))
+# Let browsers upload straight to the S3 bucket instead of through Django
+DOCUMENT_DIRECT_UPLOADS = os.environ.get('DOCUMENT_DIRECT_UPLOADS', 'False') == 'True'
+# Lifetime of presigned upload policies (seconds)
+DOCUMENT_DIRECT_UPLOAD_EXPIRES = int(os.environ.get('DOCUMENT_DIRECT_UPLOAD_EXPIRES', 3600))
+# Resumable chunked uploads (S3 multipart, or chunks assembled on local disk)
+DOCUMENT_CHUNKED_UPLOADS = os.environ.get('DOCUMENT_CHUNKED_UPLOADS', 'False') == 'True'
+DOCUMENT_UPLOAD_PART_SIZE = int(os.environ.get('DOCUMENT_UPLOAD_PART_SIZE', 8 * 1024 * 1024))
+DOCUMENT_CHUNK_UPLOAD_ROOT = os.environ.get('DOCUMENT_CHUNK_UPLOAD_ROOT', os.path.join(BASE_DIR, 'upload_chunks'))
+
+# Background S3 transfers (manage.py process_storage_transfers)
+DOCUMENT_TRANSFER_CONCURRENCY = int(os.environ.get('DOCUMENT_TRANSFER_CONCURRENCY', 4))
+DOCUMENT_TRANSFER_MAX_ATTEMPTS = int(os.environ.get('DOCUMENT_TRANSFER_MAX_ATTEMPTS', 8))
+DOCUMENT_TRANSFER_RETRY_BASE_SECONDS = int(os.environ.get('DOCUMENT_TRANSFER_RETRY_BASE_SECONDS', 30))
+DOCUMENT_TRANSFER_RETRY_MAX_SECONDS = int(os.environ.get('DOCUMENT_TRANSFER_RETRY_MAX_SECONDS', 3600))
+DOCUMENT_TRANSFER_LEASE_SECONDS = int(os.environ.get('DOCUMENT_TRANSFER_LEASE_SECONDS', 3600))
+
+# Text search configuration (language) used for the document full-text index
+DOCUMENT_SEARCH_CONFIG = os.environ.get('DOCUMENT_SEARCH_CONFIG', 'english')
+# Characters of extracted text added to each document's search vector
+DOCUMENT_SEARCH_TEXT_CHARS = int(os.environ.get('DOCUMENT_SEARCH_TEXT_CHARS', 200000))
+
+# Text extraction (manage.py extract_document_text)
+DOCUMENT_TEXT_WORKERS = int(os.environ.get('DOCUMENT_TEXT_WORKERS', 2))
+DOCUMENT_TEXT_MAX_CHARS = int(os.environ.get('DOCUMENT_TEXT_MAX_CHARS', 2000000))
+
+# Thumbnails and previews (manage.py render_documents): longest edge in pixels
+DOCUMENT_RENDITION_WORKERS = int(os.environ.get('DOCUMENT_RENDITION_WORKERS', 2))
+DOCUMENT_THUMBNAIL_SIZE = int(os.environ.get('DOCUMENT_THUMBNAIL_SIZE', 256))
+DOCUMENT_PREVIEW_SIZE = int(os.environ.get('DOCUMENT_PREVIEW_SIZE', 1200))
+
+# Seconds between checks for a changed active S3 configuration; documents
+# switch storage without a restart once the check sees the change
+DOCUMENT_STORAGE_CONFIG_TTL = int(os.environ.get('DOCUMENT_STORAGE_CONFIG_TTL', 30))
+
+# Storage lifecycle (manage.py apply_storage_lifecycle): versions of documents
+# archived this many days, and non-current versions this old, move to the cold
+# tier; restored contents stay hot for DOCUMENT_LIFECYCLE_RESTORE_DAYS. S3
+# objects change storage class (GLACIER and DEEP_ARCHIVE need a restore of
+# DOCUMENT_ARCHIVE_RESTORE_DAYS before downloads); local files are gzipped
+# into DOCUMENT_COLD_STORAGE_ROOT and decompressed on first download
+DOCUMENT_LIFECYCLE_ARCHIVED_DAYS = int(os.environ.get('DOCUMENT_LIFECYCLE_ARCHIVED_DAYS', 30))
+DOCUMENT_LIFECYCLE_NONCURRENT_DAYS = int(os.environ.get('DOCUMENT_LIFECYCLE_NONCURRENT_DAYS', 90))
+DOCUMENT_LIFECYCLE_RESTORE_DAYS = int(os.environ.get('DOCUMENT_LIFECYCLE_RESTORE_DAYS', 30))
+DOCUMENT_COLD_STORAGE_CLASS = os.environ.get('DOCUMENT_COLD_STORAGE_CLASS', 'GLACIER_IR')
+DOCUMENT_COLD_STORAGE_ROOT = os.environ.get('DOCUMENT_COLD_STORAGE_ROOT', os.path.join(BASE_DIR, 'cold_storage'))
+DOCUMENT_ARCHIVE_RESTORE_DAYS = int(os.environ.get('DOCUMENT_ARCHIVE_RESTORE_DAYS', 7))
+
+# Presigned download URL cache: entries kept per process, seconds of validity
+# a cached URL must have left to be reused, and an optional CACHES alias that
+# shares signed URLs between processes
+DOCUMENT_URL_CACHE_SIZE = int(os.environ.get('DOCUMENT_URL_CACHE_SIZE', 4096))
+DOCUMENT_URL_REFRESH_MARGIN = int(os.environ.get('DOCUMENT_URL_REFRESH_MARGIN', 300))
+DOCUMENT_URL_CACHE_ALIAS = os.environ.get('DOCUMENT_URL_CACHE_ALIAS') or None
+
+# Hand locally stored downloads to the front proxy after the access check:
+# 'x-accel-redirect' (nginx) or 'x-sendfile' (Apache/lighttpd); empty streams
+# from Django. For nginx, map the prefix to MEDIA_ROOT in an internal location:
+#   location /protected-media/ { internal; alias /app/daedlaus/media/; }
+DOCUMENT_DOWNLOAD_OFFLOAD = os.environ.get('DOCUMENT_DOWNLOAD_OFFLOAD', '')
+DOCUMENT_ACCEL_REDIRECT_PREFIX = os.environ.get('DOCUMENT_ACCEL_REDIRECT_PREFIX', '/protected-media/')
+
+# Integrity scrubber (manage.py scrub_storage, run nightly): days between
+# verifications of each stored file, files read in parallel and the combined
+# read rate limit in MB/s (0 for none)
+DOCUMENT_INTEGRITY_INTERVAL_DAYS = int(os.environ.get('DOCUMENT_INTEGRITY_INTERVAL_DAYS', 30))
+DOCUMENT_INTEGRITY_WORKERS = int(os.environ.get('DOCUMENT_INTEGRITY_WORKERS', 4))
+DOCUMENT_INTEGRITY_RATE = float(os.environ.get('DOCUMENT_INTEGRITY_RATE', 20))
+
+# Cached document access grants: seconds a user's grants are reused (0
+# disables the cache) and the CACHES alias holding them. Entries never
+# outlive the earliest grant expiry; use a shared cache (e.g. Redis) when
+# running several processes so grant changes are seen everywhere at once
+DOCUMENT_PERMISSION_CACHE_TIMEOUT = int(os.environ.get('DOCUMENT_PERMISSION_CACHE_TIMEOUT', 300))
+DOCUMENT_PERMISSION_CACHE_ALIAS = os.environ.get('DOCUMENT_PERMISSION_CACHE_ALIAS', 'default')
+
+# Cached case visibility: seconds the IDs of the cases a user is assigned to
+# are reused (0 disables the cache) and the CACHES alias holding them.
+# Assignment changes drop the affected users' entries
+CASE_VISIBILITY_CACHE_TIMEOUT = int(os.environ.get('CASE_VISIBILITY_CACHE_TIMEOUT', 300))
+CASE_VISIBILITY_CACHE_ALIAS = os.environ.get('CASE_VISIBILITY_CACHE_ALIAS', 'default')
+
+# Bulk imports of clients, cases, matters and folders: rows validated and
+# written together, each chunk in its own savepoint
+CASE_IMPORT_CHUNK_SIZE = int(os.environ.get('CASE_IMPORT_CHUNK_SIZE', 1000))
+
+# ZIP exports of cases and clients: files fetched ahead in parallel, and the
+# read size and number of reads buffered per file (bounds memory per export)
+DOCUMENT_EXPORT_WORKERS = int(os.environ.get('DOCUMENT_EXPORT_WORKERS', 4))
+DOCUMENT_EXPORT_CHUNK_SIZE = int(os.environ.get('DOCUMENT_EXPORT_CHUNK_SIZE', 1024 * 1024))
+DOCUMENT_EXPORT_BUFFER_CHUNKS = int(os.environ.get('DOCUMENT_EXPORT_BUFFER_CHUNKS', 8))
+
+# Pooled boto3 clients (aws/clients.py): HTTP connections per client, shared
+# by every thread of a process, and attempts per request in standard retry mode
+AWS_MAX_POOL_CONNECTIONS = int(os.environ.get('AWS_MAX_POOL_CONNECTIONS', 50))
+AWS_MAX_RETRY_ATTEMPTS = int(os.environ.get('AWS_MAX_RETRY_ATTEMPTS', 5))
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
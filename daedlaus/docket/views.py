@@ -5,7 +5,7 @@ from django.utils.translation import gettext as _
 from django.db import transaction
 
 from .models import Court, Docket, Party, Attorney, DocketEntry
-from cases.models import Case
+from cases.views import get_visible_case_or_404
 
 @login_required
 def court_list(request):
@@ -91,7 +91,7 @@ def docket_entries(request, docket_id):
 @login_required
 def case_docket(request, case_uuid):
     """Show docket for a specific case"""
-    case = get_object_or_404(Case, uuid=case_uuid)
+    case = get_visible_case_or_404(request, case_uuid)
     try:
         docket = case.docket
         return redirect('docket:docket_detail', docket_id=docket.id)
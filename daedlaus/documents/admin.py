@@ -1,14 +1,22 @@
 from django.contrib import admin
 from django.utils.translation import gettext_lazy as _
 from django.utils.html import format_html
+from django.db.models import Count
 from django.urls import reverse
 from .models import (
     DocumentCategory, 
     Document, 
     DocumentVersion, 
     DocumentComment,
-    DocumentAccess
+    DocumentAccess,
+    DocumentBlob,
+    DocumentRendition,
+    DocumentText,
+    IntegrityCheck,
+    StorageTransfer,
+    Tag
 )
+from .services.search import search_documents, search_enabled
 
 @admin.register(DocumentCategory)
 class DocumentCategoryAdmin(admin.ModelAdmin):
@@ -62,18 +70,21 @@ class DocumentAdmin(admin.ModelAdmin):
         }),
     )
     inlines = [DocumentVersionInline, DocumentAccessInline, DocumentCommentInline]
+    list_select_related = ('category', 'created_by', 'current_version')
     
-    def version_count(self, obj):
-        count = obj.versions.count()
-        return count
-    version_count.short_description = _('Versions')
+    def get_search_results(self, request, queryset, search_term):
+        """Use the full-text index instead of icontains scans where available"""
+        if search_term and search_enabled():
+            return search_documents(queryset, search_term), False
+        return super().get_search_results(request, queryset, search_term)
     
     def document_link(self, obj):
         """Generate a link to the current version if available"""
-        if obj.current_version:
-            url = reverse('admin:documents_documentversion_change', args=[obj.current_version.id])
+        current_version = obj.current_version
+        if current_version:
+            url = reverse('admin:documents_documentversion_change', args=[current_version.id])
             return format_html('<a href="{}">{} (v{})</a>', 
-                             url, obj.current_version.file_name, obj.current_version.version_number)
+                             url, current_version.file_name, current_version.version_number)
         return '-'
     document_link.short_description = _('Current Version')
     
@@ -100,11 +111,11 @@ class DocumentAdmin(admin.ModelAdmin):
 
 @admin.register(DocumentVersion)
 class DocumentVersionAdmin(admin.ModelAdmin):
-    list_display = ('__str__', 'document', 'version_number', 'file_name', 'file_size_display', 'uploaded_by', 'uploaded_at')
-    list_filter = ('uploaded_at',)
+    list_display = ('__str__', 'document', 'version_number', 'file_name', 'file_size_display', 'storage_status', 'uploaded_by', 'uploaded_at')
+    list_filter = ('storage_status', 'storage_tier', 'uploaded_at')
     search_fields = ('document__title', 'file_name')
-    readonly_fields = ('document', 'version_number', 'uploaded_by', 'uploaded_at', 'file_name', 'file_size', 'file_type')
-    fields = ('document', 'version_number', 'file', 'file_name', 'file_size_display', 'file_type', 'notes', 'uploaded_by', 'uploaded_at', 's3_key')
+    readonly_fields = ('document', 'version_number', 'file', 'uploaded_by', 'uploaded_at', 'file_name', 'file_size', 'file_type', 'storage_status', 'storage_tier', 'storage_class', 'tier_changed_at')
+    fields = ('document', 'version_number', 'file', 'file_name', 'file_size_display', 'file_type', 'notes', 'uploaded_by', 'uploaded_at', 's3_key', 'storage_status', 'storage_tier', 'storage_class', 'tier_changed_at')
     
     def file_size_display(self, obj):
         """Display file size in human-readable format"""
@@ -121,4 +132,118 @@ class DocumentVersionAdmin(admin.ModelAdmin):
     
     def has_add_permission(self, request):
         """Disable adding versions directly through admin"""
-        return False
\ No newline at end of file
+        return False
+
+
+@admin.register(StorageTransfer)
+class StorageTransferAdmin(admin.ModelAdmin):
+    list_display = ('version', 'status', 'attempts', 'next_attempt_at', 'updated_at')
+    list_filter = ('status',)
+    search_fields = ('version__document__title', 'version__file_name', 'last_error')
+    readonly_fields = ('version', 'attempts', 'locked_at', 'last_error', 'created_at', 'updated_at')
+    actions = ['retry_transfers']
+    
+    def retry_transfers(self, request, queryset):
+        """Requeue the selected transfers for immediate upload"""
+        from .services.transfers import enqueue_transfer
+        count = 0
+        for transfer in queryset.exclude(status='running').select_related('version'):
+            enqueue_transfer(transfer.version)
+            count += 1
+        self.message_user(request, _('%(count)d transfer(s) queued for retry.') % {'count': count})
+    retry_transfers.short_description = _('Retry selected transfers')
+
+
+@admin.register(IntegrityCheck)
+class IntegrityCheckAdmin(admin.ModelAdmin):
+    list_display = ('version', 'status', 'last_verified_at', 'failed_since')
+    list_filter = ('status', 'last_verified_at')
+    search_fields = ('version__document__title', 'version__file_name', 'detail')
+    readonly_fields = ('version', 'status', 'etag', 'sha256', 'detail', 'last_verified_at', 'failed_since', 'created_at')
+    list_select_related = ('version__document',)
+    actions = ['verify_again']
+    
+    def verify_again(self, request, queryset):
+        """Make the selected versions due on the next scrubber run"""
+        count = queryset.update(last_verified_at=None)
+        self.message_user(request, _('%(count)d version(s) queued for verification.') % {'count': count})
+    verify_again.short_description = _('Verify again on the next run')
+    
+    def has_add_permission(self, request):
+        """Checks are recorded by uploads and the scrubber"""
+        return False
+
+
+@admin.register(DocumentBlob)
+class DocumentBlobAdmin(admin.ModelAdmin):
+    list_display = ('sha256', 'size', 'content_type', 'ref_count', 'created_at')
+    search_fields = ('sha256', 's3_key')
+    readonly_fields = ('sha256', 'size', 'content_type', 'file', 's3_key', 'ref_count', 'created_at')
+    
+    def has_add_permission(self, request):
+        """Blobs are created by uploads"""
+        return False
+
+
+@admin.register(DocumentText)
+class DocumentTextAdmin(admin.ModelAdmin):
+    list_display = ('version', 'status', 'extractor', 'char_count', 'truncated', 'extracted_at')
+    list_filter = ('status', 'extractor')
+    search_fields = ('version__document__title', 'version__file_name')
+    readonly_fields = ('version', 'status', 'extractor', 'char_count', 'truncated', 'attempts', 'error', 'extracted_at', 'created_at')
+    exclude = ('content',)
+    actions = ['requeue_extraction']
+    
+    def requeue_extraction(self, request, queryset):
+        """Queue the selected versions to be extracted again"""
+        count = queryset.exclude(status='running').update(status='pending', attempts=0, error='')
+        self.message_user(request, _('%(count)d version(s) queued for extraction.') % {'count': count})
+    requeue_extraction.short_description = _('Extract text again')
+    
+    def has_add_permission(self, request):
+        """Text rows are created when versions are stored"""
+        return False
+
+
+@admin.register(DocumentRendition)
+class DocumentRenditionAdmin(admin.ModelAdmin):
+    list_display = ('content_hash', 'kind', 'status', 'renderer', 'width', 'height', 'size', 'rendered_at')
+    list_filter = ('status', 'kind', 'renderer')
+    search_fields = ('content_hash',)
+    readonly_fields = (
+        'content_hash', 'kind', 'source_version', 'status', 'renderer', 'file', 's3_key', 'content_type',
+        'width', 'height', 'size', 'attempts', 'error', 'rendered_at', 'created_at'
+    )
+    list_select_related = ('source_version',)
+    actions = ['requeue_rendering']
+    
+    def requeue_rendering(self, request, queryset):
+        """Queue the selected renditions to be rendered again"""
+        count = queryset.exclude(status='running').update(status='pending', attempts=0, error='')
+        self.message_user(request, _('%(count)d rendition(s) queued for rendering.') % {'count': count})
+    requeue_rendering.short_description = _('Render again')
+    
+    def has_add_permission(self, request):
+        """Renditions are queued when versions are stored"""
+        return False
+
+
+@admin.register(Tag)
+class TagAdmin(admin.ModelAdmin):
+    list_display = ('name', 'normalized', 'document_count')
+    search_fields = ('normalized',)
+    # Tags are rebuilt from each document's tags field on save, so a rename
+    # here would not last; rename a tag by editing the documents instead
+    readonly_fields = ('name', 'normalized')
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(document_count=Count('document_links'))
+    
+    def document_count(self, obj):
+        return obj.document_count
+    document_count.short_description = _('Documents')
+    document_count.admin_order_field = 'document_count'
+    
+    def has_add_permission(self, request):
+        """Tags are created from the tags field of documents"""
+        return False
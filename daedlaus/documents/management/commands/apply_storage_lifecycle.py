@@ -0,0 +1,118 @@
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+from django.utils import timezone
+
+from documents.services.lifecycle import get_lifecycle_settings, lifecycle_candidates, move_to_cold
+from documents.services.s3_service import get_document_service
+
+
+class Command(BaseCommand):
+    help = (
+        'Move versions of archived documents, and old non-current versions, to the cold storage tier '
+        '(an S3 storage class, or gzip in the local cold directory)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Versions evaluated per keyset-paginated query (default: 1000)'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=4,
+            help='Contents moved in parallel (default: 4)'
+        )
+        parser.add_argument(
+            '--storage-class', default=None,
+            help='S3 storage class to move objects to (default: DOCUMENT_COLD_STORAGE_CLASS)'
+        )
+        parser.add_argument(
+            '--limit', type=int, default=0,
+            help='Stop after moving this many contents (default: no limit)'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Report what would move without changing anything'
+        )
+
+    def handle(self, *args, **options):
+        storage_service = get_document_service()
+        policy = get_lifecycle_settings()
+        target = (options['storage_class'] or policy['storage_class']) if storage_service.using_s3 else 'gzip'
+        self.stdout.write(
+            f"Moving versions of documents archived over {policy['archived_days']} days and non-current "
+            f"versions over {policy['noncurrent_days']} days old to {target}"
+        )
+
+        # Evaluated against one clock so pages agree on what is due
+        candidates = lifecycle_candidates(now=timezone.now())
+        last_pk = 0
+        # Blobs left hot this run (failed, or all of them in a dry run); moved
+        # blobs drop out of later pages on their own
+        skipped_blobs = set()
+        moved = failed = evaluated = 0
+        moved_bytes = 0
+
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            while True:
+                close_old_connections()
+                batch = list(
+                    candidates.filter(pk__gt=last_pk)
+                    .only('pk', 'file', 's3_key', 'blob_id', 'file_size', 'storage_tier', 'storage_class')
+                    .order_by('pk')[:options['batch_size']]
+                )
+                if not batch:
+                    break
+                last_pk = batch[-1].pk
+                evaluated += len(batch)
+
+                # One move per stored copy; versions sharing a blob move together
+                units = []
+                batch_blobs = set()
+                for version in batch:
+                    if version.blob_id:
+                        if version.blob_id in batch_blobs or version.blob_id in skipped_blobs:
+                            continue
+                        batch_blobs.add(version.blob_id)
+                    units.append(version)
+                if options['limit']:
+                    units = units[:max(options['limit'] - moved, 0)]
+
+                if options['dry_run']:
+                    skipped_blobs.update(batch_blobs)
+                    moved += len(units)
+                    moved_bytes += sum(version.file_size or 0 for version in units)
+                else:
+                    results = executor.map(
+                        lambda version: self.move(storage_service, version, options['storage_class']), units
+                    )
+                    for version, (success, result) in zip(units, results):
+                        if success:
+                            moved += 1
+                            moved_bytes += version.file_size or 0
+                        else:
+                            failed += 1
+                            if version.blob_id:
+                                skipped_blobs.add(version.blob_id)
+                            self.stderr.write(f"Version {version.pk}: {result}")
+
+                self.stdout.write(
+                    f"Evaluated up to version {last_pk}: {moved} moved, {failed} failed "
+                    f"({moved_bytes / 1024 / 1024:.1f} MB)"
+                )
+                if options['limit'] and moved >= options['limit']:
+                    break
+
+        verb = 'Would move' if options['dry_run'] else 'Moved'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {moved} stored file(s), {moved_bytes / 1024 / 1024:.1f} MB, to the cold tier "
+            f"({evaluated} due version(s) evaluated, {failed} failed)"
+        ))
+
+    @staticmethod
+    def move(storage_service, version, storage_class):
+        try:
+            return move_to_cold(storage_service, version, storage_class)
+        finally:
+            # Worker threads open their own database connections
+            connection.close()
@@ -0,0 +1,135 @@
+import io
+import multiprocessing
+import os
+import resource
+import shutil
+import tempfile
+import time
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.core.management.base import BaseCommand
+
+from documents.services.streaming import stream_to_storage
+
+MB = 1024 * 1024
+
+
+class SyntheticUpload(io.RawIOBase):
+    """
+    Read-only file object producing ``size`` bytes without holding them in memory.
+    Content is a repeated random block, starting with a PDF header so MIME
+    sniffing has something to recognise.
+    """
+
+    def __init__(self, size, name='benchmark.pdf'):
+        self.size = size
+        self.name = name
+        self._block = b'%PDF-1.7\n' + os.urandom(MB - 9)
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        remaining = self.size - self._pos
+        if remaining <= 0:
+            return 0
+        length = min(len(buffer), remaining)
+        offset = self._pos % len(self._block)
+        written = 0
+        while written < length:
+            piece = self._block[offset:offset + length - written]
+            buffer[written:written + len(piece)] = piece
+            written += len(piece)
+            offset = 0
+        self._pos += length
+        return length
+
+
+def _current_rss_kb():
+    with open('/proc/self/statm') as statm:
+        pages = int(statm.read().split()[1])
+    return pages * os.sysconf('SC_PAGE_SIZE') // 1024
+
+
+def _run_upload(size, mode, location, results):
+    """Store one synthetic file in a forked child and report its memory use."""
+    try:
+        results.put(_measure_upload(size, mode, location))
+    except Exception as e:
+        results.put({'error': str(e)})
+
+
+def _measure_upload(size, mode, location):
+    start_rss = _current_rss_kb()
+    storage = FileSystemStorage(location=location)
+    source = SyntheticUpload(size)
+
+    started = time.perf_counter()
+    if mode == 'legacy':
+        storage.save('documents/benchmark.pdf', ContentFile(source.read()))
+        checksum = content_type = '-'
+    else:
+        _, stream = stream_to_storage(source, 'documents/benchmark.pdf', storage=storage)
+        checksum = stream.checksum[:12]
+        content_type = stream.content_type
+    elapsed = time.perf_counter() - started
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        'peak_delta_kb': max(peak_rss - start_rss, 0),
+        'seconds': elapsed,
+        'checksum': checksum,
+        'content_type': content_type,
+    }
+
+
+class Command(BaseCommand):
+    help = 'Benchmark peak memory of storing large uploads via the streaming local storage path'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', default='10,500,2048',
+            help='Comma-separated file sizes in MB (default: 10,500,2048)'
+        )
+        parser.add_argument(
+            '--mode', choices=['streaming', 'legacy', 'both'], default='streaming',
+            help='Storage path to measure; "legacy" reads the whole file into memory first'
+        )
+        parser.add_argument(
+            '--location', default=None,
+            help='Directory to write benchmark files to (defaults to a temporary directory)'
+        )
+
+    def handle(self, *args, **options):
+        sizes = [int(s) for s in options['sizes'].split(',') if s.strip()]
+        modes = ['streaming', 'legacy'] if options['mode'] == 'both' else [options['mode']]
+        location = options['location'] or tempfile.mkdtemp(prefix='docbench-')
+
+        context = multiprocessing.get_context('fork')
+        self.stdout.write(f"{'mode':<10} {'size':>8} {'peak RSS delta':>16} {'time':>9} {'MB/s':>8}  type")
+        try:
+            for mode in modes:
+                for size_mb in sizes:
+                    results = context.Queue()
+                    child = context.Process(
+                        target=_run_upload,
+                        args=(size_mb * MB, mode, location, results)
+                    )
+                    child.start()
+                    result = results.get()
+                    child.join()
+                    shutil.rmtree(os.path.join(location, 'documents'), ignore_errors=True)
+
+                    if 'error' in result:
+                        self.stderr.write(f"{mode:<10} {size_mb:>6}MB failed: {result['error']}")
+                        continue
+
+                    throughput = size_mb / result['seconds'] if result['seconds'] else 0
+                    self.stdout.write(
+                        f"{mode:<10} {size_mb:>6}MB {result['peak_delta_kb'] / 1024:>13.1f} MB "
+                        f"{result['seconds']:>8.2f}s {throughput:>8.1f}  {result['content_type']}"
+                    )
+        finally:
+            if not options['location']:
+                shutil.rmtree(location, ignore_errors=True)
@@ -0,0 +1,110 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory, override_settings
+
+from documents.models import DocumentVersion
+from documents.services.downloads import serve_file
+
+MB = 1024 * 1024
+
+MODES = ('stream', 'range', 'x-accel-redirect', 'x-sendfile')
+
+
+def write_sample(path, size):
+    block = os.urandom(MB)
+    with open(path, 'wb') as out:
+        written = 0
+        while written < size:
+            out.write(block[:size - written])
+            written += min(MB, size - written)
+
+
+class Command(BaseCommand):
+    help = 'Measure how long a web worker is tied up by concurrent local downloads in each serving mode'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--size', type=int, default=1024,
+            help='Sample file size in MB (default: 1024)'
+        )
+        parser.add_argument(
+            '--concurrency', type=int, default=8,
+            help='Simultaneous downloads (default: 8)'
+        )
+        parser.add_argument(
+            '--client-mbps', type=float, default=0,
+            help='Simulated bandwidth of each client in megabits/s (default: unthrottled)'
+        )
+        parser.add_argument(
+            '--range-mb', type=int, default=4,
+            help="Bytes requested per download in 'range' mode, in MB (default: 4)"
+        )
+        parser.add_argument(
+            '--modes', default=','.join(MODES),
+            help=f"Comma-separated modes to measure (default: {','.join(MODES)})"
+        )
+
+    def handle(self, *args, **options):
+        modes = [m.strip() for m in options['modes'].split(',') if m.strip()]
+        size = options['size'] * MB
+        location = tempfile.mkdtemp(prefix='downloadbench-')
+        rate = options['client_mbps'] * 1000 * 1000 / 8
+
+        try:
+            self.stdout.write(f"Writing {options['size']} MB sample...")
+            write_sample(os.path.join(location, 'sample.bin'), size)
+
+            self.stdout.write(
+                f"{'mode':<18} {'status':>6} {'sent/download':>14} {'mean busy':>10} "
+                f"{'max busy':>9} {'worker-s':>9} {'wall':>8}"
+            )
+            for mode in modes:
+                offload = mode if mode in ('x-accel-redirect', 'x-sendfile') else ''
+                with override_settings(MEDIA_ROOT=location, DOCUMENT_DOWNLOAD_OFFLOAD=offload):
+                    self._run_mode(mode, options, rate)
+        finally:
+            shutil.rmtree(location, ignore_errors=True)
+
+    def _run_mode(self, mode, options, rate):
+        version = DocumentVersion(file='sample.bin', file_name='sample.bin')
+        factory = RequestFactory()
+        headers = {}
+        if mode == 'range':
+            headers['HTTP_RANGE'] = f"bytes=0-{options['range_mb'] * MB - 1}"
+
+        results = []
+        lock = threading.Lock()
+
+        def download():
+            request = factory.get('/download/', **headers)
+            started = time.perf_counter()
+            response = serve_file(request, version.file, version.file_name)
+            sent = 0
+            # The worker is busy until the last byte has been handed to the client
+            for chunk in response:
+                sent += len(chunk)
+                if rate:
+                    behind = sent / rate - (time.perf_counter() - started)
+                    if behind > 0:
+                        time.sleep(behind)
+            response.close()
+            with lock:
+                results.append((response.status_code, sent, time.perf_counter() - started))
+
+        threads = [threading.Thread(target=download) for _ in range(options['concurrency'])]
+        wall_started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall = time.perf_counter() - wall_started
+
+        busy = [seconds for _, _, seconds in results]
+        self.stdout.write(
+            f"{mode:<18} {results[0][0]:>6} {results[0][1] / MB:>11.1f} MB "
+            f"{sum(busy) / len(busy):>9.3f}s {max(busy):>8.3f}s {sum(busy):>9.2f} {wall:>7.2f}s"
+        )
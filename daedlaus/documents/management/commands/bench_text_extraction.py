@@ -0,0 +1,182 @@
+import multiprocessing
+import os
+import resource
+import shutil
+import tempfile
+import time
+import zipfile
+from django.core.management.base import BaseCommand
+
+from documents.services.extraction import PYPDF_AVAILABLE, extract_text
+
+MB = 1024 * 1024
+
+SENTENCE = (
+    "The parties agree that the indemnification obligations set out in section 12 "
+    "survive termination of this agreement for a period of six years. "
+)
+
+DOCX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '</Types>'
+)
+
+
+def write_text(path, size):
+    line = (SENTENCE * 4 + '\n').encode('utf-8')
+    with open(path, 'wb') as out:
+        written = 0
+        while written < size:
+            out.write(line)
+            written += len(line)
+
+
+def write_docx(path, size):
+    """Write a DOCX whose document part holds roughly ``size`` bytes of markup."""
+    paragraph = (
+        f'<w:p><w:r><w:t xml:space="preserve">{SENTENCE * 3}</w:t></w:r>'
+        f'<w:r><w:tab/><w:t>{SENTENCE}</w:t></w:r></w:p>'
+    ).encode('utf-8')
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('[Content_Types].xml', DOCX_CONTENT_TYPES)
+        with archive.open('word/document.xml', 'w') as part:
+            part.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>'
+            )
+            written = 0
+            while written < size:
+                part.write(paragraph)
+                written += len(paragraph)
+            part.write(b'</w:body></w:document>')
+
+
+def write_pdf(path, size):
+    """Write a minimal multi-page PDF with an uncompressed text layer."""
+    lines = ''.join(f'({SENTENCE[:90]}) Tj 0 -14 Td ' for _ in range(45))
+    stream = f'BT /F1 10 Tf 40 780 Td {lines}ET'.encode('latin-1')
+    pages = max(1, size // (len(stream) + 150))
+
+    offsets = []
+    with open(path, 'wb') as out:
+        def obj(number, body):
+            offsets.append((number, out.tell()))
+            out.write(f'{number} 0 obj\n'.encode() + body + b'\nendobj\n')
+
+        out.write(b'%PDF-1.4\n')
+        kids = ' '.join(f'{4 + i * 2} 0 R' for i in range(pages))
+        obj(1, b'<< /Type /Catalog /Pages 2 0 R >>')
+        obj(2, f'<< /Type /Pages /Kids [{kids}] /Count {pages} >>'.encode())
+        obj(3, b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>')
+        for i in range(pages):
+            page, content = 4 + i * 2, 5 + i * 2
+            obj(page, (
+                f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] '
+                f'/Resources << /Font << /F1 3 0 R >> >> /Contents {content} 0 R >>'
+            ).encode())
+            obj(content, f'<< /Length {len(stream)} >>\nstream\n'.encode() + stream + b'\nendstream')
+
+        xref = out.tell()
+        count = len(offsets) + 1
+        out.write(f'xref\n0 {count}\n0000000000 65535 f \n'.encode())
+        for _, offset in sorted(offsets):
+            out.write(f'{offset:010d} 00000 n \n'.encode())
+        out.write(f'trailer\n<< /Size {count} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n'.encode())
+
+
+FORMATS = {
+    'text': ('sample.txt', 'text/plain', write_text),
+    'docx': (
+        'sample.docx',
+        'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+        write_docx
+    ),
+    'pdf': ('sample.pdf', 'application/pdf', write_pdf),
+}
+
+
+def _current_rss_kb():
+    with open('/proc/self/statm') as statm:
+        pages = int(statm.read().split()[1])
+    return pages * os.sysconf('SC_PAGE_SIZE') // 1024
+
+
+def _run_extraction(path, content_type, max_chars, results):
+    """Extract one sample file in a forked child and report its memory use."""
+    try:
+        start_rss = _current_rss_kb()
+        started = time.perf_counter()
+        with open(path, 'rb') as file_obj:
+            _, text, truncated = extract_text(file_obj, content_type, os.path.basename(path), max_chars)
+        elapsed = time.perf_counter() - started
+        results.put({
+            'seconds': elapsed,
+            'chars': len(text),
+            'truncated': truncated,
+            'peak_delta_kb': max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - start_rss, 0),
+        })
+    except Exception as e:
+        results.put({'error': str(e)})
+
+
+class Command(BaseCommand):
+    help = 'Benchmark text extraction throughput and memory per file format'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', default='1,10,50',
+            help='Comma-separated sample sizes in MB (default: 1,10,50)'
+        )
+        parser.add_argument(
+            '--formats', default=','.join(FORMATS),
+            help=f"Comma-separated formats to measure (default: {','.join(FORMATS)})"
+        )
+        parser.add_argument(
+            '--max-chars', type=int, default=10 ** 9,
+            help='Character limit passed to the extractors (default: effectively unlimited)'
+        )
+
+    def handle(self, *args, **options):
+        sizes = [int(s) for s in options['sizes'].split(',') if s.strip()]
+        formats = [f.strip() for f in options['formats'].split(',') if f.strip()]
+        if 'pdf' in formats and not PYPDF_AVAILABLE:
+            self.stderr.write("pypdf is not installed; skipping PDF")
+            formats.remove('pdf')
+
+        location = tempfile.mkdtemp(prefix='textbench-')
+        context = multiprocessing.get_context('fork')
+        self.stdout.write(f"{'format':<8} {'size':>8} {'time':>9} {'MB/s':>8} {'chars/s':>12} {'peak RSS delta':>16}")
+        try:
+            for name in formats:
+                file_name, content_type, writer = FORMATS[name]
+                for size_mb in sizes:
+                    path = os.path.join(location, file_name)
+                    writer(path, size_mb * MB)
+                    file_size = os.path.getsize(path)
+
+                    results = context.Queue()
+                    child = context.Process(
+                        target=_run_extraction,
+                        args=(path, content_type, options['max_chars'], results)
+                    )
+                    child.start()
+                    result = results.get()
+                    child.join()
+                    os.remove(path)
+
+                    if 'error' in result:
+                        self.stderr.write(f"{name:<8} {size_mb:>6}MB failed: {result['error']}")
+                        continue
+
+                    seconds = result['seconds'] or 1e-9
+                    self.stdout.write(
+                        f"{name:<8} {file_size / MB:>6.1f}MB {seconds:>8.2f}s "
+                        f"{file_size / MB / seconds:>8.1f} {result['chars'] / seconds:>12,.0f} "
+                        f"{result['peak_delta_kb'] / 1024:>13.1f} MB"
+                    )
+        finally:
+            shutil.rmtree(location, ignore_errors=True)
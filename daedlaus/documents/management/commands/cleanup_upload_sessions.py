@@ -0,0 +1,36 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from documents.models import UploadSession
+from documents.services import chunked_upload
+from documents.services.s3_service import DocumentStorageService
+
+
+class Command(BaseCommand):
+    help = 'Abort chunked uploads that have been idle for too long and discard their parts'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hours', type=int, default=24,
+            help='Abort active uploads not touched for this many hours (default: 24)'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='List stale uploads without aborting them'
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options['hours'])
+        stale = UploadSession.objects.filter(status='active', updated_at__lt=cutoff)
+
+        storage_service = DocumentStorageService()
+        count = 0
+        for session in stale.iterator():
+            self.stdout.write(f"{session.uuid} {session.file_name} (last activity {session.updated_at:%Y-%m-%d %H:%M})")
+            if not options['dry_run']:
+                chunked_upload.abort_session(storage_service, session)
+            count += 1
+
+        action = 'Found' if options['dry_run'] else 'Aborted'
+        self.stdout.write(self.style.SUCCESS(f"{action} {count} stale upload(s)"))
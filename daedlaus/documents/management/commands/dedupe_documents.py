@@ -0,0 +1,122 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Q
+
+from documents.models import DocumentBlob, DocumentVersion
+from documents.services import blobs
+from documents.services.deletions import delete_after_commit
+from documents.services.s3_service import DocumentStorageService
+
+
+class Command(BaseCommand):
+    help = 'Hash existing document versions and move them onto shared content-addressed blobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=100,
+            help='Versions to load per query (default: 100)'
+        )
+        parser.add_argument(
+            '--limit', type=int, default=None,
+            help='Stop after this many versions'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Hash versions and report duplicates without changing anything'
+        )
+        parser.add_argument(
+            '--repair-refcounts', action='store_true',
+            help='Recompute blob reference counts and delete blobs nothing references'
+        )
+
+    def handle(self, *args, **options):
+        storage_service = DocumentStorageService()
+
+        if options['repair_refcounts']:
+            self.repair(storage_service, options['dry_run'])
+            return
+
+        pending = DocumentVersion.objects.filter(blob__isnull=True).exclude(Q(file='') & Q(s3_key=''))
+        self.stdout.write(f"{pending.count()} version(s) without a blob")
+
+        processed = reused = skipped = errors = 0
+        reclaimed = 0
+        seen = {}
+        last_pk = 0
+        while options['limit'] is None or processed + skipped + errors < options['limit']:
+            # Keyset pagination, so adopted versions dropping out of the
+            # filter do not shift the pages
+            batch = list(
+                pending.filter(pk__gt=last_pk).select_related('document').order_by('pk')[:options['batch_size']]
+            )
+            if not batch:
+                break
+
+            for version in batch:
+                last_pk = version.pk
+                if options['limit'] is not None and processed + skipped + errors >= options['limit']:
+                    break
+                try:
+                    if options['dry_run']:
+                        duplicate = self.inspect(storage_service, version, seen)
+                        if duplicate is None:
+                            skipped += 1
+                            continue
+                    else:
+                        blob, duplicate = blobs.adopt_version(storage_service, version)
+                        if blob is None:
+                            skipped += 1
+                            continue
+                except Exception as e:
+                    errors += 1
+                    self.stderr.write(f"{version} (id {version.pk}): {str(e)}")
+                    continue
+
+                processed += 1
+                if duplicate:
+                    reused += 1
+                    reclaimed += version.file_size or 0
+
+        action = 'Would reclaim' if options['dry_run'] else 'Reclaimed'
+        self.stdout.write(self.style.SUCCESS(
+            f"Hashed {processed} version(s): {reused} duplicate(s), {skipped} without contents, "
+            f"{errors} error(s). {action} {reclaimed / (1024 * 1024):.1f} MB"
+        ))
+
+    def inspect(self, storage_service, version, seen):
+        """Hash a version without moving it; return whether its contents were seen before"""
+        if version.file and version.file.storage.exists(version.file.name):
+            with version.file.storage.open(version.file.name, 'rb') as file_obj:
+                checksum = blobs.hash_file(file_obj).checksum
+        elif version.s3_key and storage_service.using_s3:
+            success, body = storage_service.open_object(version.s3_key)
+            if not success:
+                raise blobs.BlobError(body)
+            try:
+                checksum = blobs.hash_file(body).checksum
+            finally:
+                body.close()
+        else:
+            return None
+
+        duplicate = checksum in seen or DocumentBlob.objects.filter(sha256=checksum).exists()
+        seen[checksum] = True
+        return duplicate
+
+    def repair(self, storage_service, dry_run):
+        unreferenced = DocumentBlob.objects.annotate(total=Count('versions')).filter(total=0)
+        if dry_run:
+            self.stdout.write(f"{unreferenced.count()} unreferenced blob(s)")
+            return
+
+        fixed = blobs.repair_ref_counts()
+        self.stdout.write(f"Corrected {fixed} reference count(s)")
+
+        deleted = 0
+        # Contents are deleted in bulk once the rows are gone
+        with transaction.atomic():
+            for blob in unreferenced.iterator():
+                delete_after_commit(storage_service, s3_key=blob.s3_key, file_field=blob.file)
+                blob.delete()
+                deleted += 1
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} unreferenced blob(s)"))
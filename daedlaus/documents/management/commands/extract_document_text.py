@@ -0,0 +1,112 @@
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from documents.models import DocumentText, DocumentVersion
+from documents.services.extraction import claim_extractions, extract_in_worker
+
+
+class Command(BaseCommand):
+    help = 'Extract text from stored document versions in a pool of worker processes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=None,
+            help='Number of worker processes (default: DOCUMENT_TEXT_WORKERS)'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=None,
+            help='Versions to claim per poll (default: 4x workers)'
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=5,
+            help='Seconds to wait when the queue is empty (default: 5)'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Exit once the queue is empty instead of polling forever'
+        )
+        parser.add_argument(
+            '--backfill', action='store_true',
+            help='First queue every version that has never been extracted (safe to rerun)'
+        )
+        parser.add_argument(
+            '--retry-failed', action='store_true',
+            help='Also retry versions whose extraction failed'
+        )
+
+    def handle(self, *args, **options):
+        workers = options['workers'] or getattr(settings, 'DOCUMENT_TEXT_WORKERS', 2)
+        batch_size = options['batch_size'] or workers * 4
+
+        if options['backfill']:
+            self.backfill()
+
+        counts = {}
+        chars = 0
+        started = time.perf_counter()
+
+        # Spawned workers set Django up themselves, rather than inheriting
+        # this process's database connections through fork()
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=django.setup
+        ) as executor:
+            self.stdout.write(f"Extracting text with {workers} worker process(es)")
+            try:
+                while True:
+                    close_old_connections()
+                    ids = claim_extractions(batch_size, retry_failed=options['retry_failed'])
+                    if not ids:
+                        if options['once']:
+                            break
+                        time.sleep(options['poll_interval'])
+                        continue
+
+                    for version_id, status, extracted in executor.map(extract_in_worker, ids):
+                        counts[status] = counts.get(status, 0) + 1
+                        chars += extracted
+                        if status == 'failed':
+                            self.stderr.write(f"Version {version_id}: extraction failed")
+
+                    processed = sum(counts.values())
+                    elapsed = time.perf_counter() - started
+                    self.stdout.write(
+                        f"Processed {processed} version(s) ({processed / elapsed:.1f}/s): "
+                        + ', '.join(f"{count} {status}" for status, count in sorted(counts.items()))
+                    )
+            except KeyboardInterrupt:
+                self.stdout.write("Stopping")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Extracted {chars} characters from {counts.get('done', 0)} version(s)"
+        ))
+
+    def backfill(self, batch_size=1000):
+        """
+        Queue every version without a text row.
+        
+        Queued versions drop out of the filter, so an interrupted backfill
+        simply resumes where it stopped when run again.
+        """
+        missing = DocumentVersion.objects.filter(text__isnull=True).exclude(file='', s3_key='')
+        queued = 0
+        last_pk = 0
+        while True:
+            ids = list(
+                missing.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            last_pk = ids[-1]
+            DocumentText.objects.bulk_create(
+                [DocumentText(version_id=pk) for pk in ids],
+                ignore_conflicts=True
+            )
+            queued += len(ids)
+            self.stdout.write(f"Queued {queued} version(s) for extraction")
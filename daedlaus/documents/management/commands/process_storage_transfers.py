@@ -0,0 +1,57 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from documents.services.s3_service import get_document_service
+from documents.services.transfers import run_worker
+
+
+class Command(BaseCommand):
+    help = 'Upload queued document versions to S3 in the background, retrying failures with backoff'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency', type=int, default=None,
+            help='Number of uploads to run at once (default: DOCUMENT_TRANSFER_CONCURRENCY)'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=None,
+            help='Transfers to claim per poll (default: 4x concurrency)'
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=5,
+            help='Seconds to wait when the queue is empty (default: 5)'
+        )
+        parser.add_argument(
+            '--max-attempts', type=int, default=None,
+            help='Attempts before a transfer is marked failed (default: DOCUMENT_TRANSFER_MAX_ATTEMPTS)'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Exit once no transfers are due instead of polling forever'
+        )
+
+    def handle(self, *args, **options):
+        if not get_document_service().using_s3:
+            self.stdout.write(self.style.WARNING("S3 is not configured; queued transfers will stay pending"))
+            if options['once']:
+                return
+
+        concurrency = options['concurrency'] or getattr(settings, 'DOCUMENT_TRANSFER_CONCURRENCY', 4)
+        self.stdout.write(f"Processing storage transfers with {concurrency} worker(s)")
+
+        try:
+            # The storage service is re-read per batch, picking up S3
+            # configuration changes made while the worker runs
+            uploaded, failed = run_worker(
+                concurrency=concurrency,
+                batch_size=options['batch_size'],
+                poll_interval=options['poll_interval'],
+                once=options['once'],
+                max_attempts=options['max_attempts'],
+                stdout=self.stdout
+            )
+        except KeyboardInterrupt:
+            self.stdout.write("Stopped")
+            return
+
+        self.stdout.write(self.style.SUCCESS(f"Uploaded {uploaded} version(s), {failed} not uploaded"))
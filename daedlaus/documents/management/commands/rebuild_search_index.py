@@ -0,0 +1,45 @@
+import time
+from django.core.management.base import BaseCommand
+
+from documents.models import Document
+from documents.services.search import search_enabled, update_search_vectors
+
+
+class Command(BaseCommand):
+    help = 'Recompute the full-text search vectors of all documents in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Documents to update per statement (default: 1000)'
+        )
+        parser.add_argument(
+            '--missing-only', action='store_true',
+            help='Only index documents that have no search vector yet'
+        )
+
+    def handle(self, *args, **options):
+        if not search_enabled():
+            self.stdout.write(self.style.WARNING("Full-text search requires PostgreSQL; nothing to do"))
+            return
+
+        documents = Document.objects.all()
+        if options['missing_only']:
+            documents = documents.filter(search_vector__isnull=True)
+
+        started = time.perf_counter()
+        updated = 0
+        last_pk = 0
+        while True:
+            # Keyset pagination keeps each batch an index range scan
+            ids = list(
+                documents.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:options['batch_size']]
+            )
+            if not ids:
+                break
+            last_pk = ids[-1]
+            updated += update_search_vectors(Document.objects.filter(pk__in=ids))
+            self.stdout.write(f"Indexed {updated} document(s)")
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"Reindexed {updated} document(s) in {elapsed:.1f}s"))
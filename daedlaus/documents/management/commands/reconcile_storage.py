@@ -0,0 +1,182 @@
+import heapq
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models.functions import Collate
+from django.utils import timezone
+
+from documents.models import DocumentBlob, DocumentRendition, DocumentVersion
+from documents.services.s3_service import DocumentStorageService
+
+# Collations that sort like S3 listings (by UTF-8 bytes)
+BINARY_COLLATIONS = {
+    'postgresql': 'C',
+    'sqlite': 'BINARY',
+    'mysql': 'utf8mb4_bin',
+}
+
+# Models whose rows reference S3 objects, with the label used in reports
+KEY_SOURCES = (
+    ('version', DocumentVersion),
+    ('blob', DocumentBlob),
+    ('rendition', DocumentRendition),
+)
+
+
+def _labelled(keys, label):
+    for key in keys:
+        yield key, label
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare the S3 bucket with the keys recorded in the database, streaming both in key order, '
+        'to find orphaned objects and missing ones'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--prefix', action='append', default=None,
+            help='Only reconcile keys under this prefix (repeatable; default: whole bucket)'
+        )
+        parser.add_argument(
+            '--page-size', type=int, default=1000,
+            help='Keys per bucket listing request and database fetch (default: 1000)'
+        )
+        parser.add_argument(
+            '--min-age', type=float, default=24,
+            help='Hours an unreferenced object must have existed to count as orphaned, so '
+                 'uploads still being recorded are left alone (default: 24)'
+        )
+        parser.add_argument(
+            '--delete-orphans', action='store_true',
+            help='Delete orphaned objects (1000 per request)'
+        )
+        parser.add_argument(
+            '--mark-missing', action='store_true',
+            help="Set storage_status to 'failed' on versions whose object is missing"
+        )
+        parser.add_argument(
+            '--show', type=int, default=50,
+            help='Keys listed per category in the report (default: 50)'
+        )
+
+    def handle(self, *args, **options):
+        self.storage_service = DocumentStorageService()
+        if not self.storage_service.using_s3:
+            raise CommandError("S3 is not configured for document storage")
+
+        collation = BINARY_COLLATIONS.get(connection.vendor)
+        if collation is None:
+            raise CommandError(f"No byte-order collation known for the {connection.vendor} database")
+
+        self.options = options
+        self.cutoff = timezone.now() - timedelta(hours=options['min_age'])
+        self.counts = {'matched': 0, 'orphaned': 0, 'recent': 0, 'missing': 0, 'deleted': 0}
+        self.orphaned_bytes = 0
+        self.shown = {}
+        self.to_delete = []
+        self.missing_versions = []
+
+        for prefix in options['prefix'] or ['']:
+            self.stdout.write(f"Reconciling '{prefix or '*'}'")
+            self.reconcile(prefix, collation, options['page_size'])
+
+        self.flush_deletes(force=True)
+        self.flush_missing(force=True)
+
+        self.stdout.write(
+            f"{self.counts['matched']} matched, {self.counts['orphaned']} orphaned "
+            f"({self.orphaned_bytes / 1024 / 1024:.1f} MB), {self.counts['recent']} unreferenced but recent, "
+            f"{self.counts['missing']} missing"
+        )
+        if options['delete_orphans']:
+            self.stdout.write(self.style.SUCCESS(f"Deleted {self.counts['deleted']} orphaned object(s)"))
+
+    def database_keys(self, prefix, collation, page_size):
+        """
+        Yield (key, source label) for every recorded key under the prefix,
+        merged across models in byte order.
+        """
+        streams = []
+        for label, model in KEY_SOURCES:
+            keys = (
+                model.objects.filter(s3_key__startswith=prefix)
+                .exclude(s3_key='')
+                .annotate(sort_key=Collate('s3_key', collation))
+                .order_by('sort_key')
+                .values_list('s3_key', flat=True)
+                .iterator(chunk_size=page_size)
+            )
+            streams.append(_labelled(keys, label))
+
+        previous = None
+        for key, label in heapq.merge(*streams):
+            if previous is not None and key < previous[0]:
+                raise CommandError(
+                    f"Database returned keys out of byte order ({previous[0]!r} before {key!r}); "
+                    "check the column collation"
+                )
+            previous = (key, label)
+            yield key, label
+
+    def reconcile(self, prefix, collation, page_size):
+        """Merge-join the bucket listing with the database keys."""
+        objects = self.storage_service.iter_objects(prefix, page_size)
+        keys = self.database_keys(prefix, collation, page_size)
+
+        obj = next(objects, None)
+        recorded = next(keys, None)
+        while obj is not None or recorded is not None:
+            if recorded is None or (obj is not None and obj['Key'] < recorded[0]):
+                self.found_unreferenced(obj)
+                obj = next(objects, None)
+            elif obj is None or recorded[0] < obj['Key']:
+                self.found_missing(*recorded)
+                recorded = next(keys, None)
+            else:
+                self.counts['matched'] += 1
+                key = obj['Key']
+                obj = next(objects, None)
+                # A key may be recorded by several rows (e.g. blob and versions)
+                while recorded is not None and recorded[0] == key:
+                    recorded = next(keys, None)
+
+    def found_unreferenced(self, obj):
+        if obj['LastModified'] > self.cutoff:
+            self.counts['recent'] += 1
+            return
+        self.counts['orphaned'] += 1
+        self.orphaned_bytes += obj.get('Size', 0)
+        self.report('orphaned', f"{obj['Key']} ({obj.get('Size', 0)} bytes, {obj['LastModified']:%Y-%m-%d})")
+        if self.options['delete_orphans']:
+            self.to_delete.append(obj['Key'])
+            self.flush_deletes()
+
+    def found_missing(self, key, label):
+        self.counts['missing'] += 1
+        self.report('missing', f"{key} (referenced by {label})")
+        if label == 'version' and self.options['mark_missing']:
+            self.missing_versions.append(key)
+            self.flush_missing()
+
+    def report(self, category, line):
+        shown = self.shown.get(category, 0)
+        if shown < self.options['show']:
+            self.stdout.write(f"  {category}: {line}")
+        elif shown == self.options['show']:
+            self.stdout.write(f"  ... further {category} keys not shown")
+        self.shown[category] = shown + 1
+
+    def flush_deletes(self, force=False):
+        if self.to_delete and (force or len(self.to_delete) >= 1000):
+            deleted, errors = self.storage_service.delete_objects(self.to_delete)
+            self.counts['deleted'] += deleted
+            for key, message in errors:
+                self.stderr.write(f"Could not delete {key}: {message}")
+            self.to_delete = []
+
+    def flush_missing(self, force=False):
+        if self.missing_versions and (force or len(self.missing_versions) >= 500):
+            DocumentVersion.objects.filter(s3_key__in=self.missing_versions).update(storage_status='failed')
+            self.missing_versions = []
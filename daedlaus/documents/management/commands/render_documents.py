@@ -0,0 +1,148 @@
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.db.models import Exists, OuterRef
+
+from documents.models import DocumentRendition, DocumentVersion
+from documents.services.renditions import claim_renditions, get_rendition_sizes, render_in_worker
+from documents.services.s3_service import DocumentStorageService
+
+
+class Command(BaseCommand):
+    help = 'Render thumbnails and previews of stored document versions in a pool of worker processes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=None,
+            help='Number of worker processes (default: DOCUMENT_RENDITION_WORKERS)'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=None,
+            help='Renditions to claim per poll (default: 8x workers)'
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=5,
+            help='Seconds to wait when the queue is empty (default: 5)'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Exit once the queue is empty instead of polling forever'
+        )
+        parser.add_argument(
+            '--backfill', action='store_true',
+            help='First queue the contents of every version that has no renditions (safe to rerun)'
+        )
+        parser.add_argument(
+            '--retry-failed', action='store_true',
+            help='Also retry renditions that failed'
+        )
+        parser.add_argument(
+            '--prune', action='store_true',
+            help='Delete renditions of contents no version has any more, then exit'
+        )
+
+    def handle(self, *args, **options):
+        if options['prune']:
+            self.prune()
+            return
+
+        workers = options['workers'] or getattr(settings, 'DOCUMENT_RENDITION_WORKERS', 2)
+        batch_size = options['batch_size'] or workers * 8
+
+        if options['backfill']:
+            self.backfill()
+
+        counts = {}
+        stored = 0
+        started = time.perf_counter()
+
+        # Spawned workers set Django up themselves, rather than inheriting
+        # this process's database connections through fork()
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=django.setup
+        ) as executor:
+            self.stdout.write(f"Rendering with {workers} worker process(es)")
+            try:
+                while True:
+                    close_old_connections()
+                    hashes = claim_renditions(batch_size, retry_failed=options['retry_failed'])
+                    if not hashes:
+                        if options['once']:
+                            break
+                        time.sleep(options['poll_interval'])
+                        continue
+
+                    for content_hash, status, rendered in executor.map(render_in_worker, hashes):
+                        counts[status] = counts.get(status, 0) + 1
+                        stored += rendered
+                        if status == 'failed':
+                            self.stderr.write(f"Contents {content_hash}: rendering failed")
+
+                    processed = sum(counts.values())
+                    elapsed = time.perf_counter() - started
+                    self.stdout.write(
+                        f"Processed {processed} file(s) ({processed / elapsed:.1f}/s): "
+                        + ', '.join(f"{count} {status}" for status, count in sorted(counts.items()))
+                    )
+            except KeyboardInterrupt:
+                self.stdout.write("Stopping")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Stored {stored} rendition(s) for {counts.get('done', 0)} file(s)"
+        ))
+
+    def backfill(self, batch_size=1000):
+        """
+        Queue renditions for every version whose contents have none.
+
+        Versions stored before checksums were recorded are skipped; run
+        dedupe_documents first to give them one.
+        """
+        kinds = list(get_rendition_sizes())
+        missing = DocumentVersion.objects.exclude(checksum='').exclude(
+            Exists(DocumentRendition.objects.filter(content_hash=OuterRef('checksum')))
+        )
+        queued = 0
+        last_pk = 0
+        while True:
+            versions = list(
+                missing.filter(pk__gt=last_pk).order_by('pk').values_list('pk', 'checksum')[:batch_size]
+            )
+            if not versions:
+                break
+            last_pk = versions[-1][0]
+            # One source version per set of contents
+            sources = {checksum: pk for pk, checksum in versions}
+            DocumentRendition.objects.bulk_create(
+                [
+                    DocumentRendition(content_hash=checksum, kind=kind, source_version_id=pk)
+                    for checksum, pk in sources.items()
+                    for kind in kinds
+                ],
+                ignore_conflicts=True
+            )
+            queued += len(versions)
+            self.stdout.write(f"Queued renditions for {queued} version(s)")
+
+    def prune(self, batch_size=500):
+        """Delete renditions, and their images, whose contents are no longer stored."""
+        storage_service = DocumentStorageService()
+        orphaned = DocumentRendition.objects.exclude(
+            Exists(DocumentVersion.objects.filter(checksum=OuterRef('content_hash')))
+        )
+        deleted = 0
+        while True:
+            batch = list(orphaned.order_by('pk')[:batch_size])
+            if not batch:
+                break
+            for rendition in batch:
+                storage_service.delete_rendition(rendition)
+            DocumentRendition.objects.filter(pk__in=[rendition.pk for rendition in batch]).delete()
+            deleted += len(batch)
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} orphaned rendition(s)"))
@@ -0,0 +1,150 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+from django.utils import timezone
+
+from documents.services.integrity import (
+    Throttle, failed_checks, get_integrity_settings, integrity_candidates, rolling_slice_size, scrub_version
+)
+from documents.services.s3_service import get_document_service
+
+
+class Command(BaseCommand):
+    help = (
+        'Re-verify the stored contents of the document versions checked longest ago against their '
+        'SHA-256 and S3 ETag, and report missing or changed files (run nightly)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit', type=int, default=0,
+            help='Versions to verify this run (default: enough to cover every version once per interval)'
+        )
+        parser.add_argument(
+            '--interval-days', type=int, default=None,
+            help='Days after which a verified version is due again (default: DOCUMENT_INTEGRITY_INTERVAL_DAYS)'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=None,
+            help='Files read in parallel (default: DOCUMENT_INTEGRITY_WORKERS)'
+        )
+        parser.add_argument(
+            '--rate', type=float, default=None,
+            help='Combined read rate limit in MB/s, 0 for none (default: DOCUMENT_INTEGRITY_RATE)'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=200,
+            help='Versions fetched per query (default: 200)'
+        )
+        parser.add_argument(
+            '--quick', action='store_true',
+            help='Compare sizes and S3 ETags only, reading contents only when an ETag changed'
+        )
+        parser.add_argument(
+            '--report', action='store_true',
+            help='Only list the versions whose last verification failed'
+        )
+        parser.add_argument(
+            '--show', type=int, default=50,
+            help='Failures listed in the report (default: 50)'
+        )
+
+    def handle(self, *args, **options):
+        if options['report']:
+            self.report(options['show'])
+            return
+
+        policy = get_integrity_settings()
+        interval_days = options['interval_days'] or policy['interval_days']
+        workers = options['workers'] or policy['workers']
+        rate = options['rate'] if options['rate'] is not None else policy['rate']
+        limit = options['limit'] or rolling_slice_size(interval_days)
+        throttle = Throttle(int(rate * 1024 * 1024))
+        storage_service = get_document_service()
+
+        self.stdout.write(
+            f"Verifying up to {limit} version(s) not verified in {interval_days} days"
+            f"{' (quick)' if options['quick'] else ''}, {workers} at a time"
+            f"{f', at most {rate:g} MB/s' if rate else ''}"
+        )
+
+        candidates = integrity_candidates(timezone.now() - timedelta(days=interval_days))
+        counts = {}
+        failures = []
+        seen = set()
+        verified = 0
+        start = timezone.now()
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            while verified < limit:
+                close_old_connections()
+                # Verified versions (and those sharing their contents) drop out
+                # of the candidates, so each query returns the next oldest
+                batch = list(
+                    candidates.exclude(pk__in=seen)
+                    .only('pk', 'file', 's3_key', 'blob_id', 'file_size', 'checksum', 'storage_tier', 'storage_class')
+                    [:min(options['batch_size'], limit - verified)]
+                )
+                if not batch:
+                    break
+                seen.update(version.pk for version in batch)
+
+                units = []
+                batch_blobs = set()
+                for version in batch:
+                    if version.blob_id:
+                        if version.blob_id in batch_blobs:
+                            continue
+                        batch_blobs.add(version.blob_id)
+                    units.append(version)
+
+                results = executor.map(
+                    lambda version: self.verify(storage_service, version, options['quick'], throttle), units
+                )
+                for version, (status, detail) in zip(units, results):
+                    verified += 1
+                    counts[status] = counts.get(status, 0) + 1
+                    if status != 'ok':
+                        failures.append((version, status, detail))
+                        self.stderr.write(f"Version {version.pk}: {status}: {detail}")
+
+                self.stdout.write(f"Verified {verified}: " + ', '.join(
+                    f"{count} {status}" for status, count in sorted(counts.items())
+                ))
+
+        elapsed = (timezone.now() - start).total_seconds()
+        self.stdout.write(self.style.SUCCESS(
+            f"Verified {verified} stored file(s) in {elapsed:.0f}s, {len(failures)} failed"
+        ))
+        outstanding = failed_checks().count()
+        if outstanding:
+            self.stdout.write(self.style.WARNING(
+                f"{outstanding} version(s) failed their last verification; see --report"
+            ))
+
+    @staticmethod
+    def verify(storage_service, version, quick, throttle):
+        try:
+            return scrub_version(storage_service, version, quick, throttle)
+        finally:
+            # Worker threads open their own database connections
+            connection.close()
+
+    def report(self, show):
+        checks = failed_checks()
+        total = checks.count()
+        if not total:
+            self.stdout.write(self.style.SUCCESS("No failed integrity checks"))
+            return
+
+        self.stdout.write(f"{total} version(s) failed their last verification:")
+        for check in checks[:show]:
+            version = check.version
+            self.stdout.write(
+                f"  {check.get_status_display()}: {version.document.title} v{version.version_number} "
+                f"(version {version.pk}, {version.s3_key or version.file.name}) since "
+                f"{check.failed_since:%Y-%m-%d}: {check.detail}"
+            )
+        if total > show:
+            self.stdout.write(f"  ... {total - show} more not shown")
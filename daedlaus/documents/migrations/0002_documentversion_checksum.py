@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("documents", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="documentversion",
+            name="checksum",
+            field=models.CharField(
+                blank=True,
+                help_text="SHA-256 checksum of the file contents",
+                max_length=64,
+            ),
+        ),
+    ]
@@ -0,0 +1,165 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:53
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("documents", "0002_documentversion_checksum"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="documentversion",
+            name="file_size",
+            field=models.PositiveBigIntegerField(help_text="File size in bytes"),
+        ),
+        migrations.CreateModel(
+            name="UploadSession",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "uuid",
+                    models.UUIDField(default=uuid.uuid4, editable=False, unique=True),
+                ),
+                (
+                    "document_metadata",
+                    models.JSONField(
+                        blank=True,
+                        default=dict,
+                        help_text="Fields for the new document created when the upload completes",
+                    ),
+                ),
+                ("file_name", models.CharField(max_length=255)),
+                (
+                    "file_size",
+                    models.PositiveBigIntegerField(
+                        help_text="Total file size in bytes"
+                    ),
+                ),
+                ("content_type", models.CharField(blank=True, max_length=100)),
+                (
+                    "chunk_size",
+                    models.PositiveIntegerField(
+                        help_text="Size of every part except the last, in bytes"
+                    ),
+                ),
+                ("total_parts", models.PositiveIntegerField()),
+                ("s3_key", models.CharField(blank=True, max_length=512)),
+                (
+                    "s3_upload_id",
+                    models.CharField(
+                        blank=True,
+                        help_text="S3 multipart upload ID (empty for local uploads)",
+                        max_length=1024,
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("active", "Active"),
+                            ("completed", "Completed"),
+                            ("aborted", "Aborted"),
+                        ],
+                        default="active",
+                        max_length=20,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "document",
+                    models.ForeignKey(
+                        blank=True,
+                        help_text="Existing document this upload adds a version to",
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="upload_sessions",
+                        to="documents.document",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="upload_sessions",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "version",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="documents.documentversion",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Upload Session",
+                "verbose_name_plural": "Upload Sessions",
+                "ordering": ["-created_at"],
+            },
+        ),
+        migrations.CreateModel(
+            name="UploadPart",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("part_number", models.PositiveIntegerField()),
+                ("size", models.PositiveIntegerField()),
+                (
+                    "etag",
+                    models.CharField(
+                        blank=True,
+                        help_text="ETag returned by S3 for this part",
+                        max_length=255,
+                    ),
+                ),
+                (
+                    "checksum",
+                    models.CharField(
+                        help_text="SHA-256 checksum of the part", max_length=64
+                    ),
+                ),
+                ("received_at", models.DateTimeField(auto_now=True)),
+                (
+                    "session",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="parts",
+                        to="documents.uploadsession",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Upload Part",
+                "verbose_name_plural": "Upload Parts",
+                "ordering": ["part_number"],
+                "unique_together": {("session", "part_number")},
+            },
+        ),
+    ]
@@ -0,0 +1,94 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:55
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("documents", "0003_upload_sessions"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="documentversion",
+            name="storage_status",
+            field=models.CharField(
+                choices=[
+                    ("pending", "Pending Upload"),
+                    ("uploaded", "Uploaded"),
+                    ("failed", "Upload Failed"),
+                ],
+                default="uploaded",
+                help_text="Whether the file has reached its final storage backend",
+                max_length=20,
+            ),
+        ),
+        migrations.CreateModel(
+            name="StorageTransfer",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("running", "Running"),
+                            ("done", "Done"),
+                            ("failed", "Failed"),
+                        ],
+                        default="pending",
+                        max_length=20,
+                    ),
+                ),
+                ("attempts", models.PositiveIntegerField(default=0)),
+                (
+                    "next_attempt_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now,
+                        help_text="Earliest time the transfer may be (re)tried",
+                    ),
+                ),
+                (
+                    "locked_at",
+                    models.DateTimeField(
+                        blank=True,
+                        help_text="When a worker claimed this transfer",
+                        null=True,
+                    ),
+                ),
+                ("last_error", models.TextField(blank=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "version",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="transfer",
+                        to="documents.documentversion",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Storage Transfer",
+                "verbose_name_plural": "Storage Transfers",
+                "ordering": ["next_attempt_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["status", "next_attempt_at"],
+                        name="documents_s_status_2bf300_idx",
+                    )
+                ],
+            },
+        ),
+    ]
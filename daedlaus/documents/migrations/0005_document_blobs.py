@@ -0,0 +1,86 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:58
+
+import django.db.models.deletion
+import documents.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("documents", "0004_storage_transfers"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DocumentBlob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "sha256",
+                    models.CharField(
+                        help_text="SHA-256 checksum of the contents",
+                        max_length=64,
+                        unique=True,
+                    ),
+                ),
+                ("size", models.PositiveBigIntegerField(help_text="Size in bytes")),
+                (
+                    "content_type",
+                    models.CharField(
+                        blank=True,
+                        help_text="MIME type sniffed from the contents",
+                        max_length=100,
+                    ),
+                ),
+                (
+                    "file",
+                    models.FileField(
+                        blank=True,
+                        max_length=255,
+                        upload_to=documents.models.blob_file_path,
+                    ),
+                ),
+                (
+                    "s3_key",
+                    models.CharField(
+                        blank=True,
+                        help_text="S3 object key if stored in S3",
+                        max_length=512,
+                    ),
+                ),
+                (
+                    "ref_count",
+                    models.PositiveIntegerField(
+                        default=0,
+                        help_text="Number of document versions referencing this blob",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "verbose_name": "Document Blob",
+                "verbose_name_plural": "Document Blobs",
+            },
+        ),
+        migrations.AddField(
+            model_name="documentversion",
+            name="blob",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="Shared contents of this version",
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="versions",
+                to="documents.documentblob",
+            ),
+        ),
+    ]
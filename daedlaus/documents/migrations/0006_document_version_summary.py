@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_version_summary(apps, schema_editor):
+    Document = apps.get_model("documents", "Document")
+    DocumentVersion = apps.get_model("documents", "DocumentVersion")
+
+    versions = DocumentVersion.objects.filter(document=OuterRef("pk"))
+    Document.objects.update(
+        current_version=Subquery(versions.order_by("-version_number").values("pk")[:1]),
+        version_count=Coalesce(
+            Subquery(versions.values("document").annotate(total=Count("pk")).values("total")),
+            0,
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("documents", "0005_document_blobs"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="document",
+            name="current_version",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                help_text="Most recent version of this document",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="documents.documentversion",
+            ),
+        ),
+        migrations.AddField(
+            model_name="document",
+            name="version_count",
+            field=models.PositiveIntegerField(
+                default=0,
+                editable=False,
+                help_text="Number of versions of this document",
+            ),
+        ),
+        migrations.RunPython(populate_version_summary, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:00
+
+from django.db import migrations, models
+from django.db.models import Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_last_version_number(apps, schema_editor):
+    Document = apps.get_model("documents", "Document")
+    DocumentVersion = apps.get_model("documents", "DocumentVersion")
+
+    latest = (
+        DocumentVersion.objects.filter(document=OuterRef("pk"))
+        .values("document")
+        .annotate(latest=Max("version_number"))
+        .values("latest")
+    )
+    Document.objects.update(last_version_number=Coalesce(Subquery(latest), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("documents", "0006_document_version_summary"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="document",
+            name="last_version_number",
+            field=models.PositiveIntegerField(
+                default=0,
+                editable=False,
+                help_text="Highest version number allocated to this document",
+            ),
+        ),
+        migrations.RunPython(populate_last_version_number, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,87 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("documents", "0008_document_search_vector"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DocumentText",
+            fields=[
+                (
+                    "version",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="text",
+                        serialize=False,
+                        to="documents.documentversion",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("running", "Running"),
+                            ("done", "Done"),
+                            ("unsupported", "Unsupported Format"),
+                            ("failed", "Failed"),
+                        ],
+                        default="pending",
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "extractor",
+                    models.CharField(
+                        blank=True,
+                        help_text="Extractor that produced the text (e.g. pdf, docx, text)",
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "content",
+                    models.BinaryField(
+                        blank=True, default=b"", help_text="zlib-compressed UTF-8 text"
+                    ),
+                ),
+                ("char_count", models.PositiveIntegerField(default=0)),
+                (
+                    "truncated",
+                    models.BooleanField(
+                        default=False,
+                        help_text="Whether extraction stopped at the configured character limit",
+                    ),
+                ),
+                ("attempts", models.PositiveIntegerField(default=0)),
+                (
+                    "locked_at",
+                    models.DateTimeField(
+                        blank=True,
+                        help_text="When a worker claimed this version",
+                        null=True,
+                    ),
+                ),
+                ("error", models.TextField(blank=True)),
+                ("extracted_at", models.DateTimeField(blank=True, null=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "verbose_name": "Document Text",
+                "verbose_name_plural": "Document Texts",
+                "indexes": [
+                    models.Index(
+                        fields=["status", "version"],
+                        name="documents_d_status_f94fa9_idx",
+                    )
+                ],
+            },
+        ),
+    ]
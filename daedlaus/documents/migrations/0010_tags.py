@@ -0,0 +1,151 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+TAG_MAX_LENGTH = 100
+
+
+def normalize_tag(name):
+    return " ".join(name.split()).casefold()[:TAG_MAX_LENGTH].rstrip()
+
+
+def populate_tags(apps, schema_editor):
+    """Parse the comma-separated tags of existing documents, a batch at a time"""
+    Document = apps.get_model("documents", "Document")
+    Tag = apps.get_model("documents", "Tag")
+    DocumentTag = apps.get_model("documents", "DocumentTag")
+
+    last_pk = 0
+    while True:
+        batch = list(
+            Document.objects.filter(pk__gt=last_pk)
+            .exclude(tags="")
+            .order_by("pk")
+            .values_list("pk", "tags")[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        last_pk = batch[-1][0]
+
+        document_tags = {}
+        names = {}
+        for document_id, value in batch:
+            for name in value.split(","):
+                name = " ".join(name.split())[:TAG_MAX_LENGTH].rstrip()
+                if name:
+                    normalized = normalize_tag(name)
+                    names.setdefault(normalized, name)
+                    document_tags.setdefault(document_id, set()).add(normalized)
+
+        Tag.objects.bulk_create(
+            [Tag(name=name, normalized=normalized) for normalized, name in names.items()],
+            ignore_conflicts=True,
+        )
+        tag_ids = dict(Tag.objects.filter(normalized__in=names).values_list("normalized", "pk"))
+        DocumentTag.objects.bulk_create(
+            [
+                DocumentTag(document_id=document_id, tag_id=tag_ids[normalized])
+                for document_id, normalized_names in document_tags.items()
+                for normalized in normalized_names
+            ],
+            ignore_conflicts=True,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("documents", "0009_document_text"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Tag",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(help_text="Tag as first entered", max_length=100),
+                ),
+                (
+                    "normalized",
+                    models.CharField(
+                        help_text="Case-folded form used for matching",
+                        max_length=100,
+                        unique=True,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Tag",
+                "verbose_name_plural": "Tags",
+                "ordering": ["normalized"],
+            },
+        ),
+        migrations.CreateModel(
+            name="DocumentTag",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "document",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="tag_links",
+                        to="documents.document",
+                    ),
+                ),
+                (
+                    "tag",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="document_links",
+                        to="documents.tag",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Document Tag",
+                "verbose_name_plural": "Document Tags",
+            },
+        ),
+        migrations.AddField(
+            model_name="document",
+            name="tag_set",
+            field=models.ManyToManyField(
+                blank=True,
+                help_text="Normalized tags, kept in sync with the tags field",
+                related_name="documents",
+                through="documents.DocumentTag",
+                to="documents.tag",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="documenttag",
+            index=models.Index(
+                fields=["tag", "document"], name="documents_d_tag_id_e118e1_idx"
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name="documenttag",
+            unique_together={("document", "tag")},
+        ),
+        migrations.RunPython(populate_tags, migrations.RunPython.noop),
+    ]
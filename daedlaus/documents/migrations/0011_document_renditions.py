@@ -0,0 +1,123 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:16
+
+import django.db.models.deletion
+import documents.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("documents", "0010_tags"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DocumentRendition",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "content_hash",
+                    models.CharField(
+                        help_text="SHA-256 checksum of the source contents",
+                        max_length=64,
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[("thumbnail", "Thumbnail"), ("preview", "Preview")],
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("running", "Running"),
+                            ("done", "Done"),
+                            ("unsupported", "Unsupported Format"),
+                            ("failed", "Failed"),
+                        ],
+                        default="pending",
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "renderer",
+                    models.CharField(
+                        blank=True,
+                        help_text="Renderer that produced the image (e.g. image, pdf, text)",
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "file",
+                    models.FileField(
+                        blank=True,
+                        max_length=255,
+                        upload_to=documents.models.rendition_file_path,
+                    ),
+                ),
+                (
+                    "s3_key",
+                    models.CharField(
+                        blank=True,
+                        help_text="S3 object key if stored in S3",
+                        max_length=512,
+                    ),
+                ),
+                ("content_type", models.CharField(blank=True, max_length=100)),
+                ("width", models.PositiveIntegerField(default=0)),
+                ("height", models.PositiveIntegerField(default=0)),
+                (
+                    "size",
+                    models.PositiveIntegerField(
+                        default=0, help_text="Size of the rendition in bytes"
+                    ),
+                ),
+                ("attempts", models.PositiveIntegerField(default=0)),
+                (
+                    "locked_at",
+                    models.DateTimeField(
+                        blank=True,
+                        help_text="When a worker claimed this rendition",
+                        null=True,
+                    ),
+                ),
+                ("error", models.TextField(blank=True)),
+                ("rendered_at", models.DateTimeField(blank=True, null=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "source_version",
+                    models.ForeignKey(
+                        blank=True,
+                        help_text="Version the contents are read from when rendering",
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="documents.documentversion",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Document Rendition",
+                "verbose_name_plural": "Document Renditions",
+                "indexes": [
+                    models.Index(
+                        fields=["status", "id"], name="documents_d_status_f34f02_idx"
+                    )
+                ],
+                "unique_together": {("content_hash", "kind")},
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("documents", "0011_document_renditions"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="documentversion",
+            name="storage_class",
+            field=models.CharField(
+                blank=True,
+                help_text="S3 storage class of cold contents, or 'gzip' for the local cold directory",
+                max_length=32,
+            ),
+        ),
+        migrations.AddField(
+            model_name="documentversion",
+            name="storage_tier",
+            field=models.CharField(
+                choices=[("hot", "Hot"), ("cold", "Cold")],
+                default="hot",
+                help_text="Whether the contents were moved to cheaper storage by the lifecycle policy",
+                max_length=10,
+            ),
+        ),
+        migrations.AddField(
+            model_name="documentversion",
+            name="tier_changed_at",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="When the contents last moved between tiers",
+                null=True,
+            ),
+        ),
+    ]
@@ -0,0 +1,103 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("documents", "0012_document_storage_tiers"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IntegrityCheck",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Not Verified Yet"),
+                            ("ok", "OK"),
+                            ("mismatch", "Contents Changed"),
+                            ("missing", "Missing"),
+                            ("error", "Unreadable"),
+                        ],
+                        default="pending",
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "etag",
+                    models.CharField(
+                        blank=True,
+                        help_text="S3 ETag recorded at upload or first verification",
+                        max_length=100,
+                    ),
+                ),
+                (
+                    "sha256",
+                    models.CharField(
+                        blank=True,
+                        help_text="SHA-256 of the contents read at the last full verification",
+                        max_length=64,
+                    ),
+                ),
+                (
+                    "detail",
+                    models.TextField(
+                        blank=True, help_text="What did not match, or the error raised"
+                    ),
+                ),
+                (
+                    "last_verified_at",
+                    models.DateTimeField(
+                        blank=True,
+                        help_text="When the contents were last verified",
+                        null=True,
+                    ),
+                ),
+                (
+                    "failed_since",
+                    models.DateTimeField(
+                        blank=True,
+                        help_text="First verification of the current run of failures",
+                        null=True,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "version",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="integrity_check",
+                        to="documents.documentversion",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Integrity Check",
+                "verbose_name_plural": "Integrity Checks",
+                "indexes": [
+                    models.Index(
+                        fields=["last_verified_at"],
+                        name="documents_i_last_ve_70a9b4_idx",
+                    ),
+                    models.Index(
+                        fields=["status", "last_verified_at"],
+                        name="documents_i_status_13655a_idx",
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-17 08:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("documents", "0013_integrity_checks"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="document",
+            name="is_private",
+            field=models.BooleanField(
+                default=True,
+                help_text="If True, only its creator and users with explicit permissions can access this document",
+            ),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-17 08:35
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def populate_archived_at(apps, schema_editor):
+    """The last update is the best record of when existing documents were archived"""
+    Document = apps.get_model("documents", "Document")
+    Document.objects.filter(status="archived").update(archived_at=F("updated_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("documents", "0014_document_is_private_help"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="document",
+            name="archived_at",
+            field=models.DateTimeField(
+                blank=True,
+                editable=False,
+                help_text="When the document was archived; cleared if it leaves the archived status",
+                null=True,
+            ),
+        ),
+        migrations.RunPython(populate_archived_at, migrations.RunPython.noop),
+    ]
@@ -1,9 +1,15 @@
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models, transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce, Greatest
 from django.conf import settings
 from django.utils.translation import gettext_lazy as _
 from django.urls import reverse
+from django.utils import timezone
 import uuid
 import os
+import zlib
 from datetime import datetime
 
 class DocumentCategory(models.Model):
@@ -34,6 +40,105 @@ class DocumentCategory(models.Model):
         return reverse('documents:category_detail', args=[self.pk])
 
 
+# Longest tag name stored; longer tags are cut to this length
+TAG_MAX_LENGTH = 100
+
+
+def normalize_tag(name):
+    """Normalize a tag for matching: trimmed, single-spaced and case-folded"""
+    # Case folding can lengthen a name, so cut again afterwards
+    return ' '.join(name.split()).casefold()[:TAG_MAX_LENGTH].rstrip()
+
+
+def parse_tags(value):
+    """
+    Split a comma-separated tag string into distinct, non-empty tag names,
+    cutting each to TAG_MAX_LENGTH characters
+    """
+    tags = {}
+    for name in (value or '').split(','):
+        name = ' '.join(name.split())[:TAG_MAX_LENGTH].rstrip()
+        if name:
+            tags.setdefault(normalize_tag(name), name)
+    return list(tags.values())
+
+
+class Tag(models.Model):
+    """
+    A document tag, stored once and linked to documents through DocumentTag
+    """
+    name = models.CharField(
+        max_length=TAG_MAX_LENGTH,
+        help_text=_("Tag as first entered")
+    )
+    normalized = models.CharField(
+        max_length=TAG_MAX_LENGTH,
+        unique=True,
+        help_text=_("Case-folded form used for matching")
+    )
+    
+    class Meta:
+        verbose_name = _("Tag")
+        verbose_name_plural = _("Tags")
+        ordering = ['normalized']
+    
+    def __str__(self):
+        return self.name
+
+
+class DocumentQuerySet(models.QuerySet):
+    """
+    Queryset helpers for reading document version summaries in bulk
+    """
+    
+    def with_current_version(self):
+        """Fetch the current version (and category) in the same query"""
+        return self.select_related('category', 'current_version')
+    
+    def accessible_to(self, user, action='view'):
+        """
+        Restrict to documents the user may view (or download): all of them
+        with the matching model permission, otherwise public ones and
+        private ones they created or hold an unexpired grant for
+        """
+        from .services.permissions import get_permission_resolver
+        return get_permission_resolver().filter_queryset(self, user, action)
+    
+    def downloadable_by(self, user):
+        """Restrict to documents the user may download"""
+        return self.accessible_to(user, action='download')
+    
+    def annotate_version_summary(self):
+        """
+        Annotate ``latest_version_id`` and ``versions_total`` computed from the
+        versions table, for checking or rebuilding the denormalized columns
+        """
+        versions = DocumentVersion.objects.filter(document=OuterRef('pk'))
+        return self.annotate(
+            latest_version_id=Subquery(versions.order_by('-version_number').values('pk')[:1]),
+            versions_total=Coalesce(
+                Subquery(versions.values('document').annotate(total=Count('pk')).values('total')),
+                0
+            )
+        )
+    
+    def sync_version_summary(self):
+        """
+        Rewrite current_version and version_count from the versions table.
+        
+        Returns:
+            int: Number of documents updated
+        """
+        versions = DocumentVersion.objects.filter(document=OuterRef('pk'))
+        return self.update(
+            current_version=Subquery(versions.order_by('-version_number').values('pk')[:1]),
+            version_count=Coalesce(
+                Subquery(versions.values('document').annotate(total=Count('pk')).values('total')),
+                0
+            )
+        )
+
+
 class Document(models.Model):
     """
     Main document model for storing files with metadata
@@ -59,6 +164,13 @@ class Document(models.Model):
         blank=True,
         help_text=_("Comma-separated tags")
     )
+    tag_set = models.ManyToManyField(
+        Tag,
+        through='DocumentTag',
+        blank=True,
+        related_name='documents',
+        help_text=_("Normalized tags, kept in sync with the tags field")
+    )
     status = models.CharField(
         max_length=20,
         choices=STATUS_CHOICES,
@@ -86,8 +198,40 @@ class Document(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     is_private = models.BooleanField(
         default=True,
-        help_text=_("If True, only users with explicit permissions can access this document")
+        help_text=_("If True, only its creator and users with explicit permissions can access this document")
+    )
+    current_version = models.ForeignKey(
+        'DocumentVersion',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='+',
+        help_text=_("Most recent version of this document")
+    )
+    version_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text=_("Number of versions of this document")
+    )
+    last_version_number = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text=_("Highest version number allocated to this document")
     )
+    search_vector = SearchVectorField(
+        null=True,
+        editable=False,
+        help_text=_("Weighted full-text index of the title, tags, description and text")
+    )
+    archived_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text=_("When the document was archived; cleared if it leaves the archived status")
+    )
+    
+    objects = DocumentQuerySet.as_manager()
     
     class Meta:
         verbose_name = _("Document")
@@ -97,10 +241,27 @@ class Document(models.Model):
             ("download_document", "Can download document"),
             ("share_document", "Can share document with others"),
         ]
+        indexes = [
+            GinIndex(fields=['search_vector'], name='document_search_gin'),
+        ]
     
     def __str__(self):
         return self.title
     
+    def save(self, *args, **kwargs):
+        """Override save to record when the document was archived"""
+        archived_at = self.archived_at
+        if self.status != 'archived':
+            archived_at = None
+        elif archived_at is None:
+            archived_at = timezone.now()
+        if archived_at != self.archived_at:
+            self.archived_at = archived_at
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | {'archived_at'}
+        super().save(*args, **kwargs)
+    
     def get_absolute_url(self):
         return reverse('documents:document_detail', args=[self.uuid])
     
@@ -110,18 +271,52 @@ class Document(models.Model):
             return []
         return [tag.strip() for tag in self.tags.split(',')]
     
-    @property
-    def current_version(self):
-        """Get the most recent version of this document"""
-        return self.versions.order_by('-version_number').first()
-    
     @property
     def file_extension(self):
         """Get the file extension of the current version"""
-        if not self.current_version:
+        current_version = self.current_version
+        if not current_version:
             return None
-        _, ext = os.path.splitext(self.current_version.file_name)
+        _, ext = os.path.splitext(current_version.file_name)
         return ext.lower() if ext else None
+    
+    def is_accessible_to(self, user, action='view'):
+        """Check whether the user may view (or download) this document"""
+        from .services.permissions import get_permission_resolver
+        return get_permission_resolver().can_access(user, self, action)
+    
+    def refresh_version_summary(self):
+        """Recompute current_version and version_count after versions were removed"""
+        Document.objects.filter(pk=self.pk).sync_version_summary()
+        self.refresh_from_db(fields=['current_version', 'version_count'])
+
+
+class DocumentTag(models.Model):
+    """
+    Link between a document and one of its tags
+    """
+    document = models.ForeignKey(
+        Document,
+        on_delete=models.CASCADE,
+        related_name='tag_links'
+    )
+    tag = models.ForeignKey(
+        Tag,
+        on_delete=models.CASCADE,
+        related_name='document_links'
+    )
+    
+    class Meta:
+        verbose_name = _("Document Tag")
+        verbose_name_plural = _("Document Tags")
+        unique_together = [['document', 'tag']]
+        indexes = [
+            # Serves "documents with this tag" lookups and tag counts
+            models.Index(fields=['tag', 'document']),
+        ]
+    
+    def __str__(self):
+        return f"{self.document_id} - {self.tag_id}"
 
 
 def document_file_path(instance, filename):
@@ -133,10 +328,75 @@ def document_file_path(instance, filename):
     return f'documents/{now.year}/{now.month}/{instance.document.uuid}/{filename}'
 
 
+def blob_file_path(instance, filename):
+    """
+    Content-addressed path for a blob
+    Pattern: blobs/{hash[:2]}/{hash[2:4]}/{hash}
+    """
+    return instance.storage_key
+
+
+class DocumentBlob(models.Model):
+    """
+    File contents stored once per SHA-256 digest and shared by every
+    document version with identical bytes
+    """
+    sha256 = models.CharField(
+        max_length=64,
+        unique=True,
+        help_text=_("SHA-256 checksum of the contents")
+    )
+    size = models.PositiveBigIntegerField(
+        help_text=_("Size in bytes")
+    )
+    content_type = models.CharField(
+        max_length=100,
+        blank=True,
+        help_text=_("MIME type sniffed from the contents")
+    )
+    file = models.FileField(
+        upload_to=blob_file_path,
+        max_length=255,
+        blank=True
+    )
+    s3_key = models.CharField(
+        max_length=512,
+        blank=True,
+        help_text=_("S3 object key if stored in S3")
+    )
+    ref_count = models.PositiveIntegerField(
+        default=0,
+        help_text=_("Number of document versions referencing this blob")
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name = _("Document Blob")
+        verbose_name_plural = _("Document Blobs")
+    
+    def __str__(self):
+        return self.sha256
+    
+    @property
+    def storage_key(self):
+        """Path of the blob in local storage and key of the blob in S3"""
+        return f"blobs/{self.sha256[:2]}/{self.sha256[2:4]}/{self.sha256}"
+
+
 class DocumentVersion(models.Model):
     """
     Represents a specific version of a document file
     """
+    STORAGE_STATUS_CHOICES = (
+        ('pending', _('Pending Upload')),
+        ('uploaded', _('Uploaded')),
+        ('failed', _('Upload Failed')),
+    )
+    STORAGE_TIER_CHOICES = (
+        ('hot', _('Hot')),
+        ('cold', _('Cold')),
+    )
+    
     document = models.ForeignKey(
         Document,
         on_delete=models.CASCADE,
@@ -148,7 +408,7 @@ class DocumentVersion(models.Model):
         max_length=255
     )
     file_name = models.CharField(max_length=255)
-    file_size = models.PositiveIntegerField(
+    file_size = models.PositiveBigIntegerField(
         help_text=_("File size in bytes")
     )
     file_type = models.CharField(
@@ -171,6 +431,41 @@ class DocumentVersion(models.Model):
         blank=True,
         help_text=_("S3 object key if stored in S3")
     )
+    checksum = models.CharField(
+        max_length=64,
+        blank=True,
+        help_text=_("SHA-256 checksum of the file contents")
+    )
+    storage_status = models.CharField(
+        max_length=20,
+        choices=STORAGE_STATUS_CHOICES,
+        default='uploaded',
+        help_text=_("Whether the file has reached its final storage backend")
+    )
+    blob = models.ForeignKey(
+        DocumentBlob,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='versions',
+        help_text=_("Shared contents of this version")
+    )
+    storage_tier = models.CharField(
+        max_length=10,
+        choices=STORAGE_TIER_CHOICES,
+        default='hot',
+        help_text=_("Whether the contents were moved to cheaper storage by the lifecycle policy")
+    )
+    storage_class = models.CharField(
+        max_length=32,
+        blank=True,
+        help_text=_("S3 storage class of cold contents, or 'gzip' for the local cold directory")
+    )
+    tier_changed_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text=_("When the contents last moved between tiers")
+    )
     
     class Meta:
         verbose_name = _("Document Version")
@@ -183,21 +478,75 @@ class DocumentVersion(models.Model):
     
     def save(self, *args, **kwargs):
         """Override save to set file metadata and handle versioning"""
-        # If this is a new record, set the version number
-        if not self.pk and not self.version_number:
-            # Get the latest version number for this document
-            latest = DocumentVersion.objects.filter(
-                document=self.document
-            ).order_by('-version_number').first()
-            
-            self.version_number = 1 if not latest else latest.version_number + 1
+        # If a new file was uploaded, store its contents once per checksum and
+        # point this version at the shared blob
+        replaced_blob_id = None
+        if self.file and not self.file._committed:
+            from .services.blobs import store_blob
+            if not self._state.adding:
+                # The file of an existing version is being replaced; what was
+                # recorded about the old contents no longer applies
+                replaced_blob_id = DocumentVersion.objects.filter(pk=self.pk).values_list('blob_id', flat=True).first()
+                self.s3_key = ''
+                self.storage_tier, self.storage_class, self.tier_changed_at = 'hot', '', None
+            upload_name = os.path.basename(self.file.name)
+            blob, stream = store_blob(self.file.file, upload_name)
+            self.blob = blob
+            self.file = blob.file.name
+            self.file_name = self.file_name or upload_name
+            self.file_size = blob.size
+            self.checksum = blob.sha256
+            self.file_type = stream.content_type
+            if blob.s3_key and not self.s3_key:
+                self.s3_key = blob.s3_key
+            # Reused contents may already be in the cold tier
+            cold = DocumentVersion.objects.filter(blob=blob, storage_tier='cold').values_list(
+                'storage_class', 'tier_changed_at'
+            ).first()
+            if cold:
+                self.storage_tier = 'cold'
+                self.storage_class, self.tier_changed_at = cold
             
         # If file was uploaded, set metadata
-        if self.file and hasattr(self.file, 'size'):
+        elif self.file and not self.blob_id and hasattr(self.file, 'size'):
             self.file_size = self.file.size
             self.file_name = os.path.basename(self.file.name)
+        
+        adding = self._state.adding
+        with transaction.atomic():
+            # If this is a new record, allocate the version number. The update
+            # locks the document row until the transaction commits, so
+            # concurrent uploads to the same document queue here instead of
+            # both reading the same latest number.
+            if adding:
+                if self.version_number:
+                    next_number = Greatest(F('last_version_number'), self.version_number)
+                else:
+                    next_number = F('last_version_number') + 1
+                Document.objects.filter(pk=self.document_id).update(
+                    last_version_number=next_number,
+                    version_count=F('version_count') + 1
+                )
+                if not self.version_number:
+                    self.version_number = Document.objects.filter(
+                        pk=self.document_id
+                    ).values_list('last_version_number', flat=True).get()
             
-        super().save(*args, **kwargs)
+            super().save(*args, **kwargs)
+            
+            # Drop the reference on the replaced contents, which deletes them
+            # if nothing else uses them
+            if replaced_blob_id:
+                from .services.blobs import release_blob
+                from .services.s3_service import get_document_service
+                release_blob(replaced_blob_id, get_document_service())
+            
+            # Keep the document's current version in step
+            if adding:
+                Document.objects.filter(pk=self.document_id).filter(
+                    Q(current_version__isnull=True) |
+                    Q(current_version__version_number__lt=self.version_number)
+                ).update(current_version=self)
 
 
 class DocumentComment(models.Model):
@@ -270,4 +619,410 @@ class DocumentAccess(models.Model):
         unique_together = [['document', 'user']]
     
     def __str__(self):
-        return f"{self.user.username} - {self.get_access_type_display()} - {self.document.title}"
\ No newline at end of file
+        return f"{self.user.username} - {self.get_access_type_display()} - {self.document.title}"
+
+
+class UploadSession(models.Model):
+    """
+    A resumable chunked upload in progress.
+    
+    Each chunk maps onto one part of an S3 multipart upload, or onto a chunk
+    file on local disk when S3 is not configured.
+    """
+    STATUS_CHOICES = (
+        ('active', _('Active')),
+        ('completed', _('Completed')),
+        ('aborted', _('Aborted')),
+    )
+    
+    uuid = models.UUIDField(
+        default=uuid.uuid4,
+        editable=False,
+        unique=True
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='upload_sessions'
+    )
+    document = models.ForeignKey(
+        Document,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='upload_sessions',
+        help_text=_("Existing document this upload adds a version to")
+    )
+    document_metadata = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text=_("Fields for the new document created when the upload completes")
+    )
+    file_name = models.CharField(max_length=255)
+    file_size = models.PositiveBigIntegerField(
+        help_text=_("Total file size in bytes")
+    )
+    content_type = models.CharField(max_length=100, blank=True)
+    chunk_size = models.PositiveIntegerField(
+        help_text=_("Size of every part except the last, in bytes")
+    )
+    total_parts = models.PositiveIntegerField()
+    s3_key = models.CharField(max_length=512, blank=True)
+    s3_upload_id = models.CharField(
+        max_length=1024,
+        blank=True,
+        help_text=_("S3 multipart upload ID (empty for local uploads)")
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='active'
+    )
+    version = models.ForeignKey(
+        DocumentVersion,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = _("Upload Session")
+        verbose_name_plural = _("Upload Sessions")
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.file_name} ({self.get_status_display()})"
+    
+    @property
+    def uses_s3(self):
+        return bool(self.s3_upload_id)
+    
+    def expected_part_size(self, part_number):
+        """Return the exact size the given part must have"""
+        if part_number == self.total_parts:
+            return self.file_size - (self.total_parts - 1) * self.chunk_size
+        return self.chunk_size
+
+
+class UploadPart(models.Model):
+    """
+    A chunk of an UploadSession that the server has acknowledged
+    """
+    session = models.ForeignKey(
+        UploadSession,
+        on_delete=models.CASCADE,
+        related_name='parts'
+    )
+    part_number = models.PositiveIntegerField()
+    size = models.PositiveIntegerField()
+    etag = models.CharField(
+        max_length=255,
+        blank=True,
+        help_text=_("ETag returned by S3 for this part")
+    )
+    checksum = models.CharField(
+        max_length=64,
+        help_text=_("SHA-256 checksum of the part")
+    )
+    received_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = _("Upload Part")
+        verbose_name_plural = _("Upload Parts")
+        ordering = ['part_number']
+        unique_together = [['session', 'part_number']]
+    
+    def __str__(self):
+        return f"{self.session.file_name} part {self.part_number}"
+
+
+class StorageTransfer(models.Model):
+    """
+    Queued upload of a locally stored document version to S3.
+    
+    Rows are created in the same transaction as the version, and a worker
+    (manage.py process_storage_transfers) uploads them in the background.
+    """
+    STATUS_CHOICES = (
+        ('pending', _('Pending')),
+        ('running', _('Running')),
+        ('done', _('Done')),
+        ('failed', _('Failed')),
+    )
+    
+    version = models.OneToOneField(
+        DocumentVersion,
+        on_delete=models.CASCADE,
+        related_name='transfer'
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='pending'
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(
+        default=timezone.now,
+        help_text=_("Earliest time the transfer may be (re)tried")
+    )
+    locked_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text=_("When a worker claimed this transfer")
+    )
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = _("Storage Transfer")
+        verbose_name_plural = _("Storage Transfers")
+        ordering = ['next_attempt_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.version} ({self.get_status_display()})"
+
+
+class DocumentText(models.Model):
+    """
+    Plain text extracted from a document version, stored zlib-compressed.
+    
+    Rows are queued when a version is stored and filled in by the extraction
+    worker (manage.py extract_document_text).
+    """
+    STATUS_CHOICES = (
+        ('pending', _('Pending')),
+        ('running', _('Running')),
+        ('done', _('Done')),
+        ('unsupported', _('Unsupported Format')),
+        ('failed', _('Failed')),
+    )
+    
+    version = models.OneToOneField(
+        DocumentVersion,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='text'
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='pending'
+    )
+    extractor = models.CharField(
+        max_length=20,
+        blank=True,
+        help_text=_("Extractor that produced the text (e.g. pdf, docx, text)")
+    )
+    content = models.BinaryField(
+        blank=True,
+        default=b'',
+        help_text=_("zlib-compressed UTF-8 text")
+    )
+    char_count = models.PositiveIntegerField(default=0)
+    truncated = models.BooleanField(
+        default=False,
+        help_text=_("Whether extraction stopped at the configured character limit")
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    locked_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text=_("When a worker claimed this version")
+    )
+    error = models.TextField(blank=True)
+    extracted_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name = _("Document Text")
+        verbose_name_plural = _("Document Texts")
+        indexes = [
+            models.Index(fields=['status', 'version']),
+        ]
+    
+    def __str__(self):
+        return f"Text of {self.version_id} ({self.get_status_display()})"
+    
+    @property
+    def text(self):
+        """The extracted text, decompressed"""
+        if not self.content:
+            return ''
+        return zlib.decompress(bytes(self.content)).decode('utf-8')
+    
+    def set_text(self, text):
+        """Compress and store extracted text"""
+        self.content = zlib.compress(text.encode('utf-8'), 6)
+        self.char_count = len(text)
+
+
+def rendition_file_path(instance, filename):
+    """
+    Content-addressed path for a rendition
+    Pattern: renditions/{hash[:2]}/{hash}/{kind}.jpg
+    """
+    return instance.storage_key
+
+
+class DocumentRendition(models.Model):
+    """
+    Thumbnail or preview image of a document's contents.
+    
+    Keyed by the contents' SHA-256, so versions with identical bytes share
+    renditions and a rendition is only regenerated when the contents change.
+    Rows are queued when a version is stored and rendered by the rendition
+    worker (manage.py render_documents).
+    """
+    KIND_CHOICES = (
+        ('thumbnail', _('Thumbnail')),
+        ('preview', _('Preview')),
+    )
+    STATUS_CHOICES = (
+        ('pending', _('Pending')),
+        ('running', _('Running')),
+        ('done', _('Done')),
+        ('unsupported', _('Unsupported Format')),
+        ('failed', _('Failed')),
+    )
+    
+    content_hash = models.CharField(
+        max_length=64,
+        help_text=_("SHA-256 checksum of the source contents")
+    )
+    kind = models.CharField(
+        max_length=20,
+        choices=KIND_CHOICES
+    )
+    source_version = models.ForeignKey(
+        DocumentVersion,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        help_text=_("Version the contents are read from when rendering")
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='pending'
+    )
+    renderer = models.CharField(
+        max_length=20,
+        blank=True,
+        help_text=_("Renderer that produced the image (e.g. image, pdf, text)")
+    )
+    file = models.FileField(
+        upload_to=rendition_file_path,
+        max_length=255,
+        blank=True
+    )
+    s3_key = models.CharField(
+        max_length=512,
+        blank=True,
+        help_text=_("S3 object key if stored in S3")
+    )
+    content_type = models.CharField(max_length=100, blank=True)
+    width = models.PositiveIntegerField(default=0)
+    height = models.PositiveIntegerField(default=0)
+    size = models.PositiveIntegerField(
+        default=0,
+        help_text=_("Size of the rendition in bytes")
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    locked_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text=_("When a worker claimed this rendition")
+    )
+    error = models.TextField(blank=True)
+    rendered_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name = _("Document Rendition")
+        verbose_name_plural = _("Document Renditions")
+        unique_together = [['content_hash', 'kind']]
+        indexes = [
+            models.Index(fields=['status', 'id']),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_kind_display()} of {self.content_hash[:12]} ({self.get_status_display()})"
+    
+    @property
+    def storage_key(self):
+        """Path of the rendition in local storage and key of the rendition in S3"""
+        return f"renditions/{self.content_hash[:2]}/{self.content_hash}/{self.kind}.jpg"
+
+
+class IntegrityCheck(models.Model):
+    """
+    Result of the last integrity verification of a document version's stored
+    contents.
+    
+    Rows are created when a version is uploaded straight to S3 (recording
+    the object's ETag) or on its first verification, and updated by the
+    scrubber (manage.py scrub_storage), which re-verifies the versions
+    checked longest ago each run.
+    """
+    STATUS_CHOICES = (
+        ('pending', _('Not Verified Yet')),
+        ('ok', _('OK')),
+        ('mismatch', _('Contents Changed')),
+        ('missing', _('Missing')),
+        ('error', _('Unreadable')),
+    )
+    
+    version = models.OneToOneField(
+        DocumentVersion,
+        on_delete=models.CASCADE,
+        related_name='integrity_check'
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='pending'
+    )
+    etag = models.CharField(
+        max_length=100,
+        blank=True,
+        help_text=_("S3 ETag recorded at upload or first verification")
+    )
+    sha256 = models.CharField(
+        max_length=64,
+        blank=True,
+        help_text=_("SHA-256 of the contents read at the last full verification")
+    )
+    detail = models.TextField(
+        blank=True,
+        help_text=_("What did not match, or the error raised")
+    )
+    last_verified_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text=_("When the contents were last verified")
+    )
+    failed_since = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text=_("First verification of the current run of failures")
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name = _("Integrity Check")
+        verbose_name_plural = _("Integrity Checks")
+        indexes = [
+            models.Index(fields=['last_verified_at']),
+            models.Index(fields=['status', 'last_verified_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.version} ({self.get_status_display()})"
@@ -0,0 +1,271 @@
+import logging
+import shutil
+import tempfile
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from ..models import DocumentBlob, DocumentVersion
+from .deletions import delete_after_commit
+from .lifecycle import delete_cold_copy
+from .streaming import StreamingFile, get_chunk_size, stream_to_storage
+
+logger = logging.getLogger(__name__)
+
+
+class BlobError(Exception):
+    """Raised when the contents of a blob cannot be stored"""
+
+
+def hash_file(file_obj, name=None):
+    """
+    Read a file once to compute its size, SHA-256 checksum and MIME type.
+
+    Args:
+        file_obj: File-like object to read
+        name: Original file name, used to refine the MIME type
+
+    Returns:
+        StreamingFile: Wrapper with bytes_read, checksum and content_type populated
+    """
+    stream = StreamingFile(file_obj, name=name)
+    for _ in stream.chunks():
+        pass
+    return stream
+
+
+def _rewind(file_obj):
+    try:
+        file_obj.seek(0)
+        return True
+    except (AttributeError, OSError):
+        return False
+
+
+def _blob_storage():
+    return DocumentBlob._meta.get_field('file').storage
+
+
+def _write_blob_file(file_obj, blob, storage=None):
+    """
+    Write blob contents to local storage under the content-addressed path.
+
+    Returns:
+        str: Name of the stored file
+    """
+    storage = storage or _blob_storage()
+    path = blob.storage_key
+
+    # The name is the checksum, so a complete file already at the path (e.g.
+    # from an upload whose transaction rolled back) has the same contents
+    if storage.exists(path) and storage.size(path) == blob.size:
+        return path
+
+    saved_path, stream = stream_to_storage(file_obj, path, storage=storage)
+    if stream.checksum != blob.sha256:
+        storage.delete(saved_path)
+        raise BlobError(f"Contents of {blob.sha256} changed while being stored")
+    return saved_path
+
+
+def acquire_blob(sha256):
+    """
+    Take a reference on the blob with the given checksum, if one exists.
+
+    Returns:
+        DocumentBlob: The blob, or None if the contents are not stored yet
+    """
+    with transaction.atomic():
+        blob = DocumentBlob.objects.select_for_update().filter(sha256=sha256).first()
+        if blob is None:
+            return None
+        DocumentBlob.objects.filter(pk=blob.pk).update(ref_count=F('ref_count') + 1)
+        blob.ref_count += 1
+    return blob
+
+
+def store_blob(file_obj, name=None, storage=None):
+    """
+    Store uploaded contents once per checksum and take a reference on the blob.
+
+    The file is hashed before anything is written, so repeat uploads of the
+    same bytes never touch storage.
+
+    Args:
+        file_obj: File-like object with the uploaded contents
+        name: Original file name, used to refine the MIME type
+        storage: Django storage backend (defaults to the blob field's storage)
+
+    Returns:
+        tuple: (DocumentBlob, StreamingFile with size/checksum/content_type populated)
+    """
+    spool = None
+    if not _rewind(file_obj):
+        # Unseekable streams are spooled so they can be read twice
+        spool = tempfile.TemporaryFile()
+        shutil.copyfileobj(file_obj, spool, get_chunk_size())
+        file_obj = spool
+
+    try:
+        stream = hash_file(file_obj, name)
+        blob = acquire_blob(stream.checksum)
+        if blob is not None:
+            logger.info(f"Reusing stored contents {blob.sha256} for {name}")
+            return blob, stream
+
+        blob = DocumentBlob(
+            sha256=stream.checksum,
+            size=stream.bytes_read,
+            content_type=stream.content_type,
+            ref_count=1
+        )
+        file_obj.seek(0)
+        saved_path = _write_blob_file(file_obj, blob, storage)
+        blob.file = saved_path
+
+        try:
+            with transaction.atomic():
+                blob.save()
+        except IntegrityError:
+            # Another upload stored the same contents first
+            if saved_path != blob.storage_key:
+                (storage or _blob_storage()).delete(saved_path)
+            blob = acquire_blob(stream.checksum)
+            if blob is None:
+                raise BlobError(f"Blob {stream.checksum} disappeared while being stored")
+
+        return blob, stream
+    finally:
+        if spool is not None:
+            spool.close()
+
+
+def release_blob(blob_id, storage_service):
+    """
+    Drop a reference on a blob, deleting its contents once nothing uses them.
+
+    Call after the referencing version has been deleted.
+
+    Args:
+        blob_id: ID of the DocumentBlob
+        storage_service: DocumentStorageService instance used to delete from S3
+    """
+    with transaction.atomic():
+        blob = DocumentBlob.objects.select_for_update().filter(pk=blob_id).first()
+        if blob is None:
+            return
+        DocumentBlob.objects.filter(pk=blob_id, ref_count__gt=0).update(ref_count=F('ref_count') - 1)
+        blob.refresh_from_db(fields=['ref_count'])
+        if blob.ref_count > 0 or blob.versions.exists():
+            return
+
+        sha256 = blob.sha256
+        file_name = blob.file.name if blob.file else ''
+        s3_key = blob.s3_key
+        blob.delete()
+
+    def delete_contents():
+        # Identical bytes may have been uploaded again since the row was deleted
+        if DocumentBlob.objects.filter(sha256=sha256).exists():
+            return
+        if file_name:
+            _blob_storage().delete(file_name)
+            delete_cold_copy(file_name)
+        logger.info(f"Deleted unreferenced blob {sha256}")
+
+    transaction.on_commit(delete_contents)
+    if s3_key:
+        # Batched with the other deletions of the transaction
+        delete_after_commit(storage_service, s3_key=s3_key)
+
+
+def adopt_version(storage_service, version):
+    """
+    Move an existing version's contents onto a content-addressed blob,
+    dropping its own copy once the blob holds the same bytes.
+
+    Args:
+        storage_service: DocumentStorageService instance
+        version: DocumentVersion without a blob
+
+    Returns:
+        tuple: (DocumentBlob, whether an identical blob already existed),
+        or (None, False) if the version has no readable contents
+    """
+    old_file = version.file.name if version.file else ''
+    old_key = version.s3_key
+    storage = version.file.storage
+    local_available = bool(old_file) and storage.exists(old_file)
+
+    if local_available:
+        with storage.open(old_file, 'rb') as file_obj:
+            stream = hash_file(file_obj, version.file_name)
+    elif old_key and storage_service.using_s3:
+        success, body = storage_service.open_object(old_key)
+        if not success:
+            raise BlobError(body)
+        try:
+            stream = hash_file(body, version.file_name)
+        finally:
+            body.close()
+    else:
+        return None, False
+
+    with transaction.atomic():
+        blob = acquire_blob(stream.checksum)
+        existed = blob is not None
+        if not existed:
+            blob = DocumentBlob(
+                sha256=stream.checksum,
+                size=stream.bytes_read,
+                content_type=stream.content_type,
+                ref_count=1
+            )
+
+        # Fill in whichever copies the blob lacks from this version
+        if local_available and not blob.file:
+            with storage.open(old_file, 'rb') as file_obj:
+                blob.file = _write_blob_file(file_obj, blob)
+        if old_key and storage_service.using_s3 and not blob.s3_key:
+            success, result = storage_service.copy_object(old_key, blob.storage_key, blob.content_type)
+            if not success:
+                raise BlobError(result)
+            blob.s3_key = blob.storage_key
+        blob.save()
+
+        version.blob = blob
+        version.checksum = blob.sha256
+        version.file = blob.file.name if blob.file else ''
+        version.s3_key = blob.s3_key
+        version.save(update_fields=['blob', 'checksum', 'file', 's3_key'])
+
+        new_file = version.file.name or ''
+        transaction.on_commit(lambda: _delete_unreferenced_copies(
+            storage_service, storage, old_file if old_file != new_file else '',
+            old_key if old_key != blob.s3_key else ''
+        ))
+
+    return blob, existed
+
+
+def _delete_unreferenced_copies(storage_service, storage, file_name, s3_key):
+    if file_name and not DocumentVersion.objects.filter(file=file_name).exists():
+        storage.delete(file_name)
+    if s3_key and not DocumentVersion.objects.filter(s3_key=s3_key).exists():
+        storage_service.delete_object(s3_key)
+
+
+def repair_ref_counts():
+    """
+    Recompute every blob's reference count from the versions that use it.
+
+    Returns:
+        int: Number of blobs whose count was corrected
+    """
+    counts = DocumentVersion.objects.filter(blob=OuterRef('pk')).values('blob').annotate(
+        total=Count('pk')
+    ).values('total')
+    actual = Coalesce(Subquery(counts), 0)
+    return DocumentBlob.objects.annotate(actual=actual).exclude(ref_count=F('actual')).update(
+        ref_count=actual
+    )
@@ -0,0 +1,296 @@
+import hashlib
+import io
+import logging
+import math
+import os
+import shutil
+import tempfile
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+
+from ..models import DocumentVersion, UploadPart, UploadSession
+from .integrity import record_upload
+
+logger = logging.getLogger(__name__)
+
+# S3 allows at most 10,000 parts per multipart upload
+MAX_PARTS = 10000
+
+# S3 requires every part except the last to be at least 5 MB
+MIN_PART_SIZE = 5 * 1024 * 1024
+
+
+class ChunkedUploadError(Exception):
+    """Raised when a chunked upload request cannot be honoured"""
+
+
+class ChunkReader(io.RawIOBase):
+    """
+    Read-only file object presenting a sequence of chunk files as one stream,
+    so local uploads are assembled without loading them into memory.
+    """
+
+    def __init__(self, paths, size):
+        self._paths = list(paths)
+        self.paths = list(self._paths)
+        self.size = size
+        self._current = None
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        # Only rewinding is supported, which is all hashing before storage needs
+        if offset != 0 or whence != io.SEEK_SET:
+            raise io.UnsupportedOperation("ChunkReader can only seek to the start")
+        if self._current is not None:
+            self._current.close()
+            self._current = None
+        self.paths = list(self._paths)
+        return 0
+
+    def readinto(self, buffer):
+        while True:
+            if self._current is None:
+                if not self.paths:
+                    return 0
+                self._current = open(self.paths.pop(0), 'rb')
+            count = self._current.readinto(buffer)
+            if count:
+                return count
+            self._current.close()
+            self._current = None
+
+    def close(self):
+        if self._current is not None:
+            self._current.close()
+            self._current = None
+        super().close()
+
+
+def get_part_size():
+    """Return the configured part size, respecting the S3 minimum."""
+    return max(getattr(settings, 'DOCUMENT_UPLOAD_PART_SIZE', 8 * 1024 * 1024), MIN_PART_SIZE)
+
+
+def get_chunk_dir(session):
+    """Directory holding the chunk files of a local upload session."""
+    return os.path.join(settings.DOCUMENT_CHUNK_UPLOAD_ROOT, session.uuid.hex)
+
+
+def get_chunk_path(session, part_number):
+    return os.path.join(get_chunk_dir(session), f"{part_number:05d}.part")
+
+
+def start_session(storage_service, user, file_name, file_size, content_type='',
+                  document=None, document_metadata=None, is_private=True):
+    """
+    Start a resumable upload.
+
+    Args:
+        storage_service: DocumentStorageService instance
+        user: User performing the upload
+        file_name: Name of the uploaded file
+        file_size: Total size of the file in bytes
+        content_type: MIME type of the file
+        document: Existing Document the upload adds a version to (optional)
+        document_metadata: Fields for a new document, including 'document_uuid'
+        is_private: Whether the stored object should be private
+
+    Returns:
+        UploadSession: The new session
+    """
+    chunk_size = get_part_size()
+    total_parts = max(1, math.ceil(file_size / chunk_size))
+    if total_parts > MAX_PARTS:
+        raise ChunkedUploadError(f"File is too large to upload in {MAX_PARTS} parts")
+
+    session = UploadSession(
+        user=user,
+        document=document,
+        document_metadata=document_metadata or {},
+        file_name=file_name,
+        file_size=file_size,
+        content_type=content_type,
+        chunk_size=chunk_size,
+        total_parts=total_parts
+    )
+
+    if storage_service.using_s3:
+        document_uuid = document.uuid if document else document_metadata['document_uuid']
+        s3_key = f"documents/{document_uuid}/uploads/{session.uuid.hex}/{file_name}"
+        success, result = storage_service.create_multipart_upload(
+            s3_key, content_type=content_type, is_private=is_private
+        )
+        if not success:
+            raise ChunkedUploadError(result)
+        session.s3_key = s3_key
+        session.s3_upload_id = result
+
+    session.save()
+    logger.info(f"Started chunked upload {session.uuid} for {file_name} ({total_parts} parts)")
+    return session
+
+
+def store_part(storage_service, session, part_number, stream):
+    """
+    Store one chunk of an upload, replacing any earlier copy of the same part.
+
+    The chunk is spooled to a temporary file (in memory only up to the
+    configured chunk size) so it can be hashed, size-checked and handed to S3
+    as a seekable body.
+
+    Args:
+        storage_service: DocumentStorageService instance
+        session: UploadSession the chunk belongs to
+        part_number: 1-based part number
+        stream: File-like object with the chunk data (e.g. the request)
+
+    Returns:
+        UploadPart: The acknowledged part
+    """
+    if session.status != 'active':
+        raise ChunkedUploadError(f"Upload is {session.status}")
+    if not 1 <= part_number <= session.total_parts:
+        raise ChunkedUploadError(f"Part number must be between 1 and {session.total_parts}")
+
+    expected_size = session.expected_part_size(part_number)
+    read_size = settings.DOCUMENT_UPLOAD_CHUNK_SIZE
+    checksum = hashlib.sha256()
+    size = 0
+
+    with tempfile.SpooledTemporaryFile(max_size=read_size) as buffer:
+        while True:
+            data = stream.read(read_size)
+            if not data:
+                break
+            size += len(data)
+            if size > expected_size:
+                raise ChunkedUploadError(f"Part {part_number} is larger than {expected_size} bytes")
+            checksum.update(data)
+            buffer.write(data)
+
+        if size != expected_size:
+            raise ChunkedUploadError(f"Part {part_number} must be {expected_size} bytes, got {size}")
+        buffer.seek(0)
+
+        etag = ''
+        if session.uses_s3:
+            success, result = storage_service.upload_part(
+                session.s3_key, session.s3_upload_id, part_number, buffer, size
+            )
+            if not success:
+                raise ChunkedUploadError(result)
+            etag = result
+        else:
+            # Write next to the final path and rename, so a resumed upload
+            # never sees a half-written chunk
+            chunk_path = get_chunk_path(session, part_number)
+            os.makedirs(os.path.dirname(chunk_path), exist_ok=True)
+            partial_path = f"{chunk_path}.tmp"
+            with open(partial_path, 'wb') as chunk_file:
+                shutil.copyfileobj(buffer, chunk_file, read_size)
+            os.replace(partial_path, chunk_path)
+
+    part, _ = UploadPart.objects.update_or_create(
+        session=session,
+        part_number=part_number,
+        defaults={
+            'size': size,
+            'etag': etag,
+            'checksum': checksum.hexdigest(),
+        }
+    )
+    session.save(update_fields=['updated_at'])
+    return part
+
+
+def received_parts(session):
+    """Return the sorted part numbers the server has acknowledged."""
+    return list(session.parts.order_by('part_number').values_list('part_number', flat=True))
+
+
+def complete_session(storage_service, session, document):
+    """
+    Assemble the parts of an upload and record it as a new document version.
+
+    Args:
+        storage_service: DocumentStorageService instance
+        session: UploadSession to complete
+        document: Document the new version belongs to
+
+    Returns:
+        DocumentVersion: The created version
+    """
+    if session.status == 'completed' and session.version_id:
+        return session.version
+    if session.status != 'active':
+        raise ChunkedUploadError(f"Upload is {session.status}")
+
+    parts = list(session.parts.order_by('part_number').values_list('part_number', 'etag'))
+    missing = sorted(set(range(1, session.total_parts + 1)) - {number for number, _ in parts})
+    if missing:
+        raise ChunkedUploadError(f"Missing parts: {', '.join(str(n) for n in missing[:20])}")
+
+    if session.uses_s3:
+        success, result = storage_service.complete_multipart_upload(
+            session.s3_key, session.s3_upload_id, parts
+        )
+        # A retried completion finds the upload already assembled
+        if not success and not storage_service.get_object_metadata(session.s3_key)[0]:
+            raise ChunkedUploadError(result)
+
+    with transaction.atomic():
+        version = DocumentVersion(
+            document=document,
+            file_name=session.file_name,
+            file_size=session.file_size,
+            file_type=session.content_type,
+            notes=session.document_metadata.get('notes', ''),
+            uploaded_by=session.user
+        )
+        if session.uses_s3:
+            version.s3_key = session.s3_key
+            version.save()
+            success, metadata = storage_service.get_object_metadata(session.s3_key)
+            if success:
+                record_upload(version, metadata['etag'])
+        else:
+            paths = [get_chunk_path(session, number) for number, _ in parts]
+            reader = ChunkReader(paths, session.file_size)
+            try:
+                version.file = File(reader, name=session.file_name)
+                version.save()
+            finally:
+                reader.close()
+
+        session.document = document
+        session.status = 'completed'
+        session.version = version
+        session.save(update_fields=['document', 'status', 'version', 'updated_at'])
+
+        if not session.uses_s3:
+            chunk_dir = get_chunk_dir(session)
+            transaction.on_commit(lambda: shutil.rmtree(chunk_dir, ignore_errors=True))
+
+    logger.info(f"Completed chunked upload {session.uuid} as {version}")
+    return version
+
+
+def abort_session(storage_service, session):
+    """Discard an upload and any parts stored for it."""
+    if session.status != 'active':
+        return
+
+    if session.uses_s3:
+        storage_service.abort_multipart_upload(session.s3_key, session.s3_upload_id)
+    else:
+        shutil.rmtree(get_chunk_dir(session), ignore_errors=True)
+
+    session.status = 'aborted'
+    session.save(update_fields=['status', 'updated_at'])
+    logger.info(f"Aborted chunked upload {session.uuid}")
@@ -0,0 +1,84 @@
+import logging
+import threading
+from django.db import connection, transaction
+from aws.services.s3 import DELETE_BATCH_SIZE
+
+from ..models import DocumentBlob, DocumentRendition, DocumentVersion
+from .lifecycle import delete_cold_copy
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+
+
+class DeletionBatch:
+    """
+    Storage deletions collected during one transaction and carried out,
+    in bulk, once it commits.
+    """
+
+    def __init__(self, storage_service):
+        self.storage_service = storage_service
+        self.s3_keys = []
+        self.files = []
+
+    def flush(self):
+        if getattr(_local, 'batch', None) is self:
+            _local.batch = None
+
+        keys = list(dict.fromkeys(self.s3_keys))
+        for start in range(0, len(keys), DELETE_BATCH_SIZE):
+            batch = keys[start:start + DELETE_BATCH_SIZE]
+            # Keys stored again since (or kept by a rolled-back savepoint) stay
+            referenced = set(DocumentVersion.objects.filter(s3_key__in=batch).values_list('s3_key', flat=True))
+            referenced.update(DocumentBlob.objects.filter(s3_key__in=batch).values_list('s3_key', flat=True))
+            referenced.update(DocumentRendition.objects.filter(s3_key__in=batch).values_list('s3_key', flat=True))
+            _, errors = self.storage_service.delete_objects(key for key in batch if key not in referenced)
+            for key, message in errors:
+                logger.error(f"Failed to delete S3 object {key}: {message}")
+
+        for storage, name in self.files:
+            try:
+                storage.delete(name)
+                delete_cold_copy(name)
+            except Exception as e:
+                logger.error(f"Failed to delete local file {name}: {str(e)}")
+
+
+def _current_batch(storage_service):
+    """Return the batch flushed when the current transaction commits."""
+    batch = getattr(_local, 'batch', None)
+    # A batch whose transaction rolled back never flushes; start afresh
+    pending = any(batch.flush in hook for hook in connection.run_on_commit) if batch else False
+    if not pending or batch.storage_service is not storage_service:
+        batch = DeletionBatch(storage_service)
+        _local.batch = batch
+        transaction.on_commit(batch.flush)
+    return batch
+
+
+def delete_after_commit(storage_service, s3_key=None, file_field=None):
+    """
+    Delete an S3 object and/or a local file once the current transaction
+    commits. Deletions queued in the same transaction are sent together,
+    1000 S3 keys per request.
+
+    Outside a transaction the deletion happens immediately.
+
+    Args:
+        storage_service: DocumentStorageService used to delete S3 objects
+        s3_key: Key of the S3 object to delete
+        file_field: FieldFile of a local file to delete
+    """
+    if not connection.in_atomic_block:
+        batch = DeletionBatch(storage_service)
+    else:
+        batch = _current_batch(storage_service)
+
+    if s3_key and storage_service.using_s3:
+        batch.s3_keys.append(s3_key)
+    if file_field:
+        batch.files.append((file_field.storage, file_field.name))
+
+    if not connection.in_atomic_block:
+        batch.flush()
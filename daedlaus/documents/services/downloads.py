@@ -0,0 +1,177 @@
+import logging
+import mimetypes
+import re
+from urllib.parse import quote
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.http import content_disposition_header, http_date
+
+logger = logging.getLogger(__name__)
+
+# Size of the reads used when streaming a byte range
+RANGE_CHUNK_SIZE = 256 * 1024
+
+OFFLOAD_MODES = ('x-accel-redirect', 'x-sendfile')
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class RangeNotSatisfiable(Exception):
+    """Raised when a Range header lies entirely outside the file"""
+
+
+def get_offload_mode():
+    """
+    Return how local files are handed to the front proxy: 'x-accel-redirect'
+    (nginx), 'x-sendfile' (Apache/lighttpd) or None to stream from Django.
+    """
+    mode = (getattr(settings, 'DOCUMENT_DOWNLOAD_OFFLOAD', '') or '').lower()
+    if mode and mode not in OFFLOAD_MODES:
+        logger.warning(f"Unknown DOCUMENT_DOWNLOAD_OFFLOAD mode '{mode}', streaming from Django")
+        return None
+    return mode or None
+
+
+def parse_range(header, size):
+    """
+    Parse a single-range ``Range`` header.
+
+    Multiple ranges and malformed headers are ignored, as RFC 9110 allows,
+    so the caller sends the whole file.
+
+    Args:
+        header: Value of the Range header
+        size: Size of the file in bytes
+
+    Returns:
+        tuple: (first byte, last byte) inclusive, or None for the whole file
+    """
+    match = RANGE_RE.match((header or '').strip())
+    if not match:
+        return None
+
+    first, last = match.groups()
+    if not first:
+        if not last:
+            return None
+        # Suffix range: the final N bytes
+        length = int(last)
+        if length == 0:
+            raise RangeNotSatisfiable()
+        return max(size - length, 0), size - 1
+
+    first = int(first)
+    last = min(int(last), size - 1) if last else size - 1
+    if first >= size:
+        raise RangeNotSatisfiable()
+    if last < first:
+        return None
+    return first, last
+
+
+def iter_range(file_obj, first, last, chunk_size=RANGE_CHUNK_SIZE):
+    """Yield bytes ``first``..``last`` of a file, then close it."""
+    try:
+        file_obj.seek(first)
+        remaining = last - first + 1
+        while remaining > 0:
+            data = file_obj.read(min(chunk_size, remaining))
+            if not data:
+                break
+            remaining -= len(data)
+            yield data
+    finally:
+        file_obj.close()
+
+
+def _offload_response(mode, file_field):
+    """Build an empty response telling the proxy which file to send, or None."""
+    response = HttpResponse()
+    if mode == 'x-accel-redirect':
+        prefix = getattr(settings, 'DOCUMENT_ACCEL_REDIRECT_PREFIX', '/protected-media/')
+        response['X-Accel-Redirect'] = quote(prefix.rstrip('/') + '/' + file_field.name.lstrip('/'))
+    else:
+        try:
+            response['X-Sendfile'] = file_field.path
+        except NotImplementedError:
+            # Storage without local paths; nothing the proxy can serve
+            return None
+    # Let the proxy pick the type from the real file rather than Django's default
+    del response['Content-Type']
+    return response
+
+
+def serve_file(request, file_field, file_name, content_type=None, etag=None, last_modified=None,
+               as_attachment=True):
+    """
+    Send a locally stored file, honouring single byte-range requests.
+
+    With DOCUMENT_DOWNLOAD_OFFLOAD set, the worker returns straight away and
+    the front proxy streams the bytes (and handles ranges itself).
+
+    Args:
+        request: The download request
+        file_field: FieldFile of the stored file
+        file_name: Name offered to the browser
+        content_type: MIME type (guessed from ``file_name`` if omitted)
+        etag: Strong validator for If-Range, e.g. the file's checksum
+        last_modified: Datetime the file was stored
+        as_attachment: Whether the browser should save rather than display it
+
+    Returns:
+        HttpResponse: 200, 206 or 416 response
+    """
+    if not content_type:
+        content_type, _ = mimetypes.guess_type(file_name)
+        content_type = content_type or 'application/octet-stream'
+
+    response = None
+    mode = get_offload_mode()
+    if mode:
+        response = _offload_response(mode, file_field)
+        if response is not None:
+            response['Content-Type'] = content_type
+
+    if response is None:
+        size = file_field.size
+        byte_range = None
+        if request.method == 'GET' and _if_range_matches(request, etag, last_modified):
+            try:
+                byte_range = parse_range(request.headers.get('Range'), size)
+            except RangeNotSatisfiable:
+                response = HttpResponse(status=416)
+                response['Content-Range'] = f'bytes */{size}'
+                return response
+
+        file_obj = file_field.storage.open(file_field.name, 'rb')
+        if byte_range:
+            first, last = byte_range
+            response = StreamingHttpResponse(
+                iter_range(file_obj, first, last), status=206, content_type=content_type
+            )
+            response['Content-Length'] = str(last - first + 1)
+            response['Content-Range'] = f'bytes {first}-{last}/{size}'
+        else:
+            response = FileResponse(file_obj, content_type=content_type)
+            response['Content-Length'] = str(size)
+        response['Accept-Ranges'] = 'bytes'
+
+    response['Content-Disposition'] = content_disposition_header(as_attachment, file_name)
+    if etag:
+        response['ETag'] = f'"{etag}"'
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    return response
+
+
+def _if_range_matches(request, etag, last_modified):
+    """
+    Whether a range may be served: the If-Range validator (if any) must
+    still describe the stored file.
+    """
+    validator = request.headers.get('If-Range')
+    if not validator:
+        return True
+    if validator.startswith('"') or validator.startswith('W/'):
+        return bool(etag) and validator == f'"{etag}"'
+    return bool(last_modified) and validator == http_date(last_modified.timestamp())
@@ -0,0 +1,307 @@
+import codecs
+import logging
+import os
+import shutil
+import tempfile
+import zipfile
+from datetime import timedelta
+from xml.etree import ElementTree
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from ..models import Document, DocumentText, DocumentVersion
+from .s3_service import get_document_service
+from .search import update_search_vectors
+from .streaming import get_chunk_size
+
+logger = logging.getLogger(__name__)
+
+# pypdf is optional; PDFs are marked unsupported without it
+try:
+    from pypdf import PdfReader
+    PYPDF_AVAILABLE = True
+except ImportError:
+    PYPDF_AVAILABLE = False
+
+WORD_NAMESPACE = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+TEXT_TYPES = {'text/plain', 'text/csv', 'text/markdown', 'text/html', 'application/json', 'application/xml', 'text/xml'}
+DOCX_TYPES = {'application/vnd.openxmlformats-officedocument.wordprocessingml.document'}
+PDF_TYPES = {'application/pdf'}
+
+
+class UnsupportedFormat(Exception):
+    """Raised when no extractor handles a file's format"""
+
+
+def get_max_chars():
+    """Return the most characters extracted from a single file."""
+    return getattr(settings, 'DOCUMENT_TEXT_MAX_CHARS', 2000000)
+
+
+class TextCollector:
+    """Accumulates extracted text up to a character limit."""
+
+    def __init__(self, max_chars):
+        self.max_chars = max_chars
+        self.parts = []
+        self.length = 0
+        self.truncated = False
+
+    @property
+    def full(self):
+        return self.length >= self.max_chars
+
+    def add(self, text):
+        if not text or self.full:
+            return
+        remaining = self.max_chars - self.length
+        if len(text) > remaining:
+            text = text[:remaining]
+            self.truncated = True
+        self.parts.append(text)
+        self.length += len(text)
+
+    def text(self):
+        return ''.join(self.parts)
+
+
+def extract_plain_text(file_obj, collector):
+    """Decode a text file chunk by chunk (UTF-8, with a UTF-16 BOM check)."""
+    head = file_obj.read(get_chunk_size())
+    encoding = 'utf-16' if head[:2] in (codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE) else 'utf-8-sig'
+    decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+
+    data = head
+    while data and not collector.full:
+        collector.add(decoder.decode(data))
+        data = file_obj.read(get_chunk_size())
+    if not collector.full:
+        collector.add(decoder.decode(b'', final=True))
+    elif data:
+        collector.truncated = True
+
+
+def extract_docx_text(file_obj, collector):
+    """Stream the paragraphs of a DOCX file's main document part."""
+    try:
+        archive = zipfile.ZipFile(file_obj)
+    except zipfile.BadZipFile as e:
+        raise UnsupportedFormat(f"Not a valid DOCX file: {str(e)}")
+
+    with archive, archive.open('word/document.xml') as part:
+        for _, element in ElementTree.iterparse(part, events=('end',)):
+            tag = element.tag
+            if tag == f'{WORD_NAMESPACE}t':
+                collector.add(element.text)
+            elif tag == f'{WORD_NAMESPACE}tab':
+                collector.add('\t')
+            elif tag in (f'{WORD_NAMESPACE}br', f'{WORD_NAMESPACE}cr'):
+                collector.add('\n')
+            elif tag == f'{WORD_NAMESPACE}p':
+                collector.add('\n')
+                # Finished paragraphs are no longer needed
+                element.clear()
+            if collector.full:
+                break
+
+
+def extract_pdf_text(file_obj, collector):
+    """Extract the text layer of a PDF page by page."""
+    if not PYPDF_AVAILABLE:
+        raise UnsupportedFormat("PDF extraction requires the pypdf package")
+
+    reader = PdfReader(file_obj)
+    for page in reader.pages:
+        collector.add(page.extract_text() or '')
+        collector.add('\n\f')
+        if collector.full:
+            break
+
+
+# Extractor name -> (function, whether it needs a seekable file)
+EXTRACTORS = {
+    'text': (extract_plain_text, False),
+    'docx': (extract_docx_text, True),
+    'pdf': (extract_pdf_text, True),
+}
+
+
+def get_extractor_name(content_type, file_name=''):
+    """
+    Choose the extractor for a file.
+
+    Returns:
+        str: Key into EXTRACTORS, or None if the format is not supported
+    """
+    content_type = (content_type or '').split(';')[0].strip().lower()
+    extension = os.path.splitext(file_name or '')[1].lower()
+
+    if content_type in PDF_TYPES or extension == '.pdf':
+        return 'pdf'
+    if content_type in DOCX_TYPES or extension == '.docx':
+        return 'docx'
+    if content_type in TEXT_TYPES or content_type.startswith('text/') or extension in ('.txt', '.csv', '.md'):
+        return 'text'
+    return None
+
+
+def extract_text(file_obj, content_type, file_name='', max_chars=None):
+    """
+    Extract plain text from a file.
+
+    Formats that need random access (DOCX, PDF) are spooled to a temporary
+    file first when the source cannot seek, e.g. an S3 response body.
+
+    Args:
+        file_obj: File-like object opened for binary reading
+        content_type: MIME type of the file
+        file_name: Original file name, used when the MIME type is generic
+        max_chars: Stop after this many characters
+
+    Returns:
+        tuple: (extractor name, text, whether the text was truncated)
+    """
+    name = get_extractor_name(content_type, file_name)
+    if name is None:
+        raise UnsupportedFormat(f"No text extractor for {content_type or file_name}")
+
+    extractor, needs_seek = EXTRACTORS[name]
+    collector = TextCollector(max_chars or get_max_chars())
+
+    if needs_seek and not _is_seekable(file_obj):
+        with tempfile.SpooledTemporaryFile(max_size=get_chunk_size()) as spool:
+            shutil.copyfileobj(file_obj, spool, get_chunk_size())
+            spool.seek(0)
+            extractor(spool, collector)
+    else:
+        extractor(file_obj, collector)
+
+    return name, collector.text(), collector.truncated
+
+
+def _is_seekable(file_obj):
+    try:
+        return file_obj.seekable()
+    except AttributeError:
+        return False
+
+
+def enqueue_extraction(version):
+    """
+    Queue a document version for text extraction.
+
+    Returns:
+        DocumentText: The queued row
+    """
+    text, created = DocumentText.objects.get_or_create(version=version)
+    if not created and text.status != 'running':
+        DocumentText.objects.filter(pk=text.pk).update(status='pending', attempts=0, error='')
+        text.status = 'pending'
+    return text
+
+
+def claim_extractions(batch_size, retry_failed=False):
+    """
+    Atomically claim a batch of queued versions for extraction.
+
+    Rows left 'running' by a crashed worker are reclaimed once their lease expires.
+
+    Returns:
+        list: Version IDs claimed
+    """
+    now = timezone.now()
+    lease = timedelta(seconds=getattr(settings, 'DOCUMENT_TEXT_LEASE_SECONDS', 3600))
+    due = Q(status='pending') | Q(status='running', locked_at__lt=now - lease)
+    if retry_failed:
+        due |= Q(status='failed')
+
+    with transaction.atomic():
+        ids = list(
+            DocumentText.objects.select_for_update(skip_locked=True)
+            .filter(due)
+            .order_by('version')
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        if ids:
+            DocumentText.objects.filter(pk__in=ids).update(status='running', locked_at=now)
+    return ids
+
+
+def extract_version(version_id, storage_service):
+    """
+    Extract, compress and store the text of one document version, then
+    refresh its document's search vector.
+
+    Identical contents (same checksum) reuse text extracted earlier.
+
+    Args:
+        version_id: ID of a DocumentVersion claimed for extraction
+        storage_service: DocumentStorageService used to read the file
+
+    Returns:
+        tuple: (status, number of characters extracted)
+    """
+    version = DocumentVersion.objects.get(pk=version_id)
+    row = DocumentText.objects.get(pk=version_id)
+    row.attempts += 1
+
+    existing = None
+    if version.checksum:
+        existing = DocumentText.objects.filter(
+            version__checksum=version.checksum, status='done'
+        ).exclude(pk=version_id).first()
+
+    try:
+        if existing is not None:
+            row.extractor = existing.extractor
+            row.content = existing.content
+            row.char_count = existing.char_count
+            row.truncated = existing.truncated
+        else:
+            success, file_obj = storage_service.open_document(version)
+            if not success:
+                raise IOError(file_obj)
+            try:
+                name, text, truncated = extract_text(file_obj, version.file_type, version.file_name)
+            finally:
+                file_obj.close()
+            row.extractor = name
+            row.set_text(text)
+            row.truncated = truncated
+        row.status = 'done'
+        row.error = ''
+        row.extracted_at = timezone.now()
+    except UnsupportedFormat as e:
+        row.status = 'unsupported'
+        row.error = str(e)
+    except Exception as e:
+        logger.error(f"Text extraction failed for version {version_id}: {str(e)}")
+        row.status = 'failed'
+        row.error = str(e)
+
+    row.locked_at = None
+    row.save()
+
+    if row.status == 'done':
+        update_search_vectors(Document.objects.filter(current_version=version_id))
+    return row.status, row.char_count
+
+
+def extract_in_worker(version_id):
+    """
+    Process pool entry point: extract one version using a storage service
+    (and database connection) owned by the worker process.
+
+    Returns:
+        tuple: (version ID, status, number of characters extracted)
+    """
+    try:
+        status, chars = extract_version(version_id, get_document_service())
+    except Exception as e:
+        logger.exception(f"Error extracting text of version {version_id}: {str(e)}")
+        DocumentText.objects.filter(pk=version_id).update(status='failed', error=str(e), locked_at=None)
+        status, chars = 'failed', 0
+    return version_id, status, chars
@@ -0,0 +1,272 @@
+import gzip
+import hashlib
+import logging
+import math
+import re
+import threading
+import time
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from ..models import DocumentVersion, IntegrityCheck
+from .lifecycle import ARCHIVE_STORAGE_CLASSES, LOCAL_COLD_CLASS, cold_file_path, storage_unit
+from .streaming import get_chunk_size
+
+logger = logging.getLogger(__name__)
+
+# ETags of single-part uploads (without SSE-KMS) are the MD5 of the contents
+PLAIN_ETAG = re.compile(r'^[0-9a-f]{32}$')
+
+# Statuses reported as needing attention
+FAILED_STATUSES = ('mismatch', 'missing', 'error')
+
+
+def get_integrity_settings():
+    """
+    Return the scrubber settings.
+
+    Returns:
+        dict: interval_days, workers and rate (MB/s, 0 for unthrottled)
+    """
+    return {
+        'interval_days': getattr(settings, 'DOCUMENT_INTEGRITY_INTERVAL_DAYS', 30),
+        'workers': getattr(settings, 'DOCUMENT_INTEGRITY_WORKERS', 4),
+        'rate': getattr(settings, 'DOCUMENT_INTEGRITY_RATE', 20),
+    }
+
+
+class Throttle:
+    """
+    Limits the combined read rate of all verification threads.
+
+    A token bucket holding up to one second of reads: callers report the
+    bytes they read and sleep once they get ahead of the rate.
+    """
+
+    def __init__(self, bytes_per_second):
+        self.rate = bytes_per_second
+        self._allowance = float(bytes_per_second)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self, size):
+        if not self.rate:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._allowance = min(self._allowance + (now - self._last) * self.rate, self.rate)
+            self._last = now
+            self._allowance -= size
+            wait = -self._allowance / self.rate if self._allowance < 0 else 0
+        if wait:
+            time.sleep(wait)
+
+
+def record_upload(version, etag):
+    """
+    Record the S3 ETag of contents uploaded straight to the bucket, whose
+    SHA-256 the server never saw, as the baseline later checks compare to.
+    """
+    if etag:
+        IntegrityCheck.objects.update_or_create(version=version, defaults={'etag': etag})
+
+
+def integrity_candidates(cutoff):
+    """
+    Versions due for verification, the longest unverified first.
+
+    Args:
+        cutoff: Versions verified before this time are due again
+
+    Returns:
+        QuerySet: DocumentVersions never verified or verified before ``cutoff``
+    """
+    return (
+        DocumentVersion.objects.exclude(file='', s3_key='')
+        .filter(
+            Q(integrity_check__isnull=True) |
+            Q(integrity_check__last_verified_at__isnull=True) |
+            Q(integrity_check__last_verified_at__lt=cutoff)
+        )
+        .order_by(F('integrity_check__last_verified_at').asc(nulls_first=True), 'pk')
+    )
+
+
+def rolling_slice_size(interval_days):
+    """Versions to verify per nightly run so every version is covered once per interval."""
+    total = DocumentVersion.objects.exclude(file='', s3_key='').count()
+    return max(math.ceil(total / max(interval_days, 1)), 1)
+
+
+def read_digests(file_obj, throttle=None):
+    """
+    Read a file to the end, computing its size, SHA-256 and MD5.
+
+    Returns:
+        tuple: (size, sha256 hex digest, md5 hex digest)
+    """
+    sha256 = hashlib.sha256()
+    md5 = hashlib.md5(usedforsecurity=False)
+    size = 0
+    chunk_size = get_chunk_size()
+    while True:
+        data = file_obj.read(chunk_size)
+        if not data:
+            break
+        size += len(data)
+        sha256.update(data)
+        md5.update(data)
+        if throttle is not None:
+            throttle.consume(len(data))
+    return size, sha256.hexdigest(), md5.hexdigest()
+
+
+def verify_version(storage_service, version, quick=False, throttle=None):
+    """
+    Check that a version's stored contents are present and unchanged.
+
+    S3 objects are compared with the ETag recorded for them and, when read,
+    with the version's SHA-256 (and with the ETag itself where it is a plain
+    MD5). Local files, including gzipped cold copies, are read and hashed.
+    Contents without a known SHA-256 have it recorded as the baseline.
+
+    Args:
+        storage_service: DocumentStorageService instance
+        version: DocumentVersion to verify
+        quick: Only compare sizes and ETags, reading the contents only when
+            the ETag changed
+        throttle: Optional Throttle shared by concurrent verifications
+
+    Returns:
+        tuple: (status, detail, dict with the observed 'etag' and 'sha256')
+    """
+    check = IntegrityCheck.objects.filter(version=version).first()
+    expected_sha256 = version.checksum or (check.sha256 if check else '')
+    observed = {'etag': '', 'sha256': ''}
+
+    if storage_service.using_s3 and version.s3_key:
+        success, metadata = storage_service.stat_object(version.s3_key)
+        if not success:
+            return 'error', metadata, observed
+        if metadata is None:
+            return 'missing', f"S3 object {version.s3_key} does not exist", observed
+        observed['etag'] = metadata['etag']
+        if version.file_size is not None and metadata['size'] != version.file_size:
+            return 'mismatch', f"S3 object is {metadata['size']} bytes, expected {version.file_size}", observed
+
+        etag_unchanged = bool(check and check.etag) and check.etag == metadata['etag']
+        readable = metadata['storage_class'] not in ARCHIVE_STORAGE_CLASSES or metadata['restored']
+        if not readable:
+            if check and check.etag and not etag_unchanged:
+                return 'mismatch', "ETag changed while the object is in archive storage", observed
+            return 'ok', "Archived; ETag checked without reading the contents", observed
+        if quick and etag_unchanged:
+            return 'ok', '', observed
+
+        success, body = storage_service.open_object(version.s3_key)
+        if not success:
+            return 'error', body, observed
+        try:
+            size, sha256, md5 = read_digests(body, throttle)
+        finally:
+            body.close()
+        observed['sha256'] = sha256
+        if PLAIN_ETAG.match(metadata['etag']) and md5 != metadata['etag']:
+            return 'mismatch', "Contents read do not match the object's ETag", observed
+        if not expected_sha256 and check and check.etag and not etag_unchanged:
+            return 'mismatch', f"ETag is {metadata['etag']}, recorded {check.etag} at upload", observed
+    else:
+        name = version.file.name
+        is_cold = version.storage_tier == 'cold' and version.storage_class == LOCAL_COLD_CLASS
+        storage = version.file.storage
+        try:
+            if is_cold:
+                file_obj = gzip.open(cold_file_path(name), 'rb')
+            elif not storage.exists(name):
+                return 'missing', f"File {name} does not exist", observed
+            else:
+                if quick:
+                    size = storage.size(name)
+                    if version.file_size is not None and size != version.file_size:
+                        return 'mismatch', f"File is {size} bytes, expected {version.file_size}", observed
+                    return 'ok', '', observed
+                file_obj = storage.open(name, 'rb')
+        except FileNotFoundError:
+            return 'missing', f"Cold copy of {name} does not exist", observed
+        except Exception as e:
+            return 'error', f"Failed to open {name}: {str(e)}", observed
+        try:
+            size, sha256, _ = read_digests(file_obj, throttle)
+        except Exception as e:
+            return 'error', f"Failed to read {name}: {str(e)}", observed
+        finally:
+            file_obj.close()
+        observed['sha256'] = sha256
+
+    if version.file_size is not None and size != version.file_size:
+        return 'mismatch', f"Read {size} bytes, expected {version.file_size}", observed
+    if expected_sha256 and sha256 != expected_sha256:
+        return 'mismatch', f"SHA-256 is {sha256}, expected {expected_sha256}", observed
+    if not expected_sha256:
+        return 'ok', "SHA-256 recorded as the baseline", observed
+    return 'ok', '', observed
+
+
+def record_result(version, status, detail='', observed=None, now=None):
+    """
+    Store a verification result on the version and every version sharing
+    its contents.
+
+    A successful check updates the recorded ETag and SHA-256, so an object
+    rewritten with the same bytes (e.g. by a storage class change) becomes
+    the new baseline. Failures keep the baseline and record when they began.
+
+    Returns:
+        int: Number of versions updated
+    """
+    observed = observed or {}
+    now = now or timezone.now()
+    version_ids = list(storage_unit(version).values_list('pk', flat=True))
+    fields = {'status': status, 'detail': detail, 'last_verified_at': now}
+    if status == 'ok':
+        fields['failed_since'] = None
+        fields.update({name: value for name, value in observed.items() if value})
+
+    with transaction.atomic():
+        IntegrityCheck.objects.bulk_create(
+            [IntegrityCheck(version_id=pk) for pk in version_ids], ignore_conflicts=True
+        )
+        checks = IntegrityCheck.objects.filter(version_id__in=version_ids)
+        updated = checks.update(**fields)
+        if status != 'ok':
+            checks.filter(failed_since__isnull=True).update(failed_since=now)
+
+    if status != 'ok':
+        logger.warning(f"Integrity check of version {version.pk} failed ({status}): {detail}")
+    return updated
+
+
+def scrub_version(storage_service, version, quick=False, throttle=None):
+    """
+    Verify a version and record the result.
+
+    Returns:
+        tuple: (status, detail)
+    """
+    try:
+        status, detail, observed = verify_version(storage_service, version, quick, throttle)
+    except Exception as e:
+        status, detail, observed = 'error', str(e), {}
+    record_result(version, status, detail, observed)
+    return status, detail
+
+
+def failed_checks():
+    """Integrity checks whose last verification failed, the oldest failures first."""
+    return (
+        IntegrityCheck.objects.filter(status__in=FAILED_STATUSES)
+        .select_related('version__document')
+        .order_by('failed_since', 'pk')
+    )
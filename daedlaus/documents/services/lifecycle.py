@@ -0,0 +1,219 @@
+import gzip
+import logging
+import os
+import shutil
+from datetime import timedelta
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef, Q
+from django.utils import timezone
+
+from ..models import DocumentVersion
+from .streaming import get_chunk_size
+
+logger = logging.getLogger(__name__)
+
+# storage_class of versions compressed into the local cold directory
+LOCAL_COLD_CLASS = 'gzip'
+
+# S3 storage classes whose objects must be restored before they can be read
+ARCHIVE_STORAGE_CLASSES = ('GLACIER', 'DEEP_ARCHIVE')
+
+
+def get_lifecycle_settings():
+    """
+    Return the lifecycle policy settings.
+
+    Returns:
+        dict: archived_days, noncurrent_days, restore_days, storage_class,
+            cold_root and archive_restore_days
+    """
+    return {
+        'archived_days': getattr(settings, 'DOCUMENT_LIFECYCLE_ARCHIVED_DAYS', 30),
+        'noncurrent_days': getattr(settings, 'DOCUMENT_LIFECYCLE_NONCURRENT_DAYS', 90),
+        'restore_days': getattr(settings, 'DOCUMENT_LIFECYCLE_RESTORE_DAYS', 30),
+        'storage_class': getattr(settings, 'DOCUMENT_COLD_STORAGE_CLASS', 'GLACIER_IR'),
+        'cold_root': getattr(settings, 'DOCUMENT_COLD_STORAGE_ROOT', os.path.join(settings.BASE_DIR, 'cold_storage')),
+        'archive_restore_days': getattr(settings, 'DOCUMENT_ARCHIVE_RESTORE_DAYS', 7),
+    }
+
+
+def cold_file_path(name):
+    """Path of the compressed cold copy of a locally stored file."""
+    return os.path.join(get_lifecycle_settings()['cold_root'], name + '.gz')
+
+
+def needs_restore(version):
+    """
+    Whether a version's contents must be restored before they can be read.
+
+    S3 classes with instant access (STANDARD_IA, GLACIER_IR, ...) are read in place.
+    """
+    if version.storage_tier != 'cold':
+        return False
+    return version.storage_class == LOCAL_COLD_CLASS or version.storage_class in ARCHIVE_STORAGE_CLASSES
+
+
+def storage_unit(version):
+    """
+    Versions whose contents are stored in the same place as ``version``'s.
+
+    Blob-backed versions share their blob's file or object, so they change
+    tier together.
+    """
+    if version.blob_id:
+        return DocumentVersion.objects.filter(blob_id=version.blob_id)
+    return DocumentVersion.objects.filter(pk=version.pk)
+
+
+def lifecycle_candidates(now=None):
+    """
+    Versions the lifecycle policy moves to the cold tier.
+
+    A version is due when its document has been archived for
+    ``archived_days`` (counted from ``Document.archived_at``, so later edits
+    to an archived document do not restart the clock), or when it is not
+    the current version and was uploaded more than ``noncurrent_days`` ago.
+    Versions restored within ``restore_days`` are left hot, and shared
+    contents only move once every version using them is due.
+
+    Returns:
+        QuerySet: Hot DocumentVersions that are due
+    """
+    policy = get_lifecycle_settings()
+    now = now or timezone.now()
+    due = (
+        Q(document__status='archived', document__archived_at__lt=now - timedelta(days=policy['archived_days'])) |
+        (Q(uploaded_at__lt=now - timedelta(days=policy['noncurrent_days'])) &
+         ~Q(document__current_version=F('pk')))
+    )
+    settled = Q(tier_changed_at__isnull=True) | Q(tier_changed_at__lt=now - timedelta(days=policy['restore_days']))
+    # A hot version sharing the contents that is not due keeps them hot
+    blocking = DocumentVersion.objects.filter(
+        blob_id=OuterRef('blob_id'), storage_tier='hot'
+    ).exclude(due & settled)
+
+    return (
+        DocumentVersion.objects.filter(due, settled, storage_tier='hot', storage_status='uploaded')
+        .exclude(file='', s3_key='')
+        .exclude(Exists(blocking))
+    )
+
+
+def _compress_local(version):
+    storage = version.file.storage
+    path = cold_file_path(version.file.name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    partial = path + '.partial'
+    with storage.open(version.file.name, 'rb') as source, gzip.open(partial, 'wb', compresslevel=6) as target:
+        shutil.copyfileobj(source, target, get_chunk_size())
+    os.replace(partial, path)
+
+
+def move_to_cold(storage_service, version, storage_class=None):
+    """
+    Move a version's contents (and every version sharing them) to the cold tier.
+
+    S3 objects are copied in place to the cold storage class; local files
+    are gzipped into the cold directory and the hot copy deleted once the
+    tier change commits.
+
+    Args:
+        storage_service: DocumentStorageService instance
+        version: DocumentVersion to move
+        storage_class: S3 storage class (defaults to DOCUMENT_COLD_STORAGE_CLASS)
+
+    Returns:
+        tuple: (success, storage class or error message)
+    """
+    try:
+        if storage_service.using_s3 and version.s3_key:
+            storage_class = storage_class or get_lifecycle_settings()['storage_class']
+            success, result = storage_service.set_storage_class(version.s3_key, storage_class)
+            if not success:
+                return False, result
+        elif version.file:
+            storage_class = LOCAL_COLD_CLASS
+            _compress_local(version)
+        else:
+            return False, "Version has no stored contents"
+
+        with transaction.atomic():
+            moved = storage_unit(version).filter(storage_tier='hot').update(
+                storage_tier='cold', storage_class=storage_class, tier_changed_at=timezone.now()
+            )
+
+        if storage_class == LOCAL_COLD_CLASS:
+            name = version.file.name
+            storage = version.file.storage
+
+            def delete_hot_copy():
+                # A download may have restored the contents in the meantime
+                if not DocumentVersion.objects.filter(file=name, storage_tier='hot').exists():
+                    storage.delete(name)
+
+            transaction.on_commit(delete_hot_copy)
+        logger.info(f"Moved {moved} version(s) sharing the contents of {version.pk} to {storage_class}")
+        return True, storage_class
+    except Exception as e:
+        logger.error(f"Error moving version {version.pk} to cold storage: {str(e)}")
+        return False, str(e)
+
+
+def restore_version(storage_service, version):
+    """
+    Make cold contents readable again.
+
+    Local cold copies are decompressed back into hot storage and the
+    versions sharing them marked hot. Objects in S3 archive classes get a
+    temporary restored copy, which becomes readable some hours later;
+    other S3 classes are readable in place.
+
+    Args:
+        storage_service: DocumentStorageService instance
+        version: DocumentVersion to read (updated in place when restored)
+
+    Returns:
+        tuple: (success, message); success is False while an archive
+            restore is still in progress
+    """
+    if not needs_restore(version):
+        return True, "Contents are readable"
+
+    if version.storage_class in ARCHIVE_STORAGE_CLASSES:
+        return storage_service.restore_archived_object(
+            version.s3_key, get_lifecycle_settings()['archive_restore_days']
+        )
+
+    name = version.file.name
+    path = cold_file_path(name)
+    storage = version.file.storage
+    try:
+        with transaction.atomic():
+            # Concurrent downloads of the same contents wait here for the first restore
+            rows = list(storage_unit(version).select_for_update().values_list('storage_tier', flat=True))
+            if 'cold' in rows:
+                if not storage.exists(name):
+                    with gzip.open(path, 'rb') as source:
+                        saved = storage.save(name, File(source, name=os.path.basename(name)))
+                    if saved != name:
+                        storage.delete(saved)
+                        raise IOError(f"Could not restore {name}: stored as {saved}")
+                storage_unit(version).update(storage_tier='hot', storage_class='', tier_changed_at=timezone.now())
+                transaction.on_commit(lambda: delete_cold_copy(name))
+    except Exception as e:
+        logger.error(f"Error restoring version {version.pk} from cold storage: {str(e)}")
+        return False, f"Failed to restore document: {str(e)}"
+
+    version.storage_tier = 'hot'
+    version.storage_class = ''
+    logger.info(f"Restored {name} from cold storage")
+    return True, "Contents restored"
+
+
+def delete_cold_copy(name):
+    """Delete the local cold copy of a stored file, if there is one."""
+    path = cold_file_path(name)
+    if os.path.exists(path):
+        os.remove(path)
@@ -0,0 +1,158 @@
+import logging
+import threading
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from ..models import DocumentAccess
+
+logger = logging.getLogger(__name__)
+
+# Model permission that opens every private document, per action
+ACTION_PERMISSIONS = {
+    'view': 'documents.view_document',
+    'download': 'documents.download_document',
+}
+
+
+class DocumentPermissionResolver:
+    """
+    Resolves which private documents a user was granted access to.
+
+    Creators always reach their own documents. A user's unexpired
+    DocumentAccess grants are read in one query and cached under the
+    configured cache alias until the earliest grant expires (or the cache
+    timeout passes, whichever is sooner). Grant changes drop the user's
+    entry once they commit. The result is also memoized on the user
+    object, so one request reads it at most once.
+    """
+
+    def __init__(self, timeout=None, cache_alias=None):
+        self.timeout = timeout if timeout is not None else getattr(
+            settings, 'DOCUMENT_PERMISSION_CACHE_TIMEOUT', 300
+        )
+        self.cache_alias = cache_alias or getattr(settings, 'DOCUMENT_PERMISSION_CACHE_ALIAS', 'default')
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def cache(self):
+        from django.core.cache import caches
+        return caches[self.cache_alias]
+
+    @staticmethod
+    def make_key(user_id):
+        return f"documents:grants:{user_id}"
+
+    def granted_document_ids(self, user):
+        """
+        Return the IDs of documents the user holds an unexpired grant for.
+
+        Args:
+            user: User to resolve
+
+        Returns:
+            frozenset: Document IDs (empty for anonymous users)
+        """
+        if user is None or not getattr(user, 'is_authenticated', False):
+            return frozenset()
+
+        now = timezone.now()
+        memo = getattr(user, '_document_grants', None)
+        if memo is not None and (memo[1] is None or memo[1] > now):
+            return memo[0]
+
+        key = self.make_key(user.pk)
+        entry = self.cache.get(key) if self.timeout else None
+        if entry is not None and (entry[1] is None or entry[1] > now):
+            with self._lock:
+                self.hits += 1
+        else:
+            entry = self._load(user.pk, now)
+            with self._lock:
+                self.misses += 1
+            if self.timeout:
+                timeout = self.timeout
+                if entry[1] is not None:
+                    timeout = max(min(timeout, int((entry[1] - now).total_seconds())), 1)
+                self.cache.set(key, entry, timeout)
+
+        user._document_grants = entry
+        return entry[0]
+
+    @staticmethod
+    def _load(user_id, now):
+        grants = (
+            DocumentAccess.objects.filter(user_id=user_id)
+            .filter(Q(expires_at__isnull=True) | Q(expires_at__gt=now))
+            .values_list('document_id', 'expires_at')
+        )
+        document_ids = set()
+        next_expiry = None
+        for document_id, expires_at in grants:
+            document_ids.add(document_id)
+            if expires_at is not None and (next_expiry is None or expires_at < next_expiry):
+                next_expiry = expires_at
+        # The entry is only valid until the first grant in it runs out
+        return frozenset(document_ids), next_expiry
+
+    def has_full_access(self, user, action='view'):
+        """Whether a model permission lets the user open every private document."""
+        return user is not None and user.has_perm(ACTION_PERMISSIONS[action])
+
+    def can_access(self, user, document, action='view'):
+        """
+        Check whether a user may view or download a document.
+
+        Args:
+            user: User requesting access
+            document: Document instance
+            action: 'view' or 'download'
+
+        Returns:
+            bool: True if the document is public, the user created it or
+                holds an unexpired grant, or a model permission covers every
+                document
+        """
+        if not document.is_private:
+            return True
+        if document.created_by_id is not None and document.created_by_id == getattr(user, 'pk', None):
+            return True
+        if self.has_full_access(user, action):
+            return True
+        return document.pk in self.granted_document_ids(user)
+
+    def filter_queryset(self, queryset, user, action='view'):
+        """Restrict a Document queryset to what the user may view or download."""
+        if self.has_full_access(user, action):
+            return queryset
+        visible = Q(is_private=False) | Q(pk__in=self.granted_document_ids(user))
+        if user is not None and getattr(user, 'is_authenticated', False):
+            visible |= Q(created_by_id=user.pk)
+        return queryset.filter(visible)
+
+    def invalidate(self, user_id):
+        """Forget the cached grants of one user."""
+        self.cache.delete(self.make_key(user_id))
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+_resolver = None
+_resolver_lock = threading.Lock()
+
+
+def get_permission_resolver():
+    """Return the process-wide permission resolver, creating it on first use."""
+    global _resolver
+    if _resolver is None:
+        with _resolver_lock:
+            if _resolver is None:
+                _resolver = DocumentPermissionResolver()
+    return _resolver
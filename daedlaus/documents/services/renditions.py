@@ -0,0 +1,332 @@
+import io
+import logging
+import shutil
+import tempfile
+import textwrap
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from PIL import Image, ImageDraw, ImageFont, ImageOps
+
+from ..models import DocumentRendition, DocumentVersion
+from .extraction import PYPDF_AVAILABLE, UnsupportedFormat, extract_text, get_extractor_name
+from .s3_service import get_document_service
+from .streaming import get_chunk_size
+
+if PYPDF_AVAILABLE:
+    from pypdf import PdfReader
+
+logger = logging.getLogger(__name__)
+
+RENDITION_CONTENT_TYPE = 'image/jpeg'
+JPEG_QUALITY = 82
+
+# Text cards: page proportions (A4), margins and characters read from the source
+PAGE_RATIO = 1.414
+TEXT_CARD_CHARS = 4000
+TEXT_CARD_COLUMNS = 60
+
+
+def get_rendition_sizes():
+    """
+    Return the longest edge, in pixels, of each rendition kind.
+
+    Returns:
+        dict: Kind -> size
+    """
+    return {
+        'thumbnail': getattr(settings, 'DOCUMENT_THUMBNAIL_SIZE', 256),
+        'preview': getattr(settings, 'DOCUMENT_PREVIEW_SIZE', 1200),
+    }
+
+
+def enqueue_renditions(version):
+    """
+    Queue thumbnail and preview rendering for a version's contents.
+
+    Contents that were rendered before (same checksum) are not queued
+    again; versions without a checksum are picked up by the backfill.
+
+    Returns:
+        int: Number of renditions queued
+    """
+    if not version.checksum:
+        return 0
+
+    existing = set(
+        DocumentRendition.objects.filter(content_hash=version.checksum).values_list('kind', flat=True)
+    )
+    missing = [kind for kind in get_rendition_sizes() if kind not in existing]
+    DocumentRendition.objects.bulk_create(
+        [DocumentRendition(content_hash=version.checksum, kind=kind, source_version=version) for kind in missing],
+        ignore_conflicts=True
+    )
+    # Rows left without a source when their version was deleted can use this one
+    if existing:
+        DocumentRendition.objects.filter(
+            content_hash=version.checksum, source_version__isnull=True
+        ).update(source_version=version)
+    return len(missing)
+
+
+def claim_renditions(batch_size, retry_failed=False):
+    """
+    Atomically claim queued renditions, grouped by source contents.
+
+    Returns:
+        list: Content hashes claimed; every kind pending for a hash is
+            rendered from a single read of the source
+    """
+    now = timezone.now()
+    lease = timedelta(seconds=getattr(settings, 'DOCUMENT_RENDITION_LEASE_SECONDS', 3600))
+    due = Q(status='pending') | Q(status='running', locked_at__lt=now - lease)
+    if retry_failed:
+        due |= Q(status='failed')
+
+    with transaction.atomic():
+        rows = list(
+            DocumentRendition.objects.select_for_update(skip_locked=True)
+            .filter(due)
+            .order_by('id')
+            .values_list('pk', 'content_hash')[:batch_size]
+        )
+        if rows:
+            DocumentRendition.objects.filter(pk__in=[pk for pk, _ in rows]).update(
+                status='running', locked_at=now
+            )
+    return list(dict.fromkeys(content_hash for _, content_hash in rows))
+
+
+def flatten(image):
+    """Convert any Pillow image to RGB, putting transparent areas on white."""
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, 'white')
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def render_text_card(text, width):
+    """Draw the start of a document's text on a page-shaped white image."""
+    height = int(width * PAGE_RATIO)
+    margin = width // 12
+    font_size = max(width // 45, 10)
+    try:
+        font = ImageFont.load_default(size=font_size)
+    except TypeError:
+        font = ImageFont.load_default()
+
+    card = Image.new('RGB', (width, height), 'white')
+    draw = ImageDraw.Draw(card)
+    line_height = int(font_size * 1.4)
+    y = margin
+    for paragraph in text.splitlines():
+        for line in textwrap.wrap(paragraph, TEXT_CARD_COLUMNS) or ['']:
+            if y + line_height > height - margin:
+                return card
+            draw.text((margin, y), line, fill=(40, 40, 40), font=font)
+            y += line_height
+    return card
+
+
+def _first_page_image(file_obj):
+    """
+    Return the largest image on the first page of a PDF (scanned pages are
+    a single image), or the page's text if it has none.
+
+    Returns:
+        tuple: (Pillow image or None, text)
+    """
+    if not PYPDF_AVAILABLE:
+        raise UnsupportedFormat("PDF rendering requires the pypdf package")
+
+    page = PdfReader(file_obj).pages[0]
+    best = None
+    for embedded in page.images:
+        image = embedded.image
+        if best is None or image.width * image.height > best.width * best.height:
+            best = image
+    if best is not None:
+        return best, ''
+    return None, page.extract_text() or ''
+
+
+def load_source_image(file_obj, content_type, file_name, max_size):
+    """
+    Decode the image that renditions of a file are made from.
+
+    Images are decoded at reduced resolution where the format allows it;
+    PDFs use their first page; other text formats become a text card.
+
+    Args:
+        file_obj: Seekable file opened for binary reading
+        content_type: MIME type of the file
+        file_name: Original file name
+        max_size: Largest rendition edge that will be produced
+
+    Returns:
+        tuple: (renderer name, Pillow image)
+    """
+    content_type = (content_type or '').split(';')[0].strip().lower()
+    if content_type.startswith('image/'):
+        try:
+            image = Image.open(file_obj)
+        except Exception as e:
+            raise UnsupportedFormat(f"Unreadable image: {str(e)}")
+        # JPEGs can be decoded at a fraction of their size directly
+        image.draft('RGB', (max_size, max_size))
+        return 'image', ImageOps.exif_transpose(image)
+
+    extractor = get_extractor_name(content_type, file_name)
+    if extractor == 'pdf':
+        image, text = _first_page_image(file_obj)
+        if image is not None:
+            return 'pdf', image
+        return 'pdf', render_text_card(text, max_size)
+    if extractor is not None:
+        _, text, _ = extract_text(file_obj, content_type, file_name, max_chars=TEXT_CARD_CHARS)
+        return 'text', render_text_card(text, max_size)
+
+    raise UnsupportedFormat(f"No renderer for {content_type or file_name}")
+
+
+def encode_rendition(image, size):
+    """
+    Scale an image to fit a square of ``size`` pixels and encode it as JPEG.
+
+    Returns:
+        tuple: (JPEG bytes, scaled image)
+    """
+    image = flatten(image.copy())
+    image.thumbnail((size, size), Image.LANCZOS)
+    output = io.BytesIO()
+    image.save(output, 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+    return output.getvalue(), image
+
+
+def _source_version(content_hash, rows):
+    for row in rows:
+        if row.source_version_id:
+            return row.source_version
+    return DocumentVersion.objects.filter(checksum=content_hash).order_by('-pk').first()
+
+
+def render_contents(content_hash, storage_service):
+    """
+    Render every claimed rendition of one set of contents.
+
+    The source is read and decoded once; each kind is then scaled from
+    the same image and stored through the storage service.
+
+    Args:
+        content_hash: SHA-256 of the contents, as returned by claim_renditions
+        storage_service: DocumentStorageService used to read and store files
+
+    Returns:
+        tuple: (status, number of renditions stored)
+    """
+    rows = list(
+        DocumentRendition.objects.filter(content_hash=content_hash, status='running')
+        .select_related('source_version')
+    )
+    if not rows:
+        return 'done', 0
+
+    sizes = get_rendition_sizes()
+    status, error, stored = 'done', '', 0
+    renderer = ''
+    try:
+        version = _source_version(content_hash, rows)
+        if version is None:
+            raise IOError("No document version has these contents any more")
+
+        success, file_obj = storage_service.open_document(version)
+        if not success:
+            raise IOError(file_obj)
+        with tempfile.SpooledTemporaryFile(max_size=get_chunk_size()) as spool:
+            try:
+                shutil.copyfileobj(file_obj, spool, get_chunk_size())
+            finally:
+                file_obj.close()
+            spool.seek(0)
+            renderer, image = load_source_image(
+                spool, version.file_type, version.file_name, max(sizes[row.kind] for row in rows)
+            )
+            image.load()
+
+        # Largest first, so each smaller kind scales an already reduced image
+        for row in sorted(rows, key=lambda row: -sizes[row.kind]):
+            data, image = encode_rendition(image, sizes[row.kind])
+            row.width, row.height = image.size
+            row.content_type = RENDITION_CONTENT_TYPE
+            row.size = len(data)
+            success, result = storage_service.store_rendition(row, data)
+            if not success:
+                raise IOError(result)
+            stored += 1
+    except UnsupportedFormat as e:
+        status, error = 'unsupported', str(e)
+    except Exception as e:
+        logger.error(f"Rendering failed for contents {content_hash}: {str(e)}")
+        status, error = 'failed', str(e)
+
+    now = timezone.now()
+    for row in rows:
+        row.attempts += 1
+        row.status = status
+        row.error = error
+        row.renderer = renderer
+        row.locked_at = None
+        if row.status == 'done':
+            row.rendered_at = now
+        row.save()
+    return status, stored
+
+
+def renditions_for_versions(versions, kind=None):
+    """
+    Look up the finished renditions of many versions in one query.
+
+    Args:
+        versions: Iterable of DocumentVersion instances
+        kind: Only return this kind
+
+    Returns:
+        dict: DocumentVersion ID -> {kind: DocumentRendition}
+    """
+    versions = [version for version in versions if version is not None and version.checksum]
+    if not versions:
+        return {}
+
+    renditions = DocumentRendition.objects.filter(
+        content_hash__in={version.checksum for version in versions}, status='done'
+    )
+    if kind:
+        renditions = renditions.filter(kind=kind)
+
+    by_hash = {}
+    for rendition in renditions:
+        by_hash.setdefault(rendition.content_hash, {})[rendition.kind] = rendition
+    return {version.pk: by_hash[version.checksum] for version in versions if version.checksum in by_hash}
+
+
+def render_in_worker(content_hash):
+    """
+    Process pool entry point: render one set of contents using a storage
+    service (and database connection) owned by the worker process.
+
+    Returns:
+        tuple: (content hash, status, number of renditions stored)
+    """
+    try:
+        status, stored = render_contents(content_hash, get_document_service())
+    except Exception as e:
+        logger.exception(f"Error rendering contents {content_hash}: {str(e)}")
+        DocumentRendition.objects.filter(content_hash=content_hash, status='running').update(
+            status='failed', error=str(e), locked_at=None
+        )
+        status, stored = 'failed', 0
+    return content_hash, status, stored
@@ -1,8 +1,17 @@
 import logging
 import mimetypes
 import os
+import threading
+import time
 from django.conf import settings
-from aws.utils import get_aws_session, get_active_s3_config, BOTO3_AVAILABLE
+from django.core.files.base import ContentFile
+from django.utils.http import content_disposition_header
+from aws.services.s3 import delete_bucket_objects, iter_bucket_objects
+from aws.clients import get_client
+from aws.utils import get_active_s3_config, BOTO3_AVAILABLE
+from .lifecycle import restore_version
+from .streaming import stream_to_storage
+from .url_cache import get_url_cache
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +26,8 @@ class DocumentStorageService:
         self.s3_client = None
         self.s3_config = None
         self.using_s3 = False
+        self.url_cache = get_url_cache()
+        self.config_signature = None
         
         # Check if we should use S3
         if BOTO3_AVAILABLE:
@@ -25,11 +36,11 @@ class DocumentStorageService:
             
             if media_config:
                 try:
-                    # Create S3 client
-                    session = get_aws_session(media_config)
-                    self.s3_client = session.client('s3')
+                    # Shared client from the process-wide registry
+                    self.s3_client = get_client(media_config, 's3')
                     self.s3_config = media_config
                     self.using_s3 = True
+                    self.config_signature = (media_config.pk, media_config.updated_at)
                     logger.info(f"Using S3 bucket '{media_config.bucket_name}' for document storage")
                 except Exception as e:
                     logger.error(f"Error initializing S3 for document storage: {str(e)}")
@@ -68,12 +79,23 @@ class DocumentStorageService:
         Returns:
             tuple: (success, S3 key or error message)
         """
-        # Generate S3 key based on document
-        doc = document_version.document
-        s3_key = f"documents/{doc.uuid}/{document_version.version_number}/{document_version.file_name}"
+        blob = document_version.blob
+        if blob is not None and blob.s3_key:
+            # Identical contents are already in the bucket
+            document_version.s3_key = blob.s3_key
+            document_version.save(update_fields=['s3_key'])
+            logger.info(f"Reused S3 object for document: {blob.s3_key}")
+            return True, blob.s3_key
         
-        # Determine content type
-        content_type, _ = mimetypes.guess_type(document_version.file_name)
+        # Generate S3 key based on the contents, or on the document for
+        # versions stored before content addressing
+        doc = document_version.document
+        if blob is not None:
+            s3_key = blob.storage_key
+            content_type = blob.content_type
+        else:
+            s3_key = f"documents/{doc.uuid}/{document_version.version_number}/{document_version.file_name}"
+            content_type, _ = mimetypes.guess_type(document_version.file_name)
         
         # Set extra args for upload
         extra_args = {
@@ -81,8 +103,9 @@ class DocumentStorageService:
             'ServerSideEncryption': 'AES256',  # Enable encryption
         }
         
-        # If file is private, add private ACL
-        if doc.is_private:
+        # If file is private, add private ACL (blobs may be shared by private
+        # documents, so they always are)
+        if doc.is_private or blob is not None:
             extra_args['ACL'] = 'private'
         
         try:
@@ -94,9 +117,14 @@ class DocumentStorageService:
                 ExtraArgs=extra_args
             )
             
-            # Store S3 key in document version
+            # Store S3 key in document version, and on the blob so versions
+            # sharing the contents need no upload of their own
             document_version.s3_key = s3_key
             document_version.save(update_fields=['s3_key'])
+            if blob is not None:
+                blob.s3_key = s3_key
+                blob.save(update_fields=['s3_key'])
+                blob.versions.filter(s3_key='').update(s3_key=s3_key)
             
             logger.info(f"Uploaded document to S3: {s3_key}")
             return True, s3_key
@@ -105,6 +133,422 @@ class DocumentStorageService:
             logger.error(f"S3 upload error: {str(e)}")
             return False, f"Failed to upload to S3: {str(e)}"
     
+    def create_presigned_post(self, s3_key, content_type=None, max_size=None, is_private=True, expires=3600):
+        """
+        Generate a presigned POST so a browser can upload a file straight to S3.
+        
+        The policy pins the key, content type and encryption, and limits the
+        upload size, so the client cannot write anything else to the bucket.
+        
+        Args:
+            s3_key: Object key the upload must be stored under
+            content_type: MIME type the client will send
+            max_size: Maximum allowed upload size in bytes
+            is_private: Whether to enforce a private ACL
+            expires: Policy expiration time in seconds
+            
+        Returns:
+            tuple: (success, dict with 'url' and 'fields' or error message)
+        """
+        if not self.using_s3:
+            return False, "Direct uploads require S3 storage"
+        
+        content_type = content_type or 'application/octet-stream'
+        fields = {
+            'Content-Type': content_type,
+            'x-amz-server-side-encryption': 'AES256',
+        }
+        conditions = [
+            {'Content-Type': content_type},
+            {'x-amz-server-side-encryption': 'AES256'},
+        ]
+        if is_private:
+            fields['acl'] = 'private'
+            conditions.append({'acl': 'private'})
+        if max_size:
+            conditions.append(['content-length-range', 1, max_size])
+        
+        try:
+            presigned = self.s3_client.generate_presigned_post(
+                Bucket=self.s3_config.bucket_name,
+                Key=s3_key,
+                Fields=fields,
+                Conditions=conditions,
+                ExpiresIn=expires
+            )
+            return True, presigned
+        except Exception as e:
+            logger.error(f"Error generating presigned POST: {str(e)}")
+            return False, f"Failed to prepare direct upload: {str(e)}"
+    
+    def create_multipart_upload(self, s3_key, content_type=None, is_private=True):
+        """
+        Start an S3 multipart upload.
+        
+        Args:
+            s3_key: Object key the upload will be stored under
+            content_type: MIME type of the final object
+            is_private: Whether to apply a private ACL
+            
+        Returns:
+            tuple: (success, upload ID or error message)
+        """
+        if not self.using_s3:
+            return False, "Multipart uploads require S3 storage"
+        
+        extra_args = {
+            'ContentType': content_type or 'application/octet-stream',
+            'ServerSideEncryption': 'AES256',
+        }
+        if is_private:
+            extra_args['ACL'] = 'private'
+        
+        try:
+            response = self.s3_client.create_multipart_upload(
+                Bucket=self.s3_config.bucket_name,
+                Key=s3_key,
+                **extra_args
+            )
+            return True, response['UploadId']
+        except Exception as e:
+            logger.error(f"Error starting multipart upload for {s3_key}: {str(e)}")
+            return False, f"Failed to start multipart upload: {str(e)}"
+    
+    def upload_part(self, s3_key, upload_id, part_number, file_obj, size):
+        """
+        Upload one part of a multipart upload.
+        
+        Args:
+            s3_key: Object key of the multipart upload
+            upload_id: Multipart upload ID
+            part_number: 1-based part number
+            file_obj: Seekable file object holding the part data
+            size: Size of the part in bytes
+            
+        Returns:
+            tuple: (success, ETag or error message)
+        """
+        try:
+            response = self.s3_client.upload_part(
+                Bucket=self.s3_config.bucket_name,
+                Key=s3_key,
+                UploadId=upload_id,
+                PartNumber=part_number,
+                Body=file_obj,
+                ContentLength=size
+            )
+            return True, response['ETag'].strip('"')
+        except Exception as e:
+            logger.error(f"Error uploading part {part_number} of {s3_key}: {str(e)}")
+            return False, f"Failed to upload part {part_number}: {str(e)}"
+    
+    def complete_multipart_upload(self, s3_key, upload_id, parts):
+        """
+        Assemble the uploaded parts into the final S3 object.
+        
+        Args:
+            s3_key: Object key of the multipart upload
+            upload_id: Multipart upload ID
+            parts: Iterable of (part_number, etag) tuples
+            
+        Returns:
+            tuple: (success, S3 key or error message)
+        """
+        try:
+            self.s3_client.complete_multipart_upload(
+                Bucket=self.s3_config.bucket_name,
+                Key=s3_key,
+                UploadId=upload_id,
+                MultipartUpload={
+                    'Parts': [
+                        {'PartNumber': number, 'ETag': f'"{etag}"'}
+                        for number, etag in sorted(parts)
+                    ]
+                }
+            )
+            logger.info(f"Completed multipart upload to S3: {s3_key}")
+            return True, s3_key
+        except Exception as e:
+            logger.error(f"Error completing multipart upload for {s3_key}: {str(e)}")
+            return False, f"Failed to complete multipart upload: {str(e)}"
+    
+    def abort_multipart_upload(self, s3_key, upload_id):
+        """
+        Abort a multipart upload and discard its parts.
+        
+        Returns:
+            tuple: (success, message)
+        """
+        try:
+            self.s3_client.abort_multipart_upload(
+                Bucket=self.s3_config.bucket_name,
+                Key=s3_key,
+                UploadId=upload_id
+            )
+            return True, "Multipart upload aborted"
+        except Exception as e:
+            logger.error(f"Error aborting multipart upload for {s3_key}: {str(e)}")
+            return False, f"Failed to abort multipart upload: {str(e)}"
+    
+    def get_object_metadata(self, s3_key):
+        """
+        Fetch the metadata of an uploaded S3 object.
+        
+        Args:
+            s3_key: Object key to inspect
+            
+        Returns:
+            tuple: (success, dict with 'size', 'content_type' and 'etag' or error message)
+        """
+        if not self.using_s3:
+            return False, "S3 is not configured"
+        
+        try:
+            response = self.s3_client.head_object(
+                Bucket=self.s3_config.bucket_name,
+                Key=s3_key
+            )
+            return True, {
+                'size': response.get('ContentLength', 0),
+                'content_type': response.get('ContentType', ''),
+                'etag': response.get('ETag', '').strip('"'),
+            }
+        except Exception as e:
+            logger.error(f"Error reading S3 object metadata for {s3_key}: {str(e)}")
+            return False, f"Uploaded file not found: {str(e)}"
+
+    def stat_object(self, s3_key):
+        """
+        Fetch an object's metadata, telling a missing object apart from a
+        failed request.
+
+        Args:
+            s3_key: Object key to inspect
+
+        Returns:
+            tuple: (success, dict with 'size', 'etag', 'storage_class' and
+                'restored', None if the object does not exist, or error message)
+        """
+        if not self.using_s3:
+            return False, "S3 is not configured"
+
+        try:
+            response = self.s3_client.head_object(
+                Bucket=self.s3_config.bucket_name,
+                Key=s3_key
+            )
+        except Exception as e:
+            code = getattr(e, 'response', {}).get('Error', {}).get('Code', '')
+            if code in ('404', 'NoSuchKey', 'NotFound'):
+                return True, None
+            logger.error(f"Error reading S3 object metadata for {s3_key}: {str(e)}")
+            return False, f"Failed to read object metadata: {str(e)}"
+
+        return True, {
+            'size': response.get('ContentLength', 0),
+            'etag': response.get('ETag', '').strip('"'),
+            'storage_class': response.get('StorageClass', 'STANDARD'),
+            'restored': 'ongoing-request="false"' in response.get('Restore', ''),
+        }
+
+    def open_object(self, s3_key):
+        """
+        Open an S3 object for streaming reads.
+        
+        Args:
+            s3_key: Object key to read
+            
+        Returns:
+            tuple: (success, file-like body or error message)
+        """
+        if not self.using_s3:
+            return False, "S3 is not configured"
+        
+        try:
+            response = self.s3_client.get_object(
+                Bucket=self.s3_config.bucket_name,
+                Key=s3_key
+            )
+            return True, response['Body']
+        except Exception as e:
+            logger.error(f"Error opening S3 object {s3_key}: {str(e)}")
+            return False, f"Failed to read from S3: {str(e)}"
+    
+    def open_document(self, document_version):
+        """
+        Open a stored document version for streaming reads, from S3 or local storage.
+        
+        Args:
+            document_version: DocumentVersion instance
+            
+        Returns:
+            tuple: (success, file-like object or error message); the caller closes it
+        """
+        if document_version.storage_tier == 'cold':
+            success, message = self.restore_document(document_version)
+            if not success:
+                return False, message
+        
+        if self.using_s3 and document_version.s3_key:
+            return self.open_object(document_version.s3_key)
+        
+        if not document_version.file:
+            return False, "Document file not found"
+        
+        try:
+            return True, document_version.file.storage.open(document_version.file.name, 'rb')
+        except Exception as e:
+            logger.error(f"Error opening local document {document_version.file.name}: {str(e)}")
+            return False, f"Failed to open document: {str(e)}"
+    
+    def copy_object(self, source_key, s3_key, content_type=None):
+        """
+        Copy an object within the bucket (server-side, in parts for large objects).
+        
+        Args:
+            source_key: Key of the object to copy
+            s3_key: Destination key
+            content_type: MIME type of the copy
+            
+        Returns:
+            tuple: (success, destination key or error message)
+        """
+        extra_args = {
+            'ContentType': content_type or 'application/octet-stream',
+            'MetadataDirective': 'REPLACE',
+            'ServerSideEncryption': 'AES256',
+            'ACL': 'private',
+        }
+        
+        try:
+            self.s3_client.copy(
+                {'Bucket': self.s3_config.bucket_name, 'Key': source_key},
+                self.s3_config.bucket_name,
+                s3_key,
+                ExtraArgs=extra_args
+            )
+            logger.info(f"Copied S3 object {source_key} to {s3_key}")
+            return True, s3_key
+        except Exception as e:
+            logger.error(f"Error copying S3 object {source_key} to {s3_key}: {str(e)}")
+            return False, f"Failed to copy S3 object: {str(e)}"
+    
+    def set_storage_class(self, s3_key, storage_class):
+        """
+        Change the storage class of an object by copying it onto itself.
+        
+        Args:
+            s3_key: Object key
+            storage_class: Target S3 storage class, e.g. 'GLACIER_IR'
+            
+        Returns:
+            tuple: (success, storage class or error message)
+        """
+        if not self.using_s3:
+            return False, "S3 is not configured"
+        
+        try:
+            self.s3_client.copy(
+                {'Bucket': self.s3_config.bucket_name, 'Key': s3_key},
+                self.s3_config.bucket_name,
+                s3_key,
+                ExtraArgs={
+                    'StorageClass': storage_class,
+                    'MetadataDirective': 'COPY',
+                    'ServerSideEncryption': 'AES256',
+                }
+            )
+            logger.info(f"Moved S3 object {s3_key} to {storage_class}")
+            return True, storage_class
+        except Exception as e:
+            logger.error(f"Error changing storage class of {s3_key}: {str(e)}")
+            return False, f"Failed to change storage class: {str(e)}"
+    
+    def restore_archived_object(self, s3_key, days):
+        """
+        Make an object in an S3 archive class (GLACIER, DEEP_ARCHIVE) readable,
+        requesting a temporary restored copy if there is none yet.
+        
+        Args:
+            s3_key: Object key
+            days: Days the restored copy is kept
+            
+        Returns:
+            tuple: (success, message); success is True once the object can be read
+        """
+        if not self.using_s3:
+            return False, "S3 is not configured"
+        
+        try:
+            response = self.s3_client.head_object(Bucket=self.s3_config.bucket_name, Key=s3_key)
+            restore = response.get('Restore', '')
+            if 'ongoing-request="false"' in restore:
+                return True, "Restored copy available"
+            if 'ongoing-request="true"' not in restore:
+                self.s3_client.restore_object(
+                    Bucket=self.s3_config.bucket_name,
+                    Key=s3_key,
+                    RestoreRequest={'Days': days, 'GlacierJobParameters': {'Tier': 'Standard'}}
+                )
+                logger.info(f"Requested restore of archived S3 object {s3_key}")
+            return False, "The document is archived and is being restored; try again in a few hours"
+        except Exception as e:
+            logger.error(f"Error restoring archived S3 object {s3_key}: {str(e)}")
+            return False, f"Failed to restore archived document: {str(e)}"
+    
+    def restore_document(self, document_version):
+        """
+        Bring a cold document version back to where it can be read
+        (see services.lifecycle.restore_version).
+        
+        Returns:
+            tuple: (success, message)
+        """
+        return restore_version(self, document_version)
+    
+    def delete_object(self, s3_key):
+        """
+        Delete an object from the bucket.
+        
+        Returns:
+            tuple: (success, message)
+        """
+        try:
+            self.s3_client.delete_object(
+                Bucket=self.s3_config.bucket_name,
+                Key=s3_key
+            )
+            logger.info(f"Deleted object from S3: {s3_key}")
+            return True, "Object deleted from S3"
+        except Exception as e:
+            logger.error(f"Error deleting S3 object {s3_key}: {str(e)}")
+            return False, f"Failed to delete S3 object: {str(e)}"
+    
+    def delete_objects(self, s3_keys):
+        """
+        Delete many objects from the bucket, 1000 keys per request.
+        
+        Returns:
+            tuple: (number of keys deleted, list of (key, error message))
+        """
+        if not self.using_s3:
+            return 0, []
+        deleted, errors = delete_bucket_objects(self.s3_client, self.s3_config.bucket_name, s3_keys)
+        if deleted or errors:
+            logger.info(f"Deleted {deleted} object(s) from S3 ({len(errors)} failed)")
+        return deleted, errors
+    
+    def iter_objects(self, prefix='', page_size=1000):
+        """
+        Stream the bucket listing under a prefix, in key order, page by page.
+        
+        Yields:
+            dict: Object metadata (Key, Size, LastModified, ...)
+        """
+        if not self.using_s3:
+            return
+        yield from iter_bucket_objects(self.s3_client, self.s3_config.bucket_name, prefix, page_size)
+    
     def _upload_to_local(self, file_obj, document_version):
         """
         Save file to local storage.
@@ -121,12 +565,15 @@ class DocumentStorageService:
             filename = f"{document_version.document.uuid}_{document_version.version_number}_{document_version.file_name}"
             path = f"documents/{filename}"
             
-            # Use Django's default storage
-            from django.core.files.storage import default_storage
-            from django.core.files.base import ContentFile
+            # Stream the file in fixed-size chunks so memory use stays bounded,
+            # computing size, checksum and MIME type on the way through
+            saved_path, stream = stream_to_storage(file_obj, path)
             
-            # Save the file
-            saved_path = default_storage.save(path, ContentFile(file_obj.read()))
+            document_version.file_size = stream.bytes_read
+            document_version.checksum = stream.checksum
+            document_version.file_type = stream.content_type
+            if document_version.pk:
+                document_version.save(update_fields=['file_size', 'checksum', 'file_type'])
             
             logger.info(f"Uploaded document to local storage: {saved_path}")
             return True, saved_path
@@ -135,29 +582,25 @@ class DocumentStorageService:
             logger.error(f"Local storage error: {str(e)}")
             return False, f"Failed to save to local storage: {str(e)}"
     
-    def get_document_url(self, document_version, expires=3600):
+    def get_document_url(self, document_version, expires=3600, scope=None):
         """
         Get a URL for accessing the document.
         
+        Presigned URLs are cached per (key, scope) and reused until shortly
+        before they expire.
+        
         Args:
             document_version: DocumentVersion instance
             expires: URL expiration time in seconds (for S3 presigned URLs)
+            scope: Cache scope of the requester (see get_url_scope); URLs are
+                never shared between scopes
             
         Returns:
             tuple: (success, URL or error message)
         """
         try:
             if self.using_s3 and document_version.s3_key:
-                # Generate presigned URL for S3 object
-                url = self.s3_client.generate_presigned_url(
-                    'get_object',
-                    Params={
-                        'Bucket': self.s3_config.bucket_name,
-                        'Key': document_version.s3_key
-                    },
-                    ExpiresIn=expires
-                )
-                return True, url
+                return True, self._presign_version(document_version, expires, scope)
             else:
                 # For local storage, use media URL
                 if document_version.file:
@@ -170,6 +613,126 @@ class DocumentStorageService:
             logger.error(f"Error generating document URL: {str(e)}")
             return False, f"Failed to generate document URL: {str(e)}"
     
+    def get_document_urls(self, document_versions, expires=3600, scope=None):
+        """
+        Get URLs for many document versions in one call, e.g. for a list page.
+        
+        Versions whose URL cannot be generated are left out.
+        
+        Args:
+            document_versions: Iterable of DocumentVersion instances
+            expires: URL expiration time in seconds (for S3 presigned URLs)
+            scope: Cache scope of the requester
+            
+        Returns:
+            dict: DocumentVersion ID -> URL
+        """
+        urls = {}
+        for document_version in document_versions:
+            if document_version.pk in urls:
+                continue
+            success, url = self.get_document_url(document_version, expires, scope)
+            if success:
+                urls[document_version.pk] = url
+        return urls
+    
+    def _presign_version(self, document_version, expires, scope):
+        """Return a cached or freshly signed GET URL for a version's S3 object."""
+        disposition = ''
+        if document_version.blob_id:
+            # Blob keys carry no file name, so supply the version's, quoted
+            # or encoded like the local download path
+            disposition = content_disposition_header(False, document_version.file_name) or ''
+        return self._presign_get(document_version.s3_key, expires, scope, disposition)
+    
+    def _presign_get(self, s3_key, expires, scope, disposition=''):
+        """Return a cached or freshly signed GET URL for an S3 object."""
+        params = {
+            'Bucket': self.s3_config.bucket_name,
+            'Key': s3_key
+        }
+        if disposition:
+            params['ResponseContentDisposition'] = disposition
+        
+        key = self.url_cache.make_key(params['Bucket'], s3_key, scope, expires, disposition)
+        url = self.url_cache.get(key)
+        if url is None:
+            signed_at = time.time()
+            url = self.s3_client.generate_presigned_url(
+                'get_object',
+                Params=params,
+                ExpiresIn=expires
+            )
+            self.url_cache.set(key, url, signed_at + expires)
+        return url
+    
+    def store_rendition(self, rendition, data):
+        """
+        Store the image bytes of a rendition, in S3 or local storage.
+        
+        Args:
+            rendition: DocumentRendition instance (not saved by this method)
+            data: Encoded image bytes
+            
+        Returns:
+            tuple: (success, storage key or error message)
+        """
+        try:
+            if self.using_s3:
+                self.s3_client.put_object(
+                    Bucket=self.s3_config.bucket_name,
+                    Key=rendition.storage_key,
+                    Body=data,
+                    ContentType=rendition.content_type,
+                    ServerSideEncryption='AES256',
+                    ACL='private'
+                )
+                rendition.s3_key = rendition.storage_key
+                return True, rendition.s3_key
+            
+            # Content-addressed, so an existing file already holds these bytes
+            if rendition.file:
+                rendition.file.storage.delete(rendition.file.name)
+            rendition.file.save(rendition.storage_key, ContentFile(data), save=False)
+            return True, rendition.file.name
+        except Exception as e:
+            logger.error(f"Error storing rendition {rendition.storage_key}: {str(e)}")
+            return False, f"Failed to store rendition: {str(e)}"
+    
+    def get_rendition_url(self, rendition, expires=3600, scope=None):
+        """
+        Get a URL for displaying a rendition.
+        
+        Returns:
+            tuple: (success, URL or error message)
+        """
+        try:
+            if self.using_s3 and rendition.s3_key:
+                return True, self._presign_get(rendition.s3_key, expires, scope)
+            if rendition.file:
+                return True, rendition.file.url
+            return False, "Rendition file not found"
+        except Exception as e:
+            logger.error(f"Error generating rendition URL: {str(e)}")
+            return False, f"Failed to generate rendition URL: {str(e)}"
+    
+    def delete_rendition(self, rendition):
+        """
+        Delete a rendition's image from storage.
+        
+        Returns:
+            tuple: (success, message)
+        """
+        if rendition.s3_key and self.using_s3:
+            return self.delete_object(rendition.s3_key)
+        try:
+            if rendition.file:
+                rendition.file.storage.delete(rendition.file.name)
+            return True, "Rendition deleted"
+        except Exception as e:
+            logger.error(f"Error deleting rendition {rendition.file.name}: {str(e)}")
+            return False, f"Failed to delete rendition: {str(e)}"
+    
     def delete_document(self, document_version):
         """
         Delete a document from storage.
@@ -181,7 +744,11 @@ class DocumentStorageService:
             tuple: (success, message)
         """
         try:
-            if self.using_s3 and document_version.s3_key:
+            if document_version.blob_id:
+                # Shared contents are deleted when their last version goes
+                # (see services.blobs.release_blob)
+                return True, "Document contents are shared and reference-counted"
+            elif self.using_s3 and document_version.s3_key:
                 # Delete from S3
                 self.s3_client.delete_object(
                     Bucket=self.s3_config.bucket_name,
@@ -203,4 +770,79 @@ class DocumentStorageService:
                     
         except Exception as e:
             logger.error(f"Error deleting document: {str(e)}")
-            return False, f"Failed to delete document: {str(e)}"
\ No newline at end of file
+            return False, f"Failed to delete document: {str(e)}"
+
+
+def get_active_config_signature():
+    """
+    Return (pk, updated_at) of the active media S3Configuration, or None.
+
+    Raises:
+        Exception: If the configuration table cannot be read
+    """
+    from aws.models import S3Configuration
+
+    return S3Configuration.objects.filter(
+        is_active=True, use_for_media_files=True
+    ).values_list('pk', 'updated_at').first()
+
+
+_document_service = None
+_checked_at = 0.0
+_service_lock = threading.Lock()
+
+
+def get_document_service():
+    """
+    Return the process-wide document storage service.
+
+    Nothing is read from the database until the first call, so importing
+    views and signals at startup does no I/O. Afterwards the active S3
+    configuration is re-checked at most every DOCUMENT_STORAGE_CONFIG_TTL
+    seconds (one small query) and the service rebuilt when it changed, so
+    configuration edits in the admin take effect without a restart.
+
+    Returns:
+        DocumentStorageService: Shared, thread-safe service
+    """
+    global _document_service, _checked_at
+    ttl = getattr(settings, 'DOCUMENT_STORAGE_CONFIG_TTL', 30)
+    service = _document_service
+    if service is not None and time.monotonic() - _checked_at < ttl:
+        return service
+
+    with _service_lock:
+        if _document_service is not None and time.monotonic() - _checked_at < ttl:
+            return _document_service
+        if _document_service is None:
+            _document_service = DocumentStorageService()
+        elif BOTO3_AVAILABLE:
+            try:
+                signature = get_active_config_signature()
+            except Exception as e:
+                # Keep serving with the current configuration
+                logger.error(f"Error checking S3 configuration: {str(e)}")
+                signature = _document_service.config_signature
+            if signature != _document_service.config_signature:
+                logger.info("S3 configuration changed; reloading document storage service")
+                _document_service = DocumentStorageService()
+        _checked_at = time.monotonic()
+        return _document_service
+
+
+def reset_document_service():
+    """Make the next get_document_service() call rebuild the service."""
+    global _document_service
+    with _service_lock:
+        _document_service = None
+
+
+def _reset_after_fork():
+    # Worker processes build their own service, with their own S3 client
+    global _document_service, _service_lock
+    _document_service = None
+    _service_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
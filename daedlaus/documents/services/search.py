@@ -0,0 +1,184 @@
+import logging
+from django.conf import settings
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank, SearchVector
+from django.db import connection
+from django.db.models import Case, F, Q, Value, When
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from ..models import Document, DocumentText
+
+logger = logging.getLogger(__name__)
+
+# Fields indexed on Document, with their ranking weight
+WEIGHTED_FIELDS = (
+    ('title', 'A'),
+    ('tags', 'B'),
+    ('description', 'C'),
+)
+
+# Markers placed around matches by ts_headline, swapped for <mark> tags after
+# the rest of the snippet has been HTML-escaped
+HIGHLIGHT_START = '\x02'
+HIGHLIGHT_STOP = '\x03'
+
+# Characters of extracted text considered when building result snippets
+SNIPPET_TEXT_CHARS = 20000
+
+
+def search_enabled():
+    """Full-text search needs PostgreSQL; other databases fall back to icontains."""
+    return connection.vendor == 'postgresql'
+
+
+def get_search_config():
+    """Return the text search configuration (language) used for indexing and queries."""
+    return getattr(settings, 'DOCUMENT_SEARCH_CONFIG', 'english')
+
+
+def document_vector():
+    """Weighted search vector expression over a document's metadata columns."""
+    config = get_search_config()
+    vector = None
+    for field, weight in WEIGHTED_FIELDS:
+        part = SearchVector(field, weight=weight, config=config)
+        vector = part if vector is None else vector + part
+    return vector
+
+
+def get_search_text_limit():
+    """Return how many characters of extracted text are indexed per document."""
+    # PostgreSQL rejects tsvectors over 1 MB, so index a bounded prefix
+    return getattr(settings, 'DOCUMENT_SEARCH_TEXT_CHARS', 200000)
+
+
+def current_texts(document_ids):
+    """
+    Load the extracted text of the current version of each document.
+
+    Returns:
+        dict: Document ID -> extracted text, for documents that have any
+    """
+    texts = DocumentText.objects.filter(
+        status='done',
+        char_count__gt=0,
+        version__document__in=document_ids,
+        version__document__current_version=F('version')
+    ).values_list('version__document', 'content')
+    return {document_id: DocumentText(content=content).text for document_id, content in texts}
+
+
+def update_search_vectors(queryset):
+    """
+    Recompute the stored search vectors of the given documents.
+
+    Metadata-only documents are updated in one UPDATE; documents with
+    extracted text get their (bounded) text added at the lowest weight.
+
+    Args:
+        queryset: Document queryset to reindex
+
+    Returns:
+        int: Number of documents updated
+    """
+    if not search_enabled():
+        return 0
+
+    document_ids = list(queryset.values_list('pk', flat=True))
+    texts = current_texts(document_ids)
+    limit = get_search_text_limit()
+    config = get_search_config()
+
+    updated = Document.objects.filter(pk__in=document_ids).exclude(pk__in=texts.keys()).update(
+        search_vector=document_vector()
+    )
+    for document_id, text in texts.items():
+        updated += Document.objects.filter(pk=document_id).update(
+            search_vector=document_vector() + SearchVector(Value(text[:limit]), weight='D', config=config)
+        )
+    return updated
+
+
+def search_documents(queryset, query):
+    """
+    Filter documents matching a search query, best matches first.
+
+    Uses the GIN-indexed search vector on PostgreSQL; elsewhere falls back to
+    case-insensitive substring matching without ranking.
+
+    Args:
+        queryset: Document queryset to search
+        query: Search text as typed by the user (web search syntax)
+
+    Returns:
+        QuerySet: Matching documents, annotated with ``rank`` on PostgreSQL
+    """
+    query = (query or '').strip()
+    if not query:
+        return queryset
+
+    if not search_enabled():
+        return queryset.filter(
+            Q(title__icontains=query) | Q(description__icontains=query) | Q(tags__icontains=query)
+        )
+
+    search_query = SearchQuery(query, search_type='websearch', config=get_search_config())
+    return queryset.filter(search_vector=search_query).annotate(
+        rank=SearchRank(F('search_vector'), search_query)
+    ).order_by('-rank', '-updated_at')
+
+
+def add_snippets(documents, query, max_words=35):
+    """
+    Set a ``snippet`` attribute (safe HTML, matches wrapped in ``<mark>``) on each document.
+
+    Headlines are expensive to compute, so this runs one query for just the
+    documents being displayed rather than for every match.
+
+    Args:
+        documents: Iterable of Document instances (e.g. a page of results)
+        query: Search text the documents were found with
+
+    Returns:
+        list: The documents
+    """
+    documents = list(documents)
+    query = (query or '').strip()
+    if not documents or not query or not search_enabled():
+        return documents
+
+    # Highlight the description followed by the start of the extracted text
+    document_ids = [document.pk for document in documents]
+    texts = current_texts(document_ids)
+    source = F('description')
+    if texts:
+        source = Case(
+            *[
+                When(pk=document_id, then=Value(f"{description}\n{texts[document_id][:SNIPPET_TEXT_CHARS]}"))
+                for document_id, description in
+                Document.objects.filter(pk__in=texts.keys()).values_list('pk', 'description')
+            ],
+            default=F('description')
+        )
+
+    search_query = SearchQuery(query, search_type='websearch', config=get_search_config())
+    snippets = dict(
+        Document.objects.filter(pk__in=document_ids).annotate(
+            snippet=SearchHeadline(
+                source,
+                search_query,
+                config=get_search_config(),
+                start_sel=HIGHLIGHT_START,
+                stop_sel=HIGHLIGHT_STOP,
+                max_words=max_words,
+                min_words=max_words // 2,
+                max_fragments=2
+            )
+        ).values_list('pk', 'snippet')
+    )
+    for document in documents:
+        snippet = escape(snippets.get(document.pk) or '')
+        document.snippet = mark_safe(
+            snippet.replace(HIGHLIGHT_START, '<mark>').replace(HIGHLIGHT_STOP, '</mark>')
+        )
+    return documents
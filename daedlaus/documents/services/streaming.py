@@ -0,0 +1,169 @@
+import hashlib
+import logging
+import mimetypes
+import os
+from django.conf import settings
+from django.core.files import File
+
+logger = logging.getLogger(__name__)
+
+# Default size of the chunks read from uploads and written to storage
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# Leading bytes used to recognise common document formats.
+# Checked in order, so longer/more specific signatures come first.
+MAGIC_SIGNATURES = (
+    (b'%PDF-', 'application/pdf'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'GIF87a', 'image/gif'),
+    (b'GIF89a', 'image/gif'),
+    (b'II*\x00', 'image/tiff'),
+    (b'MM\x00*', 'image/tiff'),
+    (b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1', 'application/x-ole-storage'),
+    (b'PK\x03\x04', 'application/zip'),
+    (b'{\\rtf', 'application/rtf'),
+    (b'ID3', 'audio/mpeg'),
+    (b'RIFF', 'application/octet-stream'),
+)
+
+# Container formats whose real type is better described by the file extension
+# (e.g. DOCX/XLSX are ZIP files, DOC/XLS are OLE compound files).
+CONTAINER_TYPES = {'application/zip', 'application/x-ole-storage', 'application/octet-stream'}
+
+SNIFF_BYTES = 512
+
+
+def get_chunk_size():
+    """Return the configured upload chunk size in bytes."""
+    return getattr(settings, 'DOCUMENT_UPLOAD_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)
+
+
+def sniff_content_type(head, file_name=None):
+    """
+    Determine the MIME type of a file from its leading bytes and name.
+
+    Args:
+        head: The first bytes of the file
+        file_name: Original file name, used as a fallback and for container formats
+
+    Returns:
+        str: MIME type, 'application/octet-stream' if unknown
+    """
+    sniffed = None
+    for signature, content_type in MAGIC_SIGNATURES:
+        if head.startswith(signature):
+            sniffed = content_type
+            break
+
+    # ISO base media (MP4/MOV) keeps its signature at offset 4
+    if sniffed is None and head[4:8] == b'ftyp':
+        sniffed = 'video/quicktime' if head[8:10] == b'qt' else 'video/mp4'
+
+    guessed = None
+    if file_name:
+        guessed, _ = mimetypes.guess_type(file_name)
+
+    if sniffed and sniffed not in CONTAINER_TYPES:
+        return sniffed
+    if guessed:
+        return guessed
+    if sniffed and sniffed != 'application/octet-stream':
+        return sniffed
+
+    # Fall back to treating undecodable content as binary
+    try:
+        head.decode('utf-8')
+        return 'text/plain' if head else 'application/octet-stream'
+    except UnicodeDecodeError:
+        return 'application/octet-stream'
+
+
+class StreamingFile(File):
+    """
+    File wrapper that computes size, SHA-256 checksum and MIME type while the
+    content is read, so storing an upload only ever holds one chunk in memory.
+
+    Works with Django storages (which consume ``chunks()``) as well as with
+    boto3 ``upload_fileobj`` (which calls ``read()``).
+    """
+
+    def __init__(self, file, name=None, chunk_size=None):
+        if name is None:
+            name = getattr(file, 'name', None)
+        super().__init__(file, name)
+        self.chunk_size = chunk_size or get_chunk_size()
+        self._reset_digest()
+
+    def _reset_digest(self):
+        self._hash = hashlib.sha256()
+        self._head = b''
+        self.bytes_read = 0
+
+    def _consume(self, data):
+        if not data:
+            return
+        self._hash.update(data)
+        self.bytes_read += len(data)
+        if len(self._head) < SNIFF_BYTES:
+            self._head += data[:SNIFF_BYTES - len(self._head)]
+
+    def chunks(self, chunk_size=None):
+        # File.chunks() rewinds seekable files and reads through self.read(),
+        # which does the hashing, so only the digest needs resetting here
+        self._reset_digest()
+        yield from super().chunks(chunk_size or self.chunk_size)
+
+    def read(self, size=-1):
+        data = self.file.read(size)
+        self._consume(data)
+        return data
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        position = self.file.seek(offset, whence)
+        if offset == 0 and whence == os.SEEK_SET:
+            self._reset_digest()
+        return position
+
+    @property
+    def size(self):
+        # Avoid File.size reading the underlying file to measure it
+        size = getattr(self.file, 'size', None)
+        if size is not None:
+            return size
+        return super().size
+
+    @property
+    def checksum(self):
+        """Hex SHA-256 digest of the bytes read so far."""
+        return self._hash.hexdigest()
+
+    @property
+    def content_type(self):
+        """MIME type sniffed from the leading bytes read so far."""
+        return sniff_content_type(self._head, self.name and os.path.basename(self.name))
+
+
+def stream_to_storage(file_obj, path, storage=None, chunk_size=None):
+    """
+    Write a file object to storage chunk by chunk.
+
+    Args:
+        file_obj: File-like object to store
+        path: Destination path within the storage
+        storage: Django storage backend (defaults to default_storage)
+        chunk_size: Size of the chunks to write
+
+    Returns:
+        tuple: (saved path, StreamingFile with size/checksum/content_type populated)
+    """
+    if storage is None:
+        from django.core.files.storage import default_storage
+        storage = default_storage
+
+    stream = file_obj if isinstance(file_obj, StreamingFile) else StreamingFile(
+        file_obj, name=os.path.basename(path), chunk_size=chunk_size
+    )
+    saved_path = storage.save(path, stream)
+    logger.debug(f"Streamed {stream.bytes_read} bytes to {saved_path}")
+    return saved_path, stream
@@ -0,0 +1,75 @@
+import logging
+from django.db import transaction
+from django.db.models import Count
+
+from ..models import DocumentTag, Tag, normalize_tag, parse_tags
+
+logger = logging.getLogger(__name__)
+
+
+def get_or_create_tags(names):
+    """
+    Return Tag rows for the given tag names, creating any that are missing.
+
+    Returns:
+        dict: Normalized name -> Tag
+    """
+    wanted = {normalize_tag(name): name for name in names}
+    if not wanted:
+        return {}
+
+    Tag.objects.bulk_create(
+        [Tag(name=name, normalized=normalized) for normalized, name in wanted.items()],
+        ignore_conflicts=True
+    )
+    return {tag.normalized: tag for tag in Tag.objects.filter(normalized__in=wanted)}
+
+
+def sync_document_tags(document):
+    """
+    Bring a document's tag links in line with its comma-separated tags field.
+
+    Returns:
+        tuple: (number of links added, number of links removed)
+    """
+    tags = get_or_create_tags(parse_tags(document.tags))
+    wanted = {tag.pk for tag in tags.values()}
+
+    with transaction.atomic():
+        current = set(DocumentTag.objects.filter(document=document).values_list('tag_id', flat=True))
+        added = wanted - current
+        removed = current - wanted
+        if added:
+            DocumentTag.objects.bulk_create(
+                [DocumentTag(document=document, tag_id=tag_id) for tag_id in added],
+                ignore_conflicts=True
+            )
+        if removed:
+            DocumentTag.objects.filter(document=document, tag_id__in=removed).delete()
+    return len(added), len(removed)
+
+
+def filter_by_tag(queryset, name):
+    """
+    Restrict a document queryset to documents carrying the given tag.
+
+    Matches the whole tag (case-insensitively), never a substring.
+    """
+    tag = Tag.objects.filter(normalized=normalize_tag(name)).first()
+    if tag is None:
+        return queryset.none()
+    return queryset.filter(tag_links__tag=tag)
+
+
+def tag_facets(queryset, limit=20):
+    """
+    Count the tags of the documents in a queryset, most used first.
+
+    Returns:
+        QuerySet: Tags annotated with ``document_count``
+    """
+    return Tag.objects.filter(
+        document_links__document__in=queryset.order_by().values('pk')
+    ).annotate(
+        document_count=Count('document_links')
+    ).order_by('-document_count', 'normalized')[:limit]
@@ -0,0 +1,190 @@
+import logging
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from ..models import DocumentVersion, StorageTransfer
+from .s3_service import get_document_service
+
+logger = logging.getLogger(__name__)
+
+
+def get_transfer_setting(name, default):
+    return getattr(settings, f'DOCUMENT_TRANSFER_{name}', default)
+
+
+def enqueue_transfer(version):
+    """
+    Queue a document version for upload to S3.
+
+    Call inside the transaction that creates the version, so the job only
+    becomes visible to workers once the local file write has committed.
+
+    Returns:
+        StorageTransfer: The queued (or already queued) transfer
+    """
+    transfer, created = StorageTransfer.objects.get_or_create(version=version)
+    if not created and transfer.status != 'running':
+        transfer.status = 'pending'
+        transfer.attempts = 0
+        transfer.next_attempt_at = timezone.now()
+        transfer.last_error = ''
+        transfer.save(update_fields=['status', 'attempts', 'next_attempt_at', 'last_error', 'updated_at'])
+
+    DocumentVersion.objects.filter(pk=version.pk).update(storage_status='pending')
+    version.storage_status = 'pending'
+    return transfer
+
+
+def get_retry_delay(attempts):
+    """
+    Exponential backoff with jitter for the given number of failed attempts.
+
+    Returns:
+        timedelta: How long to wait before the next attempt
+    """
+    base = get_transfer_setting('RETRY_BASE_SECONDS', 30)
+    cap = get_transfer_setting('RETRY_MAX_SECONDS', 3600)
+    delay = min(cap, base * (2 ** max(attempts - 1, 0)))
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+
+def claim_transfers(batch_size):
+    """
+    Atomically claim a batch of due transfers for this worker.
+
+    Rows locked by another worker are skipped, and transfers left 'running'
+    by a crashed worker are reclaimed once their lease expires.
+
+    Returns:
+        list: IDs of the claimed transfers
+    """
+    now = timezone.now()
+    lease = timedelta(seconds=get_transfer_setting('LEASE_SECONDS', 3600))
+
+    with transaction.atomic():
+        ids = list(
+            StorageTransfer.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(status='pending', next_attempt_at__lte=now) |
+                Q(status='running', locked_at__lt=now - lease)
+            )
+            .order_by('next_attempt_at')
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        if ids:
+            StorageTransfer.objects.filter(pk__in=ids).update(status='running', locked_at=now)
+    return ids
+
+
+def process_transfer(transfer_id, storage_service, max_attempts=None):
+    """
+    Upload a single claimed transfer and record the outcome.
+
+    Args:
+        transfer_id: ID of a StorageTransfer claimed by this worker
+        storage_service: DocumentStorageService instance
+        max_attempts: Attempts before the transfer is marked failed
+
+    Returns:
+        bool: True if the file was uploaded
+    """
+    transfer = StorageTransfer.objects.select_related('version__document').get(pk=transfer_id)
+    version = transfer.version
+
+    if version.s3_key:
+        success, result = True, version.s3_key
+    elif not version.file:
+        success, result = False, "Version has no local file to upload"
+    else:
+        try:
+            version.file.open('rb')
+            try:
+                success, result = storage_service.upload_document(version.file, version)
+            finally:
+                version.file.close()
+        except Exception as e:
+            success, result = False, str(e)
+
+    transfer.attempts += 1
+    if success:
+        transfer.status = 'done'
+        transfer.last_error = ''
+        version_status = 'uploaded'
+        logger.info(f"Transferred {version} to S3: {result}")
+    elif transfer.attempts >= (max_attempts or get_transfer_setting('MAX_ATTEMPTS', 8)):
+        transfer.status = 'failed'
+        transfer.last_error = result
+        version_status = 'failed'
+        logger.error(f"Giving up on transfer of {version} after {transfer.attempts} attempts: {result}")
+    else:
+        transfer.status = 'pending'
+        transfer.last_error = result
+        transfer.next_attempt_at = timezone.now() + get_retry_delay(transfer.attempts)
+        version_status = 'pending'
+        logger.warning(f"Transfer of {version} failed (attempt {transfer.attempts}), retrying: {result}")
+
+    transfer.locked_at = None
+    transfer.save(update_fields=['status', 'attempts', 'last_error', 'next_attempt_at', 'locked_at', 'updated_at'])
+    DocumentVersion.objects.filter(pk=version.pk).update(storage_status=version_status)
+    return success
+
+
+def _process_in_thread(transfer_id, storage_service, max_attempts):
+    try:
+        return process_transfer(transfer_id, storage_service, max_attempts)
+    except Exception as e:
+        logger.exception(f"Error processing storage transfer {transfer_id}: {str(e)}")
+        return False
+    finally:
+        # Worker threads open their own database connections
+        connection.close()
+
+
+def run_worker(storage_service=None, concurrency=None, batch_size=None, poll_interval=5, once=False,
+               max_attempts=None, stdout=None):
+    """
+    Process queued transfers until stopped (or until the queue is empty if once=True).
+
+    At most ``concurrency`` uploads run at the same time. Unless a service is
+    passed in, the shared storage service is fetched again for every batch,
+    so S3 configuration changes reach a running worker without a restart.
+    While S3 is not configured, nothing is claimed.
+
+    Args:
+        storage_service: DocumentStorageService to use for every batch
+            (default: get_document_service() per batch)
+
+    Returns:
+        tuple: (uploaded count, failed count)
+    """
+    concurrency = concurrency or get_transfer_setting('CONCURRENCY', 4)
+    batch_size = batch_size or concurrency * 4
+    uploaded = failed = 0
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        while True:
+            close_old_connections()
+            service = storage_service or get_document_service()
+            ids = claim_transfers(batch_size) if service.using_s3 else []
+            if not ids:
+                if once:
+                    break
+                time.sleep(poll_interval)
+                continue
+
+            for success in executor.map(lambda pk: _process_in_thread(pk, service, max_attempts), ids):
+                if success:
+                    uploaded += 1
+                else:
+                    failed += 1
+
+            if stdout:
+                stdout.write(f"Processed {len(ids)} transfer(s): {uploaded} uploaded, {failed} not uploaded so far")
+
+    return uploaded, failed
@@ -0,0 +1,144 @@
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+def get_url_scope(user):
+    """
+    Cache scope for presigned URLs handed to a user, so one user's links are
+    never served to another.
+    """
+    if user is None or not getattr(user, 'is_authenticated', False):
+        return 'anonymous'
+    return f"user:{user.pk}"
+
+
+class PresignedURLCache:
+    """
+    Cache of presigned S3 URLs, reused until shortly before they expire.
+
+    Entries live in a per-process LRU and, when a cache alias is configured,
+    in a shared Django cache so all workers reuse each other's signatures.
+    """
+
+    def __init__(self, max_entries=None, refresh_margin=None, cache_alias=None):
+        self.max_entries = max_entries or getattr(settings, 'DOCUMENT_URL_CACHE_SIZE', 4096)
+        self.refresh_margin = refresh_margin if refresh_margin is not None else getattr(
+            settings, 'DOCUMENT_URL_REFRESH_MARGIN', 300
+        )
+        self.cache_alias = cache_alias or getattr(settings, 'DOCUMENT_URL_CACHE_ALIAS', None)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def shared_cache(self):
+        if not self.cache_alias:
+            return None
+        from django.core.cache import caches
+        return caches[self.cache_alias]
+
+    @staticmethod
+    def make_key(bucket, s3_key, scope, expires, disposition=''):
+        """Build the cache key for a signed URL."""
+        return (bucket, s3_key, scope, expires, disposition)
+
+    @staticmethod
+    def _shared_key(key):
+        digest = hashlib.sha256('\0'.join(str(part) for part in key).encode('utf-8')).hexdigest()
+        return f"documents:presigned:{digest}"
+
+    def get(self, key):
+        """
+        Return a cached URL that is valid for at least the refresh margin.
+
+        Returns:
+            str: The URL, or None on a miss
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                url, expires_at = entry
+                if expires_at - now > self.refresh_margin:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return url
+                del self._entries[key]
+
+        shared = self.shared_cache
+        if shared is not None:
+            entry = shared.get(self._shared_key(key))
+            if entry is not None and entry[1] - now > self.refresh_margin:
+                self._store_local(key, entry[0], entry[1])
+                with self._lock:
+                    self.shared_hits += 1
+                return entry[0]
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key, url, expires_at):
+        """Cache a URL that stops working at ``expires_at`` (a Unix timestamp)."""
+        self._store_local(key, url, expires_at)
+
+        shared = self.shared_cache
+        if shared is not None:
+            timeout = int(expires_at - time.time() - self.refresh_margin)
+            if timeout > 0:
+                shared.set(self._shared_key(key), (url, expires_at), timeout)
+
+    def _store_local(self, key, url, expires_at):
+        with self._lock:
+            self._entries[key] = (url, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every locally cached URL (shared entries expire on their own)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """
+        Return hit/miss counters for this process.
+
+        Returns:
+            dict: hits, shared_hits, misses, evictions, size and hit_rate
+        """
+        with self._lock:
+            lookups = self.hits + self.shared_hits + self.misses
+            return {
+                'hits': self.hits,
+                'shared_hits': self.shared_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': len(self._entries),
+                'hit_rate': (self.hits + self.shared_hits) / lookups if lookups else 0.0,
+            }
+
+
+# Process-wide cache shared by every storage service instance
+_url_cache = None
+_url_cache_lock = threading.Lock()
+
+
+def get_url_cache():
+    """Return the process-wide presigned URL cache, creating it on first use."""
+    global _url_cache
+    if _url_cache is None:
+        with _url_cache_lock:
+            if _url_cache is None:
+                _url_cache = PresignedURLCache()
+    return _url_cache
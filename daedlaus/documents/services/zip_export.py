@@ -0,0 +1,273 @@
+import logging
+import queue
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.db import connection
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.http import content_disposition_header
+
+from ..models import Document
+
+logger = logging.getLogger(__name__)
+
+# Name of the archive entry listing files that could not be exported
+ERRORS_ENTRY = 'EXPORT-ERRORS.txt'
+
+
+def get_export_settings():
+    """
+    Return (prefetch workers, chunk size, chunks buffered per file) for ZIP exports.
+
+    At most ``workers * buffer chunks * chunk size`` bytes are held in memory.
+    """
+    return (
+        getattr(settings, 'DOCUMENT_EXPORT_WORKERS', 4),
+        getattr(settings, 'DOCUMENT_EXPORT_CHUNK_SIZE', 1024 * 1024),
+        getattr(settings, 'DOCUMENT_EXPORT_BUFFER_CHUNKS', 8),
+    )
+
+
+def clean_path_part(name):
+    """Make a folder or file name safe to use as one component of an archive path."""
+    name = (name or '').replace('/', '_').replace('\\', '_').strip()
+    if name in ('', '.', '..'):
+        return '_'
+    return name
+
+
+def unique_path(path, used):
+    """Return ``path``, or ``name (2).ext`` etc. if it is already in ``used``."""
+    candidate = path
+    stem, dot, extension = path.rpartition('.')
+    if not stem or '/' in extension:
+        stem, dot, extension = path, '', ''
+    counter = 2
+    while candidate.casefold() in used:
+        candidate = f"{stem} ({counter}){dot}{extension}"
+        counter += 1
+    used.add(candidate.casefold())
+    return candidate
+
+
+class ZipStream:
+    """
+    Write-only, non-seekable sink for zipfile.
+
+    zipfile writes data descriptors when it cannot seek, so entries can be
+    sent as they are written; ``drain`` hands back what has been written so far.
+    """
+
+    def __init__(self):
+        self._parts = []
+        self._offset = 0
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        self._offset += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._offset
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._parts)
+        self._parts = []
+        return data
+
+
+class FilePrefetch:
+    """
+    Reads one stored file into a bounded queue from a pool thread, so the
+    next few files download while the current one is being archived.
+    """
+
+    _END = object()
+
+    def __init__(self, storage_service, document_version, chunk_size, max_chunks):
+        self.storage_service = storage_service
+        self.document_version = document_version
+        self.chunk_size = chunk_size
+        self.chunks = queue.Queue(maxsize=max_chunks)
+        self.cancelled = threading.Event()
+
+    def run(self):
+        try:
+            success, file_obj = self.storage_service.open_document(self.document_version)
+            if not success:
+                self._put(IOError(file_obj))
+                return
+            try:
+                while not self.cancelled.is_set():
+                    data = file_obj.read(self.chunk_size)
+                    if not data:
+                        break
+                    self._put(data)
+            finally:
+                file_obj.close()
+            self._put(self._END)
+        except Exception as e:
+            self._put(e)
+        finally:
+            # Pool threads open their own database connections
+            connection.close()
+
+    def _put(self, item):
+        # Block while the queue is full, but give up once the export is abandoned
+        while not self.cancelled.is_set():
+            try:
+                self.chunks.put(item, timeout=1)
+                return
+            except queue.Full:
+                continue
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def __iter__(self):
+        while True:
+            item = self.chunks.get()
+            if item is self._END:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+
+def stream_zip(entries, storage_service):
+    """
+    Generate a ZIP archive of stored files without temporary files.
+
+    Files are fetched ahead by a small thread pool and written as they
+    arrive; memory use is bounded by the prefetch settings, not file sizes.
+    Files that cannot be opened are listed in an EXPORT-ERRORS.txt entry.
+
+    Args:
+        entries: Iterable of (archive path, DocumentVersion)
+        storage_service: DocumentStorageService the files are read from
+
+    Yields:
+        bytes: Successive pieces of the archive
+    """
+    workers, chunk_size, max_chunks = get_export_settings()
+    sink = ZipStream()
+    archive = zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_STORED, allowZip64=True)
+    errors = []
+    pending = []
+    entries = iter(entries)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='zip-export') as pool:
+        def schedule():
+            # Keep one prefetch per worker in flight
+            while len(pending) < workers:
+                entry = next(entries, None)
+                if entry is None:
+                    return
+                prefetch = FilePrefetch(storage_service, entry[1], chunk_size, max_chunks)
+                pool.submit(prefetch.run)
+                pending.append((entry[0], entry[1], prefetch))
+
+        current = None
+        try:
+            schedule()
+            while pending:
+                path, version, current = pending.pop(0)
+                schedule()
+
+                chunks = iter(current)
+                try:
+                    first = next(chunks, b'')
+                except Exception as e:
+                    logger.warning(f"Skipping {path} in ZIP export: {str(e)}")
+                    errors.append(f"{path}: {str(e)}")
+                    continue
+
+                info = zipfile.ZipInfo(path, date_time=_zip_timestamp(version.uploaded_at))
+                info.compress_type = zipfile.ZIP_STORED
+                info.file_size = version.file_size or 0
+                with archive.open(info, 'w', force_zip64=not version.file_size) as member:
+                    member.write(first)
+                    for data in chunks:
+                        yield sink.drain()
+                        member.write(data)
+                yield sink.drain()
+
+            if errors:
+                archive.writestr(ERRORS_ENTRY, '\n'.join(errors) + '\n')
+            archive.close()
+            yield sink.drain()
+        finally:
+            # Release pool threads if the client disconnected mid-download
+            if current is not None:
+                current.cancel()
+            for _, _, prefetch in pending:
+                prefetch.cancel()
+
+
+def _zip_timestamp(value):
+    if value is None:
+        value = timezone.now()
+    if timezone.is_aware(value):
+        value = timezone.localtime(value)
+    return max(value.timetuple()[:6], (1980, 1, 1, 0, 0, 0))
+
+
+def export_entries(items, user):
+    """
+    Resolve documents to the files placed in an export archive.
+
+    Only the current version of each document is included, and only for
+    documents the user may download.
+
+    Args:
+        items: Iterable of (directory parts, Document ID)
+        user: User requesting the export
+
+    Returns:
+        list: (archive path, DocumentVersion) sorted by path
+    """
+    items = list(items)
+    documents = {
+        document.pk: document
+        for document in Document.objects.filter(pk__in={document_id for _, document_id in items})
+        .downloadable_by(user)
+        .exclude(current_version=None)
+        .with_current_version()
+    }
+
+    entries = []
+    used = set()
+    rows = sorted(
+        ((tuple(clean_path_part(part) for part in parts), documents[document_id])
+         for parts, document_id in items if document_id in documents),
+        key=lambda row: (row[0], row[1].title.casefold(), row[1].pk)
+    )
+    for parts, document in rows:
+        version = document.current_version
+        path = '/'.join(parts + (clean_path_part(version.file_name or document.title),))
+        entries.append((unique_path(path, used), version))
+    return entries
+
+
+def zip_response(entries, file_name, storage_service):
+    """
+    Build a streaming download response for an export archive.
+
+    Args:
+        entries: (archive path, DocumentVersion) pairs, see export_entries
+        file_name: Name offered to the browser
+        storage_service: DocumentStorageService the files are read from
+
+    Returns:
+        StreamingHttpResponse: The archive, generated as it is sent
+    """
+    response = StreamingHttpResponse(stream_zip(entries, storage_service), content_type='application/zip')
+    response['Content-Disposition'] = content_disposition_header(True, file_name)
+    # Stop proxies from buffering the whole archive before passing it on
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -1,56 +1,166 @@
 import logging
-from django.db.models.signals import pre_save, post_save, pre_delete
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
 from django.dispatch import receiver
-from .models import DocumentVersion
-from .services.s3_service import DocumentStorageService
+from aws.models import S3Configuration
+from .models import Document, DocumentAccess, DocumentVersion
+from .services.s3_service import get_document_service, reset_document_service
+from .services.blobs import release_blob
+from .services.deletions import delete_after_commit
+from .services.extraction import enqueue_extraction
+from .services.permissions import get_permission_resolver
+from .services.renditions import enqueue_renditions
+from .services.search import update_search_vectors
+from .services.tags import sync_document_tags
+from .services.transfers import enqueue_transfer
 
 logger = logging.getLogger(__name__)
 
-# Initialize the document storage service
-document_service = DocumentStorageService()
-
 @receiver(post_save, sender=DocumentVersion)
 def handle_document_version_upload(sender, instance, created, **kwargs):
     """
-    Signal handler to upload document version to S3 if it's configured
+    Signal handler to queue a new document version for upload to S3.
+    
+    The upload itself runs in the background (manage.py process_storage_transfers),
+    so the request returns as soon as the local file write commits.
     """
     # Only process if we're using S3 and there's a file to upload
-    if document_service.using_s3 and instance.file and not instance.s3_key:
+    if created and get_document_service().using_s3 and instance.file and not instance.s3_key:
         try:
-            # Reopen the file for reading
-            instance.file.open('rb')
-            
-            # Upload to S3
-            success, result = document_service.upload_document(instance.file, instance)
-            
-            # Log the result
-            if success:
-                logger.info(f"Document uploaded to S3: {result}")
-            else:
-                logger.error(f"Failed to upload document to S3: {result}")
-                
-            # Make sure to close the file
-            instance.file.close()
-            
+            enqueue_transfer(instance)
+            logger.info(f"Queued document version for S3 upload: {instance}")
         except Exception as e:
-            logger.exception(f"Error handling document upload: {str(e)}")
+            logger.exception(f"Error queueing document upload: {str(e)}")
 
 
 @receiver(pre_delete, sender=DocumentVersion)
 def handle_document_version_delete(sender, instance, **kwargs):
     """
-    Signal handler to delete document version from S3 if it's there
+    Signal handler to delete a document version's file from S3 or local storage.
+    
+    The deletion waits for the transaction to commit, and deletions from one
+    transaction (e.g. a cascading Document or Case delete) are batched into
+    DeleteObjects requests of up to 1000 keys.
+    """
+    # Shared contents are released in handle_document_version_release
+    if instance.blob_id:
+        return
+    
+    try:
+        storage_service = get_document_service()
+        if storage_service.using_s3 and instance.s3_key:
+            delete_after_commit(storage_service, s3_key=instance.s3_key)
+        elif instance.file:
+            delete_after_commit(storage_service, file_field=instance.file)
+    except Exception as e:
+        logger.exception(f"Error handling document deletion: {str(e)}")
+
+
+@receiver(post_delete, sender=DocumentVersion)
+def handle_document_version_release(sender, instance, **kwargs):
+    """
+    Signal handler to drop a deleted version's reference on its shared contents
     """
-    if document_service.using_s3 and instance.s3_key:
+    if instance.blob_id:
         try:
-            # Delete from S3
-            success, result = document_service.delete_document(instance)
-            
-            # Log the result
-            if success:
-                logger.info(f"Document deleted from S3: {instance.s3_key}")
-            else:
-                logger.error(f"Failed to delete document from S3: {result}")
-                
+            release_blob(instance.blob_id, get_document_service())
         except Exception as e:
-            logger.exception(f"Error handling document deletion: {str(e)}")
\ No newline at end of file
+            logger.exception(f"Error releasing document contents: {str(e)}")
+
+
+@receiver(post_delete, sender=DocumentVersion)
+def handle_document_version_summary(sender, instance, **kwargs):
+    """
+    Signal handler to update the document's current version and version count
+    """
+    Document.objects.filter(pk=instance.document_id).sync_version_summary()
+
+
+@receiver(post_save, sender=Document)
+def handle_document_search_index(sender, instance, update_fields=None, **kwargs):
+    """
+    Signal handler to refresh the search vector when indexed fields change
+    """
+    if update_fields is not None and not {'title', 'description', 'tags'} & set(update_fields):
+        return
+    try:
+        update_search_vectors(Document.objects.filter(pk=instance.pk))
+    except Exception as e:
+        logger.exception(f"Error updating search index for document {instance.pk}: {str(e)}")
+
+
+@receiver(post_save, sender=Document)
+def handle_document_tags(sender, instance, update_fields=None, **kwargs):
+    """
+    Signal handler to keep the normalized tag links in sync with the tags field
+    """
+    if update_fields is not None and 'tags' not in update_fields:
+        return
+    sync_document_tags(instance)
+
+
+@receiver(post_save, sender=DocumentVersion)
+def handle_document_version_text(sender, instance, created, **kwargs):
+    """
+    Signal handler to queue a new version for text extraction
+    """
+    if created and (instance.file or instance.s3_key):
+        try:
+            enqueue_extraction(instance)
+            # The previous version's text no longer describes the document
+            document_id = instance.document_id
+            transaction.on_commit(lambda: update_search_vectors(Document.objects.filter(pk=document_id)))
+        except Exception as e:
+            logger.exception(f"Error queueing text extraction: {str(e)}")
+
+
+@receiver(post_save, sender=DocumentVersion)
+def handle_document_version_renditions(sender, instance, created, **kwargs):
+    """
+    Signal handler to queue thumbnails and previews for new contents
+    """
+    if created and instance.checksum:
+        try:
+            enqueue_renditions(instance)
+        except Exception as e:
+            logger.exception(f"Error queueing renditions: {str(e)}")
+
+
+@receiver(post_save, sender=S3Configuration)
+@receiver(post_delete, sender=S3Configuration)
+def handle_s3_configuration_change(sender, instance, **kwargs):
+    """
+    Signal handler to rebuild the document storage service in this process
+    when an S3 configuration changes (other processes notice within
+    DOCUMENT_STORAGE_CONFIG_TTL seconds)
+    """
+    transaction.on_commit(reset_document_service)
+
+
+@receiver(pre_save, sender=DocumentAccess)
+def handle_document_access_reassign(sender, instance, **kwargs):
+    """
+    Signal handler to remember who held a grant before it is saved, so
+    moving it to another user also clears the previous holder's cache
+    """
+    if instance.pk:
+        instance._previous_user_id = (
+            DocumentAccess.objects.filter(pk=instance.pk).values_list('user_id', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=DocumentAccess)
+@receiver(post_delete, sender=DocumentAccess)
+def handle_document_access_change(sender, instance, **kwargs):
+    """
+    Signal handler to drop the cached grants of the affected users once
+    the change commits
+    """
+    user_ids = {instance.user_id, getattr(instance, '_previous_user_id', None)} - {None}
+    
+    def invalidate():
+        resolver = get_permission_resolver()
+        for user_id in user_ids:
+            resolver.invalidate(user_id)
+    
+    transaction.on_commit(invalidate)
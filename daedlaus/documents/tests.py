@@ -1,3 +1,252 @@
-from django.test import TestCase
+import hashlib
+import io
+import shutil
+import tempfile
+import threading
+import unittest
+from datetime import timedelta
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
 
-# Create your tests here.
+from .models import TAG_MAX_LENGTH, Document, DocumentAccess, DocumentBlob, DocumentVersion, Tag
+from .services.streaming import StreamingFile
+from .services.tags import filter_by_tag
+
+MEDIA_ROOT = tempfile.mkdtemp(prefix='documents-tests-')
+
+
+def tearDownModule():
+    shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+
+def upload_version(document, user, content):
+    version = DocumentVersion(
+        document=document,
+        file=ContentFile(content, name='exhibit.txt'),
+        file_name='exhibit.txt',
+        uploaded_by=user
+    )
+    version.save()
+    return version
+
+
+class StreamingFileTests(SimpleTestCase):
+    content = bytes(range(256)) * 1000
+
+    def test_chunks_checksum_matches_sha256(self):
+        stream = StreamingFile(io.BytesIO(self.content), name='exhibit.pdf', chunk_size=1000)
+
+        self.assertEqual(b''.join(stream.chunks()), self.content)
+        self.assertEqual(stream.checksum, hashlib.sha256(self.content).hexdigest())
+        self.assertEqual(stream.bytes_read, len(self.content))
+
+    def test_read_checksum_matches_sha256(self):
+        stream = StreamingFile(io.BytesIO(self.content), name='exhibit.pdf')
+
+        while stream.read(1000):
+            pass
+        self.assertEqual(stream.checksum, hashlib.sha256(self.content).hexdigest())
+        self.assertEqual(stream.bytes_read, len(self.content))
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class VersionNumberTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='uploader', password='x')
+        self.document = Document.objects.create(title='Exhibit A', created_by=self.user)
+
+    def test_versions_are_numbered_sequentially(self):
+        numbers = [upload_version(self.document, self.user, f'v{i}'.encode()).version_number for i in range(3)]
+        self.assertEqual(numbers, [1, 2, 3])
+
+        self.document.refresh_from_db()
+        self.assertEqual(self.document.last_version_number, 3)
+        self.assertEqual(self.document.version_count, 3)
+        self.assertEqual(self.document.current_version.version_number, 3)
+
+    def test_numbers_are_not_reused_after_delete(self):
+        upload_version(self.document, self.user, b'one')
+        upload_version(self.document, self.user, b'two').delete()
+
+        self.assertEqual(upload_version(self.document, self.user, b'three').version_number, 3)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class BlobReferenceTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='uploader', password='x')
+        self.document = Document.objects.create(title='Exhibit A', created_by=self.user)
+
+    def replace_file(self, version, content):
+        version.file = ContentFile(content, name='exhibit.txt')
+        version.save()
+        version.blob.refresh_from_db()
+
+    def test_replacing_a_shared_file_releases_one_reference(self):
+        version = upload_version(self.document, self.user, b'original')
+        upload_version(self.document, self.user, b'original')
+        old_blob_id = version.blob_id
+        self.assertEqual(DocumentBlob.objects.get(pk=old_blob_id).ref_count, 2)
+
+        self.replace_file(version, b'replacement')
+
+        self.assertNotEqual(version.blob_id, old_blob_id)
+        self.assertEqual(version.blob.ref_count, 1)
+        self.assertEqual(DocumentBlob.objects.get(pk=old_blob_id).ref_count, 1)
+
+    def test_replacing_the_only_reference_deletes_the_old_blob(self):
+        version = upload_version(self.document, self.user, b'original')
+        old_blob_id = version.blob_id
+
+        self.replace_file(version, b'replacement')
+
+        self.assertFalse(DocumentBlob.objects.filter(pk=old_blob_id).exists())
+
+    def test_replacing_with_the_same_contents_keeps_one_reference(self):
+        version = upload_version(self.document, self.user, b'original')
+        blob_id = version.blob_id
+
+        self.replace_file(version, b'original')
+
+        self.assertEqual(version.blob_id, blob_id)
+        self.assertEqual(version.blob.ref_count, 1)
+
+
+class DocumentPermissionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        User = get_user_model()
+        self.owner = User.objects.create_user(username='owner', password='x')
+        self.reader = User.objects.create_user(username='reader', password='x')
+        self.private = Document.objects.create(title='Sealed', is_private=True, created_by=self.owner)
+        self.public = Document.objects.create(title='Filed', is_private=False, created_by=self.owner)
+
+    def fresh(self, user):
+        # A new instance, so nothing is memoized from an earlier check
+        return get_user_model().objects.get(pk=user.pk)
+
+    def visible(self, user, action='view'):
+        return set(Document.objects.accessible_to(self.fresh(user), action))
+
+    def grant(self, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return DocumentAccess.objects.create(document=self.private, user=self.reader, **kwargs)
+
+    def test_owner_reaches_private_document(self):
+        for action in ('view', 'download'):
+            self.assertTrue(self.private.is_accessible_to(self.fresh(self.owner), action))
+            self.assertEqual(self.visible(self.owner, action), {self.private, self.public})
+
+    def test_private_document_is_hidden_without_grant(self):
+        self.assertFalse(self.private.is_accessible_to(self.fresh(self.reader)))
+        self.assertEqual(self.visible(self.reader), {self.public})
+
+        self.client.force_login(self.reader)
+        detail = reverse('documents:document_detail', args=[self.private.uuid])
+        list_url = reverse('documents:document_list')
+        self.assertRedirects(self.client.get(detail), list_url, fetch_redirect_response=False)
+        download = reverse('documents:document_download', args=[self.private.uuid])
+        self.assertRedirects(self.client.get(download), detail, fetch_redirect_response=False)
+
+    def test_shared_document_is_visible(self):
+        self.grant()
+
+        for action in ('view', 'download'):
+            self.assertTrue(self.private.is_accessible_to(self.fresh(self.reader), action))
+            self.assertEqual(self.visible(self.reader, action), {self.private, self.public})
+
+    def test_cached_grant_stops_working_when_it_expires(self):
+        now = timezone.now()
+        self.grant(expires_at=now + timedelta(hours=1))
+        reader = self.fresh(self.reader)
+        self.assertTrue(self.private.is_accessible_to(reader))
+
+        with mock.patch('documents.services.permissions.timezone.now', return_value=now + timedelta(hours=2)):
+            # Neither the memoized nor the cached entry outlives the grant
+            self.assertFalse(self.private.is_accessible_to(reader))
+            self.assertFalse(self.private.is_accessible_to(self.fresh(self.reader)))
+
+    def test_grant_changes_drop_cached_grants(self):
+        self.assertFalse(self.private.is_accessible_to(self.fresh(self.reader)))
+
+        access = self.grant()
+        self.assertTrue(self.private.is_accessible_to(self.fresh(self.reader)))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            access.delete()
+        self.assertFalse(self.private.is_accessible_to(self.fresh(self.reader)))
+
+
+class TagLengthTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='tagger', password='x')
+
+    def test_over_long_tag_is_cut_to_fit(self):
+        long_tag = 'Privileged ' + 'x' * 200
+        document = Document.objects.create(title='Exhibit B', created_by=self.user, tags=f'{long_tag}, Motions')
+
+        tags = sorted(document.tag_set.values_list('name', 'normalized'), key=lambda tag: len(tag[0]))
+        self.assertEqual(tags[0], ('Motions', 'motions'))
+        self.assertEqual(tags[1][0], long_tag[:TAG_MAX_LENGTH])
+        self.assertEqual(tags[1][1], long_tag[:TAG_MAX_LENGTH].casefold())
+
+        # The full tag still finds the document, and saving again adds nothing
+        self.assertEqual(list(filter_by_tag(Document.objects.all(), long_tag)), [document])
+        document.save()
+        self.assertEqual(Tag.objects.count(), 2)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+@unittest.skipUnless(
+    connection.features.has_select_for_update,
+    "Concurrent uploads need a database with row-level locking"
+)
+class ConcurrentVersionUploadTests(TransactionTestCase):
+    uploads = 50
+
+    def test_parallel_uploads_get_distinct_increasing_numbers(self):
+        user = get_user_model().objects.create_user(username='uploader', password='x')
+        document = Document.objects.create(title='Exhibit A', created_by=user)
+
+        barrier = threading.Barrier(self.uploads)
+        numbers = []
+        errors = []
+        lock = threading.Lock()
+
+        def upload(index):
+            try:
+                barrier.wait()
+                version = upload_version(document, user, f'upload {index}'.encode())
+                with lock:
+                    numbers.append(version.version_number)
+            except Exception as e:
+                with lock:
+                    errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=upload, args=(i,)) for i in range(self.uploads)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(sorted(numbers), list(range(1, self.uploads + 1)))
+
+        # Numbers increase in commit order
+        stored = list(
+            DocumentVersion.objects.filter(document=document).order_by('pk').values_list('version_number', flat=True)
+        )
+        self.assertEqual(stored, sorted(stored))
+
+        document.refresh_from_db()
+        self.assertEqual(document.last_version_number, self.uploads)
+        self.assertEqual(document.version_count, self.uploads)
+        self.assertEqual(document.current_version.version_number, self.uploads)
@@ -6,6 +6,13 @@ app_name = 'documents'
 urlpatterns = [
     path('', views.document_list, name='document_list'),
     path('upload/', views.document_upload, name='document_upload'),
+    path('upload/presign/', views.document_upload_presign, name='document_upload_presign'),
+    path('upload/complete/', views.document_upload_complete, name='document_upload_complete'),
+    path('uploads/', views.upload_session_create, name='upload_session_create'),
+    path('uploads/<uuid:upload_id>/', views.upload_session_detail, name='upload_session_detail'),
+    path('uploads/<uuid:upload_id>/parts/<int:part_number>/', views.upload_session_part, name='upload_session_part'),
+    path('uploads/<uuid:upload_id>/complete/', views.upload_session_complete, name='upload_session_complete'),
+    path('download-urls/stats/', views.download_url_stats, name='download_url_stats'),
     path('<uuid:uuid>/', views.document_detail, name='document_detail'),
     path('<uuid:uuid>/download/', views.document_download, name='document_download'),
     path('<uuid:uuid>/download/<int:version>/', views.document_download, name='document_download_version'),
@@ -1,18 +1,98 @@
 import mimetypes
+import os
+from uuid import uuid4
+from django.conf import settings
+from django.core import signing
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
-from django.http import HttpResponse, JsonResponse, Http404, FileResponse
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import HttpResponse, JsonResponse, Http404
 from django.urls import reverse
 from django.contrib import messages
 from django.utils.translation import gettext as _
 from django.db import transaction
 from django.core.paginator import Paginator
-from .models import Document, DocumentCategory, DocumentVersion, DocumentAccess
-from .services.s3_service import DocumentStorageService
+from django.utils.text import get_valid_filename
+from django.views.decorators.http import require_POST, require_http_methods
+from .models import Document, DocumentCategory, DocumentVersion, UploadSession
+from .services import chunked_upload
+from .services.downloads import serve_file
+from .services.integrity import record_upload
+from .services.lifecycle import needs_restore
+from .services.renditions import renditions_for_versions
+from .services.search import add_snippets, search_documents
+from .services.tags import filter_by_tag, tag_facets
+from .services.s3_service import get_document_service
+from .services.url_cache import get_url_scope
 import logging
 
 logger = logging.getLogger(__name__)
-document_service = DocumentStorageService()
+
+# Salt for the signed tickets handed to browsers during direct-to-S3 uploads
+DIRECT_UPLOAD_SALT = 'documents.direct_upload'
+
+
+def direct_uploads_enabled():
+    """Return True if browsers should upload files straight to S3"""
+    return getattr(settings, 'DOCUMENT_DIRECT_UPLOADS', False) and get_document_service().using_s3
+
+
+def get_upload_mode():
+    """
+    Return how the upload forms send files: 'chunked' (resumable chunked
+    upload API), 'direct' (presigned POST to S3) or 'form' (plain POST)
+    """
+    if getattr(settings, 'DOCUMENT_CHUNKED_UPLOADS', False):
+        return 'chunked'
+    if direct_uploads_enabled():
+        return 'direct'
+    return 'form'
+
+def downloadable_versions(request, versions):
+    """
+    Keep the versions of documents the user may download, checked with one query.
+    """
+    versions = [v for v in versions if v is not None]
+    if not versions:
+        return []
+    allowed = set(
+        Document.objects.filter(pk__in={v.document_id for v in versions})
+        .downloadable_by(request.user)
+        .values_list('pk', flat=True)
+    )
+    return [v for v in versions if v.document_id in allowed]
+
+def sign_download_urls(request, versions):
+    """
+    Presign S3 download URLs for the versions the user may download, in one
+    call, so templates can link straight to S3 instead of via a redirect.
+
+    Returns:
+        dict: DocumentVersion ID -> URL (empty when S3 is not in use)
+    """
+    storage_service = get_document_service()
+    # Cold contents that need a restore are linked through document_download
+    versions = [v for v in versions if v is not None and v.s3_key and not needs_restore(v)]
+    if not storage_service.using_s3 or not versions:
+        return {}
+    versions = downloadable_versions(request, versions)
+    return storage_service.get_document_urls(versions, scope=get_url_scope(request.user))
+
+def rendition_urls(request, versions, kind):
+    """
+    Look up thumbnail or preview image URLs for the versions the user may download.
+
+    Returns:
+        dict: DocumentVersion ID -> URL, for versions that have been rendered
+    """
+    renditions = renditions_for_versions(downloadable_versions(request, versions), kind=kind)
+    scope = get_url_scope(request.user)
+    urls = {}
+    for version_id, kinds in renditions.items():
+        success, url = get_document_service().get_rendition_url(kinds[kind], scope=scope)
+        if success:
+            urls[version_id] = url
+    return urls
 
 @login_required
 def document_list(request):
@@ -24,19 +104,47 @@ def document_list(request):
     if category_id:
         try:
             category = DocumentCategory.objects.get(id=category_id)
-            document_list = Document.objects.filter(category=category)
+            document_list = Document.objects.with_current_version().filter(category=category)
             title = f"Documents in {category.name}"
         except DocumentCategory.DoesNotExist:
-            document_list = Document.objects.all()
+            document_list = Document.objects.with_current_version()
             title = "All Documents"
     else:
-        document_list = Document.objects.all()
+        document_list = Document.objects.with_current_version()
         title = "All Documents"
     
+    # Only what the user may see is counted and paginated
+    document_list = document_list.accessible_to(request.user)
+    
+    # Filter by tag
+    selected_tag = request.GET.get('tag', '').strip()
+    if selected_tag:
+        document_list = filter_by_tag(document_list, selected_tag)
+        title = f'{title} tagged "{selected_tag}"'
+    
+    # Full-text search, best matches first
+    query = request.GET.get('q', '').strip()
+    if query:
+        document_list = search_documents(document_list, query)
+        title = f'{title} matching "{query}"'
+    
+    # Tag counts for the documents being listed
+    tags = tag_facets(document_list)
+    
     # Pagination
     paginator = Paginator(document_list, 15)  # Show 15 documents per page
     page_number = request.GET.get('page')
     documents = paginator.get_page(page_number)
+    if query:
+        documents.object_list = add_snippets(documents.object_list, query)
+    
+    # Sign the download links and find the thumbnails of the whole page at once
+    current_versions = [d.current_version for d in documents]
+    download_urls = sign_download_urls(request, current_versions)
+    thumbnail_urls = rendition_urls(request, current_versions, 'thumbnail')
+    for document in documents:
+        document.download_url = download_urls.get(document.current_version_id)
+        document.thumbnail_url = thumbnail_urls.get(document.current_version_id)
     
     # Get all categories for filter dropdown
     categories = DocumentCategory.objects.all().order_by('name')
@@ -45,7 +153,10 @@ def document_list(request):
         'documents': documents,
         'title': title,
         'categories': categories,
-        'selected_category': category_id
+        'selected_category': category_id,
+        'query': query,
+        'tags': tags,
+        'selected_tag': selected_tag
     })
 
 @login_required
@@ -55,20 +166,24 @@ def document_detail(request, uuid):
     """
     document = get_object_or_404(Document, uuid=uuid)
     
-    # Access control check
-    if document.is_private:
-        # Check if user has access
-        access = DocumentAccess.objects.filter(document=document, user=request.user).first()
-        if not access and not request.user.has_perm('documents.view_document'):
-            messages.error(request, _("You don't have permission to view this document."))
-            return redirect('documents:document_list')
+    # Access control check (public, owner, unexpired grant or model permission)
+    if not document.is_accessible_to(request.user, action='view'):
+        messages.error(request, _("You don't have permission to view this document."))
+        return redirect('documents:document_list')
     
     # Get versions, most recent first
-    versions = document.versions.all().order_by('-version_number')
+    versions = list(document.versions.order_by('-version_number'))
+    download_urls = sign_download_urls(request, versions)
+    for doc_version in versions:
+        doc_version.download_url = download_urls.get(doc_version.pk)
+    document.download_url = download_urls.get(document.current_version_id)
+    current = next((v for v in versions if v.pk == document.current_version_id), None)
+    document.preview_url = rendition_urls(request, [current], 'preview').get(document.current_version_id)
     
     return render(request, 'documents/document_detail.html', {
         'document': document,
         'versions': versions,
+        'upload_mode': get_upload_mode(),
     })
 
 @login_required
@@ -78,13 +193,10 @@ def document_download(request, uuid, version=None):
     """
     document = get_object_or_404(Document, uuid=uuid)
     
-    # Access control check
-    if document.is_private:
-        # Check if user has access
-        access = DocumentAccess.objects.filter(document=document, user=request.user).first()
-        if not access and not request.user.has_perm('documents.download_document'):
-            messages.error(request, _("You don't have permission to download this document."))
-            return redirect('documents:document_detail', uuid=uuid)
+    # Access control check (public, owner, unexpired grant or model permission)
+    if not document.is_accessible_to(request.user, action='download'):
+        messages.error(request, _("You don't have permission to download this document."))
+        return redirect('documents:document_detail', uuid=uuid)
     
     # Get requested version or default to latest
     if version:
@@ -95,10 +207,17 @@ def document_download(request, uuid, version=None):
             messages.error(request, _("No versions available for this document."))
             return redirect('documents:document_detail', uuid=uuid)
     
+    storage_service = get_document_service()
+    # Contents moved to the cold tier are restored first
+    success, message = storage_service.restore_document(doc_version)
+    if not success:
+        messages.warning(request, _("This document cannot be downloaded yet: {0}").format(message))
+        return redirect('documents:document_detail', uuid=uuid)
+    
     # Check if we're using S3
-    if document_service.using_s3 and doc_version.s3_key:
+    if storage_service.using_s3 and doc_version.s3_key:
         # Get presigned URL
-        success, url = document_service.get_document_url(doc_version)
+        success, url = storage_service.get_document_url(doc_version, scope=get_url_scope(request.user))
         if success:
             # Redirect to presigned URL
             return redirect(url)
@@ -106,17 +225,16 @@ def document_download(request, uuid, version=None):
             messages.error(request, _("Error retrieving document: {0}").format(url))
             return redirect('documents:document_detail', uuid=uuid)
     
-    # Fallback to local file
+    # Fallback to local file (ranges supported, optionally sent by the proxy)
     if doc_version.file:
-        # Try to determine content type
-        content_type, encoding = mimetypes.guess_type(doc_version.file_name)
-        if not content_type:
-            content_type = 'application/octet-stream'
-        
         try:
-            response = FileResponse(doc_version.file, content_type=content_type)
-            response['Content-Disposition'] = f'attachment; filename="{doc_version.file_name}"'
-            return response
+            return serve_file(
+                request,
+                doc_version.file,
+                doc_version.file_name,
+                etag=doc_version.checksum or None,
+                last_modified=doc_version.uploaded_at
+            )
         except Exception as e:
             logger.error(f"Error downloading document: {str(e)}")
             messages.error(request, _("Error retrieving document. Please try again later."))
@@ -237,5 +355,334 @@ def document_upload(request):
     
     # Display the upload form
     return render(request, 'documents/document_upload.html', {
-        'categories': DocumentCategory.objects.all().order_by('name')
-    })
\ No newline at end of file
+        'categories': DocumentCategory.objects.all().order_by('name'),
+        'upload_mode': get_upload_mode(),
+    })
+
+def _parse_upload_request(request):
+    """
+    Validate the metadata sent by the browser before a direct or chunked upload.
+    
+    Returns:
+        tuple: (upload dict, None) on success or (None, JsonResponse) on error.
+        The upload dict holds file_name, file_size, content_type, document,
+        is_private and the metadata needed to create the document later.
+    """
+    file_name = get_valid_filename(os.path.basename(request.POST.get('file_name', '')))
+    if not file_name:
+        return None, JsonResponse({'error': _("No file was uploaded.")}, status=400)
+    
+    try:
+        file_size = int(request.POST.get('file_size', 0))
+    except ValueError:
+        file_size = 0
+    if file_size <= 0 or file_size > settings.DOCUMENT_MAX_UPLOAD_SIZE:
+        return None, JsonResponse({'error': _("Invalid file size.")}, status=400)
+    
+    content_type = (
+        request.POST.get('content_type')
+        or mimetypes.guess_type(file_name)[0]
+        or 'application/octet-stream'
+    )
+    
+    document_id = request.POST.get('document_id')
+    if document_id:
+        # New version for existing document
+        document = Document.objects.filter(pk=document_id).first()
+        if not document:
+            return None, JsonResponse({'error': _("Document not found.")}, status=404)
+        if not request.user.has_perm('documents.change_document'):
+            return None, JsonResponse({'error': _("You don't have permission to add new versions.")}, status=403)
+        
+        metadata = {
+            'document_id': document.pk,
+            'notes': request.POST.get('notes', ''),
+        }
+        document_uuid = str(document.uuid)
+        is_private = document.is_private
+    else:
+        # New document - created once the upload completes
+        if not request.user.has_perm('documents.add_document'):
+            return None, JsonResponse({'error': _("You don't have permission to add new documents.")}, status=403)
+        if not request.POST.get('title'):
+            return None, JsonResponse({'error': _("Title is required.")}, status=400)
+        
+        document = None
+        document_uuid = str(uuid4())
+        is_private = request.POST.get('is_private') == 'on'
+        metadata = {
+            'document_uuid': document_uuid,
+            'title': request.POST.get('title'),
+            'description': request.POST.get('description', ''),
+            'category': request.POST.get('category') or None,
+            'is_private': is_private,
+            'tags': request.POST.get('tags', ''),
+        }
+    
+    return {
+        'file_name': file_name,
+        'file_size': file_size,
+        'content_type': content_type,
+        'document': document,
+        'document_uuid': document_uuid,
+        'is_private': is_private,
+        'metadata': metadata,
+    }, None
+
+
+def _get_or_create_upload_document(metadata, user):
+    """
+    Return the document an upload belongs to, creating it from the
+    metadata captured when the upload started if it is a new document.
+    """
+    if metadata.get('document_id'):
+        return Document.objects.filter(pk=metadata['document_id']).first()
+    
+    # A retried completion may find the document already created
+    document = Document.objects.filter(uuid=metadata['document_uuid']).first()
+    if document:
+        return document
+    
+    category = None
+    if metadata['category']:
+        category = DocumentCategory.objects.filter(pk=metadata['category']).first()
+    
+    document = Document(
+        uuid=metadata['document_uuid'],
+        title=metadata['title'],
+        description=metadata['description'],
+        category=category,
+        is_private=metadata['is_private'],
+        tags=metadata['tags'],
+        created_by=user,
+        updated_by=user
+    )
+    document.save()
+    return document
+
+
+@login_required
+@require_POST
+def document_upload_presign(request):
+    """
+    Issue a presigned POST so the browser can upload a file straight to S3.
+    
+    Returns the upload URL and form fields plus a signed ticket that the
+    browser hands back to document_upload_complete once the upload finishes.
+    """
+    if not direct_uploads_enabled():
+        return JsonResponse({'error': _("Direct uploads are not enabled.")}, status=400)
+    
+    upload, error = _parse_upload_request(request)
+    if error:
+        return error
+    
+    s3_key = f"documents/{upload['document_uuid']}/uploads/{uuid4().hex}/{upload['file_name']}"
+    success, presigned = get_document_service().create_presigned_post(
+        s3_key,
+        content_type=upload['content_type'],
+        max_size=settings.DOCUMENT_MAX_UPLOAD_SIZE,
+        is_private=upload['is_private'],
+        expires=settings.DOCUMENT_DIRECT_UPLOAD_EXPIRES
+    )
+    if not success:
+        return JsonResponse({'error': presigned}, status=502)
+    
+    ticket = dict(upload['metadata'])
+    ticket.update({
+        'user': request.user.pk,
+        's3_key': s3_key,
+        'file_name': upload['file_name'],
+    })
+    
+    return JsonResponse({
+        'url': presigned['url'],
+        'fields': presigned['fields'],
+        'ticket': signing.dumps(ticket, salt=DIRECT_UPLOAD_SALT),
+    })
+
+@login_required
+@require_POST
+def document_upload_complete(request):
+    """
+    Record a file the browser uploaded directly to S3 as a new document version
+    """
+    try:
+        ticket = signing.loads(
+            request.POST.get('ticket', ''),
+            salt=DIRECT_UPLOAD_SALT,
+            max_age=settings.DOCUMENT_DIRECT_UPLOAD_EXPIRES * 2
+        )
+    except signing.BadSignature:
+        return JsonResponse({'error': _("Invalid or expired upload ticket.")}, status=400)
+    
+    if ticket['user'] != request.user.pk:
+        return JsonResponse({'error': _("This upload belongs to another user.")}, status=403)
+    
+    # Completing the same upload twice must not create a second version
+    existing = DocumentVersion.objects.filter(s3_key=ticket['s3_key']).select_related('document').first()
+    if existing:
+        return JsonResponse({
+            'redirect_url': existing.document.get_absolute_url(),
+            'version': existing.version_number,
+        })
+    
+    # Make sure the object actually landed in the bucket
+    success, metadata = get_document_service().get_object_metadata(ticket['s3_key'])
+    if not success:
+        return JsonResponse({'error': metadata}, status=400)
+    
+    with transaction.atomic():
+        document = _get_or_create_upload_document(ticket, request.user)
+        if not document:
+            return JsonResponse({'error': _("Document not found.")}, status=404)
+        
+        version = DocumentVersion(
+            document=document,
+            file_name=ticket['file_name'],
+            file_size=metadata['size'],
+            file_type=metadata['content_type'],
+            s3_key=ticket['s3_key'],
+            notes=ticket.get('notes', ''),
+            uploaded_by=request.user
+        )
+        version.save()
+        # The server never reads these bytes; the ETag is what later checks compare to
+        record_upload(version, metadata['etag'])
+    
+    if ticket.get('document_id'):
+        messages.success(request, _("New version uploaded successfully."))
+    else:
+        messages.success(request, _("Document uploaded successfully."))
+    
+    return JsonResponse({
+        'redirect_url': document.get_absolute_url(),
+        'version': version.version_number,
+    })
+
+
+def _upload_session_response(session, status=200):
+    """Serialize an upload session for the chunked upload API"""
+    parts = chunked_upload.received_parts(session)
+    missing = sorted(set(range(1, session.total_parts + 1)) - set(parts))
+    detail_url = reverse('documents:upload_session_detail', args=[session.uuid])
+    return JsonResponse({
+        'upload_id': str(session.uuid),
+        'status': session.status,
+        'file_name': session.file_name,
+        'file_size': session.file_size,
+        'chunk_size': session.chunk_size,
+        'total_parts': session.total_parts,
+        'received_parts': parts,
+        'next_part': missing[0] if missing else None,
+        'detail_url': detail_url,
+        'parts_url': f"{detail_url}parts/",
+        'complete_url': reverse('documents:upload_session_complete', args=[session.uuid]),
+    }, status=status)
+
+
+@login_required
+@require_POST
+def upload_session_create(request):
+    """
+    Start a resumable chunked upload.
+    
+    The browser then sends each chunk to upload_session_part (several at a
+    time), and can ask upload_session_detail which parts were acknowledged
+    to resume after a dropped connection.
+    """
+    upload, error = _parse_upload_request(request)
+    if error:
+        return error
+    
+    try:
+        session = chunked_upload.start_session(
+            get_document_service(),
+            request.user,
+            upload['file_name'],
+            upload['file_size'],
+            content_type=upload['content_type'],
+            document=upload['document'],
+            document_metadata=upload['metadata'],
+            is_private=upload['is_private']
+        )
+    except chunked_upload.ChunkedUploadError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    
+    return _upload_session_response(session, status=201)
+
+
+@login_required
+@require_http_methods(['GET', 'DELETE'])
+def upload_session_detail(request, upload_id):
+    """
+    Report the parts received for an upload (GET) or abort it (DELETE)
+    """
+    session = get_object_or_404(UploadSession, uuid=upload_id, user=request.user)
+    
+    if request.method == 'DELETE':
+        chunked_upload.abort_session(get_document_service(), session)
+    
+    return _upload_session_response(session)
+
+
+@login_required
+@require_http_methods(['PUT'])
+def upload_session_part(request, upload_id, part_number):
+    """
+    Receive one chunk of a resumable upload as the raw request body
+    """
+    session = get_object_or_404(UploadSession, uuid=upload_id, user=request.user)
+    
+    try:
+        part = chunked_upload.store_part(get_document_service(), session, part_number, request)
+    except chunked_upload.ChunkedUploadError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    
+    return JsonResponse({
+        'part_number': part.part_number,
+        'size': part.size,
+        'checksum': part.checksum,
+    })
+
+
+@login_required
+@require_POST
+def upload_session_complete(request, upload_id):
+    """
+    Assemble a chunked upload and record it as a new document version
+    """
+    session = get_object_or_404(UploadSession, uuid=upload_id, user=request.user)
+    
+    if session.status == 'completed' and session.version_id:
+        version = session.version
+    else:
+        with transaction.atomic():
+            document = session.document or _get_or_create_upload_document(
+                session.document_metadata, request.user
+            )
+            if not document:
+                return JsonResponse({'error': _("Document not found.")}, status=404)
+            
+            try:
+                version = chunked_upload.complete_session(get_document_service(), session, document)
+            except chunked_upload.ChunkedUploadError as e:
+                transaction.set_rollback(True)
+                return JsonResponse({'error': str(e)}, status=400)
+        
+        if session.document_metadata.get('document_id'):
+            messages.success(request, _("New version uploaded successfully."))
+        else:
+            messages.success(request, _("Document uploaded successfully."))
+    
+    return JsonResponse({
+        'redirect_url': version.document.get_absolute_url(),
+        'version': version.version_number,
+    })
+
+@staff_member_required
+def download_url_stats(request):
+    """
+    Report hit/miss counters of this process's presigned URL cache
+    """
+    return JsonResponse(get_document_service().url_cache.stats())
@@ -0,0 +1,147 @@
+// Resumable chunked document uploads
+//
+// Forms marked with data-chunked-url split the file into parts and send
+// several at a time. The upload ID is remembered in localStorage, so picking
+// the same file again after a failure only sends the missing parts.
+
+const PARALLEL_PARTS = 4;
+const MAX_PART_RETRIES = 3;
+
+document.addEventListener('DOMContentLoaded', function() {
+    const forms = document.querySelectorAll('form[data-chunked-url]');
+
+    forms.forEach(form => {
+        form.addEventListener('submit', function(e) {
+            const fileInput = form.querySelector('input[type="file"]');
+            if (!fileInput || !fileInput.files.length) {
+                return;
+            }
+
+            e.preventDefault();
+            const file = fileInput.files[0];
+            const submitButton = form.querySelector('button[type="submit"]');
+            const setStatus = text => {
+                if (submitButton) {
+                    submitButton.textContent = text;
+                }
+            };
+            if (submitButton) {
+                submitButton.disabled = true;
+            }
+
+            getSession(form, fileInput, file)
+                .then(session => uploadParts(session, file, setStatus))
+                .then(session => request(session.complete_url, { method: 'POST' }))
+                .then(result => {
+                    localStorage.removeItem(resumeKey(file));
+                    window.location = result.redirect_url;
+                })
+                .catch(error => {
+                    alert(error.message + '\nSubmit the same file again to resume.');
+                    if (submitButton) {
+                        submitButton.disabled = false;
+                        submitButton.textContent = 'Upload';
+                    }
+                });
+        });
+    });
+
+    function resumeKey(file) {
+        return 'chunked-upload:' + [file.name, file.size, file.lastModified].join(':');
+    }
+
+    // Resume a previous session for this file if the server still has it
+    function getSession(form, fileInput, file) {
+        const saved = localStorage.getItem(resumeKey(file));
+        const resume = saved
+            ? request(saved, { method: 'GET' }).catch(() => null)
+            : Promise.resolve(null);
+
+        return resume.then(session => {
+            if (session && session.status === 'active') {
+                return session;
+            }
+
+            const metadata = new FormData(form);
+            metadata.delete(fileInput.name);
+            metadata.append('file_name', file.name);
+            metadata.append('file_size', file.size);
+            metadata.append('content_type', file.type || 'application/octet-stream');
+
+            return request(form.dataset.chunkedUrl, { method: 'POST', body: metadata }).then(created => {
+                localStorage.setItem(resumeKey(file), created.detail_url);
+                return created;
+            });
+        });
+    }
+
+    function uploadParts(session, file, setStatus) {
+        const received = new Set(session.received_parts);
+        const pending = [];
+        for (let part = 1; part <= session.total_parts; part++) {
+            if (!received.has(part)) {
+                pending.push(part);
+            }
+        }
+
+        let done = received.size;
+        setStatus('Uploading ' + Math.floor(100 * done / session.total_parts) + '%');
+
+        const worker = () => {
+            const part = pending.shift();
+            if (part === undefined) {
+                return Promise.resolve();
+            }
+            const start = (part - 1) * session.chunk_size;
+            const blob = file.slice(start, Math.min(start + session.chunk_size, file.size));
+
+            return sendPart(session.parts_url + part + '/', blob, MAX_PART_RETRIES).then(() => {
+                done++;
+                setStatus('Uploading ' + Math.floor(100 * done / session.total_parts) + '%');
+                return worker();
+            });
+        };
+
+        const workers = [];
+        for (let i = 0; i < Math.min(PARALLEL_PARTS, pending.length); i++) {
+            workers.push(worker());
+        }
+        return Promise.all(workers).then(() => session);
+    }
+
+    function sendPart(url, blob, retries) {
+        return request(url, { method: 'PUT', body: blob }).catch(error => {
+            if (retries <= 0) {
+                throw error;
+            }
+            return new Promise(resolve => setTimeout(resolve, 1000 * (MAX_PART_RETRIES - retries + 1)))
+                .then(() => sendPart(url, blob, retries - 1));
+        });
+    }
+
+    function request(url, options) {
+        options.headers = { 'X-CSRFToken': getCookie('csrftoken') };
+        options.credentials = 'same-origin';
+        return fetch(url, options).then(response => response.json().then(body => {
+            if (!response.ok) {
+                throw new Error(body.error || 'Upload failed');
+            }
+            return body;
+        }));
+    }
+
+    function getCookie(name) {
+        let cookieValue = null;
+        if (document.cookie && document.cookie !== '') {
+            const cookies = document.cookie.split(';');
+            for (let i = 0; i < cookies.length; i++) {
+                const cookie = cookies[i].trim();
+                if (cookie.substring(0, name.length + 1) === (name + '=')) {
+                    cookieValue = decodeURIComponent(cookie.substring(name.length + 1));
+                    break;
+                }
+            }
+        }
+        return cookieValue;
+    }
+});
@@ -0,0 +1,91 @@
+// Direct-to-S3 document uploads
+//
+// Forms marked with data-presign-url send the file straight to the S3 bucket
+// using a presigned POST, then tell Django to record the new version.
+
+document.addEventListener('DOMContentLoaded', function() {
+    const forms = document.querySelectorAll('form[data-presign-url]');
+
+    forms.forEach(form => {
+        form.addEventListener('submit', function(e) {
+            const fileInput = form.querySelector('input[type="file"]');
+            if (!fileInput || !fileInput.files.length) {
+                return;
+            }
+
+            e.preventDefault();
+            const file = fileInput.files[0];
+            const submitButton = form.querySelector('button[type="submit"]');
+            if (submitButton) {
+                submitButton.disabled = true;
+                submitButton.textContent = 'Uploading...';
+            }
+
+            // Send the form metadata (without the file) to get an upload policy
+            const metadata = new FormData(form);
+            metadata.delete(fileInput.name);
+            metadata.append('file_name', file.name);
+            metadata.append('file_size', file.size);
+            metadata.append('content_type', file.type || 'application/octet-stream');
+
+            postForm(form.dataset.presignUrl, metadata)
+                .then(presigned => {
+                    const upload = new FormData();
+                    Object.entries(presigned.fields).forEach(([key, value]) => upload.append(key, value));
+                    // S3 requires the file to be the last field
+                    upload.append('file', file);
+
+                    return fetch(presigned.url, { method: 'POST', body: upload }).then(response => {
+                        if (!response.ok) {
+                            throw new Error('Upload to storage failed (' + response.status + ')');
+                        }
+                        return presigned.ticket;
+                    });
+                })
+                .then(ticket => {
+                    const completion = new FormData();
+                    completion.append('ticket', ticket);
+                    return postForm(form.dataset.completeUrl, completion);
+                })
+                .then(result => {
+                    window.location = result.redirect_url;
+                })
+                .catch(error => {
+                    alert(error.message);
+                    if (submitButton) {
+                        submitButton.disabled = false;
+                        submitButton.textContent = 'Upload';
+                    }
+                });
+        });
+    });
+
+    function postForm(url, data) {
+        return fetch(url, {
+            method: 'POST',
+            body: data,
+            headers: { 'X-CSRFToken': getCookie('csrftoken') },
+            credentials: 'same-origin'
+        }).then(response => response.json().then(body => {
+            if (!response.ok) {
+                throw new Error(body.error || 'Upload failed');
+            }
+            return body;
+        }));
+    }
+
+    function getCookie(name) {
+        let cookieValue = null;
+        if (document.cookie && document.cookie !== '') {
+            const cookies = document.cookie.split(';');
+            for (let i = 0; i < cookies.length; i++) {
+                const cookie = cookies[i].trim();
+                if (cookie.substring(0, name.length + 1) === (name + '=')) {
+                    cookieValue = decodeURIComponent(cookie.substring(name.length + 1));
+                    break;
+                }
+            }
+        }
+        return cookieValue;
+    }
+});